@@ -16,6 +16,8 @@ sys.path.append('/workspace')
 from shared.auth.firebase_auth import require_auth
 from shared.db.neo4j_client import execute_query
 from shared.utils.logging import get_logger
+from shared.utils.metrics import start_metrics_flush
+from shared.utils.warmup import WARMUP_FIREBASE, WARMUP_NEO4J, start_warmup, wait_for_warmup
 
 logger = get_logger(__name__)
 
@@ -28,6 +30,12 @@ ALLOWED_ORIGINS = [
     'http://localhost:3000'
 ]
 
+# Opt-in background warm-up (WARMUP_ON_START)
+start_warmup([WARMUP_FIREBASE, WARMUP_NEO4J], PROJECT_ID)
+
+# Periodic metrics export (METRICS_EXPORTER)
+start_metrics_flush()
+
 
 def add_cors_headers(response, origin):
     """Add CORS headers to response."""
@@ -61,6 +69,7 @@ def graph_function(request: Request):
         # Get authenticated user ID (set by @require_auth decorator)
         user_id = request.user_id
         logger.info(f"Processing graph request for user: {user_id}")
+        wait_for_warmup(WARMUP_NEO4J)
         
         # Route based on query parameters
         if request.args.get('search') == 'true':
@@ -85,15 +94,11 @@ def get_nodes(user_id: str, request: Request):
     offset = int(request.args.get('offset', 0))
     node_type = request.args.get('type', None)
     
-    # Build query - only return nodes owned by user
+    # Only return nodes owned by user; the type filter is a parameter so the
+    # statement text (and its cached plan) is the same for every request
     query = """
     MATCH (u:User {userId: $userId})-[:OWNS]->(n)
-    """
-    
-    if node_type:
-        query += f"WHERE '{node_type}' IN labels(n) "
-    
-    query += """
+    WHERE $nodeType IS NULL OR $nodeType IN labels(n)
     RETURN n, labels(n) as types, elementId(n) as id
     ORDER BY n.createdAt DESC
     SKIP $offset
@@ -104,9 +109,11 @@ def get_nodes(user_id: str, request: Request):
         cypher=query,
         parameters={
             'userId': user_id,
+            'nodeType': node_type,
             'offset': offset,
             'limit': limit
-        }
+        },
+        template="graph.get_nodes"
     )
     
     nodes = []
@@ -150,7 +157,8 @@ def get_node_details(user_id: str, node_id: str):
         parameters={
             'userId': user_id,
             'nodeId': node_id
-        }
+        },
+        template="graph.get_node_details"
     )
     
     if not result:
@@ -185,7 +193,8 @@ def search_nodes(user_id: str, request: Request):
         parameters={
             'userId': user_id,
             'query': query_text
-        }
+        },
+        template="graph.search_nodes"
     )
     
     nodes = []
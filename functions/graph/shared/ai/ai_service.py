@@ -7,12 +7,15 @@ caching, and error handling.
 
 import logging
 from typing import List, Optional, Dict, Any
-from google.cloud import secretmanager
 
 from .base_provider import BaseAIProvider, AIProviderError
 from .gemini_provider import GeminiProvider
 from ..models.entity import Entity
 from ..models.relationship import Relationship
+from ..utils.lazy_import import lazy_import
+
+# Imported on first use (only needed when no API key is passed in)
+secretmanager = lazy_import("google.cloud.secretmanager")
 
 logger = logging.getLogger(__name__)
 
@@ -15,8 +15,13 @@ from .graph_queries import (
     build_create_relationship_query,
     GET_USER_STATS
 )
-from ..models.entity import Entity
-from ..models.relationship import Relationship
+from ..models.entity import Entity, normalize_entity_type
+from ..models.relationship import (
+    REL_TYPE_RELATED_TO,
+    VALID_RELATIONSHIP_TYPES,
+    Relationship,
+    normalize_relationship_type
+)
 
 logger = logging.getLogger(__name__)
 
@@ -52,7 +57,8 @@ class GraphPopulator:
             result = execute_query(
                 CREATE_USER_NODE,
                 {'user_id': user_id},
-                self.project_id
+                self.project_id,
+                template="graph_populator.ensure_user"
             )
             
             logger.info(f"User node ensured: {user_id}")
@@ -78,8 +84,8 @@ class GraphPopulator:
             # Ensure user exists
             await self.ensure_user_exists(entity.user_id)
             
-            # Build query for specific entity type
-            query = build_create_entity_query(entity.type)
+            # Build query for specific entity type (unknown types map to Thing)
+            query = build_create_entity_query(normalize_entity_type(entity.type))
             
             # Prepare parameters
             params = {
@@ -91,7 +97,7 @@ class GraphPopulator:
             }
             
             # Execute query
-            result = execute_query(query, params, self.project_id)
+            result = execute_query(query, params, self.project_id, template="graph_populator.create_entity")
             
             logger.info(f"Entity created: {entity.name}")
             return result[0] if result else {}
@@ -141,8 +147,15 @@ class GraphPopulator:
             # Ensure user exists
             await self.ensure_user_exists(relationship.user_id)
             
-            # Build query for specific relationship type
-            query = build_create_relationship_query(relationship.relationship_type)
+            # Build query for specific relationship type; aliases map to their
+            # standard type and custom types are stored as RELATED_TO with the
+            # original type as a property
+            properties = relationship.properties
+            relationship_type = normalize_relationship_type(relationship.relationship_type)
+            if relationship_type not in VALID_RELATIONSHIP_TYPES:
+                properties = {**properties, 'original_type': relationship.relationship_type}
+                relationship_type = REL_TYPE_RELATED_TO
+            query = build_create_relationship_query(relationship_type)
             
             # Prepare parameters
             params = {
@@ -151,11 +164,11 @@ class GraphPopulator:
                 'target_name': relationship.target_entity,
                 'confidence': relationship.confidence,
                 'source_document_id': relationship.source_document_id,
-                'properties': relationship.properties
+                'properties': properties
             }
             
             # Execute query
-            result = execute_query(query, params, self.project_id)
+            result = execute_query(query, params, self.project_id, template="graph_populator.create_relationship")
             
             logger.info(f"Relationship created: {relationship.relationship_type}")
             return result[0] if result else {}
@@ -253,7 +266,8 @@ class GraphPopulator:
             result = execute_query(
                 GET_USER_STATS,
                 {'user_id': user_id},
-                self.project_id
+                self.project_id,
+                template="graph_populator.user_stats"
             )
             
             if result and len(result) > 0:
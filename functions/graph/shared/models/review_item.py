@@ -4,8 +4,10 @@ Review item data model for AletheiaCodex.
 Defines the structure for items in the review queue that users can approve or reject.
 """
 
+import hashlib
+import re
 from dataclasses import dataclass, field
-from typing import Dict, Any, Optional, Literal
+from typing import Dict, Any, List, Optional, Literal
 from datetime import datetime
 from enum import Enum
 
@@ -23,6 +25,40 @@ class ReviewItemStatus(str, Enum):
     REJECTED = "rejected"
 
 
+# Fields needed by the review list view. Used as the Firestore projection for
+# summary listings so large fields (extracted_text, metadata) are never read.
+REVIEW_ITEM_SUMMARY_FIELDS = [
+    'user_id',
+    'type',
+    'status',
+    'confidence',
+    'source_document_id',
+    'created_at',
+    'entity',
+    'relationship',
+    'occurrence_count'
+]
+
+# Maximum number of source documents recorded on an aggregated review item
+MAX_SOURCE_DOCUMENT_IDS = 50
+
+
+def normalize_review_name(name: str) -> str:
+    """
+    Normalize an entity name for duplicate detection.
+    
+    Case and whitespace differences ("Google", " google ", "GOOGLE") map to
+    the same value.
+    
+    Args:
+        name: Raw entity name
+        
+    Returns:
+        Normalized name
+    """
+    return re.sub(r'\s+', ' ', name).strip().casefold()
+
+
 @dataclass
 class ReviewItem:
     """
@@ -42,6 +78,8 @@ class ReviewItem:
         extracted_text: Context text from document
         rejection_reason: Reason for rejection (if rejected)
         metadata: Additional metadata
+        occurrence_count: Number of source documents the item was extracted from
+        source_document_ids: Documents the item was extracted from (first MAX_SOURCE_DOCUMENT_IDS)
     """
     user_id: str
     type: ReviewItemType
@@ -56,6 +94,8 @@ class ReviewItem:
     extracted_text: Optional[str] = None
     rejection_reason: Optional[str] = None
     metadata: Dict[str, Any] = field(default_factory=dict)
+    occurrence_count: int = 1
+    source_document_ids: List[str] = field(default_factory=list)
     
     def __post_init__(self):
         """Validate review item after initialization."""
@@ -91,6 +131,9 @@ class ReviewItem:
         # Normalize fields
         self.user_id = self.user_id.strip()
         self.source_document_id = self.source_document_id.strip()
+        
+        if not self.source_document_ids:
+            self.source_document_ids = [self.source_document_id]
     
     def to_dict(self) -> Dict[str, Any]:
         """Convert review item to dictionary representation."""
@@ -107,9 +150,16 @@ class ReviewItem:
             'relationship': self.relationship,
             'extracted_text': self.extracted_text,
             'rejection_reason': self.rejection_reason,
-            'metadata': self.metadata
+            'metadata': self.metadata,
+            'occurrence_count': self.occurrence_count,
+            'source_document_ids': self.source_document_ids
         }
     
+    def to_summary_dict(self) -> Dict[str, Any]:
+        """Convert review item to the lightweight representation used by list views."""
+        data = self.to_dict()
+        return {key: data[key] for key in ['id'] + REVIEW_ITEM_SUMMARY_FIELDS}
+    
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> 'ReviewItem':
         """Create review item from dictionary representation."""
@@ -144,9 +194,62 @@ class ReviewItem:
             relationship=data.get('relationship'),
             extracted_text=data.get('extracted_text'),
             rejection_reason=data.get('rejection_reason'),
-            metadata=data.get('metadata', {})
+            metadata=data.get('metadata', {}),
+            occurrence_count=data.get('occurrence_count', 1),
+            source_document_ids=data.get('source_document_ids', [])
         )
     
+    def get_canonical_key(self) -> str:
+        """
+        Get the key shared by all extractions of the same entity or relationship.
+        
+        Entities are keyed by (user, normalized name, type) and relationships
+        by (user, normalized source, type, normalized target).
+        """
+        if self.type == ReviewItemType.ENTITY:
+            parts = [
+                'entity',
+                self.user_id,
+                normalize_review_name(self.entity['name']),
+                self.entity['type'].strip().casefold()
+            ]
+        else:
+            parts = [
+                'relationship',
+                self.user_id,
+                normalize_review_name(self.relationship['source_entity']),
+                self.relationship['relationship_type'].strip().upper(),
+                normalize_review_name(self.relationship['target_entity'])
+            ]
+        return '\x1f'.join(parts)
+    
+    def get_canonical_id(self) -> str:
+        """Get a deterministic document ID for the item's canonical key."""
+        return hashlib.sha256(self.get_canonical_key().encode('utf-8')).hexdigest()[:40]
+    
+    def merge_occurrence(self, other: 'ReviewItem'):
+        """
+        Merge another extraction of the same entity/relationship into this item.
+        
+        Keeps the highest confidence and records the other item's source
+        documents. Only documents not already recorded add to the occurrence
+        count, so re-extracting a note (retries, re-runs, backfills) does not
+        inflate it. Once MAX_SOURCE_DOCUMENT_IDS documents are recorded, later
+        documents are counted without being recorded.
+        
+        Args:
+            other: Review item with the same canonical key
+        """
+        self.confidence = max(self.confidence, other.confidence)
+        for doc_id in dict.fromkeys(other.source_document_ids):
+            if doc_id in self.source_document_ids:
+                continue
+            self.occurrence_count += 1
+            if len(self.source_document_ids) < MAX_SOURCE_DOCUMENT_IDS:
+                self.source_document_ids.append(doc_id)
+        if not self.extracted_text:
+            self.extracted_text = other.extracted_text
+    
     def is_pending(self) -> bool:
         """Check if item is pending review."""
         return self.status == ReviewItemStatus.PENDING
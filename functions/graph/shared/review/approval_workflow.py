@@ -307,7 +307,9 @@ class ApprovalWorkflow:
             metadata={
                 'review_item_id': item.id,
                 'approved_at': datetime.utcnow().isoformat(),
-                'extracted_text': item.extracted_text
+                'extracted_text': item.extracted_text,
+                'occurrence_count': item.occurrence_count,
+                'source_document_ids': item.source_document_ids
             }
         )
     
@@ -328,7 +330,9 @@ class ApprovalWorkflow:
             metadata={
                 'review_item_id': item.id,
                 'approved_at': datetime.utcnow().isoformat(),
-                'extracted_text': item.extracted_text
+                'extracted_text': item.extracted_text,
+                'occurrence_count': item.occurrence_count,
+                'source_document_ids': item.source_document_ids
             }
         )
     
@@ -415,7 +419,7 @@ class ApprovalWorkflow:
             
             query += " RETURN e.id AS id LIMIT 1"
             
-            result = execute_neo4j_query_http(query, params)
+            result = execute_neo4j_query_http(query, params, template="review.find_entity")
             if result and 'data' in result and result['data']:
                 return result['data'][0][0]  # First row, first column
             return None
@@ -437,7 +441,7 @@ class ApprovalWorkflow:
                 'type': relationship.relationship_type
             }
             
-            result = execute_neo4j_query_http(query, params)
+            result = execute_neo4j_query_http(query, params, template="review.find_relationship")
             if result and 'data' in result and result['data']:
                 return result['data'][0][0]
             return None
@@ -0,0 +1,480 @@
+"""
+Background batch jobs for large review operations.
+
+Batch approve/reject requests that exceed the synchronous batch limit are
+stored as job documents and processed in resumable chunks by a worker.
+Progress is checkpointed after every chunk, so a worker that runs out of time
+(or crashes) re-enqueues the job and the next run continues where it stopped.
+A job whose task was lost altogether is re-driven by the next status poll
+once its lease has expired (see BatchJobManager.claim_stalled).
+
+A job targets either an explicit list of item IDs or a selector over the
+user's pending items (e.g. all pending entities above a confidence threshold).
+"""
+
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from enum import Enum
+from typing import Any, Dict, List, Optional
+
+from google.cloud import firestore
+from google.cloud.firestore_v1 import FieldFilter
+
+from ..db.firestore_client import get_firestore_client
+from ..models.review_item import ReviewItemType, ReviewItemStatus
+from ..utils.logging import get_logger
+from .batch_processor import BatchOperationType, BatchProcessor, create_batch_processor
+
+logger = get_logger(__name__)
+
+# Number of failures kept on the job document (the counts are always exact)
+MAX_RECORDED_FAILURES = 100
+
+# How long a worker owns a job before another worker may take it over
+JOB_LEASE_SECONDS = 120
+
+
+class BatchJobStatus(str, Enum):
+    """Status of a batch job."""
+    QUEUED = "queued"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+
+@dataclass
+class BatchJob:
+    """
+    A background batch approve/reject job.
+    
+    Attributes:
+        id: Job ID
+        user_id: Owner of the job and of every item it touches
+        operation_type: approve or reject
+        status: Current job status
+        item_ids: Explicit item IDs (None when a selector is used)
+        selector: Pending-item selector ({'min_confidence', 'type'}) when item_ids is None
+        reason: Rejection reason (reject jobs only)
+        total_items: Number of items known so far (exact for item_ids jobs)
+        processed_count: Items processed so far
+        successful_count: Items that succeeded
+        failed_count: Items that failed
+        failed: Details of the first MAX_RECORDED_FAILURES failures
+        position: Checkpoint (index into item_ids)
+        cursor: Checkpoint (pending-queue cursor) for selector jobs
+        created_at: Creation time
+        updated_at: Last checkpoint time
+        completed_at: Completion time
+        error: Error message if the job failed
+    """
+    user_id: str
+    operation_type: BatchOperationType
+    status: BatchJobStatus = BatchJobStatus.QUEUED
+    id: Optional[str] = None
+    item_ids: Optional[List[str]] = None
+    selector: Optional[Dict[str, Any]] = None
+    reason: Optional[str] = None
+    total_items: int = 0
+    processed_count: int = 0
+    successful_count: int = 0
+    failed_count: int = 0
+    failed: List[Dict[str, Any]] = field(default_factory=list)
+    position: int = 0
+    cursor: Optional[str] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+    completed_at: Optional[datetime] = None
+    error: Optional[str] = None
+    
+    def is_finished(self) -> bool:
+        """Check if the job has reached a terminal status."""
+        return self.status in (BatchJobStatus.COMPLETED, BatchJobStatus.FAILED)
+    
+    def get_progress(self) -> float:
+        """Get progress as percentage (0.0 to 100.0)."""
+        if self.status == BatchJobStatus.COMPLETED:
+            return 100.0
+        if self.total_items == 0:
+            return 0.0
+        return min(100.0, (self.processed_count / self.total_items) * 100.0)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert job to its Firestore representation."""
+        return {
+            'id': self.id,
+            'user_id': self.user_id,
+            'operation_type': self.operation_type.value,
+            'status': self.status.value,
+            'item_ids': self.item_ids,
+            'selector': self.selector,
+            'reason': self.reason,
+            'total_items': self.total_items,
+            'processed_count': self.processed_count,
+            'successful_count': self.successful_count,
+            'failed_count': self.failed_count,
+            'failed': self.failed,
+            'position': self.position,
+            'cursor': self.cursor,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None,
+            'completed_at': self.completed_at.isoformat() if self.completed_at else None,
+            'error': self.error
+        }
+    
+    def to_status_dict(self) -> Dict[str, Any]:
+        """Convert job to the representation returned by the status endpoint."""
+        data = self.to_dict()
+        for key in ('item_ids', 'position', 'cursor'):
+            data.pop(key)
+        data['progress'] = self.get_progress()
+        return data
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'BatchJob':
+        """Create job from its Firestore representation."""
+        def parse_time(value):
+            return datetime.fromisoformat(value) if isinstance(value, str) else value
+        
+        return cls(
+            id=data.get('id'),
+            user_id=data['user_id'],
+            operation_type=BatchOperationType(data['operation_type']),
+            status=BatchJobStatus(data['status']),
+            item_ids=data.get('item_ids'),
+            selector=data.get('selector'),
+            reason=data.get('reason'),
+            total_items=data.get('total_items', 0),
+            processed_count=data.get('processed_count', 0),
+            successful_count=data.get('successful_count', 0),
+            failed_count=data.get('failed_count', 0),
+            failed=data.get('failed', []),
+            position=data.get('position', 0),
+            cursor=data.get('cursor'),
+            created_at=parse_time(data.get('created_at')),
+            updated_at=parse_time(data.get('updated_at')),
+            completed_at=parse_time(data.get('completed_at')),
+            error=data.get('error')
+        )
+
+
+class BatchJobManager:
+    """
+    Creates, runs and reports on background batch jobs.
+    
+    Jobs are stored in the review_batch_jobs collection. run_job processes
+    chunks of at most BatchProcessor.max_batch_size items, writing a
+    checkpoint after each chunk, until the job finishes or the time budget
+    is spent.
+    """
+    
+    def __init__(
+        self,
+        project_id: str = "aletheia-codex-prod",
+        batch_processor: Optional[BatchProcessor] = None
+    ):
+        """
+        Initialize batch job manager.
+        
+        Args:
+            project_id: GCP project ID
+            batch_processor: Batch processor used for each chunk (optional)
+        """
+        self.project_id = project_id
+        self.db = get_firestore_client(project_id)
+        self.batch_processor = batch_processor or create_batch_processor(project_id)
+        self.queue_manager = self.batch_processor.queue_manager
+        self.jobs_collection = "review_batch_jobs"
+        self.chunk_size = self.batch_processor.max_batch_size
+        
+        logger.info(f"Initialized BatchJobManager for project: {project_id}")
+    
+    def create_job(
+        self,
+        user_id: str,
+        operation_type: BatchOperationType,
+        item_ids: Optional[List[str]] = None,
+        min_confidence: Optional[float] = None,
+        item_type: Optional[ReviewItemType] = None,
+        reason: Optional[str] = None
+    ) -> BatchJob:
+        """
+        Create and store a new batch job.
+        
+        Either item_ids or a selector (min_confidence and/or item_type) must be
+        given. Selector jobs act on every pending item of the user matching it.
+        
+        Args:
+            user_id: User ID
+            operation_type: approve or reject
+            item_ids: Explicit item IDs (optional)
+            min_confidence: Select pending items at or above this confidence (optional)
+            item_type: Select pending items of this type (optional)
+            reason: Rejection reason (optional)
+        
+        Returns:
+            The stored BatchJob
+        
+        Raises:
+            ValueError: If the request is invalid
+        """
+        if not user_id or not user_id.strip():
+            raise ValueError("User ID cannot be empty")
+        
+        selector = None
+        if item_ids is not None:
+            if not item_ids:
+                raise ValueError("Item IDs list cannot be empty")
+            # Keep order but drop duplicates so counts are accurate
+            item_ids = list(dict.fromkeys(item_ids))
+        elif min_confidence is not None or item_type is not None:
+            selector = {
+                'min_confidence': float(min_confidence or 0.0),
+                'type': item_type.value if isinstance(item_type, ReviewItemType) else item_type
+            }
+        else:
+            raise ValueError("Either item_ids or a selector (min_confidence/type) is required")
+        
+        now = datetime.utcnow()
+        doc_ref = self.db.collection(self.jobs_collection).document()
+        job = BatchJob(
+            id=doc_ref.id,
+            user_id=user_id,
+            operation_type=operation_type,
+            item_ids=item_ids,
+            selector=selector,
+            reason=reason,
+            total_items=len(item_ids) if item_ids else self._count_selected(user_id, selector),
+            created_at=now,
+            updated_at=now
+        )
+        
+        doc_ref.set(job.to_dict())
+        logger.info(f"Created batch job {job.id}: {operation_type.value} "
+                    f"{job.total_items} items for user {user_id}")
+        return job
+    
+    def get_job(self, job_id: str) -> Optional[BatchJob]:
+        """
+        Get a batch job by ID.
+        
+        Args:
+            job_id: Job ID
+        
+        Returns:
+            BatchJob if found, None otherwise
+        """
+        doc = self.db.collection(self.jobs_collection).document(job_id).get()
+        if not doc.exists:
+            return None
+        data = doc.to_dict()
+        data['id'] = doc.id
+        return BatchJob.from_dict(data)
+    
+    def run_job(self, job_id: str, time_budget_seconds: float = 240.0) -> Optional[BatchJob]:
+        """
+        Process a job until it finishes or the time budget is spent.
+        
+        Args:
+            job_id: Job ID
+            time_budget_seconds: Stop starting new chunks after this many seconds
+        
+        Returns:
+            The job after this run, or None if it could not be claimed. The
+            caller must re-enqueue the job when it is returned unfinished.
+        """
+        job = self._claim_job(job_id)
+        if job is None:
+            return None
+        
+        deadline = time.monotonic() + time_budget_seconds
+        logger.info(f"Running batch job {job.id} from checkpoint "
+                    f"{job.processed_count}/{job.total_items}")
+        
+        try:
+            while not job.is_finished() and time.monotonic() < deadline:
+                self._process_chunk(job)
+                self._checkpoint(job)
+        except Exception as e:
+            logger.error(f"Batch job {job.id} failed: {type(e).__name__}: {str(e)}")
+            job.status = BatchJobStatus.FAILED
+            job.error = str(e)
+            job.completed_at = datetime.utcnow()
+            self._checkpoint(job)
+        
+        return job
+    
+    def _process_chunk(self, job: BatchJob):
+        """Process the next chunk of a job and advance its checkpoint in memory."""
+        if job.item_ids is not None:
+            chunk = job.item_ids[job.position:job.position + self.chunk_size]
+            next_position = job.position + len(chunk)
+            next_cursor = None
+        else:
+            items, next_cursor = self.queue_manager.get_pending_page(
+                user_id=job.user_id,
+                limit=self.chunk_size,
+                min_confidence=job.selector.get('min_confidence', 0.0),
+                item_type=job.selector.get('type'),
+                start_after=job.cursor,
+                summary_only=True
+            )
+            chunk = [item.id for item in items]
+            next_position = job.position + len(chunk)
+        
+        if chunk:
+            if job.operation_type == BatchOperationType.APPROVE:
+                result = self.batch_processor.batch_approve(chunk, job.user_id)
+            else:
+                result = self.batch_processor.batch_reject(chunk, job.user_id, job.reason)
+            
+            job.processed_count += result.total_items
+            job.successful_count += len(result.successful)
+            job.failed_count += len(result.failed)
+            room = MAX_RECORDED_FAILURES - len(job.failed)
+            if room > 0:
+                job.failed.extend(result.failed[:room])
+        
+        job.position = next_position
+        job.cursor = next_cursor
+        
+        # Selector jobs may see more items than counted at creation time
+        job.total_items = max(job.total_items, job.processed_count)
+        
+        exhausted = (
+            job.position >= len(job.item_ids) if job.item_ids is not None
+            else next_cursor is None
+        )
+        if exhausted:
+            job.status = BatchJobStatus.COMPLETED
+            job.completed_at = datetime.utcnow()
+            logger.info(f"Batch job {job.id} completed: {job.successful_count} successful, "
+                        f"{job.failed_count} failed")
+    
+    def _checkpoint(self, job: BatchJob):
+        """Persist job progress and extend the lease."""
+        job.updated_at = datetime.utcnow()
+        data = job.to_dict()
+        data.pop('item_ids')
+        data['lease_expires_at'] = (
+            None if job.is_finished()
+            else (job.updated_at + timedelta(seconds=JOB_LEASE_SECONDS)).isoformat()
+        )
+        self.db.collection(self.jobs_collection).document(job.id).update(data)
+        logger.debug(f"Checkpointed batch job {job.id}: {job.processed_count}/{job.total_items}")
+    
+    def _claim_job(self, job_id: str) -> Optional[BatchJob]:
+        """
+        Transactionally mark a job as running by this worker.
+        
+        A running job can only be claimed once its lease has expired, so
+        duplicate task deliveries do not process the same chunk twice.
+        """
+        doc_ref = self.db.collection(self.jobs_collection).document(job_id)
+        transaction = self.db.transaction()
+        
+        @firestore.transactional
+        def claim(transaction) -> Optional[BatchJob]:
+            snapshot = doc_ref.get(transaction=transaction)
+            if not snapshot.exists:
+                logger.warning(f"Batch job not found: {job_id}")
+                return None
+            
+            data = snapshot.to_dict()
+            data['id'] = snapshot.id
+            job = BatchJob.from_dict(data)
+            now = datetime.utcnow()
+            
+            if job.is_finished():
+                logger.info(f"Batch job {job_id} already {job.status.value}")
+                return None
+            
+            lease = data.get('lease_expires_at')
+            if job.status == BatchJobStatus.RUNNING and lease and datetime.fromisoformat(lease) > now:
+                logger.info(f"Batch job {job_id} is leased by another worker")
+                return None
+            
+            job.status = BatchJobStatus.RUNNING
+            transaction.update(doc_ref, {
+                'status': job.status.value,
+                'lease_expires_at': (now + timedelta(seconds=JOB_LEASE_SECONDS)).isoformat(),
+                'updated_at': now.isoformat()
+            })
+            return job
+        
+        return claim(transaction)
+    
+    def claim_stalled(self, job_id: str) -> bool:
+        """
+        Take over re-driving a job whose worker went away.
+        
+        A job is stalled when it is unfinished and has been neither claimed
+        nor checkpointed for JOB_LEASE_SECONDS: its task was lost (e.g. an
+        in-process worker thread on a recycled instance) or its worker died
+        holding the lease. The job is touched in the same transaction, so
+        concurrent status polls re-drive it at most once per lease period.
+        
+        Args:
+            job_id: Job ID
+        
+        Returns:
+            True if the caller should enqueue the job again
+        """
+        doc_ref = self.db.collection(self.jobs_collection).document(job_id)
+        transaction = self.db.transaction()
+        
+        @firestore.transactional
+        def claim(transaction) -> bool:
+            snapshot = doc_ref.get(transaction=transaction)
+            if not snapshot.exists:
+                return False
+            
+            data = snapshot.to_dict()
+            data['id'] = snapshot.id
+            job = BatchJob.from_dict(data)
+            now = datetime.utcnow()
+            
+            if job.is_finished():
+                return False
+            lease = data.get('lease_expires_at')
+            if lease and datetime.fromisoformat(lease) > now:
+                return False
+            if job.updated_at and job.updated_at + timedelta(seconds=JOB_LEASE_SECONDS) > now:
+                return False
+            
+            transaction.update(doc_ref, {'updated_at': now.isoformat()})
+            return True
+        
+        stalled = claim(transaction)
+        if stalled:
+            logger.warning(f"Batch job {job_id} stalled, re-driving it")
+        return stalled
+    
+    def _count_selected(self, user_id: str, selector: Dict[str, Any]) -> int:
+        """Count pending items matching a selector (used for progress reporting)."""
+        try:
+            query = self.db.collection(self.queue_manager.review_queue_collection)
+            query = query.where(filter=FieldFilter("user_id", "==", user_id))
+            query = query.where(filter=FieldFilter("status", "==", ReviewItemStatus.PENDING.value))
+            if selector.get('min_confidence'):
+                query = query.where(filter=FieldFilter("confidence", ">=", selector['min_confidence']))
+            if selector.get('type'):
+                query = query.where(filter=FieldFilter("type", "==", selector['type']))
+            result = query.count().get()
+            return int(result[0][0].value)
+        except Exception as e:
+            logger.warning(f"Failed to count selected items: {str(e)}")
+            return 0
+
+
+def create_batch_job_manager(project_id: str = "aletheia-codex-prod") -> BatchJobManager:
+    """
+    Factory function to create a BatchJobManager instance.
+    
+    Args:
+        project_id: GCP project ID
+    
+    Returns:
+        BatchJobManager instance
+    """
+    return BatchJobManager(project_id=project_id)
@@ -1,22 +1,67 @@
 ﻿"""
 AletheiaCodex - Ingestion Function
 Accepts document uploads and queues them for processing.
+
+Content is streamed to Cloud Storage (gzip, content-addressed by SHA-256) so
+large documents are never held in memory and identical uploads are stored once.
+
+Entry points:
+- ingest_document: one document per request
+- ingest_bulk: NDJSON stream of documents, one per line
 """
 
 import functions_framework
-from flask import Request, jsonify
-from google.cloud import firestore, storage
+from flask import Request, Response, jsonify
+from google.cloud import firestore
+from werkzeug.sansio.multipart import Data, Epilogue, Field, File, MultipartDecoder, NeedData
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+import json
 import sys
 import os
+import threading
+import time
+from typing import Dict, Optional
 
 # Import shared modules
 from shared.db.firestore_client import get_firestore_client
+from shared.db.document_store import create_document_store
 from shared.utils.logging import get_logger
+from shared.utils.warmup import WARMUP_FIRESTORE, start_warmup
 
 logger = get_logger("ingestion")
 
 PROJECT_ID = os.environ.get("GCP_PROJECT", "aletheia-codex-prod")
 BUCKET_NAME = f"{PROJECT_ID}-documents"
+MAX_DOCUMENT_BYTES = int(os.environ.get("MAX_DOCUMENT_BYTES", 50 * 1024 * 1024))
+
+# Bulk ingestion configuration
+BULK_MAX_LINE_BYTES = int(os.environ.get("BULK_MAX_LINE_BYTES", 10 * 1024 * 1024))
+BULK_UPLOAD_CONCURRENCY = int(os.environ.get("BULK_UPLOAD_CONCURRENCY", 8))
+BULK_COMMIT_SIZE = 400  # Firestore allows 500 writes per batch
+BULK_FLUSH_SECONDS = 2.0  # Commit and report at least this often
+
+# Multipart uploads are decoded as they are read; only the form fields are
+# kept in memory
+MULTIPART_READ_BYTES = 64 * 1024
+MAX_FORM_FIELD_BYTES = 64 * 1024
+
+# Document store (created on first use, shared across requests)
+_document_store = None
+_init_lock = threading.RLock()  # serializes lazy initialization across concurrent requests
+
+# Opt-in background warm-up (WARMUP_ON_START)
+start_warmup([WARMUP_FIRESTORE], PROJECT_ID)
+
+
+def get_document_store():
+    """Get or create the document store."""
+    global _document_store
+    if _document_store is None:
+        with _init_lock:
+            if _document_store is None:
+                _document_store = create_document_store(BUCKET_NAME, PROJECT_ID, max_size=MAX_DOCUMENT_BYTES)
+    return _document_store
 
 
 @functions_framework.http
@@ -24,7 +69,9 @@ def ingest_document(request: Request):
     """
     HTTP endpoint to ingest a new document.
     
-    Expected JSON payload:
+    Accepts three request formats:
+    
+    1. JSON (small documents):
     {
         "title": "Document Title",
         "content": "Document text content...",
@@ -35,27 +82,73 @@ def ingest_document(request: Request):
         }
     }
     
+    2. multipart/form-data: a "file" part with the content, plus "title",
+       "source" and "metadata" (JSON string) form fields, before or after
+       the file part. The body is decoded incrementally, so the file is
+       streamed to storage without being spooled first.
+    
+    3. Raw body (any other content type, chunked transfer encoding allowed):
+       the body is the content; title, source and metadata (JSON string) are
+       passed as query parameters.
+    
     Returns:
-        JSON response with document ID and status
+        JSON response with document ID, content hash and status
     """
     try:
         # Parse request
         if request.method != "POST":
             return jsonify({"error": "Method not allowed. Use POST."}), 405
         
-        data = request.get_json(silent=True)
-        if not data:
-            return jsonify({"error": "Invalid JSON payload"}), 400
-        
-        # Validate required fields
-        title = data.get("title")
-        content = data.get("content")
-        source = data.get("source", "api")
+        store = get_document_store()
         
-        if not title or not content:
-            return jsonify({"error": "Missing required fields: title, content"}), 400
+        if request.is_json:
+            data = request.get_json(silent=True)
+            if not data:
+                return jsonify({"error": "Invalid JSON payload"}), 400
+            
+            title = data.get("title")
+            content = data.get("content")
+            source = data.get("source", "api")
+            metadata = data.get("metadata", {})
+            
+            if not title or not content:
+                return jsonify({"error": "Missing required fields: title, content"}), 400
+            
+            logger.info(f"Ingesting document: {title} (source: {source})")
+            stored = store.store_bytes(content.encode("utf-8"))
         
-        logger.info(f"Ingesting document: {title} (source: {source})")
+        else:
+            stored = None
+            if request.mimetype == "multipart/form-data":
+                boundary = request.mimetype_params.get("boundary")
+                if not boundary:
+                    return jsonify({"error": "Missing multipart boundary"}), 400
+                
+                upload = MultipartUpload(request.stream, boundary.encode("latin-1"))
+                if not upload.next_file():
+                    return jsonify({"error": "Missing required file part: file"}), 400
+                
+                # Fields may follow the file, so they are validated after the
+                # upload (a rejected request leaves only a content-addressed blob)
+                logger.info("Streaming multipart document upload")
+                stored = store.store_stream(upload, content_type=upload.content_type or "text/plain")
+                fields = upload.finish()
+            else:
+                fields = request.args
+            
+            title = fields.get("title")
+            source = fields.get("source", "upload")
+            try:
+                metadata = json.loads(fields.get("metadata") or "{}")
+            except json.JSONDecodeError:
+                return jsonify({"error": "metadata must be a JSON object"}), 400
+            
+            if not title:
+                return jsonify({"error": "Missing required field: title"}), 400
+            
+            if stored is None:
+                logger.info(f"Streaming document: {title} (source: {source})")
+                stored = store.store_stream(request.stream, content_type=request.mimetype or "text/plain")
         
         # Store document metadata in Firestore
         db = get_firestore_client(PROJECT_ID)
@@ -67,28 +160,353 @@ def ingest_document(request: Request):
             "source": source,
             "status": "pending",
             "created_at": firestore.SERVER_TIMESTAMP,
-            "metadata": data.get("metadata", {}),
-            "content_length": len(content)
+            "metadata": metadata,
+            "content_length": stored.size,
+            "content_sha256": stored.sha256,
+            "compressed_length": stored.compressed_size,
+            "file_path": stored.blob_name,
+            "deduplicated": stored.deduplicated
         }
         
         doc_ref.set(doc_data)
-        logger.info(f"Created document record: {document_id}")
-        
-        # Upload content to Cloud Storage
-        storage_client = storage.Client(project=PROJECT_ID)
-        bucket = storage_client.bucket(BUCKET_NAME)
-        blob = bucket.blob(f"raw/{document_id}.txt")
-        blob.upload_from_string(content, content_type="text/plain")
-        logger.info(f"Uploaded content to gs://{BUCKET_NAME}/raw/{document_id}.txt")
+        logger.info(f"Created document record: {document_id} -> gs://{BUCKET_NAME}/{stored.blob_name}")
         
         # Note: Cloud Tasks integration will be added in next iteration
         
         return jsonify({
             "status": "success",
             "document_id": document_id,
+            "content_sha256": stored.sha256,
+            "deduplicated": stored.deduplicated,
             "message": "Document ingested successfully"
         }), 201
         
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         logger.error(f"Error ingesting document: {str(e)}")
         return jsonify({"error": f"Internal server error: {str(e)}"}), 500
+
+
+class MultipartUpload:
+    """
+    Incremental multipart/form-data reader for a single file upload.
+    
+    The request body is decoded as it is read: form fields are collected
+    (at most MAX_FORM_FIELD_BYTES in total) and the file part's bytes are
+    returned by read(), so the reader can be passed to
+    DocumentStore.store_stream like any binary stream. Other file parts are
+    discarded.
+    """
+    
+    def __init__(self, stream, boundary: bytes, file_field: str = "file"):
+        """
+        Initialize the reader.
+        
+        Args:
+            stream: Binary request stream
+            boundary: Multipart boundary from the Content-Type header
+            file_field: Name of the file part to stream
+        """
+        self.stream = stream
+        self.decoder = MultipartDecoder(boundary)
+        self.file_field = file_field
+        self.fields: Dict[str, str] = {}
+        self.content_type: Optional[str] = None
+        self._part = None  # "field", "file" or "skip" while inside a part
+        self._field_name = None
+        self._field_data = bytearray()
+        self._form_bytes = 0
+        self._pending = b""
+        self._file_seen = False
+        self._done = False
+    
+    def next_file(self) -> bool:
+        """
+        Read up to the start of the file part.
+        
+        Returns:
+            True if the file part was found
+        """
+        while not self._done and self._part != "file":
+            self._next_event()
+        return self._part == "file"
+    
+    def read(self, size: int = -1) -> bytes:
+        """
+        Read bytes of the file part.
+        
+        Args:
+            size: Maximum bytes to return (all remaining if negative)
+        
+        Returns:
+            File bytes; b"" at the end of the file part
+        """
+        while self._part == "file" and (size < 0 or len(self._pending) < size):
+            self._next_event()
+        if size < 0:
+            size = len(self._pending)
+        data, self._pending = self._pending[:size], self._pending[size:]
+        return data
+    
+    def finish(self) -> Dict[str, str]:
+        """
+        Read the rest of the body.
+        
+        Returns:
+            All form fields
+        """
+        while not self._done:
+            self._next_event()
+        return self.fields
+    
+    def _next_event(self):
+        """Process one decoder event, reading more of the body if needed."""
+        event = self.decoder.next_event()
+        
+        if isinstance(event, NeedData):
+            self.decoder.receive_data(self.stream.read(MULTIPART_READ_BYTES) or None)
+        elif isinstance(event, Field):
+            self._part = "field"
+            self._field_name = event.name
+            self._field_data = bytearray()
+        elif isinstance(event, File):
+            if event.name == self.file_field and not self._file_seen:
+                self._part = "file"
+                self._file_seen = True
+                self.content_type = event.headers.get("content-type")
+            else:
+                self._part = "skip"
+        elif isinstance(event, Data):
+            if self._part == "field":
+                self._form_bytes += len(event.data)
+                if self._form_bytes > MAX_FORM_FIELD_BYTES:
+                    raise ValueError(f"Form fields exceed {MAX_FORM_FIELD_BYTES} bytes")
+                self._field_data.extend(event.data)
+                if not event.more_data:
+                    self.fields[self._field_name] = self._field_data.decode("utf-8")
+            elif self._part == "file":
+                self._pending += event.data
+            if not event.more_data:
+                self._part = None
+        elif isinstance(event, Epilogue):
+            self._done = True
+
+
+def iter_ndjson_lines(stream, max_line_bytes: int):
+    """
+    Read an NDJSON stream line by line with bounded memory.
+    
+    Args:
+        stream: Binary request stream
+        max_line_bytes: Maximum size of one line
+        
+    Yields:
+        (line_number, line) tuples; line is None for oversized lines, which
+        are skipped without being buffered
+    """
+    line_number = 0
+    while True:
+        line = stream.readline(max_line_bytes + 1)
+        if not line:
+            return
+        line_number += 1
+        
+        if len(line) > max_line_bytes and not line.endswith(b"\n"):
+            # Discard the rest of the oversized line
+            while line and not line.endswith(b"\n"):
+                line = stream.readline(max_line_bytes)
+            yield line_number, None
+            continue
+        
+        yield line_number, line
+
+
+def parse_bulk_line(line: bytes) -> dict:
+    """
+    Parse and validate one NDJSON document line.
+    
+    Args:
+        line: Raw line
+        
+    Returns:
+        Document record with title, content, source and metadata
+        
+    Raises:
+        ValueError: If the line is not a valid document
+    """
+    try:
+        record = json.loads(line)
+    except (json.JSONDecodeError, UnicodeDecodeError) as e:
+        raise ValueError(f"Invalid JSON: {str(e)}")
+    
+    if not isinstance(record, dict):
+        raise ValueError("Line must be a JSON object")
+    if not record.get("title") or not record.get("content"):
+        raise ValueError("Missing required fields: title, content")
+    
+    return {
+        "title": record["title"],
+        "content": record["content"],
+        "source": record.get("source", "import"),
+        "metadata": record.get("metadata", {})
+    }
+
+
+@functions_framework.http
+def ingest_bulk(request: Request):
+    """
+    HTTP endpoint to ingest an NDJSON stream of documents.
+    
+    Each request line is a JSON object with the same fields as the
+    ingest_document JSON payload. Content uploads run concurrently
+    (BULK_UPLOAD_CONCURRENCY at a time) and document records are written in
+    batched Firestore commits.
+    
+    The response is an NDJSON stream with one result per input line, in line
+    order, emitted once that line's record is committed:
+        {"line": 1, "status": "ok", "document_id": "...", "content_sha256": "..."}
+        {"line": 2, "status": "error", "error": "..."}
+    followed by a final {"summary": {...}} line.
+    
+    Query parameters:
+    - start_line: Skip lines before this (1-based) line number. To resume an
+      interrupted import, resend the same stream with start_line set to the
+      line after the last reported result; failed lines can be resent alone.
+    """
+    if request.method != "POST":
+        return jsonify({"error": "Method not allowed. Use POST."}), 405
+    
+    try:
+        start_line = int(request.args.get("start_line", 1))
+    except ValueError:
+        return jsonify({"error": "start_line must be an integer"}), 400
+    if start_line < 1:
+        return jsonify({"error": "start_line must be at least 1"}), 400
+    
+    stream = request.stream
+    store = get_document_store()
+    db = get_firestore_client(PROJECT_ID)
+    
+    def upload(record: dict):
+        return store.store_bytes(record["content"].encode("utf-8"))
+    
+    def generate():
+        counts = {"ingested": 0, "deduplicated": 0, "failed": 0, "skipped": 0}
+        in_flight = deque()  # (line_number, record, future, error), in line order
+        ready = []  # (line_number, result, doc_ref, doc_data), awaiting commit
+        last_flush = time.monotonic()
+        last_line = start_line - 1
+        executor = ThreadPoolExecutor(max_workers=BULK_UPLOAD_CONCURRENCY)
+        
+        def resolve(entry):
+            """Turn a finished in-flight entry into a pending result."""
+            line_number, record, future, error = entry
+            if error is None:
+                try:
+                    stored = future.result()
+                except Exception as e:
+                    error = str(e)
+            if error is not None:
+                ready.append((line_number, {"line": line_number, "status": "error", "error": error}, None, None))
+                return
+            
+            doc_ref = db.collection("documents").document()
+            doc_data = {
+                "title": record["title"],
+                "source": record["source"],
+                "status": "pending",
+                "created_at": firestore.SERVER_TIMESTAMP,
+                "metadata": record["metadata"],
+                "content_length": stored.size,
+                "content_sha256": stored.sha256,
+                "compressed_length": stored.compressed_size,
+                "file_path": stored.blob_name,
+                "deduplicated": stored.deduplicated
+            }
+            result = {
+                "line": line_number,
+                "status": "ok",
+                "document_id": doc_ref.id,
+                "content_sha256": stored.sha256,
+                "deduplicated": stored.deduplicated
+            }
+            ready.append((line_number, result, doc_ref, doc_data))
+        
+        def flush():
+            """Commit ready records and return their result lines."""
+            nonlocal last_flush, last_line
+            writes = [(ref, data) for _, _, ref, data in ready if ref is not None]
+            commit_error = None
+            if writes:
+                batch = db.batch()
+                for ref, data in writes:
+                    batch.set(ref, data)
+                try:
+                    batch.commit()
+                except Exception as e:
+                    logger.error(f"Bulk ingestion commit failed: {str(e)}")
+                    commit_error = f"Failed to save document record: {str(e)}"
+            
+            output = []
+            for line_number, result, ref, _ in ready:
+                if ref is not None and commit_error:
+                    result = {"line": line_number, "status": "error", "error": commit_error}
+                if result["status"] == "ok":
+                    counts["ingested"] += 1
+                    if result["deduplicated"]:
+                        counts["deduplicated"] += 1
+                else:
+                    counts["failed"] += 1
+                last_line = line_number
+                output.append(json.dumps(result) + "\n")
+            
+            ready.clear()
+            last_flush = time.monotonic()
+            return "".join(output)
+        
+        def drain(block: bool):
+            """Resolve finished uploads in line order; with block, wait for all of them."""
+            while in_flight:
+                future = in_flight[0][2]
+                finished = future is None or future.done()
+                if not (block or finished or len(in_flight) >= BULK_UPLOAD_CONCURRENCY):
+                    break
+                resolve(in_flight.popleft())
+        
+        try:
+            for line_number, line in iter_ndjson_lines(stream, BULK_MAX_LINE_BYTES):
+                if line_number < start_line:
+                    counts["skipped"] += 1
+                    continue
+                
+                if line is None:
+                    in_flight.append((line_number, None, None, f"Line exceeds {BULK_MAX_LINE_BYTES} bytes"))
+                elif line.strip():
+                    try:
+                        record = parse_bulk_line(line)
+                        in_flight.append((line_number, record, executor.submit(upload, record), None))
+                    except ValueError as e:
+                        in_flight.append((line_number, None, None, str(e)))
+                
+                drain(block=False)
+                
+                writes_ready = sum(1 for entry in ready if entry[2] is not None)
+                if writes_ready >= BULK_COMMIT_SIZE or (ready and time.monotonic() - last_flush >= BULK_FLUSH_SECONDS):
+                    yield flush()
+            
+            drain(block=True)
+            if ready:
+                yield flush()
+            
+            logger.info(f"Bulk ingestion finished: {counts}")
+            yield json.dumps({"summary": dict(counts, last_line=last_line)}) + "\n"
+        
+        except Exception as e:
+            logger.error(f"Bulk ingestion aborted: {str(e)}")
+            yield json.dumps({"summary": dict(counts, last_line=last_line, error=str(e))}) + "\n"
+        
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+    
+    return Response(generate(), status=200, mimetype="application/x-ndjson")
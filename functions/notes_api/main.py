@@ -7,10 +7,15 @@ Provides REST API for note management and processing.
 """
 
 import functions_framework
-from flask import Request, jsonify
+from flask import Request, jsonify, make_response
 from google.cloud import firestore
+from google.cloud.firestore_v1 import FieldFilter
+from google.cloud.firestore_v1.field_path import FieldPath
+import hashlib
 import os
+import threading
 import sys
+import uuid
 from typing import Dict, Any
 from datetime import datetime
 
@@ -18,7 +23,14 @@ from datetime import datetime
 sys.path.append('/workspace')
 
 from shared.auth.firebase_auth import require_auth
+from shared.db.firestore_client import get_firestore_client as get_shared_firestore_client
+from shared.models.note import NOTE_SUMMARY_FIELDS, bump_notes_version, get_notes_version
+from shared.utils.pagination import encode_cursor, decode_cursor
+from shared.utils.processing_queue import LANE_INTERACTIVE, QueueBacklogError, create_processing_queue
+from shared.utils.task_queue import TaskQueueError
+from shared.utils.warmup import WARMUP_FIREBASE, WARMUP_FIRESTORE, start_warmup, wait_for_warmup
 from shared.utils.logging import get_logger
+from shared.utils.metrics import start_metrics_flush
 
 logger = get_logger(__name__)
 
@@ -30,18 +42,57 @@ ALLOWED_ORIGINS = [
     'http://localhost:3000'
 ]
 
+# List pagination (order fields must be covered by the notes composite indexes)
+MAX_LIST_LIMIT = 100
+LIST_ORDER_FIELDS = ('createdAt', 'updatedAt')
+
+# Note processing queue (worker: orchestration process_note_task)
+NOTE_PROCESSING_QUEUE = os.environ.get("NOTE_PROCESSING_QUEUE", "note-processing")
+NOTE_PROCESSING_WORKER_URL = os.environ.get("NOTE_PROCESSING_WORKER_URL")
+
+_processing_queue = None
+_init_lock = threading.RLock()  # serializes lazy initialization across concurrent requests
+
+# Opt-in background warm-up (WARMUP_ON_START)
+start_warmup([WARMUP_FIREBASE, WARMUP_FIRESTORE], PROJECT_ID)
+
+# Periodic metrics export (METRICS_EXPORTER)
+start_metrics_flush()
+
 
 def get_firestore_client():
-    """Get Firestore client."""
-    return firestore.Client(project=PROJECT_ID)
+    """Get Firestore client (shared across requests on this instance)."""
+    wait_for_warmup(WARMUP_FIRESTORE)
+    return get_shared_firestore_client(PROJECT_ID)
+
+
+def get_processing_queue():
+    """
+    Get or create the note processing queue.
+    
+    Returns None when NOTE_PROCESSING_WORKER_URL is not configured, in which
+    case processing is left to the orchestration trigger.
+    """
+    global _processing_queue
+    if _processing_queue is None and NOTE_PROCESSING_WORKER_URL:
+        with _init_lock:
+            if _processing_queue is None:
+                _processing_queue = create_processing_queue(
+                    NOTE_PROCESSING_QUEUE,
+                    worker_url=NOTE_PROCESSING_WORKER_URL,
+                    project_id=PROJECT_ID
+                )
+    return _processing_queue
 
 
 def add_cors_headers(response, origin):
     """Add CORS headers to response."""
+    response = make_response(response)
     if origin in ALLOWED_ORIGINS:
         response.headers['Access-Control-Allow-Origin'] = origin
         response.headers['Access-Control-Allow-Methods'] = 'GET, POST, DELETE, OPTIONS'
-        response.headers['Access-Control-Allow-Headers'] = 'Content-Type, Authorization'
+        response.headers['Access-Control-Allow-Headers'] = 'Content-Type, Authorization, If-None-Match'
+        response.headers['Access-Control-Expose-Headers'] = 'ETag, Retry-After'
         response.headers['Access-Control-Max-Age'] = '3600'
     return response
 
@@ -54,7 +105,9 @@ def notes_api(request: Request):
     
     Endpoints:
     - POST /notes/process - Process a note through AI
-    - GET /notes - List user's notes
+    - GET /notes/queue - Get processing queue depth
+    - GET /notes - List user's notes (summaries)
+    - GET /notes/{note_id} - Get a note with its full content
     - DELETE /notes/{note_id} - Delete a note
     """
     origin = request.headers.get('Origin')
@@ -75,6 +128,10 @@ def notes_api(request: Request):
         
         if method == "POST" and path.endswith("/process"):
             response = process_note(request, user_id)
+        elif method == "GET" and path.endswith("/notes/queue"):
+            response = get_queue_status(request, user_id)
+        elif method == "GET" and get_path_note_id(path):
+            response = get_note(request, user_id, get_path_note_id(path))
         elif method == "GET":
             response = list_notes(request, user_id)
         elif method == "DELETE":
@@ -94,6 +151,10 @@ def process_note(request: Request, user_id: str):
     """
     Process a note through AI extraction.
     
+    The note is queued on the interactive lane of the processing queue. If
+    that lane's backlog is over its limit the request is rejected with 429
+    and a Retry-After header before the note is touched.
+    
     Expected payload:
     {
         "note_id": "firestore-note-id",
@@ -129,15 +190,47 @@ def process_note(request: Request, user_id: str):
             logger.warning(f"User {user_id} attempted to process note owned by {note_data.get('userId')}")
             return jsonify({"error": "Forbidden"}), 403
         
+        # Backpressure: reject before changing the note if the lane is full
+        processing_queue = get_processing_queue()
+        if processing_queue is not None:
+            try:
+                processing_queue.check_capacity(LANE_INTERACTIVE)
+            except QueueBacklogError as e:
+                return jsonify({
+                    "error": "Too many notes are waiting to be processed, try again later",
+                    "queue_depth": e.depth
+                }), 429, {"Retry-After": str(e.retry_after_seconds)}
+        
         # Update status
-        note_ref.update({
+        batch = db.batch()
+        batch.update(note_ref, {
             "status": "processing",
             "processingStartedAt": firestore.SERVER_TIMESTAMP,
             "updatedAt": firestore.SERVER_TIMESTAMP
         })
+        bump_notes_version(db, user_id, batch)
+        batch.commit()
+        
+        if processing_queue is not None:
+            try:
+                # A fresh event ID: an explicit request reprocesses even unchanged content
+                processing_queue.enqueue(
+                    {"note_id": note_id, "event_id": uuid.uuid4().hex},
+                    lane=LANE_INTERACTIVE,
+                    enforce_backlog=False
+                )
+            except TaskQueueError as e:
+                logger.error(f"Failed to queue note {note_id}: {str(e)}")
+                batch = db.batch()
+                batch.update(note_ref, {
+                    "status": "failed",
+                    "error": "Failed to queue note for processing",
+                    "updatedAt": firestore.SERVER_TIMESTAMP
+                })
+                bump_notes_version(db, user_id, batch)
+                batch.commit()
+                return jsonify({"error": "Failed to queue note for processing"}), 503
         
-        # In production, this would trigger the orchestration function
-        # For now, return success
         return jsonify({
             "success": True,
             "note_id": note_id,
@@ -150,15 +243,54 @@ def process_note(request: Request, user_id: str):
         return jsonify({"error": f"Failed to process note: {str(e)}"}), 500
 
 
+def get_queue_status(request: Request, user_id: str):
+    """
+    Get the depth of each processing lane.
+    
+    Path: /notes/queue
+    """
+    try:
+        processing_queue = get_processing_queue()
+        if processing_queue is None:
+            return jsonify({"success": True, "queued": False, "lanes": {}}), 200
+        
+        return jsonify({
+            "success": True,
+            "queued": True,
+            "lanes": processing_queue.depth()
+        }), 200
+        
+    except TaskQueueError as e:
+        logger.error(f"Error getting queue depth: {str(e)}")
+        return jsonify({"error": "Failed to get queue depth"}), 503
+
+
+def get_path_note_id(path: str):
+    """Get the note ID from a /notes/{note_id} path, or None for the collection path."""
+    parts = [part for part in path.split("/") if part]
+    if len(parts) >= 2 and parts[-2] == "notes":
+        return parts[-1]
+    return None
+
+
 def list_notes(request: Request, user_id: str):
     """
     List user's notes.
     
+    Returns note summaries (title, status, timestamps, content preview and
+    extraction counts) by default; full content is fetched per note with
+    GET /notes/{note_id}. Notes written before the summary fields existed
+    get them from scripts/utils/reprocess_notes.py --summary-only.
+    Responses carry an ETag derived from the user's notes version, and a
+    matching If-None-Match returns 304 without running the query.
+    
     Query parameters:
-    - limit: Maximum number of notes to return (default: 50)
+    - limit: Maximum number of notes to return (default: 50, max: 100)
     - status: Filter by status (processing, completed, failed)
-    - order_by: Field to order by (default: createdAt)
+    - order_by: Field to order by (createdAt or updatedAt, default: createdAt)
     - order_direction: asc or desc (default: desc)
+    - view: summary or full (default: summary)
+    - start_after: Cursor from a previous response's next_cursor
     """
     try:
         # Parse query parameters
@@ -166,38 +298,118 @@ def list_notes(request: Request, user_id: str):
         status = request.args.get("status")
         order_by = request.args.get("order_by", "createdAt")
         order_direction = request.args.get("order_direction", "desc")
+        view = request.args.get("view", "summary")
+        start_after = request.args.get("start_after")
         
-        # Build query
+        if not 1 <= limit <= MAX_LIST_LIMIT:
+            return jsonify({"error": f"limit must be between 1 and {MAX_LIST_LIMIT}"}), 400
+        if order_by not in LIST_ORDER_FIELDS:
+            return jsonify({"error": f"order_by must be one of: {', '.join(LIST_ORDER_FIELDS)}"}), 400
+        if view not in ("summary", "full"):
+            return jsonify({"error": "view must be summary or full"}), 400
+        descending = order_direction == "desc"
+        
+        cursor = None
+        if start_after:
+            try:
+                cursor = decode_cursor(start_after)
+            except ValueError:
+                return jsonify({"error": "Invalid start_after cursor"}), 400
+            if cursor['order_by'] != order_by or cursor['descending'] != descending:
+                return jsonify({"error": "start_after cursor does not match the requested ordering"}), 400
+        
+        # Conditional request: the ETag changes whenever any of the user's notes change
         db = get_firestore_client()
-        query = db.collection("notes").where("userId", "==", user_id)
+        version = get_notes_version(db, user_id)
+        params = "|".join([str(limit), status or "", order_by, order_direction, view, start_after or ""])
+        etag = f'W/"{version}-{hashlib.sha1(params.encode("utf-8")).hexdigest()[:12]}"'
+        
+        if etag in request.headers.get("If-None-Match", ""):
+            return "", 304, {"ETag": etag, "Cache-Control": "private, no-cache"}
+        
+        # Build query
+        query = db.collection("notes").where(filter=FieldFilter("userId", "==", user_id))
         
         if status:
-            query = query.where("status", "==", status)
+            query = query.where(filter=FieldFilter("status", "==", status))
+        
+        if view == "summary":
+            query = query.select(NOTE_SUMMARY_FIELDS)
         
-        # Order and limit
-        direction = firestore.Query.DESCENDING if order_direction == "desc" else firestore.Query.ASCENDING
-        query = query.order_by(order_by, direction=direction).limit(limit)
+        # Order by the requested field with the document ID as tie-breaker
+        direction = firestore.Query.DESCENDING if descending else firestore.Query.ASCENDING
+        query = query.order_by(order_by, direction=direction)
+        query = query.order_by(FieldPath.document_id(), direction=direction)
+        
+        if cursor:
+            query = query.start_after({
+                order_by: cursor['value'],
+                FieldPath.document_id(): db.collection("notes").document(cursor['doc_id'])
+            })
+        
+        # Fetch one extra note to know whether there is another page
+        docs = list(query.limit(limit + 1).stream())
+        has_more = len(docs) > limit
+        docs = docs[:limit]
         
-        # Execute query
         notes = []
-        for doc in query.stream():
+        for doc in docs:
             note_data = doc.to_dict()
             note_data["id"] = doc.id
             notes.append(note_data)
         
+        next_cursor = None
+        if has_more:
+            last = docs[-1]
+            next_cursor = encode_cursor(order_by, descending, last.get(order_by), last.id)
+        
         logger.info(f"Retrieved {len(notes)} notes for user: {user_id}")
         
         return jsonify({
             "success": True,
             "notes": notes,
-            "count": len(notes)
-        }), 200
+            "count": len(notes),
+            "next_cursor": next_cursor,
+            "has_more": has_more,
+            "view": view
+        }), 200, {"ETag": etag, "Cache-Control": "private, no-cache"}
         
+    except ValueError as e:
+        return jsonify({"error": f"Invalid parameter: {str(e)}"}), 400
     except Exception as e:
         logger.error(f"Error listing notes: {str(e)}", exc_info=True)
         return jsonify({"error": f"Failed to list notes: {str(e)}"}), 500
 
 
+def get_note(request: Request, user_id: str, note_id: str):
+    """
+    Get a single note with its full content.
+    
+    Path: /notes/{note_id}
+    """
+    try:
+        db = get_firestore_client()
+        note_doc = db.collection("notes").document(note_id).get()
+        
+        if not note_doc.exists:
+            return jsonify({"error": "Note not found"}), 404
+        
+        note_data = note_doc.to_dict()
+        if note_data.get("userId") != user_id:
+            logger.warning(f"User {user_id} attempted to read note owned by {note_data.get('userId')}")
+            return jsonify({"error": "Forbidden"}), 403
+        
+        note_data["id"] = note_doc.id
+        return jsonify({
+            "success": True,
+            "note": note_data
+        }), 200
+        
+    except Exception as e:
+        logger.error(f"Error getting note: {str(e)}", exc_info=True)
+        return jsonify({"error": f"Failed to get note: {str(e)}"}), 500
+
+
 def delete_note(request: Request, user_id: str):
     """
     Delete a note.
@@ -231,7 +443,10 @@ def delete_note(request: Request, user_id: str):
             return jsonify({"error": "Forbidden"}), 403
         
         # Delete note
-        note_ref.delete()
+        batch = db.batch()
+        batch.delete(note_ref)
+        bump_notes_version(db, user_id, batch)
+        batch.commit()
         
         logger.info(f"Deleted note: {note_id}")
         
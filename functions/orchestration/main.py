@@ -12,10 +12,10 @@ import functions_framework
 from google.cloud import firestore
 from firebase_admin import initialize_app
 import os
+import threading
 import json
 import time
-from typing import Optional, List, Dict, Any
-import asyncio
+from typing import Optional, List, Dict, Any, AsyncIterator
 from cloudevents.http import CloudEvent
 
 # Initialize Firebase Admin
@@ -30,11 +30,22 @@ from shared.db.neo4j_client import (
     create_neo4j_http_client,
     execute_neo4j_query_http
 )
-from shared.ai.ai_service import create_ai_service
-from shared.db.graph_populator import create_graph_populator
-from shared.utils.cost_monitor import create_cost_monitor
-from shared.utils.logging import get_logger
+from shared.ai.base_provider import AIProviderAuthError
+from shared.db.processing_checkpoints import ChunkCheckpoint, create_processing_checkpoints
+from shared.db.processing_ledger import ClaimOutcome, LedgerClaim, content_hash, create_processing_ledger
+from shared.utils.logging import flush_logs, get_logger
+from shared.utils.metrics import DEFAULT_SIZE_BUCKETS, counter, histogram, start_metrics_flush
 from shared.utils.text_chunker import chunk_text
+from shared.models.note import build_note_summary, bump_notes_version
+from shared.models.review_item import ReviewItem, ReviewItemType, ReviewItemStatus
+from shared.review.queue_manager import create_queue_manager
+from shared.utils.deadline import Deadline
+from shared.utils.pipeline import SOURCE_STAGE, PipelineStageError, Sink, run_staged_pipeline
+from shared.utils.processing_queue import LANE_INTERACTIVE, create_processing_queue
+from shared.utils.task_queue import TaskQueueError
+from shared.utils.tracing import current_span, start_span, traced
+from shared.utils.service_container import get_service_container
+from shared.utils.warmup import WARMUP_AI, WARMUP_FIRESTORE, WARMUP_NEO4J, start_warmup, wait_for_warmup
 
 logger = get_logger("orchestration")
 
@@ -45,6 +56,37 @@ MAX_RETRIES = 3
 INITIAL_RETRY_DELAY = 1  # seconds
 MAX_RETRY_DELAY = 10  # seconds
 
+# Note processing queue (Cloud Tasks worker: process_note_task)
+NOTE_PROCESSING_QUEUE = os.environ.get("NOTE_PROCESSING_QUEUE", "note-processing")
+NOTE_PROCESSING_WORKER_URL = os.environ.get("NOTE_PROCESSING_WORKER_URL")
+
+# Invocation budget: with a processing queue, notes that would run past the
+# function timeout stop starting new chunks and continue in a follow-up task
+FUNCTION_TIMEOUT_SECONDS = int(os.environ.get("FUNCTION_TIMEOUT_SECONDS", "540"))
+DEADLINE_RESERVE_SECONDS = int(os.environ.get("DEADLINE_RESERVE_SECONDS", "60"))
+
+# Note pipeline stages (extraction is the source stage)
+STAGE_REVIEW_QUEUE = "review_queue"
+STAGE_GRAPH = "graph"
+
+# Metrics
+NOTES_PROCESSED = counter("notes_processed_total", "Note processing invocations by outcome")
+NOTE_CHUNKS = histogram("note_chunks", "Chunks processed per note processing invocation", DEFAULT_SIZE_BUCKETS)
+
+# Review queue manager, processing queue, ledger and checkpoints (created on first use)
+_queue_manager = None
+_processing_queue = None
+_processing_ledger = None
+_processing_checkpoints = None
+_init_lock = threading.RLock()  # serializes lazy initialization across concurrent requests
+
+# Opt-in background warm-up (WARMUP_ON_START); the AI service is built in
+# the service container, so requests needing it simply share that build
+start_warmup([WARMUP_AI, WARMUP_FIRESTORE, WARMUP_NEO4J], PROJECT_ID)
+
+# Periodic metrics export (METRICS_EXPORTER)
+start_metrics_flush()
+
 
 def retry_with_backoff(func, max_retries=MAX_RETRIES, initial_delay=INITIAL_RETRY_DELAY):
     """
@@ -85,7 +127,13 @@ def retry_with_backoff(func, max_retries=MAX_RETRIES, initial_delay=INITIAL_RETR
         raise last_exception
 
 
-def update_note_status(note_id: str, status: str, error: Optional[str] = None, **kwargs):
+def update_note_status(
+    note_id: str,
+    status: str,
+    error: Optional[str] = None,
+    user_id: Optional[str] = None,
+    **kwargs
+):
     """
     Update note status in Firestore with error handling.
     
@@ -93,6 +141,7 @@ def update_note_status(note_id: str, status: str, error: Optional[str] = None, *
         note_id: Note document ID
         status: New status ('processing', 'completed', 'failed')
         error: Error message if status is 'failed'
+        user_id: Note owner; when given, the owner's notes version is bumped
         **kwargs: Additional fields to update
     """
     logger.info(f"=" * 80)
@@ -118,7 +167,11 @@ def update_note_status(note_id: str, status: str, error: Optional[str] = None, *
         # Add any additional fields
         update_data.update(kwargs)
         
-        note_ref.update(update_data)
+        batch = db.batch()
+        batch.update(note_ref, update_data)
+        if user_id:
+            bump_notes_version(db, user_id, batch)
+        batch.commit()
         logger.info(f"Successfully updated note {note_id} status to {status}")
         
     except Exception as e:
@@ -126,17 +179,59 @@ def update_note_status(note_id: str, status: str, error: Optional[str] = None, *
         # Don't raise - we don't want status update failures to break processing
 
 
-async def process_with_ai(note_id: str, content: str, user_id: str) -> Dict[str, Any]:
+def get_note_owner(note_id: str) -> Optional[str]:
     """
-    Process content with AI to extract entities and relationships.
+    Get the user ID of a note's owner, for failure paths that lost it.
+    
+    Args:
+        note_id: Note document ID
+    
+    Returns:
+        The owner's user ID, or None if the note cannot be read
+    """
+    try:
+        note_doc = get_firestore_client().collection('notes').document(note_id).get()
+        return note_doc.to_dict().get('userId') if note_doc.exists else None
+    except Exception as e:
+        logger.error(f"Failed to read owner of note {note_id}: {type(e).__name__}: {str(e)}")
+        return None
+
+
+async def extract_chunks(
+    note_id: str,
+    content: str,
+    user_id: str,
+    content_sha256: Optional[str] = None,
+    start_chunk: int = 0,
+    deadline: Optional[Deadline] = None
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Extract entities and relationships from a note, one chunk at a time.
+    
+    This is the source stage of the note pipeline: each chunk's results are
+    yielded as soon as they are extracted, so downstream stages can store
+    them while later chunks are still being processed.
+    
+    With a content hash, each extracted chunk is checkpointed and chunks
+    checkpointed by an earlier, failed attempt are yielded from their
+    checkpoint instead of being extracted again.
+    
+    With a deadline, no new chunk is started once the time left no longer
+    covers an average chunk plus the deadline's reserve; the index of the
+    first chunk left over is recorded with deadline.stop_at(). At least one
+    chunk is extracted per invocation.
     
     Args:
         note_id: Note ID for tracking
         content: Text content to process
         user_id: User ID for cost tracking
+        content_sha256: Hash of the content (enables checkpointing)
+        start_chunk: Index of the first chunk (continuations)
+        deadline: Invocation deadline
         
-    Returns:
-        Dictionary with entities, relationships, and costs
+    Yields:
+        Chunk checkpoint dictionary (index, entities, relationships, cost
+        and completed stages)
     """
     logger.info(f"=" * 80)
     logger.info(f"AI PROCESSING STARTED")
@@ -147,28 +242,47 @@ async def process_with_ai(note_id: str, content: str, user_id: str) -> Dict[str,
     logger.info(f"Content preview: {content[:200]}...")
     
     try:
-        # Initialize AI service
-        ai_service = create_ai_service()
-        cost_monitor = create_cost_monitor()
+        # Shared across warm invocations
+        services = get_service_container(PROJECT_ID)
+        ai_service = services.ai_service
         
         # Chunk text if needed
         chunks = chunk_text(content, chunk_size=8000)
         logger.info(f"Content split into {len(chunks)} chunks")
         
-        all_entities = []
-        all_relationships = []
-        total_cost = 0.0
+        # Resume from an earlier attempt's checkpoints
+        checkpoints = get_processing_checkpoints() if content_sha256 else None
+        completed = checkpoints.load(note_id, content_sha256) if checkpoints else {}
         
         # Process each chunk
+        extracted = 0
         for i, chunk in enumerate(chunks):
+            if i < start_chunk:
+                continue
+            
+            if i in completed:
+                logger.info(f"Chunk {i+1}/{len(chunks)} already extracted, resuming from checkpoint")
+                yield completed[i].to_dict()
+                continue
+            
+            # Leave the remaining chunks to a continuation when time runs short
+            if deadline and extracted and not deadline.has_time_for(deadline.average_unit_seconds):
+                deadline.stop_at(i)
+                logger.info(f"Deferring chunks {i+1}-{len(chunks)} to a continuation")
+                return
+            
             logger.info(f"Processing chunk {i+1}/{len(chunks)} ({len(chunk)} chars)")
+            started = time.monotonic()
+            extracted += 1
             
             try:
                 # extract_entities returns a list of entities directly
-                entities = await ai_service.extract_entities(
-                    text=chunk,
-                    user_id=user_id
-                )
+                with start_span("extract_chunk", chunk=i, chars=len(chunk)) as span:
+                    entities = await ai_service.extract_entities(
+                        text=chunk,
+                        user_id=user_id
+                    )
+                    span.set_attribute('entities', len(entities))
                 
                 # For now, we don't have relationships from this method
                 relationships = []
@@ -177,45 +291,38 @@ async def process_with_ai(note_id: str, content: str, user_id: str) -> Dict[str,
                 logger.info(f"Chunk {i+1} results: {len(entities)} entities, {len(relationships)} relationships")
                 logger.info(f"Chunk {i+1} cost: ${cost:.4f}")
                 
-                # Convert Entity objects to dicts for storage
-                entity_dicts = [
-                    {
-                        'name': e.name,
-                        'type': e.type,
-                        'confidence': e.confidence,
-                        'properties': e.properties if hasattr(e, 'properties') else {}
-                    }
-                    for e in entities
-                ]
-                
-                all_entities.extend(entity_dicts)
-                all_relationships.extend(relationships)
-                total_cost += cost
-                
+            except AIProviderAuthError:
+                # Most likely a rotated API key: rebuild the AI service on next use
+                services.refresh_secrets()
+                raise
             except Exception as e:
                 logger.error(f"Failed to process chunk {i+1}: {type(e).__name__}: {str(e)}")
                 # Continue with other chunks
-        
-        # Record cost (log_usage is async, but we'll skip it for now to keep things simple)
-        # TODO: Implement proper async cost logging
-        logger.info(f"Cost tracking: ${total_cost:.4f} for note {note_id}")
+                continue
+            finally:
+                if deadline:
+                    deadline.record_unit(time.monotonic() - started)
+            
+            # Convert Entity objects to dicts for storage
+            entity_dicts = [
+                {
+                    'name': e.name,
+                    'type': e.type,
+                    'confidence': e.confidence,
+                    'properties': e.properties if hasattr(e, 'properties') else {}
+                }
+                for e in entities
+            ]
+            
+            checkpoint = ChunkCheckpoint(index=i, entities=entity_dicts, relationships=relationships, cost=cost)
+            if checkpoints:
+                checkpoints.save_chunk(note_id, content_sha256, checkpoint)
+            yield checkpoint.to_dict()
         
         logger.info(f"=" * 80)
         logger.info(f"AI PROCESSING COMPLETE")
-        logger.info(f"Total entities: {len(all_entities)}")
-        logger.info(f"Total relationships: {len(all_relationships)}")
-        logger.info(f"Total cost: ${total_cost:.4f}")
         logger.info(f"=" * 80)
         
-        return {
-            'entities': all_entities,
-            'relationships': all_relationships,
-            'costs': {
-                'ai_extraction': total_cost,
-                'total': total_cost
-            }
-        }
-        
     except Exception as e:
         logger.error(f"=" * 80)
         logger.error(f"AI PROCESSING FAILED")
@@ -225,7 +332,51 @@ async def process_with_ai(note_id: str, content: str, user_id: str) -> Dict[str,
         raise
 
 
-async def store_in_review_queue(note_id: str, entities: List[Dict], relationships: List[Dict], user_id: str):
+def get_queue_manager():
+    """Get or create the review queue manager."""
+    global _queue_manager
+    if _queue_manager is None:
+        with _init_lock:
+            if _queue_manager is None:
+                _queue_manager = create_queue_manager(project_id=PROJECT_ID)
+    return _queue_manager
+
+
+def build_review_item(
+    item_type: ReviewItemType,
+    data: Dict[str, Any],
+    note_id: str,
+    user_id: str
+) -> Optional[ReviewItem]:
+    """
+    Build a pending review item from an extracted entity or relationship.
+    
+    Args:
+        item_type: Review item type
+        data: Extracted entity or relationship
+        note_id: Source note ID
+        user_id: User ID
+        
+    Returns:
+        ReviewItem, or None if the extraction is incomplete
+    """
+    try:
+        return ReviewItem(
+            user_id=user_id,
+            type=item_type,
+            status=ReviewItemStatus.PENDING,
+            confidence=data.get('confidence', 0.0),
+            source_document_id=note_id,
+            entity=data if item_type == ReviewItemType.ENTITY else None,
+            relationship=data if item_type == ReviewItemType.RELATIONSHIP else None,
+            extracted_text=data.get('extracted_text')
+        )
+    except ValueError as e:
+        logger.warning(f"Skipping invalid {item_type.value} extraction: {str(e)}")
+        return None
+
+
+def store_in_review_queue(note_id: str, entities: List[Dict], relationships: List[Dict], user_id: str):
     """
     Store extracted entities and relationships in review queue.
     
@@ -244,49 +395,30 @@ async def store_in_review_queue(note_id: str, entities: List[Dict], relationship
     logger.info(f"Relationships: {len(relationships)}")
     
     try:
-        db = get_firestore_client()
-        batch = db.batch()
-        items_created = 0
+        items = []
         
         # Create review items for entities
         for i, entity in enumerate(entities):
             logger.info(f"Creating entity review item {i+1}/{len(entities)}: {entity.get('name', 'unknown')}")
-            
-            doc_ref = db.collection('review_queue').document()
-            batch.set(doc_ref, {
-                'user_id': user_id,
-                'note_id': note_id,
-                'type': 'entity',
-                'data': entity,
-                'status': 'pending',
-                'confidence': entity.get('confidence', 0.0),
-                'created_at': firestore.SERVER_TIMESTAMP
-            })
-            items_created += 1
+            items.append(build_review_item(ReviewItemType.ENTITY, entity, note_id, user_id))
         
         # Create review items for relationships
         for i, relationship in enumerate(relationships):
             logger.info(f"Creating relationship review item {i+1}/{len(relationships)}")
-            
-            doc_ref = db.collection('review_queue').document()
-            batch.set(doc_ref, {
-                'user_id': user_id,
-                'note_id': note_id,
-                'type': 'relationship',
-                'data': relationship,
-                'status': 'pending',
-                'confidence': relationship.get('confidence', 0.0),
-                'created_at': firestore.SERVER_TIMESTAMP
-            })
-            items_created += 1
-        
-        # Commit batch
-        logger.info(f"Committing batch with {items_created} items...")
-        batch.commit()
+            items.append(build_review_item(ReviewItemType.RELATIONSHIP, relationship, note_id, user_id))
+        
+        items = [item for item in items if item is not None]
+        if not items:
+            logger.info("No valid items to store in review queue")
+            return
+        
+        # Duplicates of existing items are merged into their canonical item
+        logger.info(f"Merging {len(items)} items into review queue...")
+        item_ids = get_queue_manager().add_to_queue(user_id, items, note_id)
         
         logger.info(f"=" * 80)
         logger.info(f"REVIEW QUEUE STORAGE COMPLETE")
-        logger.info(f"Items created: {items_created}")
+        logger.info(f"Items stored: {len(items)} ({len(item_ids)} canonical)")
         logger.info(f"=" * 80)
         
     except Exception as e:
@@ -318,7 +450,8 @@ async def populate_knowledge_graph(entities: List[Dict], relationships: List[Dic
     logger.info(f"Relationships: {len(relationships)}")
     
     try:
-        graph_populator = create_graph_populator()
+        wait_for_warmup(WARMUP_NEO4J)
+        graph_populator = get_service_container(PROJECT_ID).graph_populator
         
         result = await graph_populator.populate_graph(
             entities=entities,
@@ -343,59 +476,286 @@ async def populate_knowledge_graph(entities: List[Dict], relationships: List[Dic
         raise
 
 
-@functions_framework.cloud_event
-def orchestration_function(cloud_event: CloudEvent):
+async def run_note_pipeline(
+    note_id: str,
+    content: str,
+    user_id: str,
+    content_sha256: Optional[str] = None,
+    start_chunk: int = 0,
+    deadline: Optional[Deadline] = None
+) -> Dict[str, Any]:
     """
-    Firestore trigger function that processes notes when they are created.
+    Run AI extraction, review queue storage and graph population as stages.
     
-    Triggered by: Firestore document creation in 'notes' collection
+    Extraction feeds the review queue and graph stages chunk by chunk
+    through bounded queues, so both sinks store earlier chunks (and run
+    concurrently with each other) while later chunks are being extracted.
+    Review queue storage is required; graph population failures are logged
+    and leave the items in the review queue.
     
-    Event structure:
-    {
-        "data": {
-            "value": {
-                "fields": {
-                    "userId": {"stringValue": "user-id"},
-                    "content": {"stringValue": "note content"},
-                    "status": {"stringValue": "processing"},
-                    ...
-                }
-            }
-        }
-    }
+    With a content hash, each stage is checkpointed per chunk, and stages
+    an earlier attempt completed for a chunk are skipped. With a deadline,
+    extraction may stop early; the stages still finish every chunk that was
+    extracted, and the summary's next_chunk is where a continuation resumes.
+    
+    Args:
+        note_id: Note ID
+        content: Note content
+        user_id: User ID
+        content_sha256: Hash of the content (enables checkpointing)
+        start_chunk: Index of the first chunk (continuations)
+        deadline: Invocation deadline
+        
+    Returns:
+        Dictionary with extraction counts, costs, graph summary and
+        next_chunk (None once every chunk has been processed)
+        
+    Raises:
+        PipelineStageError: If extraction or review queue storage fails
     """
-    logger.info("=" * 80)
-    logger.info("ORCHESTRATION FUNCTION TRIGGERED")
-    logger.info("=" * 80)
+    services = get_service_container(PROJECT_ID)
+    extracted = []
     
-    note_id = None
+    async def source():
+        async for chunk in extract_chunks(note_id, content, user_id, content_sha256, start_chunk, deadline):
+            extracted.append(chunk)
+            yield chunk
     
-    try:
-        # Log event details
-        logger.info(f"Event ID: {cloud_event.get('id', 'unknown')}")
-        logger.info(f"Event type: {cloud_event.get('type', 'unknown')}")
-        logger.info(f"Event source: {cloud_event.get('source', 'unknown')}")
-        logger.info(f"Event time: {cloud_event.get('time', 'unknown')}")
+    def checkpoint_stage(chunk: Dict[str, Any], stage: str, result: Optional[Dict[str, Any]] = None):
+        if content_sha256:
+            get_processing_checkpoints().mark_stage(note_id, chunk['index'], stage, result)
+    
+    def store_chunk(chunk: Dict[str, Any]):
+        if STAGE_REVIEW_QUEUE in chunk['stages']:
+            logger.info(f"Chunk {chunk['index'] + 1} already in review queue, skipping")
+            return
         
-        # Parse event data
-        # CloudEvent data for Firestore events is a protobuf message
-        # We need to access it through the cloud_event attributes
-        logger.info(f"Cloud event attributes: {cloud_event.get_attributes()}")
+        store_in_review_queue(note_id, chunk['entities'], chunk['relationships'], user_id)
+        checkpoint_stage(chunk, STAGE_REVIEW_QUEUE)
+    
+    def populate_chunk(chunk: Dict[str, Any]) -> Dict[str, int]:
+        if STAGE_GRAPH in chunk['stages']:
+            logger.info(f"Chunk {chunk['index'] + 1} already in knowledge graph, skipping")
+            return chunk['stages'][STAGE_GRAPH]
         
-        # Get document path from subject
-        subject = cloud_event.get('subject', '')
-        logger.info(f"Subject: {subject}")
+        result = populate_chunk_graph(chunk)
+        checkpoint_stage(chunk, STAGE_GRAPH, result)
+        return result
+    
+    def populate_chunk_graph(chunk: Dict[str, Any]) -> Dict[str, int]:
+        # Auto-approve high confidence items
+        high_confidence_entities = [e for e in chunk['entities'] if e.get('confidence', 0) >= 0.85]
+        high_confidence_relationships = [r for r in chunk['relationships'] if r.get('confidence', 0) >= 0.80]
         
-        # Extract note ID from subject (format: documents/notes/noteId)
-        note_id = subject.split('/')[-1] if subject else None
-        logger.info(f"Note ID from subject: {note_id}")
+        logger.info(f"High confidence items in chunk {chunk['index'] + 1}: {len(high_confidence_entities)} entities, {len(high_confidence_relationships)} relationships")
         
-        # For Firestore events, we need to read the document from Firestore
-        # The event data is protobuf and complex to parse
-        if not note_id:
-            logger.error("No note ID found in event subject")
-            return
+        if not high_confidence_entities and not high_confidence_relationships:
+            return {'entities_created': 0, 'relationships_created': 0}
         
+        # Sync stages run in worker threads, each with its own reusable loop
+        return services.run(
+            populate_knowledge_graph(
+                high_confidence_entities,
+                high_confidence_relationships,
+                user_id
+            )
+        )
+    
+    results = await run_staged_pipeline(source(), [
+        Sink(STAGE_REVIEW_QUEUE, store_chunk),
+        Sink(STAGE_GRAPH, populate_chunk, required=False)
+    ])
+    
+    graph_results = results[STAGE_GRAPH].results
+    total_cost = sum(chunk['cost'] for chunk in extracted)
+    
+    # Record cost (log_usage is async, but we'll skip it for now to keep things simple)
+    # TODO: Implement proper async cost logging
+    logger.info(f"Cost tracking: ${total_cost:.4f} for note {note_id}")
+    
+    return {
+        'chunks': len(extracted),
+        'entity_count': sum(len(chunk['entities']) for chunk in extracted),
+        'relationship_count': sum(len(chunk['relationships']) for chunk in extracted),
+        'costs': {
+            'ai_extraction': total_cost,
+            'total': total_cost
+        },
+        'graph': {
+            'entities_created': sum(r.get('entities_created', 0) for r in graph_results),
+            'relationships_created': sum(r.get('relationships_created', 0) for r in graph_results)
+        },
+        'next_chunk': deadline.stopped_at if deadline else None
+    }
+
+
+def merge_pipeline_summaries(earlier: Optional[Dict[str, Any]], summary: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Add the summary of earlier invocations of a continued note to this one's.
+    
+    Args:
+        earlier: Summary carried by the continuation (None for the first invocation)
+        summary: Summary of this invocation
+        
+    Returns:
+        Combined summary (next_chunk from this invocation)
+    """
+    if not earlier:
+        return summary
+    
+    return {
+        'chunks': earlier['chunks'] + summary['chunks'],
+        'entity_count': earlier['entity_count'] + summary['entity_count'],
+        'relationship_count': earlier['relationship_count'] + summary['relationship_count'],
+        'costs': {
+            key: earlier['costs'].get(key, 0.0) + value
+            for key, value in summary['costs'].items()
+        },
+        'graph': {
+            key: earlier['graph'].get(key, 0) + value
+            for key, value in summary['graph'].items()
+        },
+        'next_chunk': summary['next_chunk']
+    }
+
+
+def get_processing_queue():
+    """
+    Get or create the note processing queue.
+    
+    Only used when NOTE_PROCESSING_WORKER_URL is configured; without a worker
+    URL notes are processed inline by the trigger.
+    """
+    global _processing_queue
+    if _processing_queue is None:
+        with _init_lock:
+            if _processing_queue is None:
+                _processing_queue = create_processing_queue(
+                    NOTE_PROCESSING_QUEUE,
+                    worker_url=NOTE_PROCESSING_WORKER_URL,
+                    project_id=PROJECT_ID
+                )
+    return _processing_queue
+
+
+def get_processing_checkpoints():
+    """Get or create the chunk checkpoint store."""
+    global _processing_checkpoints
+    if _processing_checkpoints is None:
+        with _init_lock:
+            if _processing_checkpoints is None:
+                _processing_checkpoints = create_processing_checkpoints(project_id=PROJECT_ID)
+    return _processing_checkpoints
+
+
+def get_processing_ledger():
+    """Get or create the processing idempotency ledger."""
+    global _processing_ledger
+    if _processing_ledger is None:
+        with _init_lock:
+            if _processing_ledger is None:
+                _processing_ledger = create_processing_ledger(project_id=PROJECT_ID)
+    return _processing_ledger
+
+
+def continue_note(
+    note_id: str,
+    user_id: str,
+    claim,
+    event_id: Optional[str],
+    lane: str,
+    content_sha256: str,
+    summary: Dict[str, Any]
+):
+    """
+    Hand the rest of a note to a continuation task on the processing queue.
+    
+    Everything up to the cursor has been stored and checkpointed. The
+    continuation runs under its own event ID, so it claims its own ledger
+    entry, while redeliveries of this one are dropped.
+    
+    Args:
+        note_id: Note document ID
+        user_id: Note owner
+        claim: This invocation's ledger claim
+        event_id: This invocation's event ID
+        lane: Processing lane to continue on
+        content_sha256: Hash of the content being processed
+        summary: Combined summary so far, with the next_chunk cursor
+    """
+    cursor = summary['next_chunk']
+    root_event_id = (event_id or note_id).split(':continue-')[0]
+    continuation_event_id = f"{root_event_id}:continue-{cursor}"
+    
+    try:
+        task_id = get_processing_queue().enqueue(
+            {
+                'note_id': note_id,
+                'event_id': continuation_event_id,
+                'continuation': {
+                    'cursor': cursor,
+                    'content_sha256': content_sha256,
+                    'summary': summary
+                }
+            },
+            lane=lane,
+            enforce_backlog=False
+        )
+    except TaskQueueError as e:
+        # Finished chunks are checkpointed: a retry resumes after them
+        logger.error(f"Failed to queue continuation of note {note_id}: {str(e)}")
+        update_note_status(note_id, 'failed', error=f"Continuation error: {str(e)}", user_id=user_id)
+        get_processing_ledger().release(claim, error=str(e))
+        return
+    
+    get_processing_ledger().hand_off(claim, continuation_event_id=continuation_event_id, cursor=cursor)
+    logger.info(f"Note {note_id} continues from chunk {cursor + 1} (task {task_id})")
+
+
+@traced("process_note")
+def process_note(
+    note_id: str,
+    event_id: Optional[str] = None,
+    lane: str = LANE_INTERACTIVE,
+    continuation: Optional[Dict[str, Any]] = None
+) -> Optional[LedgerClaim]:
+    """
+    Process a note: AI extraction, review queue storage and graph population.
+    
+    Only notes with 'processing' status are processed. Deliveries are
+    claimed in the processing ledger by event ID and content hash first, so
+    duplicate deliveries of the same event do no AI or graph work. Failures
+    are recorded on the note's status rather than raised; chunks and stages
+    completed before a failure are checkpointed, and the next attempt on the
+    same content resumes after them.
+    
+    When a processing queue is configured, the invocation tracks its
+    deadline; a note too long to finish in time is handed to a continuation
+    task that resumes from the first unprocessed chunk.
+    
+    Each invocation is traced as a "process_note" span, with the pipeline
+    stages, Gemini calls, Firestore merges and Neo4j statements nested
+    under it.
+    
+    Args:
+        note_id: Note document ID
+        event_id: Delivery event ID (defaults to the note ID)
+        lane: Processing lane the note was queued on
+        continuation: Cursor, content hash and summary of earlier
+            invocations (continuation tasks only)
+    
+    Returns:
+        The ledger claim if the delivery was not claimed (duplicate or held
+        by another delivery), otherwise None
+    """
+    # The invocation budget starts now; without a queue there is nowhere to
+    # continue, so the note runs to completion as before
+    deadline = Deadline(FUNCTION_TIMEOUT_SECONDS, DEADLINE_RESERVE_SECONDS) if NOTE_PROCESSING_WORKER_URL else None
+    claim = None
+    user_id = None
+    span = current_span()
+    span.set_attributes(note_id=note_id, lane=lane)
+    try:
         # Read the note from Firestore
         db = get_firestore_client()
         note_doc = db.collection('notes').document(note_id).get()
@@ -427,7 +787,7 @@ def orchestration_function(cloud_event: CloudEvent):
         
         if not content:
             logger.error(f"No content found for note {note_id}")
-            update_note_status(note_id, 'failed', error='Missing content')
+            update_note_status(note_id, 'failed', error='Missing content', user_id=user_id)
             return
         
         # Only process notes with 'processing' status
@@ -435,97 +795,184 @@ def orchestration_function(cloud_event: CloudEvent):
             logger.info(f"Skipping note with status: {status}")
             return
         
-        # Update status to processing (with timestamp)
-        update_note_status(
-            note_id,
-            'processing',
-            processingStartedAt=firestore.SERVER_TIMESTAMP
-        )
+        # Claim the delivery; duplicates stop here
+        content_sha256 = content_hash(content)
+        claim = get_processing_ledger().claim(note_id, event_id or note_id, content_sha256)
+        if not claim.claimed:
+            return claim
         
-        # Process with AI
-        logger.info("Starting AI processing...")
-        try:
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            
-            ai_results = loop.run_until_complete(
-                process_with_ai(note_id, content, user_id)
+        start_chunk, earlier_summary = 0, None
+        if continuation:
+            if continuation.get('content_sha256') == content_sha256:
+                start_chunk = continuation.get('cursor', 0)
+                earlier_summary = continuation.get('summary')
+                logger.info(f"Continuing note {note_id} from chunk {start_chunk + 1}")
+            else:
+                logger.warning(f"Note {note_id} changed since it was continued, processing from the start")
+        
+        # Update status to processing (with timestamp and list summary)
+        if not start_chunk:
+            update_note_status(
+                note_id,
+                'processing',
+                user_id=user_id,
+                processingStartedAt=firestore.SERVER_TIMESTAMP,
+                **build_note_summary(content)
             )
-            
-            entities = ai_results['entities']
-            relationships = ai_results['relationships']
-            costs = ai_results['costs']
-            
-            logger.info(f"AI processing complete: {len(entities)} entities, {len(relationships)} relationships")
-            
-        except Exception as e:
-            logger.error(f"AI processing failed: {type(e).__name__}: {str(e)}")
-            update_note_status(note_id, 'failed', error=f"AI processing error: {str(e)}")
-            return
         
-        # Store in review queue
-        logger.info("Storing in review queue...")
+        # Extract, store and populate as overlapping stages (on this
+        # thread's reusable event loop)
+        logger.info("Starting note pipeline...")
+        services = get_service_container(PROJECT_ID)
         try:
-            loop.run_until_complete(
-                store_in_review_queue(note_id, entities, relationships, user_id)
+            summary = services.run(
+                run_note_pipeline(note_id, content, user_id, content_sha256, start_chunk, deadline)
             )
-            logger.info("Review queue storage complete")
-            
-        except Exception as e:
-            logger.error(f"Review queue storage failed: {type(e).__name__}: {str(e)}")
-            update_note_status(note_id, 'failed', error=f"Review queue error: {str(e)}")
+        except PipelineStageError as e:
+            logger.error(f"Note pipeline failed in {e.stage}: {type(e.error).__name__}: {str(e.error)}")
+            span.record_error(e)
+            prefix = "AI processing error" if e.stage == SOURCE_STAGE else "Review queue error"
+            update_note_status(note_id, 'failed', error=f"{prefix}: {str(e.error)}", user_id=user_id)
+            get_processing_ledger().release(claim, error=str(e.error))
+            NOTES_PROCESSED.inc(outcome="failed")
             return
+        NOTE_CHUNKS.observe(summary['chunks'])
         
-        # Populate knowledge graph (auto-approve high confidence items)
-        logger.info("Populating knowledge graph...")
-        try:
-            high_confidence_entities = [e for e in entities if e.get('confidence', 0) >= 0.85]
-            high_confidence_relationships = [r for r in relationships if r.get('confidence', 0) >= 0.80]
-            
-            logger.info(f"High confidence items: {len(high_confidence_entities)} entities, {len(high_confidence_relationships)} relationships")
-            
-            if high_confidence_entities or high_confidence_relationships:
-                graph_summary = loop.run_until_complete(
-                    populate_knowledge_graph(
-                        high_confidence_entities,
-                        high_confidence_relationships,
-                        user_id
-                    )
-                )
-            else:
-                graph_summary = {'entities_created': 0, 'relationships_created': 0}
-            
-            logger.info(f"Knowledge graph population complete: {graph_summary}")
-            
-            loop.close()
-            
-        except Exception as e:
-            logger.error(f"Knowledge graph population failed: {type(e).__name__}: {str(e)}")
-            # Don't fail the whole request - items are still in review queue
-            graph_summary = {'entities_created': 0, 'relationships_created': 0}
+        summary = merge_pipeline_summaries(earlier_summary, summary)
+        span.set_attributes(
+            start_chunk=start_chunk,
+            next_chunk=summary['next_chunk'],
+            entity_count=summary['entity_count'],
+            relationship_count=summary['relationship_count']
+        )
+        if summary['next_chunk'] is not None:
+            continue_note(note_id, user_id, claim, event_id, lane, content_sha256, summary)
+            NOTES_PROCESSED.inc(outcome="continued")
+            return
+        
+        entity_count = summary['entity_count']
+        relationship_count = summary['relationship_count']
+        graph_summary = summary['graph']
+        costs = summary['costs']
         
         # Update status to completed
         logger.info("Updating note status to completed...")
         update_note_status(
             note_id,
             'completed',
+            user_id=user_id,
             processingCompletedAt=firestore.SERVER_TIMESTAMP,
             extractionSummary={
-                'entityCount': len(entities),
-                'relationshipCount': len(relationships)
+                'entityCount': entity_count,
+                'relationshipCount': relationship_count
             }
         )
+        get_processing_ledger().complete(
+            claim,
+            entity_count=entity_count,
+            relationship_count=relationship_count
+        )
+        get_processing_checkpoints().clear(note_id)
+        NOTES_PROCESSED.inc(outcome="completed")
         
         logger.info("=" * 80)
         logger.info("ORCHESTRATION COMPLETE")
         logger.info(f"Note ID: {note_id}")
-        logger.info(f"Entities extracted: {len(entities)}")
-        logger.info(f"Relationships detected: {len(relationships)}")
+        logger.info(f"Entities extracted: {entity_count}")
+        logger.info(f"Relationships detected: {relationship_count}")
         logger.info(f"Entities in graph: {graph_summary['entities_created']}")
         logger.info(f"Relationships in graph: {graph_summary['relationships_created']}")
         logger.info(f"Processing cost: ${costs['total']:.4f}")
         logger.info("=" * 80)
         
+    except Exception as e:
+        logger.error("=" * 80)
+        logger.error("ORCHESTRATION FAILED")
+        logger.error(f"Error: {type(e).__name__}: {str(e)}")
+        logger.error("=" * 80)
+        logger.exception("Full traceback:")
+        span.record_error(e)
+        NOTES_PROCESSED.inc(outcome="failed")
+        
+        # Update status to failed
+        update_note_status(note_id, 'failed', error=str(e), user_id=user_id)
+        if claim is not None and claim.claimed:
+            get_processing_ledger().release(claim, error=str(e))
+
+
+@functions_framework.cloud_event
+def orchestration_function(cloud_event: CloudEvent):
+    """
+    Firestore trigger function that processes notes when they are created.
+    
+    Triggered by: Firestore document creation in 'notes' collection
+    
+    When NOTE_PROCESSING_WORKER_URL is configured the note is handed to the
+    interactive lane of the processing queue, which bounds how many notes are
+    processed concurrently; otherwise it is processed inline.
+    
+    Event structure:
+    {
+        "data": {
+            "value": {
+                "fields": {
+                    "userId": {"stringValue": "user-id"},
+                    "content": {"stringValue": "note content"},
+                    "status": {"stringValue": "processing"},
+                    ...
+                }
+            }
+        }
+    }
+    """
+    logger.info("=" * 80)
+    logger.info("ORCHESTRATION FUNCTION TRIGGERED")
+    logger.info("=" * 80)
+    
+    note_id = None
+    event_id = cloud_event.get('id')
+    
+    try:
+        # Log event details
+        logger.info(f"Event ID: {cloud_event.get('id', 'unknown')}")
+        logger.info(f"Event type: {cloud_event.get('type', 'unknown')}")
+        logger.info(f"Event source: {cloud_event.get('source', 'unknown')}")
+        logger.info(f"Event time: {cloud_event.get('time', 'unknown')}")
+        
+        # Parse event data
+        # CloudEvent data for Firestore events is a protobuf message
+        # We need to access it through the cloud_event attributes
+        logger.info(f"Cloud event attributes: {cloud_event.get_attributes()}")
+        
+        # Get document path from subject
+        subject = cloud_event.get('subject', '')
+        logger.info(f"Subject: {subject}")
+        
+        # Extract note ID from subject (format: documents/notes/noteId)
+        note_id = subject.split('/')[-1] if subject else None
+        logger.info(f"Note ID from subject: {note_id}")
+        
+        # For Firestore events, we need to read the document from Firestore
+        # The event data is protobuf and complex to parse
+        if not note_id:
+            logger.error("No note ID found in event subject")
+            return
+        
+        if NOTE_PROCESSING_WORKER_URL:
+            try:
+                # New notes are always accepted; backpressure applies at the API
+                task_id = get_processing_queue().enqueue(
+                    {'note_id': note_id, 'event_id': event_id},
+                    lane=LANE_INTERACTIVE,
+                    enforce_backlog=False
+                )
+                logger.info(f"Queued note {note_id} for processing (task {task_id})")
+                return
+            except TaskQueueError as e:
+                logger.warning(f"Failed to queue note {note_id}, processing inline: {str(e)}")
+        
+        process_note(note_id, event_id)
+        
     except Exception as e:
         logger.error("=" * 80)
         logger.error("ORCHESTRATION FAILED")
@@ -535,4 +982,51 @@ def orchestration_function(cloud_event: CloudEvent):
         
         # Update status to failed
         if note_id:
-            update_note_status(note_id, 'failed', error=str(e))
\ No newline at end of file
+            update_note_status(note_id, 'failed', error=str(e), user_id=get_note_owner(note_id))
+    finally:
+        # Write queued records before the instance may be throttled
+        flush_logs()
+
+
+@functions_framework.http
+def process_note_task(request):
+    """
+    Cloud Tasks worker for the note processing queue.
+    
+    Deployed as a separate entry point; it must only be invokable by the
+    Cloud Tasks service account (IAM/OIDC). The queue's max concurrency and
+    dispatch rate bound how many of these run at once.
+    
+    A delivery whose ledger entry is held by another delivery is answered
+    with 503 and Retry-After set to the remaining lease, so Cloud Tasks
+    redelivers it and takes the entry over if the holder died.
+    
+    Body:
+    {
+        "note_id": "string",
+        "event_id": "string",
+        "lane": "interactive" | "bulk",
+        "continuation": {                   // continuation tasks only
+            "cursor": 12,
+            "content_sha256": "string",
+            "summary": {...}
+        }
+    }
+    """
+    data = request.get_json(silent=True) or {}
+    note_id = data.get('note_id')
+    if not note_id:
+        return json.dumps({'success': False, 'error': 'Missing required field: note_id'}), 400, {'Content-Type': 'application/json'}
+    
+    lane = data.get('lane', LANE_INTERACTIVE)
+    logger.info(f"Processing note {note_id} from {lane} lane")
+    claim = process_note(note_id, data.get('event_id'), lane=lane, continuation=data.get('continuation'))
+    flush_logs()
+    if claim is not None and claim.outcome == ClaimOutcome.IN_PROGRESS:
+        retry_after = int(claim.retry_after or 0) + 1
+        logger.info(f"Note {note_id} is held by another delivery, retrying in {retry_after}s")
+        return json.dumps({'success': False, 'note_id': note_id, 'error': 'Note is already being processed'}), 503, {
+            'Content-Type': 'application/json',
+            'Retry-After': str(retry_after)
+        }
+    return json.dumps({'success': True, 'note_id': note_id}), 200, {'Content-Type': 'application/json'}
@@ -1,10 +1,12 @@
 ﻿"""Gemini AI client with automatic API key retrieval."""
 
+import threading
 import google.generativeai as genai
 from google.cloud import secretmanager
 from typing import Optional
 
 _configured: bool = False
+_configure_lock = threading.Lock()
 
 
 def get_secret(project_id: str, secret_id: str, version: str = "latest") -> str:
@@ -34,9 +36,11 @@ def configure_gemini(project_id: str = "aletheia-codex-prod"):
     """
     global _configured
     if not _configured:
-        api_key = get_secret(project_id, "GEMINI_API_KEY")
-        genai.configure(api_key=api_key)
-        _configured = True
+        with _configure_lock:
+            if not _configured:
+                api_key = get_secret(project_id, "GEMINI_API_KEY")
+                genai.configure(api_key=api_key)
+                _configured = True
 
 
 def get_model(model_name: str = "gemini-1.5-flash") -> genai.GenerativeModel:
@@ -1,15 +1,19 @@
 ﻿"""Firestore client with automatic initialization."""
 
+import threading
 from google.cloud import firestore
 from typing import Optional
 
 _client: Optional[firestore.Client] = None
+_client_lock = threading.Lock()
 
 
 def get_firestore_client(project_id: str = "aletheia-codex-prod") -> firestore.Client:
     """
     Get or create a Firestore client (singleton pattern).
     
+    Safe to call from concurrent requests; the client is created once.
+    
     Args:
         project_id: GCP project ID
         
@@ -18,7 +22,9 @@ def get_firestore_client(project_id: str = "aletheia-codex-prod") -> firestore.C
     """
     global _client
     if _client is None:
-        _client = firestore.Client(project=project_id)
+        with _client_lock:
+            if _client is None:
+                _client = firestore.Client(project=project_id)
     return _client
 
 
@@ -2,9 +2,22 @@
 Cypher query templates for Neo4j graph operations.
 
 Provides reusable query templates for entity and relationship management.
+
+Labels and relationship types cannot be Cypher parameters, so templates that
+need one are rendered once per allowed value into a QueryCatalog at import.
+Every call for the same label sends byte-identical text, which Neo4j plans
+once and serves from its plan cache; values outside the whitelist are
+rejected instead of being spliced into the statement.
 """
 
-from typing import Dict, Any, List
+import re
+from typing import Dict, Any, FrozenSet, Iterable, List
+
+from ..models.entity import VALID_ENTITY_TYPES
+from ..models.relationship import VALID_RELATIONSHIP_TYPES
+
+# Labels and relationship types that may be rendered into a statement
+_IDENTIFIER = re.compile(r"^[A-Za-z][A-Za-z0-9_]*$")
 
 
 # User node queries
@@ -181,6 +194,64 @@ RETURN keep
 """
 
 
+class QueryCatalog:
+    """
+    Pre-rendered statements for one template, one per allowed label or type.
+    """
+    
+    def __init__(self, template: str, placeholder: str, allowed: Iterable[str]):
+        """
+        Render and validate the template for every allowed value.
+        
+        Args:
+            template: Cypher template containing the placeholder
+            placeholder: Placeholder name, e.g. "entity_type"
+            allowed: Whitelisted labels or relationship types
+        
+        Raises:
+            ValueError: If an allowed value is not a plain identifier
+        """
+        token = "{" + placeholder + "}"
+        if token not in template:
+            raise ValueError(f"Template has no {token} placeholder")
+        
+        self.placeholder = placeholder
+        self._queries: Dict[str, str] = {}
+        for value in allowed:
+            if not _IDENTIFIER.match(value):
+                raise ValueError(f"Invalid {placeholder} for query catalog: {value!r}")
+            self._queries[value] = template.replace(token, value)
+    
+    @property
+    def allowed(self) -> FrozenSet[str]:
+        """Labels or types this catalog has statements for."""
+        return frozenset(self._queries)
+    
+    def get(self, value: str) -> str:
+        """
+        Get the statement for a label or type.
+        
+        Args:
+            value: Label or relationship type
+        
+        Returns:
+            Cypher query string
+        
+        Raises:
+            ValueError: If the value is not whitelisted
+        """
+        try:
+            return self._queries[value]
+        except KeyError:
+            raise ValueError(f"Unsupported {self.placeholder}: {value!r}") from None
+
+
+CREATE_ENTITY_QUERIES = QueryCatalog(CREATE_ENTITY_NODE, "entity_type", VALID_ENTITY_TYPES)
+GET_ENTITY_QUERIES = QueryCatalog(GET_ENTITY_NODE, "entity_type", VALID_ENTITY_TYPES)
+CREATE_RELATIONSHIP_QUERIES = QueryCatalog(CREATE_RELATIONSHIP, "relationship_type", VALID_RELATIONSHIP_TYPES)
+GET_RELATIONSHIP_QUERIES = QueryCatalog(GET_RELATIONSHIP, "relationship_type", VALID_RELATIONSHIP_TYPES)
+
+
 def build_create_entity_query(entity_type: str) -> str:
     """
     Build a CREATE query for a specific entity type.
@@ -190,8 +261,11 @@ def build_create_entity_query(entity_type: str) -> str:
         
     Returns:
         Cypher query string
+    
+    Raises:
+        ValueError: If the entity type is not in VALID_ENTITY_TYPES
     """
-    return CREATE_ENTITY_NODE.replace("{entity_type}", entity_type)
+    return CREATE_ENTITY_QUERIES.get(entity_type)
 
 
 def build_create_relationship_query(relationship_type: str) -> str:
@@ -203,8 +277,11 @@ def build_create_relationship_query(relationship_type: str) -> str:
         
     Returns:
         Cypher query string
+    
+    Raises:
+        ValueError: If the relationship type is not in VALID_RELATIONSHIP_TYPES
     """
-    return CREATE_RELATIONSHIP.replace("{relationship_type}", relationship_type)
+    return CREATE_RELATIONSHIP_QUERIES.get(relationship_type)
 
 
 def build_get_entity_query(entity_type: str) -> str:
@@ -216,8 +293,11 @@ def build_get_entity_query(entity_type: str) -> str:
         
     Returns:
         Cypher query string
+    
+    Raises:
+        ValueError: If the entity type is not in VALID_ENTITY_TYPES
     """
-    return GET_ENTITY_NODE.replace("{entity_type}", entity_type)
+    return GET_ENTITY_QUERIES.get(entity_type)
 
 
 def build_get_relationship_query(relationship_type: str) -> str:
@@ -229,5 +309,8 @@ def build_get_relationship_query(relationship_type: str) -> str:
         
     Returns:
         Cypher query string
+    
+    Raises:
+        ValueError: If the relationship type is not in VALID_RELATIONSHIP_TYPES
     """
-    return GET_RELATIONSHIP.replace("{relationship_type}", relationship_type)
\ No newline at end of file
+    return GET_RELATIONSHIP_QUERIES.get(relationship_type)
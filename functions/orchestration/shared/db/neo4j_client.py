@@ -16,21 +16,33 @@ FEATURES:
 - Comprehensive error handling
 - Secret caching for performance
 - Detailed logging
+- Safe for concurrent requests (shared state is lock-protected)
 """
 
-import requests
-from google.cloud import secretmanager
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Tuple
+import json
 import os
 import logging
+import threading
 import time
 from datetime import datetime, timedelta
 
+from ..utils.lazy_import import lazy_import
+from ..utils.metrics import counter
+from ..utils.tracing import Span, current_span, start_span
+from .query_profiler import adhoc_template_name, record_query
+
+# Imported on first use, so importing this module stays cheap
+requests = lazy_import("requests")
+secretmanager = lazy_import("google.cloud.secretmanager")
+
 # Configure logging
 logger = logging.getLogger(__name__)
 
 # Secret cache configuration
 _secret_cache: Dict[str, tuple] = {}  # {secret_id: (value, expiry_time)}
+_secret_cache_lock = threading.Lock()
+_secret_fetch_lock = threading.Lock()  # one Secret Manager fetch at a time
 SECRET_CACHE_TTL = 300  # 5 minutes
 
 # Retry configuration
@@ -39,11 +51,68 @@ INITIAL_RETRY_DELAY = 2  # seconds
 MAX_RETRY_DELAY = 10  # seconds
 REQUEST_TIMEOUT = 30  # seconds
 
+# Metrics
+NEO4J_QUERIES = counter("neo4j_queries_total", "Neo4j HTTP statements by template and outcome")
+NEO4J_RETRIES = counter("neo4j_retries_total", "Neo4j HTTP statement retries")
+SECRET_CACHE_LOOKUPS = counter("secret_cache_lookups_total", "Secret cache lookups by result")
+
+# Shared clients (created on first use, reused across invocations)
+HTTP_POOL_SIZE = 10
+_http_session = None
+_secret_client = None
+_client_lock = threading.Lock()
+
+
+def get_http_session():
+    """
+    Get the shared HTTP session for Neo4j requests.
+    
+    Keeps TLS connections to Neo4j alive between queries instead of paying
+    a handshake per request. Concurrent requests share the session; each
+    one checks a connection out of the pool (HTTP_POOL_SIZE connections).
+    """
+    global _http_session
+    if _http_session is None:
+        with _client_lock:
+            if _http_session is None:
+                session = requests.Session()
+                adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=HTTP_POOL_SIZE)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                _http_session = session
+    return _http_session
+
+
+def get_secret_client():
+    """Get the shared Secret Manager client."""
+    global _secret_client
+    if _secret_client is None:
+        with _client_lock:
+            if _secret_client is None:
+                _secret_client = secretmanager.SecretManagerServiceClient()
+    return _secret_client
+
+
+def _get_cached_secret(cache_key: str) -> Optional[str]:
+    """Get an unexpired cached secret, dropping it if expired."""
+    with _secret_cache_lock:
+        entry = _secret_cache.get(cache_key)
+        if entry is None:
+            return None
+        value, expiry = entry
+        if datetime.now() < expiry:
+            return value
+        del _secret_cache[cache_key]
+        return None
+
 
 def get_secret(project_id: str, secret_id: str, version: str = "latest", use_cache: bool = True) -> str:
     """
     Retrieve a secret from Secret Manager with optional caching.
     
+    Concurrent misses for the same secret wait for a single fetch instead
+    of each calling Secret Manager.
+    
     Args:
         project_id: GCP project ID
         secret_id: Secret name
@@ -56,17 +125,28 @@ def get_secret(project_id: str, secret_id: str, version: str = "latest", use_cac
     cache_key = f"{project_id}:{secret_id}:{version}"
     
     # Check cache if enabled
-    if use_cache and cache_key in _secret_cache:
-        value, expiry = _secret_cache[cache_key]
-        if datetime.now() < expiry:
+    if use_cache:
+        value = _get_cached_secret(cache_key)
+        if value is not None:
             logger.debug(f"Using cached secret: {secret_id}")
+            SECRET_CACHE_LOOKUPS.inc(result="hit")
             return value
-        else:
-            logger.debug(f"Cache expired for secret: {secret_id}")
-            del _secret_cache[cache_key]
+        SECRET_CACHE_LOOKUPS.inc(result="miss")
+    
+        with _secret_fetch_lock:
+            # Another request may have fetched it while we waited
+            value = _get_cached_secret(cache_key)
+            if value is not None:
+                return value
+            return _fetch_secret(project_id, secret_id, version, cache_key)
     
+    return _fetch_secret(project_id, secret_id, version, None)
+
+
+def _fetch_secret(project_id: str, secret_id: str, version: str, cache_key: Optional[str]) -> str:
+    """Fetch a secret from Secret Manager, caching it under cache_key if given."""
     try:
-        client = secretmanager.SecretManagerServiceClient()
+        client = get_secret_client()
         name = f"projects/{project_id}/secrets/{secret_id}/versions/{version}"
         logger.info(f"Retrieving secret: {secret_id}")
         
@@ -75,9 +155,10 @@ def get_secret(project_id: str, secret_id: str, version: str = "latest", use_cac
         secret_value = response.payload.data.decode("UTF-8").strip().replace('\n', '').replace('\r', '').replace('\t', '')
         
         # Cache the secret
-        if use_cache:
+        if cache_key is not None:
             expiry = datetime.now() + timedelta(seconds=SECRET_CACHE_TTL)
-            _secret_cache[cache_key] = (secret_value, expiry)
+            with _secret_cache_lock:
+                _secret_cache[cache_key] = (secret_value, expiry)
             logger.debug(f"Cached secret: {secret_id} (TTL: {SECRET_CACHE_TTL}s)")
         
         logger.info(f"Successfully retrieved secret: {secret_id} (length: {len(secret_value)})")
@@ -90,8 +171,8 @@ def get_secret(project_id: str, secret_id: str, version: str = "latest", use_cac
 
 def clear_secret_cache():
     """Clear the secret cache. Useful for testing or after secret rotation."""
-    global _secret_cache
-    _secret_cache.clear()
+    with _secret_cache_lock:
+        _secret_cache.clear()
     logger.info("Secret cache cleared")
 
 
@@ -127,11 +208,15 @@ def execute_neo4j_query_http(
     query: str,
     parameters: Dict[str, Any] = None,
     database: str = "neo4j",
-    max_retries: int = MAX_CONNECTION_RETRIES
+    max_retries: int = MAX_CONNECTION_RETRIES,
+    template: Optional[str] = None
 ) -> Dict[str, Any]:
     """
     Execute Cypher query via Neo4j HTTP API.
     
+    Latency, rows and payload bytes are recorded under the statement's
+    template name, and slow statements are logged (see query_profiler).
+    
     Args:
         uri: Neo4j URI (will be converted to HTTPS)
         user: Neo4j username
@@ -140,6 +225,8 @@ def execute_neo4j_query_http(
         parameters: Query parameters
         database: Database name (default: neo4j)
         max_retries: Maximum retry attempts
+        template: Template name for profiling (default: adhoc:<hash of
+            the statement>)
         
     Returns:
         Query results as dictionary
@@ -153,26 +240,89 @@ def execute_neo4j_query_http(
     # Build endpoint URL - using Query API v2 (Aura compatible)
     endpoint = f"{http_uri}/db/{database}/query/v2"
     
-    # Prepare request payload for Query API v2
-    payload = {
+    template = template or adhoc_template_name(query)
+    parameters = parameters or {}
+    
+    # Prepare request payload for Query API v2 (serialized once, so its
+    # size can be recorded)
+    body = json.dumps({
         "statement": query,
-        "parameters": parameters or {}
-    }
+        "parameters": parameters
+    })
+    
+    def run_profile(statement: str) -> Dict[str, Any]:
+        profile_body = json.dumps({"statement": statement, "parameters": parameters})
+        return _post_neo4j_query(endpoint, user, password, statement, profile_body, 1, current_span())[0]
+    
+    started = time.monotonic()
+    with start_span("neo4j.query", database=database, template=template) as span:
+        try:
+            result, response_bytes = _post_neo4j_query(endpoint, user, password, query, body, max_retries, span)
+        except Exception:
+            NEO4J_QUERIES.inc(status="error", template=template)
+            raise
+        NEO4J_QUERIES.inc(status="ok", template=template)
+        
+        # Transform Query API v2 response to match expected format
+        # Query API v2 returns: {"data": {"fields": [...], "values": [[...]]}}
+        # We need to transform to: {"results": [{"data": [{"row": [...]}]}]}
+        values = result['data'].get('values', []) if 'data' in result else []
+        span.set_attribute('rows', len(values))
+        record_query(
+            template,
+            query,
+            parameters,
+            time.monotonic() - started,
+            rows=len(values),
+            request_bytes=len(body),
+            response_bytes=response_bytes,
+            run_profile=run_profile
+        )
+        
+        if 'data' in result:
+            return {
+                "results": [{
+                    "data": [
+                        {"row": row} for row in values
+                    ]
+                }]
+            }
+        
+        return result
+
+
+def _post_neo4j_query(
+    endpoint: str,
+    user: str,
+    password: str,
+    query: str,
+    body: str,
+    max_retries: int,
+    span: Span
+) -> Tuple[Dict[str, Any], int]:
+    """
+    Post a Query API v2 request with retries (see execute_neo4j_query_http).
     
+    Returns:
+        Tuple of (raw Query API response, response size in bytes)
+    """
     # Execute request with retry logic
     delay = INITIAL_RETRY_DELAY
     last_exception = None
     
     for attempt in range(max_retries):
+        span.set_attribute('retries', attempt)
+        if attempt:
+            NEO4J_RETRIES.inc()
         try:
             logger.info(f"Executing Neo4j HTTP query (attempt {attempt + 1}/{max_retries})")
             logger.debug(f"Endpoint: {endpoint}")
             logger.debug(f"Query: {query[:100]}...")  # Log first 100 chars
             
-            response = requests.post(
+            response = get_http_session().post(
                 endpoint,
                 auth=(user, password),
-                json=payload,
+                data=body,
                 timeout=REQUEST_TIMEOUT,
                 headers={'Content-Type': 'application/json'}
             )
@@ -188,20 +338,7 @@ def execute_neo4j_query_http(
             
             logger.info("✓ Neo4j HTTP query executed successfully")
             
-            # Transform Query API v2 response to match expected format
-            # Query API v2 returns: {"data": {"fields": [...], "values": [[...]]}}
-            # We need to transform to: {"results": [{"data": [{"row": [...]}]}]}
-            if 'data' in result:
-                transformed = {
-                    "results": [{
-                        "data": [
-                            {"row": row} for row in result['data'].get('values', [])
-                        ]
-                    }]
-                }
-                return transformed
-            
-            return result
+            return result, len(response.content)
             
         except requests.exceptions.Timeout as e:
             last_exception = e
@@ -278,7 +415,8 @@ def create_neo4j_http_client(project_id: str = "aletheia-codex-prod") -> Dict[st
 def execute_query(
     cypher: str, 
     parameters: dict = None, 
-    project_id: str = "aletheia-codex-prod"
+    project_id: str = "aletheia-codex-prod",
+    template: Optional[str] = None
 ) -> List[Dict[str, Any]]:
     """
     Execute a Cypher query and return results.
@@ -289,6 +427,7 @@ def execute_query(
         cypher: Cypher query string
         parameters: Query parameters (optional)
         project_id: GCP project ID
+        template: Template name for profiling (optional)
         
     Returns:
         List of result records
@@ -300,7 +439,8 @@ def execute_query(
             client['user'],
             client['password'],
             cypher,
-            parameters
+            parameters,
+            template=template
         )
         
         # Extract records from HTTP response
@@ -345,7 +485,8 @@ def test_connection(project_id: str = "aletheia-codex-prod") -> dict:
             client['uri'],
             client['user'],
             client['password'],
-            "RETURN 1 as test"
+            "RETURN 1 as test",
+            template="connection_test"
         )
         
         # Verify result structure
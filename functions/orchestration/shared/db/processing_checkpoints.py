@@ -0,0 +1,196 @@
+"""
+Chunk-level checkpoints for note processing.
+
+Each chunk's extraction results are stored in a sub-collection of the note
+as soon as they are extracted, together with markers for the downstream
+stages (review queue, graph) that have completed for that chunk. When
+processing fails part-way and the note is retried or redelivered, chunks
+with a checkpoint are not sent to the AI provider again and completed
+stages are not repeated, so processing resumes from the first incomplete
+chunk or stage.
+
+Checkpoints record the hash of the content they were extracted from and
+are ignored if the note has changed since. They are cleared once the note
+has been processed completely. Checkpoint writes are best effort: a failed
+write only means that chunk is redone on a retry.
+"""
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from google.cloud import firestore
+
+from .firestore_client import get_firestore_client
+from ..utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+# Sub-collection of each note document
+CHECKPOINT_SUBCOLLECTION = "processing_checkpoints"
+
+
+@dataclass
+class ChunkCheckpoint:
+    """
+    Checkpoint of one extracted chunk.
+    
+    Attributes:
+        index: Chunk index within the note
+        entities: Extracted entities
+        relationships: Extracted relationships
+        cost: AI cost of the extraction
+        stages: Completed downstream stage name to its result
+    """
+    index: int
+    entities: List[Dict[str, Any]] = field(default_factory=list)
+    relationships: List[Dict[str, Any]] = field(default_factory=list)
+    cost: float = 0.0
+    stages: Dict[str, Any] = field(default_factory=dict)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to dictionary (the chunk dict passed between pipeline stages)."""
+        return {
+            'index': self.index,
+            'entities': self.entities,
+            'relationships': self.relationships,
+            'cost': self.cost,
+            'stages': self.stages
+        }
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'ChunkCheckpoint':
+        """Create from dictionary."""
+        return cls(
+            index=data['index'],
+            entities=data.get('entities', []),
+            relationships=data.get('relationships', []),
+            cost=data.get('cost', 0.0),
+            stages=data.get('stages', {})
+        )
+
+
+def checkpoint_id(index: int) -> str:
+    """Get the checkpoint document ID of a chunk (sorts by index)."""
+    return f"chunk-{index:05d}"
+
+
+class ProcessingCheckpoints:
+    """Per-chunk extraction results and stage markers of notes being processed."""
+    
+    def __init__(self, project_id: str = "aletheia-codex-prod"):
+        """
+        Initialize processing checkpoints.
+        
+        Args:
+            project_id: GCP project ID
+        """
+        self.project_id = project_id
+        self.db = get_firestore_client(project_id)
+        
+        logger.info(f"Initialized ProcessingCheckpoints for project: {project_id}")
+    
+    def _collection(self, note_id: str):
+        """Get a note's checkpoint sub-collection."""
+        return self.db.collection('notes').document(note_id).collection(CHECKPOINT_SUBCOLLECTION)
+    
+    def load(self, note_id: str, content_sha256: str) -> Dict[int, ChunkCheckpoint]:
+        """
+        Load a note's checkpoints for its current content.
+        
+        Args:
+            note_id: Note document ID
+            content_sha256: Hash of the note content being processed
+        
+        Returns:
+            Chunk index to checkpoint (empty if there are none or on error)
+        """
+        checkpoints = {}
+        try:
+            for doc in self._collection(note_id).stream():
+                data = doc.to_dict()
+                if data.get('content_sha256') != content_sha256:
+                    continue
+                checkpoint = ChunkCheckpoint.from_dict(data)
+                checkpoints[checkpoint.index] = checkpoint
+        except Exception as e:
+            logger.warning(f"Failed to load checkpoints for note {note_id}, starting from scratch: {str(e)}")
+            return {}
+        
+        if checkpoints:
+            logger.info(f"Loaded {len(checkpoints)} chunk checkpoints for note {note_id}")
+        return checkpoints
+    
+    def save_chunk(self, note_id: str, content_sha256: str, checkpoint: ChunkCheckpoint):
+        """
+        Save a chunk's extraction results (replacing any earlier checkpoint).
+        
+        Args:
+            note_id: Note document ID
+            content_sha256: Hash of the content the chunk was extracted from
+            checkpoint: Chunk checkpoint
+        """
+        data = checkpoint.to_dict()
+        data.update({
+            'content_sha256': content_sha256,
+            'created_at': firestore.SERVER_TIMESTAMP
+        })
+        try:
+            self._collection(note_id).document(checkpoint_id(checkpoint.index)).set(data)
+        except Exception as e:
+            logger.warning(f"Failed to checkpoint chunk {checkpoint.index} of note {note_id}: {str(e)}")
+    
+    def mark_stage(self, note_id: str, index: int, stage: str, result: Optional[Any] = None):
+        """
+        Mark a downstream stage completed for a chunk.
+        
+        Only the stage's own field is written, so stages running concurrently
+        do not overwrite each other's markers.
+        
+        Args:
+            note_id: Note document ID
+            index: Chunk index
+            stage: Stage name
+            result: Stage result to reuse when resuming
+        """
+        try:
+            self._collection(note_id).document(checkpoint_id(index)).update({
+                f'stages.{stage}': result if result is not None else {}
+            })
+        except Exception as e:
+            logger.warning(f"Failed to mark {stage} done for chunk {index} of note {note_id}: {str(e)}")
+    
+    def clear(self, note_id: str):
+        """
+        Delete a note's checkpoints (after it has been processed completely).
+        
+        Args:
+            note_id: Note document ID
+        """
+        try:
+            batch = self.db.batch()
+            count = 0
+            for doc in self._collection(note_id).stream():
+                batch.delete(doc.reference)
+                count += 1
+                # Firestore batches hold at most 500 writes
+                if count % 500 == 0:
+                    batch.commit()
+                    batch = self.db.batch()
+            if count % 500:
+                batch.commit()
+            logger.info(f"Cleared {count} chunk checkpoints for note {note_id}")
+        except Exception as e:
+            logger.warning(f"Failed to clear checkpoints for note {note_id}: {str(e)}")
+
+
+def create_processing_checkpoints(project_id: str = "aletheia-codex-prod") -> ProcessingCheckpoints:
+    """
+    Factory function to create a ProcessingCheckpoints instance.
+    
+    Args:
+        project_id: GCP project ID
+    
+    Returns:
+        ProcessingCheckpoints instance
+    """
+    return ProcessingCheckpoints(project_id=project_id)
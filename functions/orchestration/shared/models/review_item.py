@@ -0,0 +1,342 @@
+"""
+Review item data model for AletheiaCodex.
+
+Defines the structure for items in the review queue that users can approve or reject.
+"""
+
+import hashlib
+import re
+from dataclasses import dataclass, field
+from typing import Dict, Any, List, Optional, Literal
+from datetime import datetime
+from enum import Enum
+
+
+class ReviewItemType(str, Enum):
+    """Types of items that can be reviewed."""
+    ENTITY = "entity"
+    RELATIONSHIP = "relationship"
+
+
+class ReviewItemStatus(str, Enum):
+    """Status of review items."""
+    PENDING = "pending"
+    APPROVED = "approved"
+    REJECTED = "rejected"
+
+
+# Fields needed by the review list view. Used as the Firestore projection for
+# summary listings so large fields (extracted_text, metadata) are never read.
+REVIEW_ITEM_SUMMARY_FIELDS = [
+    'user_id',
+    'type',
+    'status',
+    'confidence',
+    'source_document_id',
+    'created_at',
+    'entity',
+    'relationship',
+    'occurrence_count'
+]
+
+# Maximum number of source documents recorded on an aggregated review item
+MAX_SOURCE_DOCUMENT_IDS = 50
+
+
+def normalize_review_name(name: str) -> str:
+    """
+    Normalize an entity name for duplicate detection.
+    
+    Case and whitespace differences ("Google", " google ", "GOOGLE") map to
+    the same value.
+    
+    Args:
+        name: Raw entity name
+        
+    Returns:
+        Normalized name
+    """
+    return re.sub(r'\s+', ' ', name).strip().casefold()
+
+
+@dataclass
+class ReviewItem:
+    """
+    Represents an item in the review queue.
+    
+    Attributes:
+        id: Unique identifier for the review item
+        user_id: ID of the user who owns this item
+        type: Type of item (entity or relationship)
+        status: Current status (pending, approved, rejected)
+        confidence: Confidence score (0.0 to 1.0)
+        source_document_id: ID of the source document
+        created_at: Timestamp when item was created
+        reviewed_at: Timestamp when item was reviewed (None if pending)
+        entity: Entity data (if type is entity)
+        relationship: Relationship data (if type is relationship)
+        extracted_text: Context text from document
+        rejection_reason: Reason for rejection (if rejected)
+        metadata: Additional metadata
+        occurrence_count: Number of source documents the item was extracted from
+        source_document_ids: Documents the item was extracted from (first MAX_SOURCE_DOCUMENT_IDS)
+    """
+    user_id: str
+    type: ReviewItemType
+    status: ReviewItemStatus
+    confidence: float
+    source_document_id: str
+    id: Optional[str] = None
+    created_at: Optional[datetime] = None
+    reviewed_at: Optional[datetime] = None
+    entity: Optional[Dict[str, Any]] = None
+    relationship: Optional[Dict[str, Any]] = None
+    extracted_text: Optional[str] = None
+    rejection_reason: Optional[str] = None
+    metadata: Dict[str, Any] = field(default_factory=dict)
+    occurrence_count: int = 1
+    source_document_ids: List[str] = field(default_factory=list)
+    
+    def __post_init__(self):
+        """Validate review item after initialization."""
+        # Validate confidence
+        if not 0.0 <= self.confidence <= 1.0:
+            raise ValueError(f"Confidence must be between 0.0 and 1.0, got {self.confidence}")
+        
+        # Validate user_id
+        if not self.user_id or not self.user_id.strip():
+            raise ValueError("User ID cannot be empty")
+        
+        # Validate source_document_id
+        if not self.source_document_id or not self.source_document_id.strip():
+            raise ValueError("Source document ID cannot be empty")
+        
+        # Validate type-specific data
+        if self.type == ReviewItemType.ENTITY:
+            if not self.entity:
+                raise ValueError("Entity data is required for entity type")
+            if not self.entity.get('name') or not self.entity.get('type'):
+                raise ValueError("Entity must have name and type")
+        elif self.type == ReviewItemType.RELATIONSHIP:
+            if not self.relationship:
+                raise ValueError("Relationship data is required for relationship type")
+            required_fields = ['source_entity', 'target_entity', 'relationship_type']
+            if not all(self.relationship.get(field) for field in required_fields):
+                raise ValueError(f"Relationship must have {', '.join(required_fields)}")
+        
+        # Set created_at if not provided
+        if self.created_at is None:
+            self.created_at = datetime.utcnow()
+        
+        # Normalize fields
+        self.user_id = self.user_id.strip()
+        self.source_document_id = self.source_document_id.strip()
+        
+        if not self.source_document_ids:
+            self.source_document_ids = [self.source_document_id]
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert review item to dictionary representation."""
+        return {
+            'id': self.id,
+            'user_id': self.user_id,
+            'type': self.type.value if isinstance(self.type, ReviewItemType) else self.type,
+            'status': self.status.value if isinstance(self.status, ReviewItemStatus) else self.status,
+            'confidence': self.confidence,
+            'source_document_id': self.source_document_id,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'reviewed_at': self.reviewed_at.isoformat() if self.reviewed_at else None,
+            'entity': self.entity,
+            'relationship': self.relationship,
+            'extracted_text': self.extracted_text,
+            'rejection_reason': self.rejection_reason,
+            'metadata': self.metadata,
+            'occurrence_count': self.occurrence_count,
+            'source_document_ids': self.source_document_ids
+        }
+    
+    def to_summary_dict(self) -> Dict[str, Any]:
+        """Convert review item to the lightweight representation used by list views."""
+        data = self.to_dict()
+        return {key: data[key] for key in ['id'] + REVIEW_ITEM_SUMMARY_FIELDS}
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'ReviewItem':
+        """Create review item from dictionary representation."""
+        # Handle datetime conversion
+        created_at = data.get('created_at')
+        if isinstance(created_at, str):
+            created_at = datetime.fromisoformat(created_at)
+        
+        reviewed_at = data.get('reviewed_at')
+        if isinstance(reviewed_at, str):
+            reviewed_at = datetime.fromisoformat(reviewed_at)
+        
+        # Handle enum conversion
+        item_type = data['type']
+        if isinstance(item_type, str):
+            item_type = ReviewItemType(item_type)
+        
+        status = data['status']
+        if isinstance(status, str):
+            status = ReviewItemStatus(status)
+        
+        return cls(
+            id=data.get('id'),
+            user_id=data['user_id'],
+            type=item_type,
+            status=status,
+            confidence=data['confidence'],
+            source_document_id=data['source_document_id'],
+            created_at=created_at,
+            reviewed_at=reviewed_at,
+            entity=data.get('entity'),
+            relationship=data.get('relationship'),
+            extracted_text=data.get('extracted_text'),
+            rejection_reason=data.get('rejection_reason'),
+            metadata=data.get('metadata', {}),
+            occurrence_count=data.get('occurrence_count', 1),
+            source_document_ids=data.get('source_document_ids', [])
+        )
+    
+    def get_canonical_key(self) -> str:
+        """
+        Get the key shared by all extractions of the same entity or relationship.
+        
+        Entities are keyed by (user, normalized name, type) and relationships
+        by (user, normalized source, type, normalized target).
+        """
+        if self.type == ReviewItemType.ENTITY:
+            parts = [
+                'entity',
+                self.user_id,
+                normalize_review_name(self.entity['name']),
+                self.entity['type'].strip().casefold()
+            ]
+        else:
+            parts = [
+                'relationship',
+                self.user_id,
+                normalize_review_name(self.relationship['source_entity']),
+                self.relationship['relationship_type'].strip().upper(),
+                normalize_review_name(self.relationship['target_entity'])
+            ]
+        return '\x1f'.join(parts)
+    
+    def get_canonical_id(self) -> str:
+        """Get a deterministic document ID for the item's canonical key."""
+        return hashlib.sha256(self.get_canonical_key().encode('utf-8')).hexdigest()[:40]
+    
+    def merge_occurrence(self, other: 'ReviewItem'):
+        """
+        Merge another extraction of the same entity/relationship into this item.
+        
+        Keeps the highest confidence and records the other item's source
+        documents. Only documents not already recorded add to the occurrence
+        count, so re-extracting a note (retries, re-runs, backfills) does not
+        inflate it. Once MAX_SOURCE_DOCUMENT_IDS documents are recorded, later
+        documents are counted without being recorded.
+        
+        Args:
+            other: Review item with the same canonical key
+        """
+        self.confidence = max(self.confidence, other.confidence)
+        for doc_id in dict.fromkeys(other.source_document_ids):
+            if doc_id in self.source_document_ids:
+                continue
+            self.occurrence_count += 1
+            if len(self.source_document_ids) < MAX_SOURCE_DOCUMENT_IDS:
+                self.source_document_ids.append(doc_id)
+        if not self.extracted_text:
+            self.extracted_text = other.extracted_text
+    
+    def is_pending(self) -> bool:
+        """Check if item is pending review."""
+        return self.status == ReviewItemStatus.PENDING
+    
+    def is_approved(self) -> bool:
+        """Check if item is approved."""
+        return self.status == ReviewItemStatus.APPROVED
+    
+    def is_rejected(self) -> bool:
+        """Check if item is rejected."""
+        return self.status == ReviewItemStatus.REJECTED
+    
+    def get_display_name(self) -> str:
+        """Get display name for the item."""
+        if self.type == ReviewItemType.ENTITY:
+            return self.entity.get('name', 'Unknown Entity')
+        elif self.type == ReviewItemType.RELATIONSHIP:
+            source = self.relationship.get('source_entity', 'Unknown')
+            target = self.relationship.get('target_entity', 'Unknown')
+            rel_type = self.relationship.get('relationship_type', 'RELATED_TO')
+            return f"{source} → {rel_type} → {target}"
+        return "Unknown Item"
+    
+    def get_confidence_level(self) -> Literal['high', 'medium', 'low']:
+        """Get confidence level category."""
+        if self.confidence >= 0.8:
+            return 'high'
+        elif self.confidence >= 0.5:
+            return 'medium'
+        else:
+            return 'low'
+
+
+@dataclass
+class UserStats:
+    """
+    User review statistics.
+    
+    Attributes:
+        user_id: User ID
+        total_pending: Number of pending items
+        total_approved: Number of approved items
+        total_rejected: Number of rejected items
+        last_review_at: Timestamp of last review
+        average_confidence: Average confidence of reviewed items
+    """
+    user_id: str
+    total_pending: int = 0
+    total_approved: int = 0
+    total_rejected: int = 0
+    last_review_at: Optional[datetime] = None
+    average_confidence: float = 0.0
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert user stats to dictionary representation."""
+        return {
+            'user_id': self.user_id,
+            'total_pending': self.total_pending,
+            'total_approved': self.total_approved,
+            'total_rejected': self.total_rejected,
+            'last_review_at': self.last_review_at.isoformat() if self.last_review_at else None,
+            'average_confidence': self.average_confidence
+        }
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'UserStats':
+        """Create user stats from dictionary representation."""
+        last_review_at = data.get('last_review_at')
+        if isinstance(last_review_at, str):
+            last_review_at = datetime.fromisoformat(last_review_at)
+        
+        return cls(
+            user_id=data['user_id'],
+            total_pending=data.get('total_pending', 0),
+            total_approved=data.get('total_approved', 0),
+            total_rejected=data.get('total_rejected', 0),
+            last_review_at=last_review_at,
+            average_confidence=data.get('average_confidence', 0.0)
+        )
+    
+    def get_total_reviewed(self) -> int:
+        """Get total number of reviewed items."""
+        return self.total_approved + self.total_rejected
+    
+    def get_approval_rate(self) -> float:
+        """Get approval rate (0.0 to 1.0)."""
+        total_reviewed = self.get_total_reviewed()
+        if total_reviewed == 0:
+            return 0.0
+        return self.total_approved / total_reviewed
\ No newline at end of file
@@ -7,21 +7,105 @@ ENHANCEMENTS:
 - Performance metrics
 - Multiple log levels
 - Trace context support
+- Non-blocking mode for hot paths
+
+Non-blocking mode (LOG_ASYNC=true) hands records to a QueueHandler; a
+QueueListener thread formats and writes them, so JSON encoding and stdout
+writes are off the request thread. Call flush_logs() before an invocation
+returns if its last records must not wait for the next one.
+
+Environment configuration:
+- LOG_ASYNC: "true" for non-blocking mode
+- LOG_LEVELS: per-logger levels, e.g. "orchestration=WARNING,shared.db=DEBUG"
+  (a logger takes the level of its longest matching prefix)
+- LOG_SAMPLE_LIMIT: INFO/DEBUG records kept per call site per window
+  (0 disables sampling); warnings and errors are never sampled
+- LOG_SAMPLE_WINDOW_SECONDS: sampling window (default 1)
+
+Records are encoded with orjson when it is installed.
+
+The request context is a context variable, so concurrent requests on
+different threads (or asyncio tasks) each log their own context.
 """
 
+import atexit
+import contextvars
 import logging
+import logging.handlers
+import os
+import queue
 import sys
 import json
+import threading
 import time
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Tuple
 from datetime import datetime
 import traceback
 
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
 # Global logger cache
 _loggers: Dict[str, logging.Logger] = {}
+_loggers_lock = threading.Lock()
+
+# Request context (for correlation), per thread / asyncio task; replaced,
+# never mutated, so records can hold a reference to it instead of a copy
+_request_context: contextvars.ContextVar[Dict[str, Any]] = contextvars.ContextVar("request_context", default={})
+
+# Non-blocking mode
+LOG_ASYNC = os.environ.get('LOG_ASYNC', '').lower() in ('1', 'true', 'yes')
 
-# Request context (for correlation)
-_request_context: Dict[str, Any] = {}
+# Sampling of repetitive INFO/DEBUG records (per call site)
+LOG_SAMPLE_LIMIT = int(os.environ.get('LOG_SAMPLE_LIMIT', '0'))
+LOG_SAMPLE_WINDOW_SECONDS = float(os.environ.get('LOG_SAMPLE_WINDOW_SECONDS', '1'))
+
+# Queue handlers and listeners of non-blocking mode, by output format
+_queue_handlers: Dict[bool, logging.Handler] = {}
+_queue_listeners: Dict[bool, logging.handlers.QueueListener] = {}
+_queue_lock = threading.Lock()
+
+
+def parse_log_levels(spec: Optional[str]) -> Dict[str, int]:
+    """
+    Parse a per-logger level spec ("name=LEVEL,name=LEVEL").
+    
+    Args:
+        spec: Level spec (invalid entries are ignored)
+    
+    Returns:
+        Logger name prefix to level
+    """
+    levels = {}
+    for entry in (spec or '').split(','):
+        name, _, level = entry.partition('=')
+        level = logging.getLevelName(level.strip().upper())
+        if name.strip() and isinstance(level, int):
+            levels[name.strip()] = level
+    return levels
+
+
+# Per-logger levels (LOG_LEVELS)
+_log_levels: Dict[str, int] = parse_log_levels(os.environ.get('LOG_LEVELS'))
+
+
+def configured_level(name: str, default: int) -> int:
+    """Get the configured level of a logger (longest matching prefix wins)."""
+    match = None
+    for prefix in _log_levels:
+        if name == prefix or name.startswith(prefix + '.'):
+            if match is None or len(prefix) > len(match):
+                match = prefix
+    return _log_levels[match] if match is not None else default
+
+
+def _dumps(entry: Dict[str, Any]) -> str:
+    """Encode a log entry as JSON (orjson when available)."""
+    if orjson is not None:
+        return orjson.dumps(entry, default=str).decode('utf-8')
+    return json.dumps(entry)
 
 
 class CloudLoggingFormatter(logging.Formatter):
@@ -44,9 +128,13 @@ class CloudLoggingFormatter(logging.Formatter):
             "line": record.lineno,
         }
         
-        # Add request context if available
-        if _request_context:
-            log_entry["request_context"] = _request_context.copy()
+        # Add request context if available (captured when the record was
+        # queued in non-blocking mode)
+        request_context = getattr(record, 'request_context', None)
+        if request_context is None:
+            request_context = _request_context.get()
+        if request_context:
+            log_entry["request_context"] = request_context
         
         # Add exception info if present
         if record.exc_info:
@@ -56,11 +144,96 @@ class CloudLoggingFormatter(logging.Formatter):
                 "traceback": traceback.format_exception(*record.exc_info)
             }
         
+        # Similar records dropped by sampling since the last one kept
+        if getattr(record, 'sampled_out', 0):
+            log_entry["sampled_out"] = record.sampled_out
+        
         # Add extra fields
         if hasattr(record, 'extra_fields'):
             log_entry.update(record.extra_fields)
         
-        return json.dumps(log_entry)
+        return _dumps(log_entry)
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Rate-limits repetitive INFO/DEBUG records per call site.
+    
+    At most `limit` records from the same source line are kept per window;
+    the next record kept after a window with drops carries the number of
+    dropped records as sampled_out. Warnings and errors always pass.
+    """
+    
+    def __init__(self, limit: int, window_seconds: float = 1.0):
+        super().__init__()
+        self.limit = limit
+        self.window_seconds = window_seconds
+        self._sites: Dict[Tuple[str, int], list] = {}
+        self._lock = threading.Lock()
+    
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        
+        now = time.monotonic()
+        key = (record.pathname, record.lineno)
+        with self._lock:
+            site = self._sites.get(key)
+            if site is None or now - site[0] >= self.window_seconds:
+                dropped = site[2] if site else 0
+                site = self._sites[key] = [now, 0, dropped]
+            if site[1] >= self.limit:
+                site[2] += 1
+                return False
+            site[1] += 1
+            if site[2]:
+                record.sampled_out = site[2]
+                site[2] = 0
+        return True
+
+
+class ContextQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that captures the request context on the calling thread."""
+    
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Merge args now; formatting (and exception rendering) happens on
+        # the listener thread
+        record.msg = record.getMessage()
+        record.args = None
+        record.request_context = _request_context.get()
+        return record
+
+
+def _get_queue_handler(use_cloud_format: bool, formatter: logging.Formatter) -> logging.Handler:
+    """Get the shared queue handler (starting its listener) for an output format."""
+    with _queue_lock:
+        handler = _queue_handlers.get(use_cloud_format)
+        if handler is None:
+            log_queue = queue.Queue()
+            stream_handler = logging.StreamHandler(sys.stdout)
+            stream_handler.setFormatter(formatter)
+            listener = logging.handlers.QueueListener(log_queue, stream_handler)
+            listener.start()
+            
+            handler = ContextQueueHandler(log_queue)
+            _queue_handlers[use_cloud_format] = handler
+            _queue_listeners[use_cloud_format] = listener
+        return handler
+
+
+def flush_logs():
+    """Wait until queued records have been written (non-blocking mode)."""
+    for listener in list(_queue_listeners.values()):
+        listener.queue.join()
+
+
+def _stop_listeners():
+    """Write remaining records and stop the listeners at exit."""
+    for listener in list(_queue_listeners.values()):
+        listener.stop()
+
+
+atexit.register(_stop_listeners)
 
 
 class PerformanceLogger:
@@ -99,17 +272,20 @@ def set_request_context(request_id: Optional[str] = None, **kwargs):
         request_id: Unique request identifier
         **kwargs: Additional context fields
     """
-    global _request_context
-    _request_context = {
+    _request_context.set({
         "request_id": request_id or generate_request_id(),
         **kwargs
-    }
+    })
+
+
+def get_request_context() -> Dict[str, Any]:
+    """Get the request context of the current thread or task."""
+    return _request_context.get()
 
 
 def clear_request_context():
     """Clear the request context."""
-    global _request_context
-    _request_context = {}
+    _request_context.set({})
 
 
 def generate_request_id() -> str:
@@ -126,11 +302,15 @@ def get_logger(
     """
     Get or create a configured logger.
     
+    The level is overridden by LOG_LEVELS for matching logger names. In
+    non-blocking mode (LOG_ASYNC) records go through a shared queue to a
+    background writer.
+    
     Args:
         name: Logger name
         level: Logging level (default: INFO)
         use_cloud_format: Use Cloud Logging JSON format (default: True)
-        
+    
     Returns:
         Configured logger instance
     """
@@ -138,17 +318,22 @@ def get_logger(
     if name in _loggers:
         return _loggers[name]
     
+    with _loggers_lock:
+        if name in _loggers:
+            return _loggers[name]
+        return _create_logger(name, level, use_cloud_format)
+
+
+def _create_logger(name: str, level: int, use_cloud_format: bool) -> logging.Logger:
+    """Create, configure and cache a logger (called under _loggers_lock)."""
     # Create new logger
+    level = configured_level(name, level)
     logger = logging.getLogger(name)
     logger.setLevel(level)
     
     # Remove existing handlers to avoid duplicates
     logger.handlers = []
     
-    # Console handler
-    handler = logging.StreamHandler(sys.stdout)
-    handler.setLevel(level)
-    
     # Set formatter based on environment
     if use_cloud_format:
         formatter = CloudLoggingFormatter()
@@ -157,7 +342,19 @@ def get_logger(
             '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
         )
     
-    handler.setFormatter(formatter)
+    if LOG_ASYNC:
+        # Shared queue to the background writer (level is set on the logger)
+        handler = _get_queue_handler(use_cloud_format, formatter)
+    else:
+        # Console handler
+        handler = logging.StreamHandler(sys.stdout)
+        handler.setLevel(level)
+        handler.setFormatter(formatter)
+    
+    # Sampling runs before the record is queued or written
+    if LOG_SAMPLE_LIMIT > 0:
+        logger.addFilter(SamplingFilter(LOG_SAMPLE_LIMIT, LOG_SAMPLE_WINDOW_SECONDS))
+    
     logger.addHandler(handler)
     
     # Prevent propagation to root logger
@@ -0,0 +1,504 @@
+"""
+In-process metrics: counters, gauges and fixed-bucket histograms.
+
+Metrics live in a process-wide registry and are updated in memory (a lock
+and a dict update per call), so instrumenting hot paths is cheap. Each
+metric keeps one value per label set. A background thread flushes the
+registry periodically to the configured exporter; the registry can also be
+rendered in the Prometheus text format for local runs.
+
+Counters and histograms are cumulative since the process started, which is
+what both Cloud Monitoring CUMULATIVE metrics and Prometheus expect.
+
+Configuration (environment):
+    METRICS_EXPORTER: "log" (one structured log line per flush),
+        "cloud_monitoring" (custom.googleapis.com metrics) or "prometheus"
+        (text dump to METRICS_FILE); unset keeps metrics in memory only
+    METRICS_FLUSH_INTERVAL_SECONDS: Seconds between flushes (default 60)
+    METRICS_FILE: Prometheus dump path (default /tmp/metrics.prom)
+    FUNCTION_REGION: Location of the generic_task resource (default
+        us-central1)
+
+Cloud Monitoring series are written against a generic_task resource whose
+task_id is unique to the process (K_REVISION plus a random suffix), so each
+instance writes its own CUMULATIVE series; aggregate across task_id when
+charting.
+
+Usage:
+    NEO4J_QUERIES = counter("neo4j_queries_total", "Neo4j HTTP statements")
+    NEO4J_QUERY_SECONDS = histogram("neo4j_query_seconds", "Neo4j statement latency")
+    
+    NEO4J_QUERIES.inc(status="ok")
+    with NEO4J_QUERY_SECONDS.time():
+        ...
+"""
+
+import atexit
+import bisect
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+from .lazy_import import lazy_import
+from .logging import get_logger
+
+monitoring_v3 = lazy_import("google.cloud.monitoring_v3")
+
+logger = get_logger(__name__)
+
+METRICS_EXPORTER = os.environ.get("METRICS_EXPORTER", "").lower()
+METRICS_FLUSH_INTERVAL_SECONDS = float(os.environ.get("METRICS_FLUSH_INTERVAL_SECONDS", "60"))
+METRICS_FILE = os.environ.get("METRICS_FILE", "/tmp/metrics.prom")
+PROJECT_ID = os.environ.get("GCP_PROJECT", "aletheia-codex-prod")
+METRICS_LOCATION = os.environ.get("FUNCTION_REGION", "us-central1")
+
+EXPORTER_LOG = "log"
+EXPORTER_CLOUD_MONITORING = "cloud_monitoring"
+EXPORTER_PROMETHEUS = "prometheus"
+
+CUSTOM_METRIC_PREFIX = "custom.googleapis.com/aletheia_codex/"
+
+# generic_task resource: one task per process of a service
+METRICS_NAMESPACE = "aletheia-codex"
+METRICS_JOB = os.environ.get("K_SERVICE", "aletheia-codex")
+
+# Time series per Cloud Monitoring write request (API limit)
+MAX_TIME_SERIES_PER_REQUEST = 200
+
+# Latency buckets in seconds
+DEFAULT_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# Size buckets (items per batch, rows per query)
+DEFAULT_SIZE_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000)
+
+COUNTER = "counter"
+GAUGE = "gauge"
+HISTOGRAM = "histogram"
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def _label_key(labels: Dict[str, object]) -> LabelKey:
+    """Hashable, order-independent key for a label set."""
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+class Metric:
+    """Base class for metrics; holds one value per label set."""
+    
+    kind = ""
+    
+    def __init__(self, name: str, description: str = ""):
+        self.name = name
+        self.description = description
+        self._values: Dict[LabelKey, object] = {}
+        self._lock = threading.Lock()
+    
+    def snapshot(self) -> Dict[LabelKey, object]:
+        """Copy of the current values by label set."""
+        with self._lock:
+            return {key: self._copy(value) for key, value in self._values.items()}
+    
+    def _copy(self, value):
+        return value
+
+
+class Counter(Metric):
+    """Monotonically increasing count."""
+    
+    kind = COUNTER
+    
+    def inc(self, amount: float = 1, **labels):
+        """
+        Increase the count.
+        
+        Args:
+            amount: Non-negative increment
+            **labels: Label values
+        """
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+    
+    def value(self, **labels) -> float:
+        """Current count for a label set."""
+        with self._lock:
+            return self._values.get(_label_key(labels), 0)
+
+
+class Gauge(Metric):
+    """Value that can go up and down."""
+    
+    kind = GAUGE
+    
+    def set(self, value: float, **labels):
+        """Set the value."""
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key] = value
+    
+    def inc(self, amount: float = 1, **labels):
+        """Add to the value (negative amounts decrease it)."""
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+    
+    def value(self, **labels) -> float:
+        """Current value for a label set."""
+        with self._lock:
+            return self._values.get(_label_key(labels), 0)
+
+
+class HistogramValue:
+    """Bucket counts, count and sum of one histogram label set."""
+    
+    __slots__ = ('bucket_counts', 'count', 'sum')
+    
+    def __init__(self, buckets: int):
+        # One count per upper bound plus the +Inf overflow bucket
+        self.bucket_counts = [0] * (buckets + 1)
+        self.count = 0
+        self.sum = 0.0
+
+
+class Histogram(Metric):
+    """Distribution of observations over fixed buckets."""
+    
+    kind = HISTOGRAM
+    
+    def __init__(self, name: str, description: str = "", buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS):
+        super().__init__(name, description)
+        self.buckets = tuple(sorted(buckets))
+    
+    def observe(self, value: float, **labels):
+        """
+        Record an observation.
+        
+        Args:
+            value: Observed value
+            **labels: Label values
+        """
+        key = _label_key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = HistogramValue(len(self.buckets))
+            entry.bucket_counts[index] += 1
+            entry.count += 1
+            entry.sum += value
+    
+    @contextmanager
+    def time(self, **labels) -> Iterator[None]:
+        """Observe the duration of a block in seconds."""
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self.observe(time.monotonic() - started, **labels)
+    
+    def percentile(self, q: float, **labels) -> Optional[float]:
+        """
+        Estimate a percentile by interpolating within its bucket.
+        
+        Args:
+            q: Percentile as a fraction (e.g. 0.95)
+            **labels: Label values
+        
+        Returns:
+            Estimated value (None without observations); observations above
+            the last bucket are reported as the last bound
+        """
+        with self._lock:
+            entry = self._values.get(_label_key(labels))
+            entry = self._copy(entry) if entry is not None else None
+        return self.estimate_percentile(entry, q)
+    
+    def estimate_percentile(self, entry: Optional[HistogramValue], q: float) -> Optional[float]:
+        """Estimate a percentile of one label set's values (see percentile())."""
+        if entry is None or not entry.count:
+            return None
+        
+        rank = q * entry.count
+        seen = 0
+        for index, bucket_count in enumerate(entry.bucket_counts):
+            if bucket_count and seen + bucket_count >= rank:
+                if index == len(self.buckets):
+                    return self.buckets[-1]
+                lower = self.buckets[index - 1] if index else 0.0
+                upper = self.buckets[index]
+                return lower + (upper - lower) * (rank - seen) / bucket_count
+            seen += bucket_count
+        return self.buckets[-1]
+    
+    def _copy(self, value: HistogramValue) -> HistogramValue:
+        copy = HistogramValue(len(self.buckets))
+        copy.bucket_counts = list(value.bucket_counts)
+        copy.count = value.count
+        copy.sum = value.sum
+        return copy
+
+
+class MetricsRegistry:
+    """Named metrics of one process."""
+    
+    def __init__(self):
+        self.started_at = time.time()
+        # Identifies this process's series among all instances
+        self.task_id = f"{os.environ.get('K_REVISION', 'local')}-{uuid.uuid4().hex[:12]}"
+        self._metrics: Dict[str, Metric] = {}
+        self._lock = threading.Lock()
+    
+    def _register(self, metric_class, name: str, description: str, **kwargs) -> Metric:
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = metric_class(name, description, **kwargs)
+            elif not isinstance(metric, metric_class):
+                raise ValueError(f"Metric {name} is already registered as a {metric.kind}")
+            return metric
+    
+    def counter(self, name: str, description: str = "") -> Counter:
+        """Get or create a counter."""
+        return self._register(Counter, name, description)
+    
+    def gauge(self, name: str, description: str = "") -> Gauge:
+        """Get or create a gauge."""
+        return self._register(Gauge, name, description)
+    
+    def histogram(
+        self,
+        name: str,
+        description: str = "",
+        buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS
+    ) -> Histogram:
+        """Get or create a histogram (buckets are fixed at creation)."""
+        return self._register(Histogram, name, description, buckets=buckets)
+    
+    def metrics(self) -> List[Metric]:
+        """Registered metrics, by name."""
+        with self._lock:
+            return [self._metrics[name] for name in sorted(self._metrics)]
+    
+    def to_log_fields(self) -> Dict[str, object]:
+        """
+        Flatten the registry for a structured log line.
+        
+        Histograms are summarized as count, sum, p50, p95 and p99.
+        """
+        fields = {}
+        for metric in self.metrics():
+            for key, value in metric.snapshot().items():
+                name = metric.name
+                if key:
+                    name += "{" + ",".join(f"{label}={label_value}" for label, label_value in key) + "}"
+                if metric.kind == HISTOGRAM:
+                    fields[name] = {
+                        'count': value.count,
+                        'sum': round(value.sum, 6),
+                        'p50': metric.estimate_percentile(value, 0.50),
+                        'p95': metric.estimate_percentile(value, 0.95),
+                        'p99': metric.estimate_percentile(value, 0.99)
+                    }
+                else:
+                    fields[name] = value
+        return fields
+    
+    def to_prometheus(self) -> str:
+        """Render the registry in the Prometheus text exposition format."""
+        lines = []
+        for metric in self.metrics():
+            if metric.description:
+                lines.append(f"# HELP {metric.name} {metric.description}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for key, value in sorted(metric.snapshot().items()):
+                if metric.kind != HISTOGRAM:
+                    lines.append(f"{metric.name}{_prometheus_labels(key)} {_prometheus_number(value)}")
+                    continue
+                
+                cumulative = 0
+                bounds = [_prometheus_number(bound) for bound in metric.buckets] + ["+Inf"]
+                for bound, bucket_count in zip(bounds, value.bucket_counts):
+                    cumulative += bucket_count
+                    lines.append(f"{metric.name}_bucket{_prometheus_labels(key + (('le', bound),))} {cumulative}")
+                lines.append(f"{metric.name}_sum{_prometheus_labels(key)} {_prometheus_number(value.sum)}")
+                lines.append(f"{metric.name}_count{_prometheus_labels(key)} {value.count}")
+        return "\n".join(lines) + "\n"
+    
+    def to_time_series(self, project_id: str = PROJECT_ID) -> list:
+        """
+        Convert the registry to Cloud Monitoring time series.
+        
+        Counters and histograms are CUMULATIVE since the registry started;
+        gauges are GAUGE points. Every series is written against this
+        registry's own generic_task resource, so instances never write
+        points to the same series.
+        """
+        now = time.time()
+        end_time = {'seconds': int(now), 'nanos': int((now % 1) * 1e9)}
+        start_time = {'seconds': int(self.started_at), 'nanos': int((self.started_at % 1) * 1e9)}
+        resource = {'type': 'generic_task', 'labels': {
+            'project_id': project_id,
+            'location': METRICS_LOCATION,
+            'namespace': METRICS_NAMESPACE,
+            'job': METRICS_JOB,
+            'task_id': self.task_id
+        }}
+        
+        series = []
+        for metric in self.metrics():
+            for key, value in metric.snapshot().items():
+                if metric.kind == HISTOGRAM:
+                    point_value = {'distribution_value': {
+                        'count': value.count,
+                        'mean': value.sum / value.count if value.count else 0.0,
+                        'bucket_options': {'explicit_buckets': {'bounds': list(metric.buckets)}},
+                        # Bucket 0 is the underflow bucket below the first bound and
+                        # the last one the overflow bucket, as in bucket_counts
+                        'bucket_counts': list(value.bucket_counts)
+                    }}
+                else:
+                    point_value = {'double_value': float(value)}
+                
+                interval = {'end_time': end_time}
+                if metric.kind != GAUGE:
+                    interval['start_time'] = start_time
+                
+                series.append(monitoring_v3.TimeSeries({
+                    'metric': {'type': CUSTOM_METRIC_PREFIX + metric.name, 'labels': dict(key)},
+                    'resource': resource,
+                    'metric_kind': 'GAUGE' if metric.kind == GAUGE else 'CUMULATIVE',
+                    'points': [{'interval': interval, 'value': point_value}]
+                }))
+        return series
+
+
+def _prometheus_labels(key: LabelKey) -> str:
+    """Render a label set as {name="value",...}."""
+    if not key:
+        return ""
+    escaped = (
+        (label, value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+        for label, value in key
+    )
+    return "{" + ",".join(f'{label}="{value}"' for label, value in escaped) + "}"
+
+
+def _prometheus_number(value: float) -> str:
+    """Render a number without a trailing .0 for integers."""
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+_registry = MetricsRegistry()
+_monitoring_client = None
+_flush_thread: Optional[threading.Thread] = None
+_flush_lock = threading.Lock()
+_flush_thread_lock = threading.Lock()
+_stop_flush = threading.Event()
+
+
+def get_registry() -> MetricsRegistry:
+    """Get the process-wide registry."""
+    return _registry
+
+
+def counter(name: str, description: str = "") -> Counter:
+    """Get or create a counter in the process-wide registry."""
+    return _registry.counter(name, description)
+
+
+def gauge(name: str, description: str = "") -> Gauge:
+    """Get or create a gauge in the process-wide registry."""
+    return _registry.gauge(name, description)
+
+
+def histogram(name: str, description: str = "", buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS) -> Histogram:
+    """Get or create a histogram in the process-wide registry."""
+    return _registry.histogram(name, description, buckets)
+
+
+def write_prometheus(path: str = METRICS_FILE):
+    """Write the registry in Prometheus text format (atomically replaced)."""
+    temp_path = f"{path}.tmp"
+    with open(temp_path, 'w') as f:
+        f.write(_registry.to_prometheus())
+    os.replace(temp_path, path)
+
+
+def _write_cloud_monitoring():
+    """Write the registry as Cloud Monitoring custom metrics."""
+    global _monitoring_client
+    if _monitoring_client is None:
+        _monitoring_client = monitoring_v3.MetricServiceClient()
+    
+    series = _registry.to_time_series()
+    for start in range(0, len(series), MAX_TIME_SERIES_PER_REQUEST):
+        _monitoring_client.create_time_series(
+            name=f"projects/{PROJECT_ID}",
+            time_series=series[start:start + MAX_TIME_SERIES_PER_REQUEST]
+        )
+
+
+def flush_metrics(exporter: str = METRICS_EXPORTER):
+    """
+    Export the registry; export failures are logged, never raised.
+    
+    Args:
+        exporter: EXPORTER_LOG, EXPORTER_CLOUD_MONITORING or
+            EXPORTER_PROMETHEUS (anything else does nothing)
+    """
+    with _flush_lock:
+        try:
+            if exporter == EXPORTER_LOG:
+                logger.info("Metrics", extra={'extra_fields': {'metrics': _registry.to_log_fields()}})
+            elif exporter == EXPORTER_CLOUD_MONITORING:
+                _write_cloud_monitoring()
+            elif exporter == EXPORTER_PROMETHEUS:
+                write_prometheus()
+        except Exception as e:
+            logger.warning(f"Failed to flush metrics to {exporter}: {type(e).__name__}: {str(e)}")
+
+
+def _flush_periodically(interval: float):
+    while not _stop_flush.wait(interval):
+        flush_metrics()
+
+
+def start_metrics_flush(interval: float = METRICS_FLUSH_INTERVAL_SECONDS) -> bool:
+    """
+    Start the background flush thread (once per process).
+    
+    Does nothing unless METRICS_EXPORTER is set. The registry is also
+    flushed at interpreter exit.
+    
+    Args:
+        interval: Seconds between flushes
+    
+    Returns:
+        Whether the flush thread is running
+    """
+    global _flush_thread
+    if not METRICS_EXPORTER:
+        return False
+    
+    with _flush_thread_lock:
+        if _flush_thread is None:
+            _flush_thread = threading.Thread(
+                target=_flush_periodically,
+                args=(interval,),
+                name="metrics-flush",
+                daemon=True
+            )
+            _flush_thread.start()
+            atexit.register(_stop_metrics_flush)
+    return True
+
+
+def _stop_metrics_flush():
+    _stop_flush.set()
+    flush_metrics()
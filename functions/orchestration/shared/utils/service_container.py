@@ -0,0 +1,226 @@
+"""
+Process-wide service container for AletheiaCodex functions.
+
+Cloud Functions reuse an instance across invocations while it is warm, so
+clients that are expensive to build (the AI provider, which fetches its API
+key from Secret Manager and configures the SDK, the cost monitor, the
+Firestore client and the graph client) are created once per instance on
+first use and shared by every invocation and thread.
+
+Asyncio event loops are the exception: a loop is bound to the thread that
+runs it, so the container keeps one loop per worker thread and reuses it.
+
+Services built from secrets can be refreshed when a secret is rotated,
+either explicitly with refresh()/refresh_secrets() or automatically after
+their max age.
+"""
+
+import asyncio
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from .logging import get_logger
+
+logger = get_logger(__name__)
+
+# Service names
+SERVICE_AI = "ai_service"
+SERVICE_COST_MONITOR = "cost_monitor"
+SERVICE_FIRESTORE = "firestore"
+SERVICE_GRAPH_POPULATOR = "graph_populator"
+SERVICE_NEO4J = "neo4j"
+
+# Services whose instances embed secret values
+SECRET_SERVICES = (SERVICE_AI, SERVICE_NEO4J)
+
+# Default max age of secret-backed services, so rotations are picked up
+SECRET_SERVICE_MAX_AGE_SECONDS = 3600
+
+_container: Optional['ServiceContainer'] = None
+_container_lock = threading.Lock()
+
+
+class ServiceContainer:
+    """
+    Lazily built, shared service instances.
+    
+    Services are registered as factories and built on first get(). Building
+    is serialized per container, so concurrent first requests build a
+    service only once.
+    """
+    
+    def __init__(self, project_id: str = "aletheia-codex-prod"):
+        """
+        Initialize service container with the default services.
+        
+        Args:
+            project_id: GCP project ID
+        """
+        self.project_id = project_id
+        self._factories: Dict[str, Tuple[Callable[[], Any], Optional[float]]] = {}
+        self._instances: Dict[str, Tuple[Any, float]] = {}
+        self._lock = threading.RLock()
+        self._local = threading.local()
+        
+        self._register_defaults()
+    
+    def register(self, name: str, factory: Callable[[], Any], max_age_seconds: Optional[float] = None):
+        """
+        Register (or replace) a service factory.
+        
+        Args:
+            name: Service name
+            factory: Callable that builds the service
+            max_age_seconds: Rebuild the service after this long (never if None)
+        """
+        with self._lock:
+            self._factories[name] = (factory, max_age_seconds)
+            self._instances.pop(name, None)
+    
+    def get(self, name: str) -> Any:
+        """
+        Get a service, building it on first use.
+        
+        Args:
+            name: Service name
+        
+        Returns:
+            Service instance
+        
+        Raises:
+            KeyError: If no factory is registered for the name
+        """
+        entry = self._instances.get(name)
+        if entry is not None and not self._expired(name, entry):
+            return entry[0]
+        
+        with self._lock:
+            entry = self._instances.get(name)
+            if entry is not None and not self._expired(name, entry):
+                return entry[0]
+            
+            factory, _ = self._factories[name]
+            started = time.monotonic()
+            instance = factory()
+            self._instances[name] = (instance, time.monotonic())
+            logger.info(f"Created service {name} in {time.monotonic() - started:.2f}s")
+            return instance
+    
+    def refresh(self, *names: str):
+        """
+        Drop services so they are rebuilt on next use.
+        
+        Args:
+            *names: Services to drop (all if none given)
+        """
+        with self._lock:
+            for name in names or list(self._instances):
+                self._instances.pop(name, None)
+        logger.info(f"Refreshed services: {', '.join(names) if names else 'all'}")
+    
+    def refresh_secrets(self):
+        """Secret rotation hook: clear cached secrets and rebuild secret-backed services."""
+        from ..db.neo4j_client import clear_secret_cache
+        
+        clear_secret_cache()
+        self.refresh(*SECRET_SERVICES)
+    
+    def event_loop(self) -> asyncio.AbstractEventLoop:
+        """Get the calling thread's event loop, creating it on first use."""
+        loop = getattr(self._local, 'loop', None)
+        if loop is None or loop.is_closed():
+            loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(loop)
+            self._local.loop = loop
+        return loop
+    
+    def run(self, coroutine: Awaitable) -> Any:
+        """
+        Run a coroutine to completion on the calling thread's event loop.
+        
+        Args:
+            coroutine: Coroutine to run
+        
+        Returns:
+            Coroutine result
+        """
+        return self.event_loop().run_until_complete(coroutine)
+    
+    @property
+    def ai_service(self):
+        """Shared AI service."""
+        return self.get(SERVICE_AI)
+    
+    @property
+    def cost_monitor(self):
+        """Shared cost monitor."""
+        return self.get(SERVICE_COST_MONITOR)
+    
+    @property
+    def firestore(self):
+        """Shared Firestore client."""
+        return self.get(SERVICE_FIRESTORE)
+    
+    @property
+    def graph_populator(self):
+        """Shared graph populator."""
+        return self.get(SERVICE_GRAPH_POPULATOR)
+    
+    @property
+    def neo4j(self) -> Dict[str, str]:
+        """Shared Neo4j HTTP client configuration."""
+        return self.get(SERVICE_NEO4J)
+    
+    def _expired(self, name: str, entry: Tuple[Any, float]) -> bool:
+        """Check whether a service has outlived its max age."""
+        max_age = self._factories[name][1]
+        return max_age is not None and time.monotonic() - entry[1] > max_age
+    
+    def _register_defaults(self):
+        """Register the standard services (SDKs are imported on first use)."""
+        project_id = self.project_id
+        
+        def ai_service():
+            from ..ai.ai_service import create_ai_service
+            return create_ai_service(project_id=project_id)
+        
+        def cost_monitor():
+            from .cost_monitor import create_cost_monitor
+            return create_cost_monitor(project_id)
+        
+        def firestore_client():
+            from ..db.firestore_client import get_firestore_client
+            return get_firestore_client(project_id)
+        
+        def graph_populator():
+            from ..db.graph_populator import create_graph_populator
+            return create_graph_populator(project_id)
+        
+        def neo4j():
+            from ..db.neo4j_client import create_neo4j_http_client
+            return create_neo4j_http_client(project_id)
+        
+        self.register(SERVICE_AI, ai_service, SECRET_SERVICE_MAX_AGE_SECONDS)
+        self.register(SERVICE_COST_MONITOR, cost_monitor)
+        self.register(SERVICE_FIRESTORE, firestore_client)
+        self.register(SERVICE_GRAPH_POPULATOR, graph_populator)
+        self.register(SERVICE_NEO4J, neo4j, SECRET_SERVICE_MAX_AGE_SECONDS)
+
+
+def get_service_container(project_id: str = "aletheia-codex-prod") -> ServiceContainer:
+    """
+    Get or create the process-wide service container (singleton pattern).
+    
+    Args:
+        project_id: GCP project ID (used on first call only)
+    
+    Returns:
+        ServiceContainer instance
+    """
+    global _container
+    if _container is None:
+        with _container_lock:
+            if _container is None:
+                _container = ServiceContainer(project_id)
+    return _container
@@ -0,0 +1,469 @@
+"""
+Lightweight tracing with nested spans.
+
+A span times one unit of work (an invocation, a pipeline stage, a Gemini
+call, a Firestore batch, a Neo4j statement) and carries attributes such as
+token counts, rows written and retries. The current span is held in a
+contextvar, so spans opened inside it become its children across awaits,
+asyncio tasks and asyncio.to_thread() workers (which copy the context).
+When the outermost span of a trace ends, the finished trace is queued for
+a background export thread, so file appends and OTLP posts stay off the
+request path; flush_traces() waits for queued traces (it also runs at exit).
+
+Tracing is off unless an exporter is configured; start_span() then returns
+a shared no-op span, so instrumented code costs a contextvar lookup.
+
+Configuration (environment):
+    TRACE_EXPORTER: "json" (one trace per line, for offline analysis) or
+        "otlp" (OpenTelemetry OTLP/JSON); unset disables tracing
+    TRACE_FILE: File written by the json exporter, and by the otlp exporter
+        when no collector is configured (default /tmp/traces.jsonl)
+    OTEL_EXPORTER_OTLP_ENDPOINT: OTLP/HTTP collector base URL; traces are
+        posted to <endpoint>/v1/traces
+    OTEL_SERVICE_NAME: service.name resource attribute (defaults to
+        K_SERVICE, then "aletheia-codex")
+
+Usage:
+    with start_span("process_note", note_id=note_id) as span:
+        ...
+        span.set_attributes(entity_count=len(entities))
+    
+    @traced("gemini.generate_content")
+    async def generate(prompt): ...
+"""
+
+import asyncio
+import atexit
+import contextvars
+import functools
+import json
+import os
+import queue
+import secrets
+import threading
+import time
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from .lazy_import import lazy_import
+from .logging import get_logger
+
+requests = lazy_import("requests")
+
+logger = get_logger(__name__)
+
+TRACE_EXPORTER = os.environ.get("TRACE_EXPORTER", "").lower()
+TRACE_FILE = os.environ.get("TRACE_FILE", "/tmp/traces.jsonl")
+OTLP_ENDPOINT = os.environ.get("OTEL_EXPORTER_OTLP_ENDPOINT")
+SERVICE_NAME = os.environ.get("OTEL_SERVICE_NAME") or os.environ.get("K_SERVICE") or "aletheia-codex"
+
+EXPORTER_JSON = "json"
+EXPORTER_OTLP = "otlp"
+
+# Seconds to wait for the OTLP collector
+OTLP_TIMEOUT = 5
+
+# Finished traces waiting for the export thread (further traces are dropped)
+TRACE_QUEUE_SIZE = 1000
+
+# Seconds to wait for queued traces at exit
+TRACE_FLUSH_TIMEOUT = 10
+
+# OTLP span kind and status codes
+_OTLP_KIND_INTERNAL = 1
+_OTLP_STATUS_OK = 1
+_OTLP_STATUS_ERROR = 2
+
+
+class _Trace:
+    """Finished spans of one trace (spans may end on other threads)."""
+    
+    def __init__(self):
+        self.trace_id = secrets.token_hex(16)
+        self.spans: List["Span"] = []
+        self.lock = threading.Lock()
+    
+    def add(self, span: "Span"):
+        with self.lock:
+            self.spans.append(span)
+
+
+class SpanStatus(str, Enum):
+    """Outcome of a span."""
+    OK = "ok"
+    ERROR = "error"
+
+
+@dataclass
+class Span:
+    """
+    A timed unit of work.
+    
+    Attributes:
+        name: Operation name (e.g. "neo4j.query")
+        trace_id: 32 hex character trace ID shared by the whole trace
+        span_id: 16 hex character span ID
+        parent_id: Parent span ID (None for the root span)
+        start_time: Start, in seconds since the epoch
+        end_time: End, in seconds since the epoch (None while open)
+        attributes: Span attributes
+        status: Outcome
+        error: Error message when the span failed
+    """
+    name: str
+    trace_id: str
+    span_id: str
+    parent_id: Optional[str] = None
+    start_time: float = 0.0
+    end_time: Optional[float] = None
+    attributes: Dict[str, Any] = field(default_factory=dict)
+    status: SpanStatus = SpanStatus.OK
+    error: Optional[str] = None
+    _trace: Optional[_Trace] = field(default=None, repr=False, compare=False)
+    
+    @property
+    def duration_seconds(self) -> Optional[float]:
+        """Span duration (None while open)."""
+        if self.end_time is None:
+            return None
+        return self.end_time - self.start_time
+    
+    def set_attribute(self, key: str, value: Any):
+        """Set one attribute."""
+        self.attributes[key] = value
+    
+    def set_attributes(self, **attributes):
+        """Set several attributes."""
+        self.attributes.update(attributes)
+    
+    def increment(self, key: str, amount: int = 1):
+        """Add to a counting attribute (e.g. retries)."""
+        self.attributes[key] = self.attributes.get(key, 0) + amount
+    
+    def record_error(self, error: BaseException):
+        """Mark the span as failed."""
+        self.status = SpanStatus.ERROR
+        self.error = f"{type(error).__name__}: {str(error)}"
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to dictionary for the JSON exporter."""
+        return {
+            'name': self.name,
+            'trace_id': self.trace_id,
+            'span_id': self.span_id,
+            'parent_id': self.parent_id,
+            'start_time': self.start_time,
+            'end_time': self.end_time,
+            'duration_seconds': self.duration_seconds,
+            'attributes': self.attributes,
+            'status': self.status.value,
+            'error': self.error
+        }
+
+
+class _NoopSpan(Span):
+    """Span returned while tracing is disabled; discards everything."""
+    
+    def set_attribute(self, key: str, value: Any):
+        pass
+    
+    def set_attributes(self, **attributes):
+        pass
+    
+    def increment(self, key: str, amount: int = 1):
+        pass
+    
+    def record_error(self, error: BaseException):
+        pass
+
+
+_NOOP_SPAN = _NoopSpan(name="", trace_id="0" * 32, span_id="0" * 16)
+
+
+class SpanExporter(ABC):
+    """Abstract base class for trace exporters."""
+    
+    @abstractmethod
+    def export(self, spans: List[Span]):
+        """
+        Export the finished spans of one trace.
+        
+        Args:
+            spans: Spans in the order they ended (root last)
+        """
+        pass
+
+
+class JsonFileExporter(SpanExporter):
+    """Appends each trace to a file as one JSON line."""
+    
+    def __init__(self, path: str = TRACE_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+    
+    def export(self, spans: List[Span]):
+        line = json.dumps({
+            'trace_id': spans[-1].trace_id,
+            'spans': [span.to_dict() for span in spans]
+        }, default=str)
+        with self._lock:
+            with open(self.path, 'a') as f:
+                f.write(line + "\n")
+
+
+class OtlpExporter(SpanExporter):
+    """
+    Exports traces as OpenTelemetry OTLP/JSON.
+    
+    Posts to an OTLP/HTTP collector when an endpoint is given; otherwise
+    appends one ExportTraceServiceRequest per line to a file.
+    """
+    
+    def __init__(
+        self,
+        endpoint: Optional[str] = OTLP_ENDPOINT,
+        path: str = TRACE_FILE,
+        service_name: str = SERVICE_NAME
+    ):
+        self.endpoint = endpoint.rstrip('/') + "/v1/traces" if endpoint else None
+        self.path = path
+        self.service_name = service_name
+        self._lock = threading.Lock()
+    
+    def export(self, spans: List[Span]):
+        payload = to_otlp(spans, self.service_name)
+        if self.endpoint:
+            response = requests.post(self.endpoint, json=payload, timeout=OTLP_TIMEOUT)
+            response.raise_for_status()
+            return
+        
+        with self._lock:
+            with open(self.path, 'a') as f:
+                f.write(json.dumps(payload, default=str) + "\n")
+
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    """Convert an attribute value to an OTLP AnyValue."""
+    if isinstance(value, bool):
+        return {'boolValue': value}
+    if isinstance(value, int):
+        return {'intValue': str(value)}
+    if isinstance(value, float):
+        return {'doubleValue': value}
+    return {'stringValue': str(value)}
+
+
+def to_otlp(spans: List[Span], service_name: str = SERVICE_NAME) -> Dict[str, Any]:
+    """
+    Convert spans to an OTLP/JSON ExportTraceServiceRequest.
+    
+    Args:
+        spans: Finished spans
+        service_name: service.name resource attribute
+    
+    Returns:
+        Request body for an OTLP/HTTP collector
+    """
+    otlp_spans = []
+    for span in spans:
+        otlp_span = {
+            'traceId': span.trace_id,
+            'spanId': span.span_id,
+            'name': span.name,
+            'kind': _OTLP_KIND_INTERNAL,
+            'startTimeUnixNano': str(int(span.start_time * 1e9)),
+            'endTimeUnixNano': str(int((span.end_time or span.start_time) * 1e9)),
+            'attributes': [
+                {'key': key, 'value': _otlp_value(value)}
+                for key, value in span.attributes.items()
+                if value is not None
+            ],
+            'status': (
+                {'code': _OTLP_STATUS_ERROR, 'message': span.error or ""}
+                if span.status == SpanStatus.ERROR else {'code': _OTLP_STATUS_OK}
+            )
+        }
+        if span.parent_id:
+            otlp_span['parentSpanId'] = span.parent_id
+        otlp_spans.append(otlp_span)
+    
+    return {
+        'resourceSpans': [{
+            'resource': {
+                'attributes': [{'key': 'service.name', 'value': {'stringValue': service_name}}]
+            },
+            'scopeSpans': [{
+                'scope': {'name': 'aletheia_codex'},
+                'spans': otlp_spans
+            }]
+        }]
+    }
+
+
+def exporter_from_env() -> Optional[SpanExporter]:
+    """Build the exporter selected by TRACE_EXPORTER (None disables tracing)."""
+    if TRACE_EXPORTER == EXPORTER_JSON:
+        return JsonFileExporter()
+    if TRACE_EXPORTER == EXPORTER_OTLP:
+        return OtlpExporter()
+    if TRACE_EXPORTER:
+        logger.warning(f"Unknown TRACE_EXPORTER {TRACE_EXPORTER!r}, tracing disabled")
+    return None
+
+
+_exporter: Optional[SpanExporter] = exporter_from_env()
+_current_span: contextvars.ContextVar[Optional[Span]] = contextvars.ContextVar("current_span", default=None)
+_export_queue: queue.Queue = queue.Queue(maxsize=TRACE_QUEUE_SIZE)
+_export_thread: Optional[threading.Thread] = None
+_export_thread_lock = threading.Lock()
+
+
+def set_exporter(exporter: Optional[SpanExporter]):
+    """
+    Replace the trace exporter.
+    
+    Args:
+        exporter: Exporter for finished traces (None disables tracing)
+    """
+    global _exporter
+    _exporter = exporter
+
+
+def tracing_enabled() -> bool:
+    """Whether spans are being recorded."""
+    return _exporter is not None
+
+
+def current_span() -> Span:
+    """Get the current span (a no-op span outside any span or when disabled)."""
+    return _current_span.get() or _NOOP_SPAN
+
+
+def _export(exporter: SpanExporter, spans: List[Span]):
+    """Export a finished trace; export failures never affect the traced work."""
+    try:
+        exporter.export(spans)
+    except Exception as e:
+        logger.warning(f"Failed to export trace: {type(e).__name__}: {str(e)}")
+
+
+def _export_queued():
+    while True:
+        exporter, spans = _export_queue.get()
+        try:
+            _export(exporter, spans)
+        finally:
+            _export_queue.task_done()
+
+
+def _queue_export(exporter: SpanExporter, spans: List[Span]):
+    """Hand a finished trace to the export thread (started on first use)."""
+    global _export_thread
+    if _export_thread is None:
+        with _export_thread_lock:
+            if _export_thread is None:
+                _export_thread = threading.Thread(target=_export_queued, name="trace-export", daemon=True)
+                _export_thread.start()
+                atexit.register(flush_traces, TRACE_FLUSH_TIMEOUT)
+    
+    try:
+        _export_queue.put_nowait((exporter, spans))
+    except queue.Full:
+        logger.warning("Trace export queue is full, dropping trace")
+
+
+def flush_traces(timeout: Optional[float] = None) -> bool:
+    """
+    Wait until queued traces have been exported.
+    
+    Args:
+        timeout: Maximum seconds to wait (no limit if None)
+    
+    Returns:
+        True if the queue was drained
+    """
+    deadline = time.monotonic() + timeout if timeout is not None else None
+    with _export_queue.all_tasks_done:
+        while _export_queue.unfinished_tasks:
+            remaining = deadline - time.monotonic() if deadline is not None else None
+            if remaining is not None and remaining <= 0:
+                return False
+            _export_queue.all_tasks_done.wait(remaining)
+    return True
+
+
+@contextmanager
+def start_span(name: str, **attributes) -> Iterator[Span]:
+    """
+    Open a span as a child of the current span.
+    
+    Without a current span, the span starts a new trace, which is queued for
+    export when the span ends. Exceptions raised inside the span mark it as
+    failed and propagate.
+    
+    Args:
+        name: Operation name
+        **attributes: Initial attributes
+    
+    Yields:
+        The span (a no-op span when tracing is disabled)
+    """
+    exporter = _exporter
+    if exporter is None:
+        yield _NOOP_SPAN
+        return
+    
+    parent = _current_span.get()
+    trace = parent._trace if parent is not None else _Trace()
+    
+    span = Span(
+        name=name,
+        trace_id=trace.trace_id,
+        span_id=secrets.token_hex(8),
+        parent_id=parent.span_id if parent else None,
+        start_time=time.time(),
+        attributes=dict(attributes),
+        _trace=trace
+    )
+    token = _current_span.set(span)
+    try:
+        yield span
+    except BaseException as e:
+        span.record_error(e)
+        raise
+    finally:
+        span.end_time = time.time()
+        _current_span.reset(token)
+        trace.add(span)
+        if parent is None:
+            _queue_export(exporter, trace.spans)
+
+
+def traced(name: Optional[str] = None, **attributes) -> Callable:
+    """
+    Decorator that runs a function (sync or async) inside a span.
+    
+    Args:
+        name: Operation name (defaults to the function's qualified name)
+        **attributes: Initial attributes
+    """
+    def decorator(func: Callable) -> Callable:
+        span_name = name or func.__qualname__
+        
+        if asyncio.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with start_span(span_name, **attributes):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+        
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with start_span(span_name, **attributes):
+                return func(*args, **kwargs)
+        return wrapper
+    
+    return decorator
@@ -0,0 +1,221 @@
+"""
+Background warm-up of dependencies at instance start.
+
+The first request on a new instance otherwise pays, serially, for Secret
+Manager fetches, the Neo4j TLS handshake (and possibly an Aura wake-up),
+the Firebase public-key fetch and AI client setup. An entry point can
+instead start a warm-up at import time: each dependency is prepared on its
+own background thread while the instance finishes starting, and a request
+waits only for the dependencies it actually uses (wait_for_warmup), for no
+longer than the warm-up itself would take.
+
+Warm-up is opt-in per deployment with the WARMUP_ON_START environment
+variable: "true" warms every task the entry point lists, a comma-separated
+list warms only those tasks. Warm-up failures are logged and otherwise
+ignored; the request then initializes the dependency itself as before.
+"""
+
+import os
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional
+
+from .logging import get_logger
+
+logger = get_logger(__name__)
+
+# Warm-up tasks
+WARMUP_AI = "ai"
+WARMUP_FIREBASE = "firebase"
+WARMUP_FIRESTORE = "firestore"
+WARMUP_NEO4J = "neo4j"
+
+# Longest a request waits for a warm-up task before doing the work itself
+DEFAULT_WAIT_SECONDS = 30.0
+
+_warmup: Optional['Warmup'] = None
+_warmup_lock = threading.Lock()
+
+
+class Warmup:
+    """Runs warm-up tasks on background threads and lets requests wait on them."""
+    
+    def __init__(self, tasks: Dict[str, Callable[[], None]]):
+        """
+        Initialize warm-up.
+        
+        Args:
+            tasks: Task name to callable
+        """
+        self.tasks = tasks
+        self.done: Dict[str, threading.Event] = {name: threading.Event() for name in tasks}
+        self.errors: Dict[str, str] = {}
+        self.durations: Dict[str, float] = {}
+        self._threads: Dict[str, threading.Thread] = {}
+    
+    def start(self):
+        """Start every task on its own daemon thread."""
+        for name in self.tasks:
+            thread = threading.Thread(target=self._run, args=(name,), name=f"warmup-{name}", daemon=True)
+            self._threads[name] = thread
+            thread.start()
+        logger.info(f"Started warm-up: {', '.join(self.tasks)}")
+    
+    def wait_for(self, *names: str, timeout: float = DEFAULT_WAIT_SECONDS) -> bool:
+        """
+        Wait for warm-up tasks to finish.
+        
+        Tasks that are not part of this warm-up are ignored. Calls from a
+        warm-up thread return immediately so tasks can share code paths
+        with requests.
+        
+        Args:
+            *names: Task names
+            timeout: Maximum total seconds to wait
+        
+        Returns:
+            True if every listed task finished successfully
+        """
+        if threading.current_thread() in self._threads.values():
+            return False
+        
+        deadline = time.monotonic() + timeout
+        ready = True
+        for name in names:
+            event = self.done.get(name)
+            if event is None:
+                continue
+            if not event.wait(max(0.0, deadline - time.monotonic())):
+                logger.warning(f"Warm-up task {name} not finished after {timeout}s, continuing without it")
+                return False
+            ready = ready and name not in self.errors
+        return ready
+    
+    def status(self) -> Dict[str, Dict[str, object]]:
+        """Get the state of every task."""
+        return {
+            name: {
+                'done': self.done[name].is_set(),
+                'seconds': self.durations.get(name),
+                'error': self.errors.get(name)
+            }
+            for name in self.tasks
+        }
+    
+    def _run(self, name: str):
+        """Run one task, recording its duration or error."""
+        started = time.monotonic()
+        try:
+            self.tasks[name]()
+            logger.info(f"Warm-up task {name} finished in {time.monotonic() - started:.2f}s")
+        except Exception as e:
+            self.errors[name] = str(e)
+            logger.warning(f"Warm-up task {name} failed: {type(e).__name__}: {str(e)}")
+        finally:
+            self.durations[name] = time.monotonic() - started
+            self.done[name].set()
+
+
+def default_tasks(project_id: str = "aletheia-codex-prod") -> Dict[str, Callable[[], None]]:
+    """
+    Get the standard warm-up tasks.
+    
+    Dependencies are imported inside the tasks, so only the SDKs of the
+    tasks that actually run are loaded.
+    
+    Args:
+        project_id: GCP project ID
+    
+    Returns:
+        Task name to callable
+    """
+    def warm_ai():
+        from .service_container import get_service_container
+        get_service_container(project_id).ai_service
+    
+    def warm_firebase():
+        from ..auth.firebase_auth import warm_up
+        warm_up()
+    
+    def warm_firestore():
+        from ..db.firestore_client import get_firestore_client
+        get_firestore_client(project_id)
+    
+    def warm_neo4j():
+        from ..db.neo4j_client import create_neo4j_http_client, execute_neo4j_query_http
+        client = create_neo4j_http_client(project_id)
+        execute_neo4j_query_http(client['uri'], client['user'], client['password'], "RETURN 1", max_retries=1, template="warmup.ping")
+    
+    return {
+        WARMUP_AI: warm_ai,
+        WARMUP_FIREBASE: warm_firebase,
+        WARMUP_FIRESTORE: warm_firestore,
+        WARMUP_NEO4J: warm_neo4j
+    }
+
+
+def enabled_tasks(requested: Iterable[str], setting: Optional[str] = None) -> List[str]:
+    """
+    Filter an entry point's warm-up tasks by the WARMUP_ON_START setting.
+    
+    Args:
+        requested: Tasks the entry point wants warmed
+        setting: WARMUP_ON_START value (read from the environment if None)
+    
+    Returns:
+        Tasks to run (empty when warm-up is disabled)
+    """
+    if setting is None:
+        setting = os.environ.get('WARMUP_ON_START', '')
+    setting = setting.strip().lower()
+    
+    if setting in ('', 'false', '0', 'no'):
+        return []
+    if setting in ('true', '1', 'yes', 'all'):
+        return list(requested)
+    
+    allowed = {name.strip() for name in setting.split(',')}
+    return [name for name in requested if name in allowed]
+
+
+def start_warmup(tasks: Iterable[str], project_id: str = "aletheia-codex-prod") -> Optional[Warmup]:
+    """
+    Start the process-wide warm-up, if enabled (call once at import time).
+    
+    Args:
+        tasks: Tasks this entry point depends on
+        project_id: GCP project ID
+    
+    Returns:
+        Warmup, or None if warm-up is disabled
+    """
+    global _warmup
+    names = enabled_tasks(tasks)
+    if not names:
+        return None
+    
+    with _warmup_lock:
+        if _warmup is None:
+            available = default_tasks(project_id)
+            unknown = [name for name in names if name not in available]
+            if unknown:
+                logger.warning(f"Ignoring unknown warm-up tasks: {', '.join(unknown)}")
+            _warmup = Warmup({name: available[name] for name in names if name in available})
+            _warmup.start()
+    return _warmup
+
+
+def wait_for_warmup(*names: str, timeout: float = DEFAULT_WAIT_SECONDS) -> bool:
+    """
+    Wait for warm-up tasks a request depends on (no-op without warm-up).
+    
+    Args:
+        *names: Task names
+        timeout: Maximum seconds to wait
+    
+    Returns:
+        True if the tasks finished successfully, False otherwise
+    """
+    if _warmup is None:
+        return False
+    return _warmup.wait_for(*names, timeout=timeout)
@@ -3,8 +3,11 @@ Review API Cloud Functions for AletheiaCodex (with Firebase Authentication).
 
 Provides HTTP endpoints for managing the review queue, including:
 - Getting pending items
+- Streaming pending item changes (server-sent events)
 - Approving/rejecting items
 - Batch operations
+- Background batch jobs
+- Archive compaction of reviewed items
 - User statistics
 """
 
@@ -12,9 +15,11 @@ import functions_framework
 import flask
 from flask import Request, jsonify
 import os
+import threading
 import sys
+import time
 from typing import Dict, Any
-from datetime import datetime
+from datetime import datetime, timedelta
 
 # Add shared directory to path
 sys.path.append('/workspace')
@@ -22,9 +27,14 @@ sys.path.append('/workspace')
 from shared.auth.firebase_auth import require_auth
 from shared.review.queue_manager import create_queue_manager
 from shared.review.approval_workflow import create_approval_workflow
-from shared.review.batch_processor import create_batch_processor
+from shared.review.batch_processor import create_batch_processor, BatchOperationType
+from shared.review.batch_jobs import create_batch_job_manager
+from shared.review.change_feed import create_change_feed
 from shared.models.review_item import ReviewItemType
+from shared.utils.task_queue import create_task_queue
 from shared.utils.logging import get_logger
+from shared.utils.metrics import start_metrics_flush
+from shared.utils.warmup import WARMUP_FIREBASE, WARMUP_FIRESTORE, WARMUP_NEO4J, start_warmup, wait_for_warmup
 
 logger = get_logger(__name__)
 
@@ -38,25 +48,52 @@ ALLOWED_ORIGINS = [
     'http://localhost:3000'
 ]
 
+# Background batch job configuration
+BATCH_JOB_QUEUE = os.environ.get('BATCH_JOB_QUEUE', 'review-batch-jobs')
+BATCH_JOB_WORKER_URL = os.environ.get('BATCH_JOB_WORKER_URL')
+BATCH_JOB_TIME_BUDGET_SECONDS = float(os.environ.get('BATCH_JOB_TIME_BUDGET_SECONDS', 240))
+
+# Change feed configuration (streams end after the max duration; clients resume)
+CHANGE_FEED_MAX_STREAM_SECONDS = float(os.environ.get('CHANGE_FEED_MAX_STREAM_SECONDS', 300))
+CHANGE_FEED_HEARTBEAT_SECONDS = float(os.environ.get('CHANGE_FEED_HEARTBEAT_SECONDS', 15))
+
+# Archive compaction configuration (archive-on-review is read by the queue manager)
+REVIEW_ARCHIVE_MAX_BATCHES = int(os.environ.get('REVIEW_ARCHIVE_MAX_BATCHES', 50))
+
 # Initialize managers (lazy initialization)
 _queue_manager = None
 _approval_workflow = None
 _batch_processor = None
+_batch_job_manager = None
+_batch_job_queue = None
+_change_feed = None
+_init_lock = threading.RLock()  # serializes lazy initialization across concurrent requests
+
+# Opt-in background warm-up (WARMUP_ON_START)
+start_warmup([WARMUP_FIREBASE, WARMUP_FIRESTORE, WARMUP_NEO4J], PROJECT_ID)
+
+# Periodic metrics export (METRICS_EXPORTER)
+start_metrics_flush()
 
 
 def get_queue_manager():
     """Get or create queue manager instance."""
     global _queue_manager
     if _queue_manager is None:
-        _queue_manager = create_queue_manager(PROJECT_ID)
+        with _init_lock:
+            if _queue_manager is None:
+                _queue_manager = create_queue_manager(PROJECT_ID)
     return _queue_manager
 
 
 def get_approval_workflow():
-    """Get or create approval workflow instance."""
+    """Get or create approval workflow instance (approvals write to Neo4j)."""
     global _approval_workflow
+    wait_for_warmup(WARMUP_NEO4J)
     if _approval_workflow is None:
-        _approval_workflow = create_approval_workflow(PROJECT_ID)
+        with _init_lock:
+            if _approval_workflow is None:
+                _approval_workflow = create_approval_workflow(PROJECT_ID)
     return _approval_workflow
 
 
@@ -64,10 +101,62 @@ def get_batch_processor():
     """Get or create batch processor instance."""
     global _batch_processor
     if _batch_processor is None:
-        _batch_processor = create_batch_processor(PROJECT_ID)
+        with _init_lock:
+            if _batch_processor is None:
+                _batch_processor = create_batch_processor(PROJECT_ID)
     return _batch_processor
 
 
+def get_batch_job_manager():
+    """Get or create batch job manager instance."""
+    global _batch_job_manager
+    if _batch_job_manager is None:
+        with _init_lock:
+            if _batch_job_manager is None:
+                _batch_job_manager = create_batch_job_manager(PROJECT_ID)
+    return _batch_job_manager
+
+
+def get_batch_job_queue():
+    """
+    Get or create the batch job task queue.
+    
+    Uses Cloud Tasks when BATCH_JOB_WORKER_URL is configured, otherwise jobs
+    run on an in-process worker thread. Those threads die with the instance;
+    jobs they leave behind are re-driven by GET /review/jobs/{job_id}.
+    """
+    global _batch_job_queue
+    if _batch_job_queue is None:
+        with _init_lock:
+            if _batch_job_queue is None:
+                _batch_job_queue = create_task_queue(
+                    BATCH_JOB_QUEUE,
+                    handler=run_batch_job,
+                    worker_url=BATCH_JOB_WORKER_URL,
+                    project_id=PROJECT_ID
+                )
+    return _batch_job_queue
+
+
+def get_change_feed():
+    """Get or create the change feed (one set of listeners per instance)."""
+    global _change_feed
+    if _change_feed is None:
+        with _init_lock:
+            if _change_feed is None:
+                _change_feed = create_change_feed(PROJECT_ID)
+    return _change_feed
+
+
+def run_batch_job(payload: Dict[str, Any]):
+    """Run one time-boxed slice of a batch job and re-enqueue it if unfinished."""
+    job_id = payload['job_id']
+    job = get_batch_job_manager().run_job(job_id, BATCH_JOB_TIME_BUDGET_SECONDS)
+    if job is not None and not job.is_finished():
+        logger.info(f"Batch job {job_id} paused at {job.processed_count}/{job.total_items}, re-enqueuing")
+        get_batch_job_queue().enqueue({'job_id': job_id})
+
+
 def add_cors_headers(response, origin):
     """Add CORS headers to response."""
     if origin in ALLOWED_ORIGINS:
@@ -100,10 +189,13 @@ def handle_request(request: Request) -> flask.Response:
     
     Routes:
     - GET /review/pending - Get pending review items
+    - GET /review/changes - Stream pending item changes (server-sent events)
     - POST /review/approve - Approve a single item
     - POST /review/reject - Reject a single item
     - POST /review/batch-approve - Batch approve items
     - POST /review/batch-reject - Batch reject items
+    - POST /review/jobs - Start a background batch job
+    - GET /review/jobs/{job_id} - Get background batch job status
     - GET /review/stats - Get user statistics
     """
     origin = request.headers.get('Origin')
@@ -125,6 +217,8 @@ def handle_request(request: Request) -> flask.Response:
         # Handle both full path (direct call) and stripped path (Firebase Hosting rewrite)
         if (path == 'review/pending' or path == 'pending') and request.method == 'GET':
             return handle_get_pending_items(request, user_id, origin)
+        elif (path == 'review/changes' or path == 'changes') and request.method == 'GET':
+            return handle_pending_changes(request, user_id, origin)
         elif (path == 'review/approve' or path == 'approve') and request.method == 'POST':
             return handle_approve_item(request, user_id, origin)
         elif (path == 'review/reject' or path == 'reject') and request.method == 'POST':
@@ -135,6 +229,10 @@ def handle_request(request: Request) -> flask.Response:
             return handle_batch_reject_items(request, user_id, origin)
         elif (path == 'review/stats' or path == 'stats') and request.method == 'GET':
             return handle_get_user_stats(request, user_id, origin)
+        elif (path == 'review/jobs' or path == 'jobs') and request.method == 'POST':
+            return handle_create_batch_job(request, user_id, origin)
+        elif (path.startswith('review/jobs/') or path.startswith('jobs/')) and request.method == 'GET':
+            return handle_get_batch_job(request, user_id, path.split('/')[-1], origin)
         else:
             return cors_response({
                 'success': False,
@@ -163,8 +261,10 @@ def handle_get_pending_items(request: Request, user_id: str, origin: str = None)
     - limit: Maximum number of items (default: 50, max: 100)
     - min_confidence: Minimum confidence threshold (default: 0.0)
     - type: Filter by item type (entity/relationship, optional)
-    - order_by: Field to order by (default: confidence)
+    - order_by: Field to order by (confidence/created_at, default: confidence)
     - descending: Order direction (default: true)
+    - cursor: next_cursor from a previous response (optional)
+    - view: "full" (default) or "summary" for list-view fields only
     """
     try:
         # Parse query parameters
@@ -173,6 +273,18 @@ def handle_get_pending_items(request: Request, user_id: str, origin: str = None)
         item_type = request.args.get('type')
         order_by = request.args.get('order_by', 'confidence')
         descending = request.args.get('descending', 'true').lower() == 'true'
+        cursor = request.args.get('cursor') or None
+        view = request.args.get('view', 'full').lower()
+        
+        if view not in ('full', 'summary'):
+            return cors_response({
+                'success': False,
+                'error': {
+                    'code': 'INVALID_PARAMETER',
+                    'message': 'Invalid view parameter. Must be "full" or "summary"'
+                }
+            }, 400, origin)
+        summary_only = view == 'summary'
         
         # Validate item type
         item_type_enum = None
@@ -192,32 +304,40 @@ def handle_get_pending_items(request: Request, user_id: str, origin: str = None)
         
         # Get pending items
         queue_manager = get_queue_manager()
-        items = queue_manager.get_pending_items(
+        items, next_cursor = queue_manager.get_pending_page(
             user_id=user_id,
             limit=limit,
             min_confidence=min_confidence,
             item_type=item_type_enum,
             order_by=order_by,
-            descending=descending
+            descending=descending,
+            start_after=cursor,
+            summary_only=summary_only
         )
         
         # Convert to dictionary format
-        items_data = [item.to_dict() for item in items]
+        if summary_only:
+            items_data = [item.to_summary_dict() for item in items]
+        else:
+            items_data = [item.to_dict() for item in items]
         
         return cors_response({
             'success': True,
             'data': {
                 'items': items_data,
                 'count': len(items_data),
+                'next_cursor': next_cursor,
+                'has_more': next_cursor is not None,
                 'filters': {
                     'limit': limit,
                     'min_confidence': min_confidence,
                     'type': item_type,
                     'order_by': order_by,
-                    'descending': descending
+                    'descending': descending,
+                    'view': view
                 }
             }
-        }, origin)
+        }, 200, origin)
         
     except ValueError as e:
         logger.error(f"Invalid parameter in get_pending_items: {str(e)}")
@@ -239,6 +359,43 @@ def handle_get_pending_items(request: Request, user_id: str, origin: str = None)
         }, 500, origin)
 
 
+def handle_pending_changes(request: Request, user_id: str, origin: str = None) -> flask.Response:
+    """
+    Handle GET /review/changes requests.
+    
+    Streams server-sent events for the user's pending items: a reset event
+    with the full pending set (or the events missed since the resume token),
+    then added/modified/removed events as they happen. Each event id is a
+    resume token; clients reconnect with the Last-Event-ID header (or the
+    resume_token query parameter) after the stream ends.
+    
+    Query parameters:
+    - resume_token: Token of the last event received
+    """
+    resume_token = request.headers.get('Last-Event-ID') or request.args.get('resume_token')
+    subscription = get_change_feed().subscribe(user_id, resume_token)
+    
+    def stream():
+        deadline = time.monotonic() + CHANGE_FEED_MAX_STREAM_SECONDS
+        try:
+            yield "retry: 3000\n\n"
+            while time.monotonic() < deadline:
+                event = subscription.get(timeout=CHANGE_FEED_HEARTBEAT_SECONDS)
+                if event is not None:
+                    yield event.to_sse()
+                elif subscription.closed:
+                    break
+                else:
+                    yield ": keep-alive\n\n"
+        finally:
+            subscription.close()
+    
+    response = flask.Response(stream(), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return add_cors_headers(response, origin)
+
+
 def handle_approve_item(request: Request, user_id: str, origin: str = None) -> flask.Response:
     """
     Handle POST /review/approve requests.
@@ -456,8 +613,12 @@ def handle_batch_approve_items(request: Request, user_id: str, origin: str = Non
                 }
             }, 400, origin)
         
-        # Batch approve
+        # Batches over the synchronous limit run as a background job
         batch_processor = get_batch_processor()
+        if len(item_ids) > batch_processor.max_batch_size:
+            return start_batch_job(user_id, BatchOperationType.APPROVE, origin, item_ids=item_ids)
+        
+        # Batch approve
         result = batch_processor.batch_approve(item_ids, user_id)
         
         return cors_response({
@@ -510,8 +671,12 @@ def handle_batch_reject_items(request: Request, user_id: str, origin: str = None
         
         reason = data.get('reason')
         
-        # Batch reject
+        # Batches over the synchronous limit run as a background job
         batch_processor = get_batch_processor()
+        if len(item_ids) > batch_processor.max_batch_size:
+            return start_batch_job(user_id, BatchOperationType.REJECT, origin, item_ids=item_ids, reason=reason)
+        
+        # Batch reject
         result = batch_processor.batch_reject(item_ids, user_id, reason)
         
         return cors_response({
@@ -530,6 +695,231 @@ def handle_batch_reject_items(request: Request, user_id: str, origin: str = None
         }, 500, origin)
 
 
+def start_batch_job(
+    user_id: str,
+    operation_type: BatchOperationType,
+    origin: str = None,
+    **job_args
+) -> flask.Response:
+    """Create a background batch job, enqueue it and return 202 with its status."""
+    job = get_batch_job_manager().create_job(user_id, operation_type, **job_args)
+    get_batch_job_queue().enqueue({'job_id': job.id})
+    
+    return cors_response({
+        'success': True,
+        'data': {
+            'job': job.to_status_dict(),
+            'status_url': f'/review/jobs/{job.id}'
+        }
+    }, 202, origin)
+
+
+def handle_create_batch_job(request: Request, user_id: str, origin: str = None) -> flask.Response:
+    """
+    Handle POST /review/jobs requests.
+    
+    Body:
+    {
+        "operation": "approve" | "reject",
+        "item_ids": ["string"] (optional),
+        "filter": {"min_confidence": 0.9, "type": "entity"} (optional),
+        "reason": "string" (optional, reject only)
+    }
+    
+    Either item_ids or filter is required. A filter selects every pending item
+    of the user that matches it.
+    """
+    try:
+        data = request.get_json(silent=True) or {}
+        
+        operation = str(data.get('operation', '')).lower()
+        if operation not in (BatchOperationType.APPROVE.value, BatchOperationType.REJECT.value):
+            return cors_response({
+                'success': False,
+                'error': {
+                    'code': 'INVALID_REQUEST',
+                    'message': 'operation must be "approve" or "reject"'
+                }
+            }, 400, origin)
+        
+        item_ids = data.get('item_ids')
+        selector = data.get('filter') or {}
+        if item_ids is not None and (not isinstance(item_ids, list) or len(item_ids) == 0):
+            return cors_response({
+                'success': False,
+                'error': {
+                    'code': 'INVALID_REQUEST',
+                    'message': 'item_ids must be a non-empty array'
+                }
+            }, 400, origin)
+        
+        item_type = selector.get('type')
+        if item_type and item_type not in (ReviewItemType.ENTITY.value, ReviewItemType.RELATIONSHIP.value):
+            return cors_response({
+                'success': False,
+                'error': {
+                    'code': 'INVALID_PARAMETER',
+                    'message': 'Invalid filter type. Must be "entity" or "relationship"'
+                }
+            }, 400, origin)
+        
+        min_confidence = selector.get('min_confidence')
+        return start_batch_job(
+            user_id,
+            BatchOperationType(operation),
+            origin,
+            item_ids=item_ids,
+            min_confidence=float(min_confidence) if min_confidence is not None else None,
+            item_type=ReviewItemType(item_type) if item_type else None,
+            reason=data.get('reason') if operation == BatchOperationType.REJECT.value else None
+        )
+        
+    except ValueError as e:
+        logger.error(f"Invalid batch job request: {str(e)}")
+        return cors_response({
+            'success': False,
+            'error': {
+                'code': 'INVALID_REQUEST',
+                'message': str(e)
+            }
+        }, 400, origin)
+    except Exception as e:
+        logger.error(f"Error creating batch job: {str(e)}", exc_info=True)
+        return cors_response({
+            'success': False,
+            'error': {
+                'code': 'INTERNAL_ERROR',
+                'message': 'Failed to create batch job'
+            }
+        }, 500, origin)
+
+
+def handle_get_batch_job(request: Request, user_id: str, job_id: str, origin: str = None) -> flask.Response:
+    """Handle GET /review/jobs/{job_id} requests."""
+    try:
+        job = get_batch_job_manager().get_job(job_id)
+        
+        if not job or job.user_id != user_id:
+            return cors_response({
+                'success': False,
+                'error': {
+                    'code': 'NOT_FOUND',
+                    'message': 'Batch job not found'
+                }
+            }, 404, origin)
+        
+        # Re-enqueue jobs whose task was lost (e.g. with the instance that ran it)
+        if not job.is_finished():
+            try:
+                if get_batch_job_manager().claim_stalled(job_id):
+                    get_batch_job_queue().enqueue({'job_id': job_id})
+            except Exception as e:
+                logger.error(f"Failed to re-drive batch job {job_id}: {str(e)}")
+        
+        return cors_response({
+            'success': True,
+            'data': job.to_status_dict()
+        }, 200, origin)
+        
+    except Exception as e:
+        logger.error(f"Error getting batch job: {str(e)}", exc_info=True)
+        return cors_response({
+            'success': False,
+            'error': {
+                'code': 'INTERNAL_ERROR',
+                'message': 'Failed to get batch job'
+            }
+        }, 500, origin)
+
+
+@functions_framework.http
+def batch_job_worker(request: Request) -> flask.Response:
+    """
+    Cloud Tasks worker for background batch jobs.
+    
+    Deployed as a separate entry point without Firebase authentication; it
+    must only be invokable by the Cloud Tasks service account (IAM/OIDC).
+    
+    Body:
+    {
+        "job_id": "string"
+    }
+    """
+    data = request.get_json(silent=True) or {}
+    job_id = data.get('job_id')
+    if not job_id:
+        return cors_response({
+            'success': False,
+            'error': {
+                'code': 'INVALID_REQUEST',
+                'message': 'Missing required field: job_id'
+            }
+        }, 400)
+    
+    try:
+        run_batch_job({'job_id': job_id})
+        return cors_response({'success': True, 'data': {'job_id': job_id}}, 200)
+    except Exception as e:
+        # Non-2xx makes Cloud Tasks retry; progress is checkpointed so retries resume
+        logger.error(f"Batch job worker failed for {job_id}: {str(e)}", exc_info=True)
+        return cors_response({
+            'success': False,
+            'error': {
+                'code': 'INTERNAL_ERROR',
+                'message': 'Batch job run failed'
+            }
+        }, 500)
+
+
+@functions_framework.http
+def archive_compaction(request: Request) -> flask.Response:
+    """
+    Move reviewed items from review_queue into the archive.
+    
+    Deployed as a separate entry point without Firebase authentication and
+    invoked periodically by Cloud Scheduler; it must only be invokable by the
+    scheduler service account (IAM/OIDC). Each run archives at most
+    REVIEW_ARCHIVE_MAX_BATCHES batches; the next run picks up the rest.
+    
+    Body (optional):
+    {
+        "user_id": "string",
+        "reviewed_before_days": 0
+    }
+    """
+    data = request.get_json(silent=True) or {}
+    
+    try:
+        reviewed_before = None
+        if data.get('reviewed_before_days') is not None:
+            reviewed_before = datetime.utcnow() - timedelta(days=float(data['reviewed_before_days']))
+    except (TypeError, ValueError):
+        return cors_response({
+            'success': False,
+            'error': {
+                'code': 'INVALID_REQUEST',
+                'message': 'reviewed_before_days must be a number'
+            }
+        }, 400)
+    
+    try:
+        archived = get_queue_manager().archive_reviewed_items(
+            user_id=data.get('user_id'),
+            reviewed_before=reviewed_before,
+            max_batches=REVIEW_ARCHIVE_MAX_BATCHES
+        )
+        return cors_response({'success': True, 'data': {'archived': archived}}, 200)
+    except Exception as e:
+        logger.error(f"Archive compaction failed: {str(e)}", exc_info=True)
+        return cors_response({
+            'success': False,
+            'error': {
+                'code': 'INTERNAL_ERROR',
+                'message': 'Archive compaction failed'
+            }
+        }, 500)
+
+
 def handle_get_user_stats(request: Request, user_id: str, origin: str = None) -> flask.Response:
     """Handle GET /review/stats requests."""
     try:
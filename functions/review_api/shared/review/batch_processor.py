@@ -15,9 +15,15 @@ from ..models.review_item import ReviewItem, ReviewItemType, ReviewItemStatus
 from .approval_workflow import ApprovalWorkflow, create_approval_workflow
 from .queue_manager import QueueManager, create_queue_manager
 from ..utils.logging import get_logger
+from ..utils.metrics import DEFAULT_SIZE_BUCKETS, counter, histogram
 
 logger = get_logger(__name__)
 
+# Metrics
+REVIEW_DECISIONS = counter("review_decisions_total", "Batch-reviewed items by operation and outcome")
+REVIEW_BATCH_SIZE = histogram("review_batch_size", "Items per batch review operation", DEFAULT_SIZE_BUCKETS)
+REVIEW_BATCH_SECONDS = histogram("review_batch_seconds", "Batch review operation latency")
+
 
 class BatchOperationType(str, Enum):
     """Types of batch operations."""
@@ -172,6 +178,7 @@ class BatchProcessor:
         )
         
         logger.info(f"Batch approve completed: {len(successful)} successful, {len(failed)} failed, {duration:.2f}s")
+        self._record_metrics(result)
         
         return result
     
@@ -259,6 +266,7 @@ class BatchProcessor:
         )
         
         logger.info(f"Batch reject completed: {len(successful)} successful, {len(failed)} failed, {duration:.2f}s")
+        self._record_metrics(result)
         
         return result
     
@@ -371,6 +379,14 @@ class BatchProcessor:
             'estimated_completion': datetime.utcnow().timestamp() + estimated_duration
         }
     
+    def _record_metrics(self, result: BatchResult):
+        """Record a finished batch operation in the metrics registry."""
+        operation = result.operation_type.value
+        REVIEW_BATCH_SIZE.observe(result.total_items, operation=operation)
+        REVIEW_BATCH_SECONDS.observe(result.duration_seconds, operation=operation)
+        REVIEW_DECISIONS.inc(len(result.successful), operation=operation, result="success")
+        REVIEW_DECISIONS.inc(len(result.failed), operation=operation, result="failed")
+    
     def _is_entity_item(self, item_id: str) -> bool:
         """Check if an item is an entity or relationship."""
         try:
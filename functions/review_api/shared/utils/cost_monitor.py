@@ -17,6 +17,7 @@ from .cost_config import (
     get_alert_level,
     get_cost_config
 )
+from ..db.firestore_client import get_firestore_client
 
 logger = logging.getLogger(__name__)
 
@@ -34,7 +35,7 @@ class CostMonitor:
             project_id: GCP project ID
         """
         self.project_id = project_id
-        self.firestore_client = firestore.Client(project=project_id)
+        self.firestore_client = get_firestore_client(project_id)
         logger.info("Initialized CostMonitor")
     
     async def log_usage(
@@ -0,0 +1,64 @@
+"""
+Opaque cursors for keyset pagination over Firestore queries.
+
+A cursor records the ordering of the page it came from and the order-field
+value and document ID of the last document, so the next page can start
+after it with a stable tie-breaker.
+"""
+
+import base64
+import json
+from datetime import datetime
+from typing import Any, Dict
+
+
+def encode_cursor(order_by: str, descending: bool, value: Any, doc_id: str) -> str:
+    """
+    Encode the position after a document as an opaque pagination cursor.
+    
+    Args:
+        order_by: Field the page was ordered by
+        descending: Whether the page was ordered descending
+        value: Value of the order field on the last document
+        doc_id: ID of the last document (tie-breaker)
+    
+    Returns:
+        URL-safe cursor string
+    """
+    if isinstance(value, datetime):
+        value = {'__datetime__': value.isoformat()}
+    
+    payload = json.dumps(
+        {'o': order_by, 'd': descending, 'v': value, 'id': doc_id},
+        separators=(',', ':')
+    )
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor: str) -> Dict[str, Any]:
+    """
+    Decode a cursor produced by encode_cursor.
+    
+    Args:
+        cursor: Opaque cursor string
+    
+    Returns:
+        Dictionary with order_by, descending, value and doc_id
+    
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        value = payload['v']
+        if isinstance(value, dict) and '__datetime__' in value:
+            value = datetime.fromisoformat(value['__datetime__'])
+        return {
+            'order_by': payload['o'],
+            'descending': bool(payload['d']),
+            'value': value,
+            'doc_id': payload['id']
+        }
+    except (ValueError, KeyError, TypeError) as e:
+        raise ValueError(f"Invalid cursor: {str(e)}")
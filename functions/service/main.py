@@ -0,0 +1,164 @@
+"""
+Unified API service for AletheiaCodex.
+
+Serves the Graph, Notes, Review and Retrieval APIs from one process, so a
+single warm instance handles the whole web client with one Firebase Admin
+app, one Firestore client, one Neo4j HTTP session and secret cache, and one
+warm-up, instead of a cold start per API.
+
+Each API's main.py is loaded unchanged from its function directory and its
+authenticated entry point is mounted under its first path segment:
+
+    /graph/...      graph/main.py        graph_function
+    /notes/...      notes_api/main.py    notes_api
+    /review/...     review_api/main.py   handle_request
+    /retrieval/...  retrieval/main.py    main
+
+A leading /api (added by the Firebase Hosting rewrites) is stripped. The
+per-function entry points keep working; the unauthenticated worker entry
+points (Cloud Tasks workers, archive compaction) are not mounted and stay
+separate functions.
+
+Entry points:
+    service: HTTP function for Cloud Functions (gen2)
+    app: Flask WSGI app (e.g. `gunicorn main:app` on Cloud Run)
+
+Configuration (environment):
+    SERVICE_API_DIR: Directory containing the API function directories
+        (default: the parent of this function's directory)
+    SERVICE_APIS: Comma-separated APIs to mount (default: all)
+"""
+
+import functions_framework
+import flask
+from flask import Request, jsonify
+import importlib.util
+import os
+import sys
+from typing import Callable, Dict
+
+# Add shared directory to path
+sys.path.append('/workspace')
+
+from shared.utils.logging import get_logger
+from shared.utils.warmup import WARMUP_FIREBASE, WARMUP_FIRESTORE, WARMUP_NEO4J, start_warmup
+
+logger = get_logger(__name__)
+
+PROJECT_ID = os.environ.get('GCP_PROJECT', 'aletheia-codex-prod')
+
+SERVICE_API_DIR = os.environ.get(
+    'SERVICE_API_DIR',
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+)
+
+# Path prefix added by the Firebase Hosting rewrites (/api/review/** etc.)
+HOSTING_PREFIX = 'api'
+
+# Mountable APIs: path segment -> (function directory, entry point)
+APIS = {
+    'graph': ('graph', 'graph_function'),
+    'notes': ('notes_api', 'notes_api'),
+    'review': ('review_api', 'handle_request'),
+    'retrieval': ('retrieval', 'main'),
+}
+
+SERVICE_APIS = [
+    name.strip()
+    for name in os.environ.get('SERVICE_APIS', ','.join(APIS)).split(',')
+    if name.strip()
+]
+
+# One warm-up for every mounted API. Started before the APIs are imported:
+# the first start_warmup() in a process wins, so their own calls reuse it.
+start_warmup([WARMUP_FIREBASE, WARMUP_FIRESTORE, WARMUP_NEO4J], PROJECT_ID)
+
+
+def load_api(name: str) -> Callable[[Request], object]:
+    """
+    Import an API's main.py and get its entry point.
+    
+    The module is registered as "<directory>_main" so the APIs do not
+    collide on "main"; they all import the same `shared` package.
+    
+    Args:
+        name: API name (key of APIS)
+    
+    Returns:
+        The API's HTTP entry point
+    
+    Raises:
+        ValueError: If the API name is unknown
+    """
+    if name not in APIS:
+        raise ValueError(f"Unknown API: {name} (expected one of {', '.join(APIS)})")
+    
+    directory, entry_point = APIS[name]
+    module_name = f"{directory}_main"
+    module = sys.modules.get(module_name)
+    if module is None:
+        path = os.path.join(SERVICE_API_DIR, directory, 'main.py')
+        spec = importlib.util.spec_from_file_location(module_name, path)
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[module_name] = module
+        try:
+            spec.loader.exec_module(module)
+        except Exception:
+            del sys.modules[module_name]
+            raise
+    
+    logger.info(f"Mounted {name} API from {directory}/main.py")
+    return getattr(module, entry_point)
+
+
+# Imported once at startup, like a single-API function imports its routes
+_handlers: Dict[str, Callable[[Request], object]] = {name: load_api(name) for name in SERVICE_APIS}
+
+
+def _strip_hosting_prefix(request: Request) -> Request:
+    """Get a request for the same call with the /api prefix moved out of the path."""
+    environ = dict(request.environ)
+    environ['SCRIPT_NAME'] = environ.get('SCRIPT_NAME', '') + '/' + HOSTING_PREFIX
+    environ['PATH_INFO'] = request.path[len(HOSTING_PREFIX) + 1:]
+    return Request(environ)
+
+
+def dispatch(request: Request):
+    """
+    Route a request to the API mounted under its first path segment.
+    
+    Args:
+        request: Incoming request
+    
+    Returns:
+        The API's response, or 404 if no API is mounted there
+    """
+    segments = [segment for segment in request.path.split('/') if segment]
+    if segments and segments[0] == HOSTING_PREFIX:
+        segments = segments[1:]
+        request = _strip_hosting_prefix(request)
+    
+    if not segments:
+        return jsonify({'status': 'ok', 'apis': sorted(_handlers)})
+    
+    handler = _handlers.get(segments[0])
+    if handler is None:
+        return jsonify({'error': f'Not found: /{segments[0]}'}), 404
+    
+    return handler(request)
+
+
+@functions_framework.http
+def service(request: Request):
+    """Main entry point for the unified API service."""
+    return dispatch(request)
+
+
+# WSGI app for running the service outside Cloud Functions
+app = flask.Flask(__name__)
+
+
+@app.route('/', defaults={'path': ''}, methods=['GET', 'POST', 'PUT', 'DELETE', 'OPTIONS'])
+@app.route('/<path:path>', methods=['GET', 'POST', 'PUT', 'DELETE', 'OPTIONS'])
+def _wsgi_route(path: str):
+    return dispatch(flask.request)
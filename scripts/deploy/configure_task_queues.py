@@ -0,0 +1,46 @@
+"""
+Create or update the Cloud Tasks queues used by the note processing queue.
+
+Applies each processing lane's concurrency and dispatch rate limits
+(shared/utils/processing_queue.py DEFAULT_LANES) to its Cloud Tasks queue,
+creating the queue if it does not exist. The local backend enforces the
+same limits in-process, so both backends behave alike.
+
+Run from the repository root after deploying the orchestration worker:
+
+Usage:
+    python scripts/deploy/configure_task_queues.py
+    python scripts/deploy/configure_task_queues.py --project aletheia-codex-prod --location us-central1
+"""
+
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from shared.utils.processing_queue import DEFAULT_LANES
+from shared.utils.task_queue import CloudTasksQueue
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Apply processing lane limits to their Cloud Tasks queues")
+    parser.add_argument("--project", default=os.environ.get("GCP_PROJECT", "aletheia-codex-prod"))
+    parser.add_argument("--location", default=os.environ.get("TASK_QUEUE_LOCATION", "us-central1"))
+    parser.add_argument(
+        "--queue",
+        default=os.environ.get("NOTE_PROCESSING_QUEUE", "note-processing"),
+        help="Processing queue name prefix (lane queues are <queue>-<lane>)"
+    )
+    args = parser.parse_args()
+    
+    for lane, config in DEFAULT_LANES.items():
+        name = f"{args.queue}-{lane}"
+        # The worker URL is only used when enqueueing
+        queue = CloudTasksQueue(name, worker_url="", project_id=args.project, location=args.location)
+        queue.configure(config.max_concurrency, config.max_dispatches_per_second)
+        print(f"{name}: {config.max_concurrency} concurrent, {config.max_dispatches_per_second}/s")
+
+
+if __name__ == "__main__":
+    main()
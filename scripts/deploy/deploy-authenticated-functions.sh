@@ -5,6 +5,9 @@
 PROJECT_ID="aletheia-codex-prod"
 REGION="us-central1"
 
+# Requests served concurrently per instance (needs at least 1 vCPU)
+CONCURRENCY="${CONCURRENCY:-8}"
+
 echo "=========================================="
 echo "Deploying Authenticated Cloud Functions"
 echo "Project: $PROJECT_ID"
@@ -70,6 +73,8 @@ if echo "N" | gcloud functions deploy notes-api-function \
   --service-account=aletheia-functions@${PROJECT_ID}.iam.gserviceaccount.com \
   --set-env-vars GCP_PROJECT=$PROJECT_ID \
   --memory=512MB \
+  --cpu=1 \
+  --concurrency=$CONCURRENCY \
   --timeout=60s; then
     echo "✓ Notes API deployed successfully"
     grant_invoker_permissions "notes-api-function"
@@ -98,6 +103,8 @@ if echo "N" | gcloud functions deploy review-api-function \
   --service-account=aletheia-functions@${PROJECT_ID}.iam.gserviceaccount.com \
   --set-env-vars GCP_PROJECT=$PROJECT_ID \
   --memory=512MB \
+  --cpu=1 \
+  --concurrency=$CONCURRENCY \
   --timeout=60s; then
     echo "✓ Review API deployed successfully"
     grant_invoker_permissions "review-api-function"
@@ -126,6 +133,8 @@ if echo "N" | gcloud functions deploy graph-function \
   --service-account=aletheia-functions@${PROJECT_ID}.iam.gserviceaccount.com \
   --set-env-vars GCP_PROJECT=$PROJECT_ID \
   --memory=512MB \
+  --cpu=1 \
+  --concurrency=$CONCURRENCY \
   --timeout=60s; then
     echo "✓ Graph API deployed successfully"
     grant_invoker_permissions "graph-function"
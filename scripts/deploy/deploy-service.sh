@@ -0,0 +1,52 @@
+#!/bin/bash
+# Deploy the unified API service (Graph, Notes, Review and Retrieval APIs
+# in one function). The per-API functions can stay deployed alongside it.
+
+set -e
+
+PROJECT_ID="aletheia-codex-prod"
+REGION="us-central1"
+
+# Requests served concurrently per instance (needs at least 1 vCPU)
+CONCURRENCY="${CONCURRENCY:-16}"
+
+REPO_DIR="$( cd "$( dirname "${BASH_SOURCE[0]}" )/../.." && pwd )"
+STAGE_DIR=$(mktemp -d)
+trap 'rm -rf "$STAGE_DIR"' EXIT
+
+echo "=========================================="
+echo "Deploying Unified API Service"
+echo "Project: $PROJECT_ID"
+echo "Region: $REGION"
+echo "=========================================="
+
+# Stage the service with one copy of shared/ and each API's main.py
+echo "Staging service in $STAGE_DIR..."
+cp "$REPO_DIR/functions/service/main.py" "$REPO_DIR/functions/service/requirements.txt" "$STAGE_DIR/"
+cp -r "$REPO_DIR/shared" "$STAGE_DIR/"
+for api in graph notes_api review_api retrieval; do
+    mkdir -p "$STAGE_DIR/apis/$api"
+    cp "$REPO_DIR/functions/$api/main.py" "$STAGE_DIR/apis/$api/"
+done
+
+cd "$STAGE_DIR"
+
+gcloud functions deploy api-service \
+  --gen2 \
+  --runtime=python311 \
+  --region=$REGION \
+  --source=. \
+  --entry-point=service \
+  --trigger-http \
+  --service-account=aletheia-functions@${PROJECT_ID}.iam.gserviceaccount.com \
+  --set-env-vars GCP_PROJECT=$PROJECT_ID,SERVICE_API_DIR=/workspace/apis \
+  --memory=1GB \
+  --cpu=1 \
+  --concurrency=$CONCURRENCY \
+  --timeout=300s
+
+echo ""
+echo "Service URL:"
+gcloud functions describe api-service --region=$REGION --gen2 --format='value(serviceConfig.uri)'
+echo ""
+echo "Routes: /graph, /notes, /review, /retrieval (also under /api/...)"
@@ -20,6 +20,11 @@ gcloud functions deploy orchestrate \
     --set-env-vars GCP_PROJECT=aletheia-codex-prod \
     --allow-unauthenticated
 
+# Apply the processing lanes' concurrency and rate limits to their Cloud Tasks queues
+cd ../..
+python scripts/deploy/configure_task_queues.py --project aletheia-codex-prod --location us-central1
+cd functions/orchestration
+
 echo "Deployment complete!"
 echo ""
 echo "Verifying deployment..."
@@ -0,0 +1,84 @@
+"""
+Tests for the unified API service.
+"""
+
+import pytest
+import importlib.util
+import os
+from flask import jsonify
+
+# Mount nothing at import; tests install their own handlers
+os.environ['SERVICE_APIS'] = ''
+
+SERVICE_MAIN = os.path.join(os.path.dirname(__file__), '..', '..', '..', 'functions', 'service', 'main.py')
+
+
+@pytest.fixture(scope='module')
+def service():
+    """Import the service entry point module."""
+    spec = importlib.util.spec_from_file_location('service_main', SERVICE_MAIN)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest.fixture
+def client(service, monkeypatch):
+    """Test client with echoing review and graph handlers mounted."""
+    def echo(name):
+        def handler(request):
+            return jsonify({
+                'api': name,
+                'path': request.path,
+                'body': request.get_json(silent=True)
+            })
+        return handler
+    
+    monkeypatch.setattr(service, '_handlers', {'review': echo('review'), 'graph': echo('graph')})
+    service.app.config['TESTING'] = True
+    return service.app.test_client()
+
+
+class TestDispatch:
+    """Test suite for routing requests to mounted APIs."""
+    
+    def test_routes_by_first_segment(self, client):
+        """Test each API receives its own paths unchanged."""
+        review = client.get('/review/pending').get_json()
+        graph = client.get('/graph?nodeId=abc').get_json()
+        
+        assert review['api'] == 'review'
+        assert review['path'] == '/review/pending'
+        assert graph['api'] == 'graph'
+    
+    def test_hosting_prefix_stripped(self, client):
+        """Test /api/... rewrites reach the API without the prefix, body intact."""
+        response = client.post('/api/review/approve', json={'item_id': 'item-1'}).get_json()
+        
+        assert response['path'] == '/review/approve'
+        assert response['body'] == {'item_id': 'item-1'}
+    
+    def test_unknown_api(self, client):
+        """Test paths outside the mounted APIs are 404s."""
+        assert client.get('/notes').status_code == 404
+        assert client.get('/').get_json() == {'status': 'ok', 'apis': ['graph', 'review']}
+
+
+class TestLoadApi:
+    """Test suite for loading API modules."""
+    
+    def test_unknown_api_rejected(self, service):
+        """Test only known APIs can be mounted."""
+        with pytest.raises(ValueError):
+            service.load_api('orchestration')
+    
+    def test_loads_entry_point(self, service):
+        """Test an API's main.py is imported under its own module name."""
+        handler = service.load_api('retrieval')
+        
+        assert handler.__module__ == 'retrieval_main'
+        assert handler(None) == ({"status": "ok", "function": "retrieval"}, 200)
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,200 @@
+"""
+Tests for background batch jobs.
+"""
+
+import pytest
+import os
+from datetime import datetime, timedelta
+from unittest.mock import patch, MagicMock
+
+# Set environment variable before importing
+os.environ['GOOGLE_APPLICATION_CREDENTIALS'] = '/workspace/aletheia-codex-prod-af9a64a7fcaa.json'
+
+from shared.review.batch_jobs import BatchJob, BatchJobStatus, BatchJobManager
+from shared.review.batch_processor import BatchResult, BatchOperationType
+from shared.models.review_item import ReviewItem, ReviewItemType, ReviewItemStatus
+
+
+def make_result(item_ids, failed_ids=()):
+    """Build a BatchResult for a processed chunk."""
+    now = datetime.utcnow()
+    return BatchResult(
+        total_items=len(item_ids),
+        successful=[i for i in item_ids if i not in failed_ids],
+        failed=[{'item_id': i, 'error': 'boom', 'error_type': 'exception'} for i in item_ids if i in failed_ids],
+        operation_type=BatchOperationType.APPROVE,
+        started_at=now,
+        completed_at=now,
+        duration_seconds=0.0
+    )
+
+
+@pytest.fixture
+def job_manager():
+    """Create batch job manager with mocked Firestore and batch processor."""
+    with patch('shared.review.batch_jobs.get_firestore_client') as mock_db, \
+            patch('shared.review.batch_jobs.firestore.transactional', lambda func: func):
+        db = MagicMock()
+        mock_db.return_value = db
+        
+        processor = MagicMock()
+        processor.max_batch_size = 2
+        
+        manager = BatchJobManager(project_id="test-project", batch_processor=processor)
+        yield manager, processor, db
+
+
+class TestBatchJob:
+    """Test suite for the BatchJob model."""
+    
+    def test_round_trip(self):
+        """Test converting a job to and from a dictionary."""
+        job = BatchJob(
+            id="job-1",
+            user_id="test-user",
+            operation_type=BatchOperationType.REJECT,
+            item_ids=["a", "b"],
+            reason="noise",
+            total_items=2,
+            created_at=datetime.utcnow()
+        )
+        
+        restored = BatchJob.from_dict(job.to_dict())
+        
+        assert restored == job
+    
+    def test_status_dict_hides_checkpoint(self):
+        """Test status representation omits checkpoint fields."""
+        job = BatchJob(
+            user_id="test-user",
+            operation_type=BatchOperationType.APPROVE,
+            item_ids=["a", "b", "c", "d"],
+            total_items=4,
+            processed_count=1
+        )
+        
+        data = job.to_status_dict()
+        
+        assert 'item_ids' not in data
+        assert 'cursor' not in data
+        assert data['progress'] == 25.0
+
+
+class TestBatchJobManager:
+    """Test suite for BatchJobManager."""
+    
+    def test_create_job_requires_target(self, job_manager):
+        """Test creating a job without item IDs or selector raises error."""
+        manager, _, _ = job_manager
+        with pytest.raises(ValueError, match="Either item_ids or a selector"):
+            manager.create_job("test-user", BatchOperationType.APPROVE)
+    
+    def test_create_job_dedupes_item_ids(self, job_manager):
+        """Test explicit item IDs are de-duplicated."""
+        manager, _, db = job_manager
+        db.collection.return_value.document.return_value.id = "job-1"
+        
+        job = manager.create_job("test-user", BatchOperationType.APPROVE, item_ids=["a", "b", "a"])
+        
+        assert job.item_ids == ["a", "b"]
+        assert job.total_items == 2
+        db.collection.return_value.document.return_value.set.assert_called_once()
+    
+    def test_item_id_job_processes_in_chunks(self, job_manager):
+        """Test an item ID job is processed chunk by chunk to completion."""
+        manager, processor, _ = job_manager
+        processor.batch_approve.side_effect = lambda ids, user_id: make_result(ids, failed_ids={"c"})
+        job = BatchJob(
+            id="job-1",
+            user_id="test-user",
+            operation_type=BatchOperationType.APPROVE,
+            item_ids=["a", "b", "c"],
+            total_items=3
+        )
+        
+        manager._process_chunk(job)
+        assert job.position == 2
+        assert job.status == BatchJobStatus.QUEUED
+        
+        manager._process_chunk(job)
+        assert job.status == BatchJobStatus.COMPLETED
+        assert job.successful_count == 2
+        assert job.failed_count == 1
+        assert job.failed[0]['item_id'] == "c"
+    
+    def test_selector_job_follows_cursor(self, job_manager):
+        """Test a selector job pages through pending items using the queue cursor."""
+        manager, processor, _ = job_manager
+        processor.batch_reject.side_effect = lambda ids, user_id, reason: make_result(ids)
+        
+        item = ReviewItem(
+            id="a",
+            user_id="test-user",
+            type=ReviewItemType.ENTITY,
+            status=ReviewItemStatus.PENDING,
+            confidence=0.95,
+            source_document_id="doc-1",
+            entity={'name': 'Acme', 'type': 'Organization'}
+        )
+        manager.queue_manager.get_pending_page.side_effect = [([item], "cursor-1"), ([], None)]
+        job = BatchJob(
+            id="job-1",
+            user_id="test-user",
+            operation_type=BatchOperationType.REJECT,
+            selector={'min_confidence': 0.9, 'type': None},
+            reason="duplicate"
+        )
+        
+        manager._process_chunk(job)
+        assert job.cursor == "cursor-1"
+        assert job.processed_count == 1
+        
+        manager._process_chunk(job)
+        assert job.status == BatchJobStatus.COMPLETED
+        second_call = manager.queue_manager.get_pending_page.call_args_list[1]
+        assert second_call.kwargs['start_after'] == "cursor-1"
+    
+    def test_stalled_job_is_redriven_once(self, job_manager):
+        """Test a job left running by a lost worker is re-driven after its lease expires."""
+        manager, _, db = job_manager
+        doc_ref = db.collection.return_value.document.return_value
+        transaction = db.transaction.return_value
+        stalled_at = datetime.utcnow() - timedelta(minutes=10)
+        job = BatchJob(
+            id="job-1",
+            user_id="test-user",
+            operation_type=BatchOperationType.APPROVE,
+            status=BatchJobStatus.RUNNING,
+            item_ids=["a", "b", "c"],
+            total_items=3,
+            updated_at=stalled_at
+        )
+        data = job.to_dict()
+        data['lease_expires_at'] = (stalled_at + timedelta(minutes=2)).isoformat()
+        doc_ref.get.return_value = MagicMock(exists=True, id="job-1", to_dict=MagicMock(return_value=data))
+        
+        assert manager.claim_stalled("job-1")
+        touched_at = datetime.fromisoformat(transaction.update.call_args[0][1]['updated_at'])
+        
+        data['updated_at'] = touched_at.isoformat()
+        assert not manager.claim_stalled("job-1")
+    
+    def test_leased_job_is_not_redriven(self, job_manager):
+        """Test a job whose worker still holds the lease is left alone."""
+        manager, _, db = job_manager
+        doc_ref = db.collection.return_value.document.return_value
+        job = BatchJob(
+            id="job-1",
+            user_id="test-user",
+            operation_type=BatchOperationType.APPROVE,
+            status=BatchJobStatus.RUNNING,
+            item_ids=["a"],
+            total_items=1,
+            updated_at=datetime.utcnow() - timedelta(minutes=10)
+        )
+        data = job.to_dict()
+        data['lease_expires_at'] = (datetime.utcnow() + timedelta(minutes=1)).isoformat()
+        doc_ref.get.return_value = MagicMock(exists=True, id="job-1", to_dict=MagicMock(return_value=data))
+        
+        assert not manager.claim_stalled("job-1")
+        db.transaction.return_value.update.assert_not_called()
@@ -0,0 +1,162 @@
+"""
+Tests for NDJSON bulk ingestion.
+"""
+
+import pytest
+import hashlib
+import importlib.util
+import io
+import json
+import os
+from unittest.mock import MagicMock
+
+from flask import Flask, request
+
+from shared.db.document_store import StoredContent, content_blob_name
+
+INGESTION_MAIN = os.path.join(os.path.dirname(__file__), '..', '..', '..', 'functions', 'ingestion', 'main.py')
+
+
+@pytest.fixture(scope='module')
+def ingestion():
+    """Import the ingestion entry point module."""
+    spec = importlib.util.spec_from_file_location('ingestion_main', INGESTION_MAIN)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+class FakeDocumentStore:
+    """Document store that records content hashes instead of uploading."""
+    
+    def __init__(self):
+        self.stored = set()
+    
+    def store_bytes(self, content: bytes) -> StoredContent:
+        if b"upload-fails" in content:
+            raise IOError("bucket unavailable")
+        sha256 = hashlib.sha256(content).hexdigest()
+        deduplicated = sha256 in self.stored
+        self.stored.add(sha256)
+        return StoredContent(sha256, content_blob_name(sha256), len(content), len(content) // 2, deduplicated)
+
+
+@pytest.fixture
+def bulk(ingestion, monkeypatch):
+    """Bulk endpoint over a fake store and mocked Firestore; yields (post, db)."""
+    db = MagicMock()
+    ids = iter(range(1000))
+    db.collection.return_value.document.side_effect = lambda: MagicMock(id=f"doc-{next(ids)}")
+    monkeypatch.setattr(ingestion, 'get_document_store', FakeDocumentStore)
+    monkeypatch.setattr(ingestion, 'get_firestore_client', lambda project_id: db)
+    
+    app = Flask(__name__)
+    
+    def post(lines, query_string=''):
+        """POST the lines and return (status, parsed response lines)."""
+        body = b"".join(line if isinstance(line, bytes) else json.dumps(line).encode() + b"\n" for line in lines)
+        with app.test_request_context('/?' + query_string, method='POST', data=body):
+            response = app.make_response(ingestion.ingest_bulk(request))
+            output = response.get_data()
+        return response.status_code, [json.loads(line) for line in output.splitlines()]
+    
+    yield post, db
+
+
+def doc(i, content=None):
+    """Build a document line."""
+    return {'title': f"Note {i}", 'content': content or f"Content of note {i}"}
+
+
+class TestLineParsing:
+    """Test suite for NDJSON line reading and validation."""
+    
+    def test_oversized_lines_are_skipped(self, ingestion):
+        """Test a line over the limit is reported without being buffered."""
+        stream = io.BytesIO(b'{"a": 1}\n' + b"x" * 50 + b"\n" + b'{"b": 2}')
+        
+        lines = list(ingestion.iter_ndjson_lines(stream, max_line_bytes=20))
+        
+        assert lines == [(1, b'{"a": 1}\n'), (2, None), (3, b'{"b": 2}')]
+    
+    def test_parse_bulk_line(self, ingestion):
+        """Test valid lines get defaults and invalid lines raise ValueError."""
+        record = ingestion.parse_bulk_line(b'{"title": "T", "content": "C"}')
+        assert record == {'title': "T", 'content': "C", 'source': "import", 'metadata': {}}
+        
+        for line in (b"not json", b'["a list"]', b'{"title": "T"}', b"\xff\xfe"):
+            with pytest.raises(ValueError):
+                ingestion.parse_bulk_line(line)
+
+
+class TestBulkIngestion:
+    """Test suite for the ingest_bulk endpoint."""
+    
+    def test_results_in_line_order_with_per_line_errors(self, bulk):
+        """Test each line gets a result in order and bad lines do not stop the import."""
+        post, _ = bulk
+        
+        status, results = post([
+            doc(1),
+            b"not json\n",
+            b"\n",
+            {'title': "No content"},
+            doc(5, content="upload-fails"),
+            doc(6, content="Content of note 1")
+        ])
+        
+        assert status == 200
+        *lines, summary = results
+        assert [(r['line'], r['status']) for r in lines] == [
+            (1, "ok"), (2, "error"), (4, "error"), (5, "error"), (6, "ok")
+        ]
+        assert "Invalid JSON" in lines[1]['error']
+        assert "bucket unavailable" in lines[3]['error']
+        assert lines[4]['deduplicated']
+        assert summary['summary'] == {
+            'ingested': 2, 'deduplicated': 1, 'failed': 3, 'skipped': 0, 'last_line': 6
+        }
+    
+    def test_records_committed_in_batches(self, bulk, ingestion, monkeypatch):
+        """Test document records are written in batched commits of BULK_COMMIT_SIZE."""
+        post, db = bulk
+        monkeypatch.setattr(ingestion, 'BULK_COMMIT_SIZE', 2)
+        monkeypatch.setattr(ingestion, 'BULK_UPLOAD_CONCURRENCY', 1)
+        
+        _, results = post([doc(i) for i in range(1, 6)])
+        
+        assert db.batch.return_value.commit.call_count == 3
+        assert db.batch.return_value.set.call_count == 5
+        assert results[-1]['summary']['ingested'] == 5
+    
+    def test_failed_commit_marks_lines_failed(self, bulk):
+        """Test lines whose records could not be committed are reported as errors."""
+        post, db = bulk
+        db.batch.return_value.commit.side_effect = Exception("deadline exceeded")
+        
+        _, results = post([doc(1), doc(2)])
+        
+        assert [r['status'] for r in results[:-1]] == ["error", "error"]
+        assert "deadline exceeded" in results[0]['error']
+        assert results[-1]['summary']['failed'] == 2
+    
+    def test_resume_from_start_line(self, bulk):
+        """Test start_line skips lines already reported by an interrupted import."""
+        post, _ = bulk
+        
+        _, results = post([doc(i) for i in range(1, 5)], query_string='start_line=3')
+        
+        assert [r['line'] for r in results[:-1]] == [3, 4]
+        assert results[-1]['summary']['skipped'] == 2
+        assert results[-1]['summary']['last_line'] == 4
+    
+    def test_invalid_start_line(self, bulk):
+        """Test start_line must be a positive integer."""
+        post, _ = bulk
+        
+        assert post([doc(1)], query_string='start_line=0')[0] == 400
+        assert post([doc(1)], query_string='start_line=abc')[0] == 400
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,130 @@
+"""
+Tests for the pending review item change feed.
+"""
+
+import pytest
+import os
+from unittest.mock import patch, MagicMock
+
+# Set environment variable before importing
+os.environ['GOOGLE_APPLICATION_CREDENTIALS'] = '/workspace/aletheia-codex-prod-af9a64a7fcaa.json'
+
+from shared.review.change_feed import (
+    PendingChangeFeed,
+    EVENT_ADDED,
+    EVENT_REMOVED,
+    EVENT_RESET
+)
+
+
+def make_change(change_type, item_id, confidence=0.9):
+    """Build a mock Firestore document change."""
+    change = MagicMock()
+    change.type.name = change_type
+    change.document.id = item_id
+    change.document.to_dict.return_value = {
+        'user_id': 'test-user',
+        'type': 'entity',
+        'status': 'pending',
+        'confidence': confidence,
+        'source_document_id': 'doc-1',
+        'entity': {'name': item_id, 'type': 'Concept'}
+    }
+    return change
+
+
+@pytest.fixture
+def change_feed():
+    """Create change feed with mocked Firestore; yields (feed, mocked pending query)."""
+    with patch('shared.review.change_feed.get_firestore_client') as mock_db:
+        db = MagicMock()
+        mock_db.return_value = db
+        query = db.collection.return_value.where.return_value.where.return_value
+        
+        feed = PendingChangeFeed(project_id="test-project")
+        yield feed, query
+
+
+class TestPendingChangeFeed:
+    """Test suite for PendingChangeFeed."""
+    
+    def test_subscribers_share_listener(self, change_feed):
+        """Test a user's subscribers share one Firestore listener."""
+        feed, query = change_feed
+        
+        feed.subscribe("test-user")
+        feed.subscribe("test-user")
+        
+        query.on_snapshot.assert_called_once()
+    
+    def test_new_subscriber_gets_reset_then_changes(self, change_feed):
+        """Test a fresh subscriber gets the pending set, then incremental events."""
+        feed, query = change_feed
+        subscription = feed.subscribe("test-user")
+        on_snapshot = query.on_snapshot.call_args[0][0]
+        
+        reset = subscription.get(timeout=0)
+        assert reset.type == EVENT_RESET
+        assert reset.items == []
+        
+        on_snapshot([], [make_change('ADDED', 'a')], None)
+        on_snapshot([], [make_change('REMOVED', 'a')], None)
+        
+        added = subscription.get(timeout=0)
+        removed = subscription.get(timeout=0)
+        assert added.type == EVENT_ADDED
+        assert added.item['id'] == 'a'
+        assert added.pending_count == 1
+        assert removed.type == EVENT_REMOVED
+        assert removed.pending_count == 0
+    
+    def test_resume_replays_missed_events(self, change_feed):
+        """Test resuming with a token replays only the events after it."""
+        feed, query = change_feed
+        first = feed.subscribe("test-user")
+        on_snapshot = query.on_snapshot.call_args[0][0]
+        on_snapshot([], [make_change('ADDED', 'a'), make_change('ADDED', 'b')], None)
+        
+        first.get(timeout=0)
+        token = first.get(timeout=0).token
+        first.close()
+        
+        resumed = feed.subscribe("test-user", resume_token=token)
+        event = resumed.get(timeout=0)
+        
+        assert event.type == EVENT_ADDED
+        assert event.item_id == 'b'
+        assert resumed.get(timeout=0) is None
+    
+    def test_unknown_token_gets_reset(self, change_feed):
+        """Test a token from another instance falls back to a reset."""
+        feed, query = change_feed
+        feed.subscribe("test-user")
+        on_snapshot = query.on_snapshot.call_args[0][0]
+        on_snapshot([], [make_change('ADDED', 'a')], None)
+        
+        subscription = feed.subscribe("test-user", resume_token="other-feed:1")
+        event = subscription.get(timeout=0)
+        
+        assert event.type == EVENT_RESET
+        assert [item['id'] for item in event.items] == ['a']
+    
+    def test_sse_format(self, change_feed):
+        """Test events are formatted as server-sent events."""
+        feed, _ = change_feed
+        event = feed.subscribe("test-user").get(timeout=0)
+        
+        message = event.to_sse()
+        
+        assert message.startswith(f"id: {event.token}\nevent: reset\ndata: ")
+        assert message.endswith("\n\n")
+    
+    def test_empty_user_id(self, change_feed):
+        """Test subscribing without a user ID raises error."""
+        feed, _ = change_feed
+        with pytest.raises(ValueError, match="User ID cannot be empty"):
+            feed.subscribe("")
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,64 @@
+"""
+Tests for invocation deadlines.
+"""
+
+import pytest
+
+from shared.utils.deadline import Deadline
+
+
+class FakeClock:
+    """Manually advanced monotonic clock."""
+    
+    def __init__(self):
+        self.now = 1000.0
+    
+    def __call__(self):
+        return self.now
+
+
+class TestDeadline:
+    """Test suite for Deadline."""
+    
+    def test_remaining(self):
+        """Test the remaining time counts down from the budget."""
+        clock = FakeClock()
+        deadline = Deadline(540, 60, clock=clock)
+        
+        clock.now += 100
+        
+        assert deadline.remaining() == 440
+    
+    def test_has_time_for_keeps_reserve(self):
+        """Test work only fits if it leaves the reserve untouched."""
+        clock = FakeClock()
+        deadline = Deadline(540, 60, clock=clock)
+        clock.now += 400
+        
+        assert deadline.has_time_for(80)
+        assert not deadline.has_time_for(81)
+    
+    def test_average_unit_seconds(self):
+        """Test unit durations are averaged for the next estimate."""
+        deadline = Deadline(540, 60, clock=FakeClock())
+        
+        assert deadline.average_unit_seconds == 0.0
+        
+        deadline.record_unit(20)
+        deadline.record_unit(40)
+        
+        assert deadline.average_unit_seconds == 30.0
+    
+    def test_stop_at_records_cursor(self):
+        """Test the cursor for a continuation is recorded."""
+        deadline = Deadline(540, 60, clock=FakeClock())
+        
+        assert deadline.stopped_at is None
+        
+        deadline.stop_at(12)
+        
+        assert deadline.stopped_at == 12
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,156 @@
+"""
+Tests for content-addressed document storage.
+"""
+
+import pytest
+import gzip
+import hashlib
+import io
+from unittest.mock import patch, MagicMock
+
+from google.api_core import exceptions as gcs_exceptions
+
+import shared.db.document_store as document_store
+from shared.db.document_store import STAGING_PREFIX, DocumentStore, content_blob_name
+
+
+class FakeWriter(io.BytesIO):
+    """Upload stream that saves its bytes to the bucket when closed."""
+    
+    def __init__(self, blob):
+        super().__init__()
+        self.blob = blob
+    
+    def write(self, data):
+        if self.blob.bucket.fail_writes:
+            raise gcs_exceptions.ServiceUnavailable("upload failed")
+        return super().write(data)
+    
+    def close(self):
+        # Like a resumable upload, whatever was sent before closing is stored
+        if not self.closed:
+            self.blob.bucket.blobs[self.blob.name] = self.getvalue()
+        super().close()
+
+
+class FakeBlob:
+    """In-memory stand-in for storage.Blob."""
+    
+    def __init__(self, bucket, name):
+        self.bucket = bucket
+        self.name = name
+        self.content_type = None
+        self.content_encoding = None
+    
+    def open(self, mode, chunk_size=None, ignore_flush=False):
+        return FakeWriter(self)
+    
+    def exists(self):
+        return self.name in self.bucket.blobs and self.name not in self.bucket.hidden
+    
+    def delete(self):
+        if self.name not in self.bucket.blobs:
+            raise gcs_exceptions.NotFound(self.name)
+        del self.bucket.blobs[self.name]
+
+
+class FakeBucket:
+    """In-memory stand-in for storage.Bucket."""
+    
+    def __init__(self):
+        self.blobs = {}
+        self.hidden = set()
+        self.fail_writes = False
+    
+    def blob(self, name):
+        return FakeBlob(self, name)
+    
+    def copy_blob(self, blob, destination_bucket, new_name, if_generation_match=None):
+        if if_generation_match == 0 and new_name in destination_bucket.blobs:
+            raise gcs_exceptions.PreconditionFailed(new_name)
+        destination_bucket.blobs[new_name] = self.blobs[blob.name]
+    
+    def staging_blobs(self):
+        return [name for name in self.blobs if name.startswith(STAGING_PREFIX)]
+
+
+@pytest.fixture
+def store():
+    """Create a document store over an in-memory bucket; yields (store, bucket)."""
+    bucket = FakeBucket()
+    client = MagicMock()
+    client.bucket.return_value = bucket
+    with patch('shared.db.document_store.get_storage_client', return_value=client):
+        yield DocumentStore("test-bucket", project_id="test-project", max_size=1024 * 1024), bucket
+
+
+class TestDocumentStore:
+    """Test suite for DocumentStore."""
+    
+    def test_gzip_round_trip(self, store, monkeypatch):
+        """Test content streamed in several chunks is stored as gzip under its hash."""
+        doc_store, bucket = store
+        monkeypatch.setattr(document_store, 'READ_CHUNK_SIZE', 1000)
+        content = "".join(f"Line {i}: Ada Lovelace wrote the first program.\n" for i in range(500)).encode()
+        
+        stored = doc_store.store_bytes(content)
+        
+        sha256 = hashlib.sha256(content).hexdigest()
+        assert stored.sha256 == sha256
+        assert stored.blob_name == content_blob_name(sha256)
+        assert stored.size == len(content)
+        assert stored.compressed_size == len(bucket.blobs[stored.blob_name])
+        assert gzip.decompress(bucket.blobs[stored.blob_name]) == content
+        assert not stored.deduplicated
+        assert bucket.staging_blobs() == []
+    
+    def test_identical_content_is_deduplicated(self, store):
+        """Test a second upload of the same content reuses the stored blob."""
+        doc_store, bucket = store
+        
+        first = doc_store.store_bytes(b"Ada Lovelace")
+        second = doc_store.store_bytes(b"Ada Lovelace")
+        
+        assert second.deduplicated
+        assert second.blob_name == first.blob_name
+        assert list(bucket.blobs) == [first.blob_name]
+    
+    def test_concurrent_upload_conflict_is_deduplicated(self, store):
+        """Test losing the if_generation_match=0 race counts as deduplicated."""
+        doc_store, bucket = store
+        stored = doc_store.store_bytes(b"Ada Lovelace")
+        original = bucket.blobs[stored.blob_name]
+        # The other upload lands between the exists() check and the copy
+        bucket.hidden.add(stored.blob_name)
+        
+        again = doc_store.store_bytes(b"Ada Lovelace")
+        
+        assert again.deduplicated
+        assert bucket.blobs[stored.blob_name] is original
+        assert bucket.staging_blobs() == []
+    
+    def test_failed_upload_removes_staging_blob(self, store):
+        """Test a failed upload does not leave a staging blob behind."""
+        doc_store, bucket = store
+        bucket.fail_writes = True
+        
+        with pytest.raises(gcs_exceptions.ServiceUnavailable):
+            doc_store.store_bytes(b"Ada Lovelace")
+        
+        assert bucket.blobs == {}
+    
+    def test_rejected_content_removes_staging_blob(self, store):
+        """Test oversized and empty content is rejected without leaving blobs."""
+        doc_store, bucket = store
+        doc_store.max_size = 10
+        
+        with pytest.raises(ValueError, match="maximum size"):
+            doc_store.store_bytes(b"x" * 1000)
+        with pytest.raises(ValueError, match="empty"):
+            doc_store.store_bytes(b"")
+        
+        assert bucket.blobs == {}
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
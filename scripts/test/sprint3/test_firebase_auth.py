@@ -0,0 +1,79 @@
+"""
+Tests for the verified Firebase ID token cache.
+"""
+
+import pytest
+import time
+from unittest.mock import MagicMock
+
+import shared.auth.firebase_auth as firebase_auth
+from shared.auth.firebase_auth import clear_token_cache, verify_firebase_token
+
+
+@pytest.fixture
+def verify_id_token(monkeypatch):
+    """Fake Admin SDK whose tokens expire after an hour."""
+    fake_auth = MagicMock()
+    fake_auth.InvalidIdTokenError = type('InvalidIdTokenError', (Exception,), {})
+    fake_auth.ExpiredIdTokenError = type('ExpiredIdTokenError', (Exception,), {})
+    fake_auth.verify_id_token.side_effect = lambda token: {
+        'uid': f"user-{token}",
+        'exp': time.time() + 3600
+    }
+    monkeypatch.setattr(firebase_auth, 'auth', fake_auth)
+    monkeypatch.setattr(firebase_auth, '_initialize_firebase', lambda: None)
+    monkeypatch.setattr(firebase_auth, 'start_key_refresh', lambda: True)
+    clear_token_cache()
+    yield fake_auth.verify_id_token
+    clear_token_cache()
+
+
+class TestTokenCache:
+    """Test suite for verify_firebase_token caching."""
+    
+    def test_repeat_token_served_from_cache(self, verify_id_token):
+        """Test a token is verified once and then looked up."""
+        first = verify_firebase_token("token-a")
+        second = verify_firebase_token("token-a")
+        
+        assert first['uid'] == second['uid'] == "user-token-a"
+        assert verify_id_token.call_count == 1
+        assert "token-a" not in str(list(firebase_auth._token_cache))
+    
+    def test_expired_token_verified_again(self, verify_id_token):
+        """Test a cached token is dropped at its exp claim."""
+        verify_id_token.side_effect = lambda token: {'uid': "user-1", 'exp': time.time() - 1}
+        
+        verify_firebase_token("token-a")
+        verify_firebase_token("token-a")
+        
+        assert verify_id_token.call_count == 2
+    
+    def test_cache_bounded(self, verify_id_token, monkeypatch):
+        """Test the least recently used token is evicted at capacity."""
+        monkeypatch.setattr(firebase_auth, 'ID_TOKEN_CACHE_SIZE', 2)
+        
+        verify_firebase_token("token-a")
+        verify_firebase_token("token-b")
+        verify_firebase_token("token-a")
+        verify_firebase_token("token-c")
+        verify_firebase_token("token-a")
+        verify_firebase_token("token-b")
+        
+        assert [call.args[0] for call in verify_id_token.call_args_list] == [
+            "token-a", "token-b", "token-c", "token-b"
+        ]
+    
+    def test_invalid_token_not_cached(self, verify_id_token):
+        """Test failed verifications are never cached."""
+        verify_id_token.side_effect = firebase_auth.auth.InvalidIdTokenError("bad signature")
+        
+        for _ in range(2):
+            with pytest.raises(Exception, match="Invalid authentication token"):
+                verify_firebase_token("token-a")
+        
+        assert verify_id_token.call_count == 2
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,66 @@
+"""
+Tests for relationship type handling in the graph populator.
+"""
+
+import pytest
+import asyncio
+from unittest.mock import patch, AsyncMock
+
+from shared.db.graph_populator import GraphPopulator
+from shared.db.graph_queries import build_create_relationship_query
+from shared.models.relationship import Relationship
+
+
+@pytest.fixture
+def populator():
+    """Graph populator with Neo4j mocked; yields (populator, execute_query)."""
+    populator = GraphPopulator(project_id="test-project")
+    with patch.object(GraphPopulator, 'ensure_user_exists', AsyncMock(return_value={})), \
+         patch('shared.db.graph_populator.execute_query', return_value=[]) as execute_query:
+        yield populator, execute_query
+
+
+def create(populator, relationship_type):
+    """Create a relationship of the given type and return (query, properties)."""
+    populator, execute_query = populator
+    relationship = Relationship(
+        source_entity="Ada Lovelace",
+        target_entity="Analytical Engine",
+        relationship_type=relationship_type,
+        properties={'year': 1843},
+        user_id="user-1"
+    )
+    
+    asyncio.run(populator.create_relationship(relationship))
+    
+    query, params = execute_query.call_args[0][:2]
+    return query, params['properties']
+
+
+class TestRelationshipTypes:
+    """Test suite for GraphPopulator.create_relationship type mapping."""
+    
+    def test_valid_type_is_kept(self, populator):
+        """Test a standard type uses its own statement without an original_type."""
+        query, properties = create(populator, "WORKS_AT")
+        
+        assert query is build_create_relationship_query("WORKS_AT")
+        assert properties == {'year': 1843}
+    
+    def test_alias_is_normalized(self, populator):
+        """Test an alias is stored under its standard type, not RELATED_TO."""
+        query, properties = create(populator, "employed by")
+        
+        assert query is build_create_relationship_query("WORKS_AT")
+        assert properties == {'year': 1843}
+    
+    def test_unknown_type_falls_back_to_related_to(self, populator):
+        """Test a custom type is stored as RELATED_TO with its original type."""
+        query, properties = create(populator, "FOUNDED_IN")
+        
+        assert query is build_create_relationship_query("RELATED_TO")
+        assert properties == {'year': 1843, 'original_type': "FOUNDED_IN"}
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,49 @@
+"""
+Tests for the pre-rendered Cypher query catalog.
+"""
+
+import pytest
+
+from shared.db.graph_queries import (
+    CREATE_ENTITY_NODE,
+    CREATE_RELATIONSHIP_QUERIES,
+    QueryCatalog,
+    build_create_entity_query,
+    build_create_relationship_query
+)
+from shared.models.entity import VALID_ENTITY_TYPES
+
+
+class TestQueryCatalog:
+    """Test suite for QueryCatalog."""
+    
+    def test_one_stable_statement_per_label(self):
+        """Test every whitelisted label has one fixed statement."""
+        for entity_type in VALID_ENTITY_TYPES:
+            query = build_create_entity_query(entity_type)
+            
+            assert f"(e:{entity_type} {{name: $name}})" in query
+            assert "{entity_type}" not in query
+            assert build_create_entity_query(entity_type) is query
+    
+    def test_rejects_unlisted_types(self):
+        """Test values outside the whitelist are never spliced into Cypher."""
+        with pytest.raises(ValueError):
+            build_create_entity_query("Person {name: 'x'}) DETACH DELETE (e")
+        
+        with pytest.raises(ValueError):
+            build_create_relationship_query("FOUNDED_IN")
+        
+        assert "WORKS_AT" in CREATE_RELATIONSHIP_QUERIES.allowed
+    
+    def test_validates_whitelist(self):
+        """Test the catalog refuses to render non-identifier values."""
+        with pytest.raises(ValueError):
+            QueryCatalog(CREATE_ENTITY_NODE, "entity_type", ["Person", "Bad Label"])
+        
+        with pytest.raises(ValueError):
+            QueryCatalog("MATCH (n) RETURN n", "entity_type", ["Person"])
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
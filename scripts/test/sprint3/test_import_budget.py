@@ -0,0 +1,89 @@
+"""
+Cold-start import budget tests for function entry points.
+
+Each entry point is staged with the root shared/ package, as the deploy
+scripts do, and its main module imported in a fresh interpreter; its
+cumulative import time compared with the budget recorded in
+scripts/utils/import_budgets.json. Re-record budgets after an intentional
+change with `python scripts/utils/profile_imports.py --record`.
+"""
+
+import pytest
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", "utils"))
+
+from profile_imports import (
+    ENTRY_POINTS,
+    ImportProfileError,
+    load_budgets,
+    parse_importtime,
+    profile_entry_point
+)
+
+from shared.utils.lazy_import import lazy_import, is_loaded
+
+
+SAMPLE_IMPORTTIME = """import time: self [us] | cumulative | imported package
+import time:       500 |        500 |     google.cloud.firestore_v1
+import time:      1000 |       1500 |   google.cloud.firestore
+import time:       200 |        200 |   shared.utils.logging
+import time:       300 |       2000 | main
+"""
+
+
+class TestImportProfiler:
+    """Test suite for the import-time profiler."""
+    
+    def test_parse_importtime(self):
+        """Test importtime output is aggregated by module and top-level package."""
+        profile = parse_importtime(SAMPLE_IMPORTTIME, "test")
+        
+        assert profile.total_ms == 2.0
+        assert profile.packages == {'google': 1.5, 'shared': 0.2, 'main': 0.3}
+        assert profile.top_modules(1) == [('google.cloud.firestore', 1.0)]
+
+
+class TestLazyImport:
+    """Test suite for lazy SDK imports."""
+    
+    def test_import_deferred_until_attribute_access(self):
+        """Test a lazy module is only imported when first used."""
+        sys.modules.pop('colorsys', None)
+        module = lazy_import('colorsys')
+        
+        assert not is_loaded(module)
+        assert 'colorsys' not in sys.modules
+        
+        assert module.rgb_to_hsv(0, 0, 0) == (0.0, 0.0, 0.0)
+        assert is_loaded(module)
+    
+    def test_loaded_module_returned_directly(self):
+        """Test an already imported module is returned as is."""
+        assert lazy_import('os') is os
+
+
+@pytest.mark.parametrize("entry_point", ENTRY_POINTS)
+def test_entry_point_import_budget(entry_point):
+    """Test an entry point's cold import stays within its recorded budget."""
+    budget = load_budgets().get(entry_point)
+    if budget is None:
+        pytest.skip(f"No import budget recorded for {entry_point}")
+    
+    try:
+        profile = profile_entry_point(entry_point)
+    except ImportProfileError as e:
+        if e.missing_dependency:
+            pytest.skip(f"{entry_point} dependencies are not installed: {e}")
+        raise
+    
+    slowest = ", ".join(f"{name} {ms:.0f} ms" for name, ms in profile.top_packages(5))
+    assert profile.total_ms <= budget, (
+        f"{entry_point} cold import took {profile.total_ms:.0f} ms (budget {budget} ms); "
+        f"slowest packages: {slowest}"
+    )
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
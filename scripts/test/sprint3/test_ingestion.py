@@ -0,0 +1,155 @@
+"""
+Tests for single document ingestion (streamed multipart uploads).
+"""
+
+import pytest
+import importlib.util
+import io
+import os
+from unittest.mock import MagicMock
+
+from flask import Flask, request
+
+from shared.db.document_store import StoredContent
+
+INGESTION_MAIN = os.path.join(os.path.dirname(__file__), '..', '..', '..', 'functions', 'ingestion', 'main.py')
+
+BOUNDARY = "test-boundary"
+
+
+@pytest.fixture(scope='module')
+def ingestion():
+    """Import the ingestion entry point module."""
+    spec = importlib.util.spec_from_file_location('ingestion_main', INGESTION_MAIN)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def multipart_body(*parts):
+    """Build a multipart/form-data body from (name, value, filename) parts."""
+    body = b""
+    for name, value, filename in parts:
+        disposition = f'form-data; name="{name}"'
+        if filename:
+            disposition += f'; filename="{filename}"\r\nContent-Type: text/markdown'
+        body += f"--{BOUNDARY}\r\nContent-Disposition: {disposition}\r\n\r\n".encode() + value + b"\r\n"
+    return body + f"--{BOUNDARY}--\r\n".encode()
+
+
+class RecordingStream(io.BytesIO):
+    """Request stream that records the largest read."""
+    
+    def __init__(self, data):
+        super().__init__(data)
+        self.largest_read = 0
+    
+    def read(self, size=-1):
+        self.largest_read = max(self.largest_read, size)
+        return super().read(size)
+
+
+class FakeDocumentStore:
+    """Document store that reads uploads in chunks and keeps the content."""
+    
+    def __init__(self):
+        self.content = None
+        self.content_type = None
+    
+    def store_stream(self, stream, content_type):
+        chunks = []
+        while True:
+            chunk = stream.read(1000)
+            if not chunk:
+                break
+            chunks.append(chunk)
+        self.content = b"".join(chunks)
+        self.content_type = content_type
+        return StoredContent("sha", "documents/sha.gz", len(self.content), len(self.content), False)
+
+
+@pytest.fixture
+def ingest(ingestion, monkeypatch):
+    """Ingest endpoint over a fake store and mocked Firestore; yields (post, store, db)."""
+    store = FakeDocumentStore()
+    db = MagicMock()
+    db.collection.return_value.document.return_value.id = "doc-1"
+    monkeypatch.setattr(ingestion, 'get_document_store', lambda: store)
+    monkeypatch.setattr(ingestion, 'get_firestore_client', lambda project_id: db)
+    
+    app = Flask(__name__)
+    
+    def post(body):
+        """POST a multipart body and return (status, JSON response)."""
+        content_type = f"multipart/form-data; boundary={BOUNDARY}"
+        with app.test_request_context('/', method='POST', data=body, content_type=content_type):
+            response = app.make_response(ingestion.ingest_document.__wrapped__(request))
+        return response.status_code, response.get_json()
+    
+    yield post, store, db
+
+
+class TestMultipartUpload:
+    """Test suite for the incremental multipart reader."""
+    
+    def test_file_is_read_incrementally(self, ingestion):
+        """Test the file part is returned in bounded reads with fields on either side."""
+        content = b"Ada Lovelace wrote the first program.\n" * 10000
+        stream = RecordingStream(multipart_body(
+            ("title", b"Notes", None),
+            ("file", content, "notes.md"),
+            ("source", b"upload", None)
+        ))
+        upload = ingestion.MultipartUpload(stream, BOUNDARY.encode())
+        
+        assert upload.next_file()
+        assert upload.fields == {'title': "Notes"}
+        assert upload.content_type == "text/markdown"
+        
+        chunks = iter(lambda: upload.read(4096), b"")
+        assert b"".join(chunks) == content
+        assert upload.finish() == {'title': "Notes", 'source': "upload"}
+        assert stream.largest_read == ingestion.MULTIPART_READ_BYTES
+    
+    def test_oversized_fields_are_rejected(self, ingestion, monkeypatch):
+        """Test form fields beyond MAX_FORM_FIELD_BYTES are not buffered."""
+        monkeypatch.setattr(ingestion, 'MAX_FORM_FIELD_BYTES', 100)
+        stream = io.BytesIO(multipart_body(("title", b"x" * 1000, None), ("file", b"content", "a.txt")))
+        upload = ingestion.MultipartUpload(stream, BOUNDARY.encode())
+        
+        with pytest.raises(ValueError, match="Form fields"):
+            upload.next_file()
+
+
+class TestIngestDocument:
+    """Test suite for multipart requests to ingest_document."""
+    
+    def test_multipart_upload(self, ingest):
+        """Test a multipart upload is streamed to the store with fields after the file."""
+        post, store, db = ingest
+        
+        status, body = post(multipart_body(
+            ("file", b"Ada Lovelace", "notes.md"),
+            ("title", b"Notes", None),
+            ("metadata", b'{"tags": ["history"]}', None)
+        ))
+        
+        assert status == 201
+        assert body['document_id'] == "doc-1"
+        assert store.content == b"Ada Lovelace"
+        assert store.content_type == "text/markdown"
+        record = db.collection.return_value.document.return_value.set.call_args[0][0]
+        assert record['title'] == "Notes"
+        assert record['metadata'] == {'tags': ["history"]}
+    
+    def test_multipart_validation(self, ingest):
+        """Test a missing file part or title is rejected."""
+        post, _, _ = ingest
+        
+        assert post(multipart_body(("title", b"Notes", None)))[0] == 400
+        assert post(multipart_body(("file", b"Ada Lovelace", "notes.md")))[0] == 400
+        assert post(b"--" + BOUNDARY.encode() + b"\r\ntruncated")[0] == 400
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
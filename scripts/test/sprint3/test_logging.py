@@ -0,0 +1,133 @@
+"""
+Tests for non-blocking, sampled structured logging.
+"""
+
+import pytest
+import io
+import json
+import logging
+import logging.handlers
+import queue
+import threading
+
+import shared.utils.logging as cloud_logging
+from shared.utils.logging import (
+    CloudLoggingFormatter,
+    ContextQueueHandler,
+    SamplingFilter,
+    clear_request_context,
+    get_request_context,
+    parse_log_levels,
+    set_request_context
+)
+
+
+def make_record(msg="Creating review item", level=logging.INFO, lineno=10, args=None):
+    """Build a log record from a fixed call site."""
+    return logging.LogRecord("orchestration", level, "main.py", lineno, msg, args, None)
+
+
+class TestSamplingFilter:
+    """Test suite for SamplingFilter."""
+    
+    def test_limits_records_per_call_site(self):
+        """Test only `limit` records per source line pass within a window."""
+        sampling = SamplingFilter(limit=2, window_seconds=60)
+        
+        kept = [sampling.filter(make_record()) for _ in range(5)]
+        
+        assert kept == [True, True, False, False, False]
+        assert sampling.filter(make_record(lineno=11))
+    
+    def test_warnings_never_sampled(self):
+        """Test warnings and errors always pass."""
+        sampling = SamplingFilter(limit=1, window_seconds=60)
+        
+        assert all(sampling.filter(make_record(level=logging.WARNING)) for _ in range(5))
+    
+    def test_dropped_count_reported(self):
+        """Test the first record of a new window reports how many were dropped."""
+        sampling = SamplingFilter(limit=1, window_seconds=0.0)
+        sampling.window_seconds = 60
+        sampling.filter(make_record())
+        sampling.filter(make_record())
+        sampling.filter(make_record())
+        sampling.window_seconds = 0.0
+        
+        record = make_record()
+        assert sampling.filter(record)
+        assert record.sampled_out == 2
+
+
+class TestLogLevels:
+    """Test suite for per-logger levels."""
+    
+    def test_parse_log_levels(self):
+        """Test the spec is parsed and invalid entries are ignored."""
+        levels = parse_log_levels("orchestration=warning, shared.db=DEBUG,bogus=LOUD,=INFO")
+        
+        assert levels == {'orchestration': logging.WARNING, 'shared.db': logging.DEBUG}
+    
+    def test_longest_prefix_wins(self, monkeypatch):
+        """Test a logger takes the level of its most specific configured prefix."""
+        monkeypatch.setattr(cloud_logging, '_log_levels', parse_log_levels("shared=ERROR,shared.db=DEBUG"))
+        
+        assert cloud_logging.configured_level('shared.db.neo4j_client', logging.INFO) == logging.DEBUG
+        assert cloud_logging.configured_level('shared.review', logging.INFO) == logging.ERROR
+        assert cloud_logging.configured_level('shared_other', logging.INFO) == logging.INFO
+
+
+class TestQueueLogging:
+    """Test suite for the non-blocking queue handler."""
+    
+    def test_record_written_by_listener_with_request_context(self):
+        """Test the request context at logging time is kept when formatted later."""
+        stream = io.StringIO()
+        stream_handler = logging.StreamHandler(stream)
+        stream_handler.setFormatter(CloudLoggingFormatter())
+        log_queue = queue.Queue()
+        listener = logging.handlers.QueueListener(log_queue, stream_handler)
+        handler = ContextQueueHandler(log_queue)
+        
+        set_request_context('req-1')
+        handler.handle(make_record("Stored %d items", args=(3,)))
+        set_request_context('req-2')
+        clear_request_context()
+        
+        listener.start()
+        log_queue.join()
+        listener.stop()
+        
+        entry = json.loads(stream.getvalue())
+        assert entry['message'] == "Stored 3 items"
+        assert entry['request_context'] == {'request_id': 'req-1'}
+
+
+class TestRequestContext:
+    """Test suite for the per-request log context."""
+    
+    def test_concurrent_requests_keep_their_context(self):
+        """Test requests on different threads do not see each other's context."""
+        barrier = threading.Barrier(2)
+        seen = {}
+        
+        def handle(request_id):
+            set_request_context(request_id, user_id=f"user-{request_id}")
+            barrier.wait()
+            record = make_record()
+            seen[request_id] = json.loads(CloudLoggingFormatter().format(record))['request_context']
+            clear_request_context()
+        
+        threads = [threading.Thread(target=handle, args=(request_id,)) for request_id in ("req-1", "req-2")]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        assert seen['req-1'] == {'request_id': 'req-1', 'user_id': 'user-req-1'}
+        assert seen['req-2'] == {'request_id': 'req-2', 'user_id': 'user-req-2'}
+        assert get_request_context() == {}
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,140 @@
+"""
+Tests for the in-process metrics registry.
+"""
+
+import pytest
+import threading
+
+from shared.utils.metrics import DEFAULT_SIZE_BUCKETS, MetricsRegistry
+
+
+@pytest.fixture
+def registry():
+    """Create an empty registry."""
+    return MetricsRegistry()
+
+
+class TestMetrics:
+    """Test suite for counters, gauges and histograms."""
+    
+    def test_counter_per_label_set(self, registry):
+        """Test counts are kept per label set regardless of label order."""
+        queries = registry.counter("neo4j_queries_total")
+        
+        queries.inc(status="ok", database="neo4j")
+        queries.inc(2, database="neo4j", status="ok")
+        queries.inc(status="error", database="neo4j")
+        
+        assert queries.value(status="ok", database="neo4j") == 3
+        assert queries.value(status="error", database="neo4j") == 1
+        assert registry.counter("neo4j_queries_total") is queries
+    
+    def test_counter_thread_safe(self, registry):
+        """Test concurrent increments are not lost."""
+        requests = registry.counter("gemini_requests_total")
+        
+        def work():
+            for _ in range(1000):
+                requests.inc()
+        
+        threads = [threading.Thread(target=work) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        assert requests.value() == 8000
+    
+    def test_kind_conflict(self, registry):
+        """Test a name cannot be registered as two kinds."""
+        registry.counter("review_batch_size")
+        
+        with pytest.raises(ValueError):
+            registry.histogram("review_batch_size")
+    
+    def test_gauge(self, registry):
+        """Test gauges go up and down."""
+        in_flight = registry.gauge("notes_in_flight")
+        
+        in_flight.inc()
+        in_flight.inc()
+        in_flight.inc(-1)
+        
+        assert in_flight.value() == 1
+    
+    def test_histogram_percentiles(self, registry):
+        """Test percentiles are interpolated within their bucket."""
+        batch_size = registry.histogram("review_batch_size", buckets=DEFAULT_SIZE_BUCKETS)
+        
+        for size in [1] * 50 + [50] * 49 + [5000]:
+            batch_size.observe(size)
+        
+        assert batch_size.percentile(0.5) == 1
+        assert 20 < batch_size.percentile(0.95) <= 50
+        assert batch_size.percentile(1.0) == 1000
+        assert batch_size.percentile(0.5, operation="reject") is None
+
+
+class TestExport:
+    """Test suite for the export formats."""
+    
+    def test_prometheus_text(self, registry):
+        """Test the registry renders in the Prometheus exposition format."""
+        registry.counter("neo4j_queries_total", "Neo4j HTTP statements").inc(3, status="ok")
+        latency = registry.histogram("neo4j_query_seconds", buckets=(0.1, 1.0))
+        latency.observe(0.05)
+        latency.observe(0.5)
+        latency.observe(2.5)
+        
+        text = registry.to_prometheus()
+        
+        assert "# HELP neo4j_queries_total Neo4j HTTP statements\n" in text
+        assert "# TYPE neo4j_queries_total counter\n" in text
+        assert 'neo4j_queries_total{status="ok"} 3\n' in text
+        assert 'neo4j_query_seconds_bucket{le="0.1"} 1\n' in text
+        assert 'neo4j_query_seconds_bucket{le="1"} 2\n' in text
+        assert 'neo4j_query_seconds_bucket{le="+Inf"} 3\n' in text
+        assert "neo4j_query_seconds_sum 3.05\n" in text
+        assert "neo4j_query_seconds_count 3\n" in text
+    
+    def test_log_fields(self, registry):
+        """Test histograms are summarized for structured log lines."""
+        registry.counter("review_decisions_total").inc(4, operation="approve", result="success")
+        registry.histogram("gemini_request_seconds").observe(0.3, model="gemini")
+        
+        fields = registry.to_log_fields()
+        
+        assert fields["review_decisions_total{operation=approve,result=success}"] == 4
+        latency = fields["gemini_request_seconds{model=gemini}"]
+        assert latency['count'] == 1
+        assert 0.25 < latency['p50'] <= 0.5
+    
+    def test_time_series_per_instance(self, registry):
+        """Test each process writes its series against its own task resource."""
+        other = MetricsRegistry()
+        for instance in (registry, other):
+            instance.counter("notes_processed_total").inc(status="ok")
+        
+        series = registry.to_time_series("test-project")[0]
+        other_series = other.to_time_series("test-project")[0]
+        
+        assert series.resource.type == "generic_task"
+        assert series.resource.labels['project_id'] == "test-project"
+        assert series.resource.labels['task_id'] != other_series.resource.labels['task_id']
+        assert dict(series.metric.labels) == dict(other_series.metric.labels) == {'status': "ok"}
+    
+    def test_time_series_distribution_buckets(self, registry):
+        """Test histogram observations land in the matching Cloud Monitoring buckets."""
+        latency = registry.histogram("gemini_request_seconds", buckets=(1, 2, 3))
+        for seconds in (0.5, 1.5, 1.7, 9):
+            latency.observe(seconds)
+        
+        distribution = registry.to_time_series("test-project")[0].points[0].value.distribution_value
+        
+        assert list(distribution.bucket_options.explicit_buckets.bounds) == [1, 2, 3]
+        assert list(distribution.bucket_counts) == [1, 2, 0, 1]
+        assert distribution.count == 4
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
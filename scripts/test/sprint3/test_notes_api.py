@@ -0,0 +1,132 @@
+"""
+Tests for the Notes API list endpoint (pagination and conditional requests).
+"""
+
+import pytest
+import importlib.util
+import os
+from datetime import datetime
+from unittest.mock import MagicMock
+
+from flask import Flask, request
+
+from shared.utils.pagination import decode_cursor, encode_cursor
+
+NOTES_API_MAIN = os.path.join(os.path.dirname(__file__), '..', '..', '..', 'functions', 'notes_api', 'main.py')
+
+
+@pytest.fixture(scope='module')
+def notes_api():
+    """Import the notes API entry point module."""
+    spec = importlib.util.spec_from_file_location('notes_api_main', NOTES_API_MAIN)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def make_doc(doc_id, created_at):
+    """Build a mock note snapshot."""
+    data = {'userId': "user-1", 'title': doc_id, 'createdAt': created_at}
+    doc = MagicMock()
+    doc.id = doc_id
+    doc.to_dict.side_effect = lambda: dict(data)
+    doc.get.side_effect = data.get
+    return doc
+
+
+@pytest.fixture
+def notes(notes_api, monkeypatch):
+    """Notes API with a mocked notes query; yields (list call, query, versions)."""
+    query = MagicMock()
+    for method in ('where', 'select', 'order_by', 'start_after', 'limit'):
+        getattr(query, method).return_value = query
+    query.stream.return_value = [
+        make_doc(f"note-{i}", datetime(2025, 1, 10 - i)) for i in range(3)
+    ]
+    db = MagicMock()
+    db.collection.return_value = query
+    versions = {'user-1': 4}
+    
+    monkeypatch.setattr(notes_api, 'get_firestore_client', lambda: db)
+    monkeypatch.setattr(notes_api, 'get_notes_version', lambda db, user_id: versions[user_id])
+    
+    app = Flask(__name__)
+    
+    def list_notes(query_string='', headers=None):
+        with app.test_request_context('/notes?' + query_string, headers=headers or {}):
+            return app.make_response(notes_api.list_notes(request, "user-1"))
+    
+    yield list_notes, query, versions
+
+
+class TestListPagination:
+    """Test suite for cursor pagination of GET /notes."""
+    
+    def test_next_cursor_resumes_after_last_note(self, notes):
+        """Test a full page returns a cursor that starts the next page after its last note."""
+        list_notes, query, _ = notes
+        
+        response = list_notes('limit=2')
+        body = response.get_json()
+        
+        assert [note['id'] for note in body['notes']] == ["note-0", "note-1"]
+        assert body['has_more']
+        cursor = decode_cursor(body['next_cursor'])
+        assert cursor['doc_id'] == "note-1"
+        assert cursor['value'] == datetime(2025, 1, 9)
+        
+        list_notes(f"limit=2&start_after={body['next_cursor']}")
+        
+        start_after = query.start_after.call_args[0][0]
+        assert start_after['createdAt'] == datetime(2025, 1, 9)
+    
+    def test_last_page_has_no_cursor(self, notes):
+        """Test a page that is not full ends the listing."""
+        list_notes, _, _ = notes
+        
+        body = list_notes('limit=5').get_json()
+        
+        assert body['count'] == 3
+        assert body['next_cursor'] is None
+        assert not body['has_more']
+    
+    def test_cursor_must_match_ordering(self, notes):
+        """Test a cursor from another ordering is rejected."""
+        list_notes, _, _ = notes
+        cursor = encode_cursor("updatedAt", True, "2025-01-01", "note-1")
+        
+        assert list_notes(f"start_after={cursor}").status_code == 400
+        assert list_notes("start_after=not-a-cursor").status_code == 400
+
+
+class TestConditionalList:
+    """Test suite for ETag handling of GET /notes."""
+    
+    def test_matching_etag_returns_304(self, notes):
+        """Test an unchanged listing is answered with 304 without running the query."""
+        list_notes, query, _ = notes
+        etag = list_notes('limit=2').headers['ETag']
+        query.stream.reset_mock()
+        
+        response = list_notes('limit=2', headers={'If-None-Match': etag})
+        
+        assert response.status_code == 304
+        assert response.headers['ETag'] == etag
+        query.stream.assert_not_called()
+    
+    def test_etag_changes_with_version_and_parameters(self, notes):
+        """Test the ETag changes when a note changes or different parameters are listed."""
+        list_notes, _, versions = notes
+        etag = list_notes('limit=2').headers['ETag']
+        
+        assert list_notes('limit=3').headers['ETag'] != etag
+        
+        versions['user-1'] += 1
+        response = list_notes('limit=2', headers={'If-None-Match': etag})
+        
+        assert response.status_code == 200
+        assert response.headers['ETag'] != etag
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
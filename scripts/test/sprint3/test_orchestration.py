@@ -0,0 +1,139 @@
+"""
+Tests for the note processing orchestration function.
+"""
+
+import pytest
+import asyncio
+import importlib.util
+import os
+from unittest.mock import AsyncMock, MagicMock
+
+from shared.ai.base_provider import AIProviderAuthError
+from shared.ai.gemini_provider import GeminiProvider
+from shared.db.processing_ledger import ClaimOutcome, LedgerClaim
+
+ORCHESTRATION_MAIN = os.path.join(os.path.dirname(__file__), '..', '..', '..', 'functions', 'orchestration', 'main.py')
+
+
+@pytest.fixture(scope='module')
+def orchestration():
+    """Import the orchestration entry point module."""
+    spec = importlib.util.spec_from_file_location('orchestration_main', ORCHESTRATION_MAIN)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def make_provider(error: Exception) -> GeminiProvider:
+    """Create a Gemini provider whose API calls fail with error."""
+    provider = GeminiProvider.__new__(GeminiProvider)
+    provider.model_name = "gemini-test"
+    provider.model = MagicMock()
+    provider.model.generate_content_async = AsyncMock(side_effect=error)
+    return provider
+
+
+class TestAuthFailures:
+    """Test suite for AI provider authentication failures."""
+    
+    def test_provider_keeps_auth_error(self):
+        """Test an invalid API key surfaces as AIProviderAuthError."""
+        provider = make_provider(Exception("API key not valid"))
+        
+        with pytest.raises(AIProviderAuthError):
+            asyncio.run(provider.extract_entities("Ada Lovelace", user_id="user-1"))
+    
+    def test_auth_failure_refreshes_secrets(self, orchestration, monkeypatch):
+        """Test extraction drops cached secrets when the API key is rejected."""
+        services = MagicMock()
+        services.ai_service = make_provider(Exception("API key not valid"))
+        monkeypatch.setattr(orchestration, 'get_service_container', lambda project_id: services)
+        
+        async def extract():
+            return [chunk async for chunk in orchestration.extract_chunks("note-1", "Ada Lovelace", "user-1")]
+        
+        with pytest.raises(AIProviderAuthError):
+            asyncio.run(extract())
+        
+        services.refresh_secrets.assert_called_once()
+
+
+
+class TestFailureStatus:
+    """Test suite for failed note status updates."""
+    
+    def test_processing_failure_bumps_notes_version(self, orchestration, monkeypatch):
+        """Test a failed note is marked failed together with its owner's notes version."""
+        note_doc = MagicMock(exists=True)
+        note_doc.to_dict.return_value = {'userId': "user-1", 'content': "Ada Lovelace", 'status': "processing"}
+        db = MagicMock()
+        db.collection.return_value.document.return_value.get.return_value = note_doc
+        ledger = MagicMock()
+        ledger.claim.side_effect = Exception("ledger unavailable")
+        update_note_status = MagicMock()
+        monkeypatch.setattr(orchestration, 'get_firestore_client', lambda: db)
+        monkeypatch.setattr(orchestration, 'get_processing_ledger', lambda: ledger)
+        monkeypatch.setattr(orchestration, 'update_note_status', update_note_status)
+        
+        orchestration.process_note("note-1")
+        
+        update_note_status.assert_called_with("note-1", 'failed', error="ledger unavailable", user_id="user-1")
+    
+    def test_trigger_failure_reads_owner(self, orchestration, monkeypatch):
+        """Test a trigger failure looks up the note owner to bump their notes version."""
+        note_doc = MagicMock(exists=True)
+        note_doc.to_dict.return_value = {'userId': "user-1"}
+        db = MagicMock()
+        db.collection.return_value.document.return_value.get.return_value = note_doc
+        update_note_status = MagicMock()
+        monkeypatch.setattr(orchestration, 'get_firestore_client', lambda: db)
+        monkeypatch.setattr(orchestration, 'NOTE_PROCESSING_WORKER_URL', None)
+        monkeypatch.setattr(orchestration, 'process_note', MagicMock(side_effect=Exception("boom")))
+        monkeypatch.setattr(orchestration, 'update_note_status', update_note_status)
+        event = MagicMock()
+        event.get.side_effect = lambda key, default=None: {'subject': "documents/notes/note-1", 'id': "event-1"}.get(key, default)
+        
+        orchestration.orchestration_function.__wrapped__(event)
+        
+        update_note_status.assert_called_once_with("note-1", 'failed', error="boom", user_id="user-1")
+
+
+
+class TestTaskWorker:
+    """Test suite for the Cloud Tasks worker."""
+    
+    def run_task(self, orchestration, monkeypatch, claim):
+        """Run process_note_task for a processing note whose claim returns claim."""
+        note_doc = MagicMock(exists=True)
+        note_doc.to_dict.return_value = {'userId': "user-1", 'content': "Ada Lovelace", 'status': "processing"}
+        db = MagicMock()
+        db.collection.return_value.document.return_value.get.return_value = note_doc
+        ledger = MagicMock()
+        ledger.claim.return_value = claim
+        monkeypatch.setattr(orchestration, 'get_firestore_client', lambda: db)
+        monkeypatch.setattr(orchestration, 'get_processing_ledger', lambda: ledger)
+        request = MagicMock()
+        request.get_json.return_value = {'note_id': "note-1", 'event_id': "event-1"}
+        
+        return orchestration.process_note_task.__wrapped__(request)
+    
+    def test_held_claim_asks_for_redelivery(self, orchestration, monkeypatch):
+        """Test a delivery held by another worker is retried after the lease."""
+        claim = LedgerClaim(key="key", outcome=ClaimOutcome.IN_PROGRESS, attempts=1, retry_after=299.5)
+        
+        _, status, headers = self.run_task(orchestration, monkeypatch, claim)
+        
+        assert status == 503
+        assert headers['Retry-After'] == "300"
+    
+    def test_duplicate_is_acknowledged(self, orchestration, monkeypatch):
+        """Test a duplicate of a finished delivery is dropped with 200."""
+        claim = LedgerClaim(key="key", outcome=ClaimOutcome.DUPLICATE, attempts=1)
+        
+        _, status, _ = self.run_task(orchestration, monkeypatch, claim)
+        
+        assert status == 200
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,111 @@
+"""
+Tests for the staged asyncio pipeline.
+"""
+
+import pytest
+import asyncio
+import time
+
+from shared.utils.pipeline import PipelineStageError, SOURCE_STAGE, Sink, run_staged_pipeline
+
+
+async def numbers(count, delay=0.0, fail_at=None):
+    """Source stage yielding 0..count-1."""
+    for i in range(count):
+        if i == fail_at:
+            raise RuntimeError("extraction failed")
+        await asyncio.sleep(delay)
+        yield i
+
+
+class TestStagedPipeline:
+    """Test suite for run_staged_pipeline."""
+    
+    def test_every_sink_receives_every_item_in_order(self):
+        """Test items fan out to all sinks, each in source order."""
+        async def double(item):
+            return item * 2
+        
+        results = asyncio.run(run_staged_pipeline(numbers(5), [
+            Sink("double", double),
+            Sink("square", lambda item: item * item)
+        ]))
+        
+        assert results["double"].results == [0, 2, 4, 6, 8]
+        assert results["square"].results == [0, 1, 4, 9, 16]
+    
+    def test_sinks_overlap_with_source(self):
+        """Test sinks store early items while the source is still producing."""
+        produced = []
+        stored_while_producing = []
+        
+        async def source():
+            for i in range(4):
+                await asyncio.sleep(0.02)
+                produced.append(i)
+                yield i
+        
+        def store(item):
+            stored_while_producing.append(len(produced) < 4)
+        
+        asyncio.run(run_staged_pipeline(source(), [Sink("store", store)]))
+        
+        assert stored_while_producing[0]
+    
+    def test_sync_sinks_run_concurrently(self):
+        """Test blocking sinks run in parallel rather than one after the other."""
+        def slow(item):
+            time.sleep(0.1)
+        
+        started = time.monotonic()
+        asyncio.run(run_staged_pipeline(numbers(2), [Sink("a", slow), Sink("b", slow)]))
+        
+        # Serial execution would take 0.4s
+        assert time.monotonic() - started < 0.35
+    
+    def test_source_failure_raises(self):
+        """Test a source failure aborts the pipeline with the source stage."""
+        with pytest.raises(PipelineStageError) as exc_info:
+            asyncio.run(run_staged_pipeline(numbers(5, fail_at=2), [Sink("store", lambda item: item)]))
+        
+        assert exc_info.value.stage == SOURCE_STAGE
+        assert str(exc_info.value.error) == "extraction failed"
+    
+    def test_required_sink_failure_cancels_source(self):
+        """Test a required sink failure stops the source from producing more."""
+        produced = []
+        
+        async def source():
+            for i in range(100):
+                produced.append(i)
+                yield i
+        
+        def store(item):
+            if item == 1:
+                raise ValueError("Firestore unavailable")
+        
+        with pytest.raises(PipelineStageError) as exc_info:
+            asyncio.run(run_staged_pipeline(source(), [Sink("review_queue", store)], queue_size=1))
+        
+        assert exc_info.value.stage == "review_queue"
+        assert len(produced) < 100
+    
+    def test_optional_sink_failure_recorded(self):
+        """Test an optional sink's failures are recorded without aborting."""
+        def populate(item):
+            if item % 2:
+                raise ConnectionError("Neo4j unavailable")
+            return item
+        
+        results = asyncio.run(run_staged_pipeline(numbers(4), [
+            Sink("review_queue", lambda item: item),
+            Sink("graph", populate, required=False)
+        ]))
+        
+        assert results["review_queue"].results == [0, 1, 2, 3]
+        assert results["graph"].results == [0, 2]
+        assert results["graph"].errors == ["Neo4j unavailable"] * 2
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
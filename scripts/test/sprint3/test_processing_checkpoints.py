@@ -0,0 +1,104 @@
+"""
+Tests for chunk-level note processing checkpoints.
+"""
+
+import pytest
+import os
+from unittest.mock import patch, MagicMock
+
+# Set environment variable before importing
+os.environ['GOOGLE_APPLICATION_CREDENTIALS'] = '/workspace/aletheia-codex-prod-af9a64a7fcaa.json'
+
+from shared.db.processing_checkpoints import (
+    ProcessingCheckpoints,
+    ChunkCheckpoint,
+    checkpoint_id
+)
+
+
+def make_doc(**fields):
+    """Build a mock checkpoint snapshot."""
+    doc = MagicMock()
+    doc.to_dict.return_value = fields
+    return doc
+
+
+@pytest.fixture
+def checkpoints():
+    """Create checkpoints with mocked Firestore; yields (checkpoints, mocked sub-collection)."""
+    with patch('shared.db.processing_checkpoints.get_firestore_client') as mock_db:
+        db = MagicMock()
+        mock_db.return_value = db
+        collection = db.collection.return_value.document.return_value.collection.return_value
+        yield ProcessingCheckpoints(project_id="test-project"), collection
+
+
+class TestProcessingCheckpoints:
+    """Test suite for ProcessingCheckpoints."""
+    
+    def test_load_ignores_checkpoints_of_other_content(self, checkpoints):
+        """Test only checkpoints extracted from the current content are resumed."""
+        store, collection = checkpoints
+        collection.stream.return_value = [
+            make_doc(index=0, content_sha256="current", entities=[{'name': 'Ada'}], stages={'review_queue': {}}),
+            make_doc(index=1, content_sha256="edited", entities=[{'name': 'Bob'}])
+        ]
+        
+        loaded = store.load("note-1", "current")
+        
+        assert list(loaded) == [0]
+        assert loaded[0].entities == [{'name': 'Ada'}]
+        assert 'review_queue' in loaded[0].stages
+    
+    def test_load_failure_starts_from_scratch(self, checkpoints):
+        """Test a failed load falls back to processing every chunk."""
+        store, collection = checkpoints
+        collection.stream.side_effect = Exception("unavailable")
+        
+        assert store.load("note-1", "current") == {}
+    
+    def test_save_chunk(self, checkpoints):
+        """Test a chunk is saved with the content hash and no completed stages."""
+        store, collection = checkpoints
+        
+        store.save_chunk("note-1", "current", ChunkCheckpoint(index=3, entities=[{'name': 'Ada'}], cost=0.01))
+        
+        collection.document.assert_called_with(checkpoint_id(3))
+        data = collection.document.return_value.set.call_args[0][0]
+        assert data['content_sha256'] == "current"
+        assert data['entities'] == [{'name': 'Ada'}]
+        assert data['stages'] == {}
+    
+    def test_mark_stage_writes_only_that_stage(self, checkpoints):
+        """Test concurrent stages do not overwrite each other's markers."""
+        store, collection = checkpoints
+        
+        store.mark_stage("note-1", 3, "graph", {'entities_created': 2})
+        
+        collection.document.return_value.update.assert_called_once_with({
+            'stages.graph': {'entities_created': 2}
+        })
+    
+    def test_write_failures_are_not_raised(self, checkpoints):
+        """Test checkpoint writes are best effort."""
+        store, collection = checkpoints
+        collection.document.return_value.set.side_effect = Exception("unavailable")
+        collection.document.return_value.update.side_effect = Exception("unavailable")
+        
+        store.save_chunk("note-1", "current", ChunkCheckpoint(index=0))
+        store.mark_stage("note-1", 0, "review_queue")
+    
+    def test_clear(self, checkpoints):
+        """Test every checkpoint of a note is deleted."""
+        store, collection = checkpoints
+        collection.stream.return_value = [make_doc(index=0), make_doc(index=1)]
+        
+        store.clear("note-1")
+        
+        batch = store.db.batch.return_value
+        assert batch.delete.call_count == 2
+        batch.commit.assert_called_once()
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
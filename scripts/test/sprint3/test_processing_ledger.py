@@ -0,0 +1,152 @@
+"""
+Tests for the note processing idempotency ledger.
+"""
+
+import pytest
+import os
+from datetime import datetime, timedelta
+from unittest.mock import patch, MagicMock
+
+# Set environment variable before importing
+os.environ['GOOGLE_APPLICATION_CREDENTIALS'] = '/workspace/aletheia-codex-prod-af9a64a7fcaa.json'
+
+from shared.db.processing_ledger import (
+    ProcessingLedger,
+    ClaimOutcome,
+    LedgerStatus,
+    content_hash,
+    ledger_key
+)
+
+
+def make_entry(exists=True, **fields):
+    """Build a mock ledger snapshot."""
+    snapshot = MagicMock()
+    snapshot.exists = exists
+    snapshot.to_dict.return_value = fields
+    return snapshot
+
+
+@pytest.fixture
+def ledger():
+    """Create ledger with mocked Firestore; yields (ledger, mocked entry reference)."""
+    with patch('shared.db.processing_ledger.get_firestore_client') as mock_db, \
+            patch('shared.db.processing_ledger.firestore.transactional', lambda func: func):
+        db = MagicMock()
+        mock_db.return_value = db
+        yield ProcessingLedger(project_id="test-project"), db.collection.return_value.document.return_value
+
+
+class TestProcessingLedger:
+    """Test suite for ProcessingLedger."""
+    
+    def test_key_depends_on_event_and_content(self):
+        """Test the same event with different content gets a different entry."""
+        key = ledger_key("note-1", "event-1", content_hash("a"))
+        
+        assert key == ledger_key("note-1", "event-1", content_hash("a"))
+        assert key != ledger_key("note-1", "event-1", content_hash("b"))
+        assert key != ledger_key("note-1", "event-2", content_hash("a"))
+    
+    def test_first_delivery_claims(self, ledger):
+        """Test the first delivery claims the entry with a lease."""
+        processing_ledger, ref = ledger
+        ref.get.return_value = make_entry(exists=False)
+        
+        claim = processing_ledger.claim("note-1", "event-1", content_hash("a"))
+        
+        assert claim.claimed
+        assert claim.attempts == 1
+        transaction = processing_ledger.db.transaction.return_value
+        entry = transaction.set.call_args[0][1]
+        assert entry['status'] == LedgerStatus.IN_PROGRESS.value
+        assert entry['owner'] == claim.owner
+        assert entry['lease_expires_at'] > datetime.utcnow()
+    
+    def test_completed_delivery_is_duplicate(self, ledger):
+        """Test a redelivery of a completed request is skipped."""
+        processing_ledger, ref = ledger
+        ref.get.return_value = make_entry(status=LedgerStatus.COMPLETED.value, attempts=1)
+        
+        claim = processing_ledger.claim("note-1", "event-1", content_hash("a"))
+        
+        assert claim.outcome == ClaimOutcome.DUPLICATE
+        processing_ledger.db.transaction.return_value.set.assert_not_called()
+    
+    def test_continued_delivery_is_duplicate(self, ledger):
+        """Test a redelivery of a request handed to a continuation is skipped."""
+        processing_ledger, ref = ledger
+        ref.get.return_value = make_entry(status=LedgerStatus.CONTINUED.value, attempts=1)
+        
+        claim = processing_ledger.claim("note-1", "event-1", content_hash("a"))
+        
+        assert claim.outcome == ClaimOutcome.DUPLICATE
+    
+    def test_concurrent_delivery_backs_off(self, ledger):
+        """Test a delivery arriving while the lease is held is skipped."""
+        processing_ledger, ref = ledger
+        ref.get.return_value = make_entry(
+            status=LedgerStatus.IN_PROGRESS.value,
+            attempts=1,
+            lease_expires_at=datetime.utcnow() + timedelta(minutes=5)
+        )
+        
+        claim = processing_ledger.claim("note-1", "event-1", content_hash("a"))
+        
+        assert claim.outcome == ClaimOutcome.IN_PROGRESS
+        assert 240 < claim.retry_after <= 300
+    
+    def test_expired_lease_is_taken_over(self, ledger):
+        """Test a delivery takes over an entry whose lease has expired."""
+        processing_ledger, ref = ledger
+        ref.get.return_value = make_entry(
+            status=LedgerStatus.IN_PROGRESS.value,
+            attempts=1,
+            lease_expires_at=datetime.utcnow() - timedelta(minutes=1)
+        )
+        
+        claim = processing_ledger.claim("note-1", "event-1", content_hash("a"))
+        
+        assert claim.claimed
+        assert claim.attempts == 2
+    
+    def test_complete_drops_lease(self, ledger):
+        """Test completing a claim records the status and clears the lease."""
+        processing_ledger, ref = ledger
+        ref.get.return_value = make_entry(exists=False)
+        claim = processing_ledger.claim("note-1", "event-1", content_hash("a"))
+        
+        ref.get.return_value = make_entry(status=LedgerStatus.IN_PROGRESS.value, owner=claim.owner)
+        
+        processing_ledger.complete(claim, entity_count=3)
+        
+        update = processing_ledger.db.transaction.return_value.update.call_args[0][1]
+        assert update['status'] == LedgerStatus.COMPLETED.value
+        assert update['lease_expires_at'] is None
+        assert update['entity_count'] == 3
+    
+    def test_taken_over_claim_is_not_finished(self, ledger):
+        """Test a worker whose lease was taken over cannot finish the new owner's claim."""
+        processing_ledger, ref = ledger
+        ref.get.return_value = make_entry(exists=False)
+        stale_claim = processing_ledger.claim("note-1", "event-1", content_hash("a"))
+        ref.get.return_value = make_entry(
+            status=LedgerStatus.IN_PROGRESS.value,
+            attempts=1,
+            owner=stale_claim.owner,
+            lease_expires_at=datetime.utcnow() - timedelta(minutes=1)
+        )
+        new_claim = processing_ledger.claim("note-1", "event-1", content_hash("a"))
+        assert new_claim.claimed and new_claim.owner != stale_claim.owner
+        ref.get.return_value = make_entry(status=LedgerStatus.IN_PROGRESS.value, attempts=2, owner=new_claim.owner)
+        
+        assert not processing_ledger.release(stale_claim, error="timeout")
+        processing_ledger.db.transaction.return_value.update.assert_not_called()
+        
+        assert processing_ledger.complete(new_claim)
+        update = processing_ledger.db.transaction.return_value.update.call_args[0][1]
+        assert update['status'] == LedgerStatus.COMPLETED.value
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,139 @@
+"""
+Tests for the task queue limits and the note processing queue.
+"""
+
+import pytest
+import threading
+import time
+from unittest.mock import MagicMock
+
+from shared.utils.task_queue import LocalTaskQueue
+from shared.utils.processing_queue import (
+    ProcessingQueue,
+    LaneConfig,
+    QueueBacklogError,
+    LANE_INTERACTIVE,
+    LANE_BULK,
+    create_processing_queue
+)
+
+
+class TestLocalTaskQueue:
+    """Test suite for LocalTaskQueue concurrency and depth."""
+    
+    def test_concurrency_limit(self):
+        """Test no more than max_concurrency payloads are handled at once."""
+        lock = threading.Lock()
+        state = {'running': 0, 'peak': 0}
+        
+        def handler(payload):
+            with lock:
+                state['running'] += 1
+                state['peak'] = max(state['peak'], state['running'])
+            time.sleep(0.02)
+            with lock:
+                state['running'] -= 1
+        
+        task_queue = LocalTaskQueue("test", handler, max_concurrency=2)
+        for i in range(6):
+            task_queue.enqueue({'n': i})
+        task_queue.join()
+        
+        assert state['peak'] == 2
+    
+    def test_depth_counts_queued_and_running(self):
+        """Test depth includes running tasks until they finish."""
+        release = threading.Event()
+        task_queue = LocalTaskQueue("test", lambda payload: release.wait(1), max_concurrency=1)
+        
+        task_queue.enqueue({'n': 1})
+        task_queue.enqueue({'n': 2})
+        assert task_queue.depth() == 2
+        
+        release.set()
+        task_queue.join()
+        assert task_queue.depth() == 0
+    
+    def test_dispatch_rate(self):
+        """Test tasks start no faster than max_dispatches_per_second."""
+        started = []
+        task_queue = LocalTaskQueue(
+            "test",
+            lambda payload: started.append(time.monotonic()),
+            max_concurrency=3,
+            max_dispatches_per_second=20
+        )
+        for i in range(3):
+            task_queue.enqueue({'n': i})
+        task_queue.join()
+        
+        started.sort()
+        assert started[-1] - started[0] >= 0.09
+
+
+class TestProcessingQueue:
+    """Test suite for ProcessingQueue lanes and backpressure."""
+    
+    def make_queue(self, interactive_depth=0, bulk_depth=0):
+        """Build a processing queue over mocked lane queues."""
+        lanes = {LANE_INTERACTIVE: MagicMock(), LANE_BULK: MagicMock()}
+        lanes[LANE_INTERACTIVE].depth.return_value = interactive_depth
+        lanes[LANE_BULK].depth.return_value = bulk_depth
+        configs = {
+            LANE_INTERACTIVE: LaneConfig(max_concurrency=2, max_dispatches_per_second=1.0, max_depth=10),
+            LANE_BULK: LaneConfig(max_concurrency=1, max_dispatches_per_second=1.0, max_depth=100, retry_after_seconds=60)
+        }
+        return ProcessingQueue("test", lanes, configs), lanes
+    
+    def test_enqueue_tags_lane(self):
+        """Test payloads are enqueued on their lane's queue with the lane name."""
+        processing_queue, lanes = self.make_queue()
+        
+        processing_queue.enqueue({'note_id': 'n1'}, lane=LANE_BULK)
+        
+        lanes[LANE_BULK].enqueue.assert_called_once_with({'note_id': 'n1', 'lane': LANE_BULK}, delay_seconds=0)
+        lanes[LANE_INTERACTIVE].enqueue.assert_not_called()
+    
+    def test_full_lane_rejects(self):
+        """Test enqueueing into a full lane raises QueueBacklogError."""
+        processing_queue, lanes = self.make_queue(bulk_depth=100)
+        
+        with pytest.raises(QueueBacklogError) as exc_info:
+            processing_queue.enqueue({'note_id': 'n1'}, lane=LANE_BULK)
+        
+        assert exc_info.value.retry_after_seconds == 60
+        lanes[LANE_BULK].enqueue.assert_not_called()
+    
+    def test_full_lane_does_not_block_other_lane(self):
+        """Test a bulk backlog does not affect the interactive lane."""
+        processing_queue, lanes = self.make_queue(bulk_depth=100)
+        
+        processing_queue.enqueue({'note_id': 'n1'}, lane=LANE_INTERACTIVE)
+        
+        lanes[LANE_INTERACTIVE].enqueue.assert_called_once()
+    
+    def test_enqueue_without_backlog_check(self):
+        """Test callers that cannot push back can skip the backlog check."""
+        processing_queue, lanes = self.make_queue(interactive_depth=10)
+        
+        processing_queue.enqueue({'note_id': 'n1'}, enforce_backlog=False)
+        
+        lanes[LANE_INTERACTIVE].enqueue.assert_called_once()
+    
+    def test_unknown_lane(self):
+        """Test enqueueing into an unknown lane raises error."""
+        processing_queue, _ = self.make_queue()
+        with pytest.raises(ValueError, match="Unknown processing lane"):
+            processing_queue.enqueue({'note_id': 'n1'}, lane="urgent")
+    
+    def test_max_depth_override(self, monkeypatch):
+        """Test a lane's max depth can be overridden from the environment."""
+        monkeypatch.setenv('PROCESSING_QUEUE_BULK_MAX_DEPTH', '5')
+        
+        processing_queue = create_processing_queue("test", handler=lambda payload: None, backend="local")
+        
+        assert processing_queue.depth()[LANE_BULK] == {'depth': 0, 'max_depth': 5}
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,120 @@
+"""
+Tests for per-template Neo4j query profiling.
+"""
+
+import pytest
+from unittest.mock import MagicMock
+
+import shared.db.query_profiler as query_profiler
+from shared.db.query_profiler import (
+    TEMPLATE_QUERY_SECONDS,
+    SLOW_QUERIES,
+    adhoc_template_name,
+    is_read_only,
+    note_query_text,
+    parameter_fingerprint,
+    plan_cache_hit_ratio,
+    profile_query,
+    record_query,
+    summarize_plan
+)
+
+
+class TestFingerprints:
+    """Test suite for template names and parameter fingerprints."""
+    
+    def test_adhoc_name_ignores_whitespace(self):
+        """Test reformatted statements keep their template name."""
+        name = adhoc_template_name("MATCH (n)\n    RETURN n")
+        
+        assert name.startswith("adhoc:")
+        assert name == adhoc_template_name("MATCH (n) RETURN n")
+        assert name != adhoc_template_name("MATCH (n) RETURN n LIMIT 1")
+    
+    def test_parameter_fingerprint_hides_values(self):
+        """Test the fingerprint keeps names and types but not values."""
+        fingerprint = parameter_fingerprint({'userId': "user-1", 'limit': 50})
+        
+        assert fingerprint['shape'] == {'limit': 'int', 'userId': 'str'}
+        assert "user-1" not in str(fingerprint)
+        assert fingerprint['hash'] == parameter_fingerprint({'limit': 50, 'userId': "user-1"})['hash']
+        assert fingerprint['hash'] != parameter_fingerprint({'userId': "user-2", 'limit': 50})['hash']
+    
+    def test_is_read_only(self):
+        """Test only statements without write clauses are profiled."""
+        assert is_read_only("MATCH (u:User {userId: $userId})-[:OWNS]->(n) RETURN n")
+        assert not is_read_only("MATCH (u:User) MERGE (u)-[:OWNS]->(e:Person {name: $name})")
+        assert not is_read_only("MATCH (n) detach delete n")
+
+
+class TestRecording:
+    """Test suite for slow query logging and PROFILE sampling."""
+    
+    def test_fast_query_recorded_per_template(self):
+        """Test latency is recorded under the template without a slow log."""
+        before = SLOW_QUERIES.value(template="test.fast")
+        
+        record_query("test.fast", "RETURN 1", {}, 0.01, rows=1, request_bytes=40, response_bytes=80)
+        
+        assert TEMPLATE_QUERY_SECONDS.percentile(0.5, template="test.fast") is not None
+        assert SLOW_QUERIES.value(template="test.fast") == before
+    
+    def test_slow_read_query_sampled_for_profile(self, monkeypatch):
+        """Test a slow read-only statement is handed to the profiler."""
+        started = MagicMock()
+        monkeypatch.setattr(query_profiler, '_start_profile', started)
+        monkeypatch.setattr(query_profiler, 'NEO4J_PROFILE_SAMPLE_RATE', 1.0)
+        run_profile = MagicMock()
+        
+        record_query("test.slow_read", "MATCH (n) RETURN n", {'limit': 5}, 5.0, 10, 40, 800, run_profile)
+        record_query("test.slow_write", "CREATE (n:Person) RETURN n", {}, 5.0, 1, 40, 80, run_profile)
+        
+        assert SLOW_QUERIES.value(template="test.slow_read") == 1
+        assert SLOW_QUERIES.value(template="test.slow_write") == 1
+        started.assert_called_once()
+        assert started.call_args[0][0] == "test.slow_read"
+    
+    def test_plan_cache_estimate(self, monkeypatch):
+        """Test repeated text counts as a hit until it falls out of the LRU."""
+        monkeypatch.setattr(query_profiler, 'NEO4J_QUERY_CACHE_SIZE', 2)
+        monkeypatch.setattr(query_profiler, '_recent_texts', query_profiler.OrderedDict())
+        
+        assert not note_query_text("test.cache", "MATCH (n:Person) RETURN n")
+        assert note_query_text("test.cache", "MATCH (n:Person) RETURN n")
+        note_query_text("test.cache", "MATCH (n:Place) RETURN n")
+        note_query_text("test.cache", "MATCH (n:Thing) RETURN n")
+        assert not note_query_text("test.cache", "MATCH (n:Person) RETURN n")
+        
+        assert plan_cache_hit_ratio("test.cache") == pytest.approx(1 / 5)
+        assert plan_cache_hit_ratio("test.unused") is None
+    
+    def test_profile_query_summarizes_plan(self):
+        """Test PROFILE output is reduced to db hits and an operator tree."""
+        plan = {
+            'operatorType': "ProduceResults",
+            'dbHits': 0,
+            'records': 10,
+            'children': [{
+                'operatorType': "NodeByLabelScan",
+                'dbHits': 11,
+                'records': 10
+            }]
+        }
+        run_profile = MagicMock(return_value={'data': {}, 'profiledQueryPlan': plan})
+        
+        record = profile_query("test.profile", "MATCH (n:Person) RETURN n", {'shape': {}, 'hash': "x"}, run_profile)
+        
+        run_profile.assert_called_once_with("PROFILE MATCH (n:Person) RETURN n")
+        assert record['db_hits'] == 11
+        assert record['plan']['children'][0]['operator'] == "NodeByLabelScan"
+        assert summarize_plan(plan)[0] == 11
+    
+    def test_profile_failure_is_swallowed(self):
+        """Test a failing PROFILE run does not raise."""
+        run_profile = MagicMock(side_effect=Exception("timeout"))
+        
+        assert profile_query("test.profile", "MATCH (n) RETURN n", {}, run_profile) is None
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -10,7 +10,7 @@ from unittest.mock import Mock, patch, MagicMock
 # Set environment variable before importing
 os.environ['GOOGLE_APPLICATION_CREDENTIALS'] = '/workspace/aletheia-codex-prod-af9a64a7fcaa.json'
 
-from shared.review.queue_manager import QueueManager, create_queue_manager
+from shared.review.queue_manager import QueueManager, create_queue_manager, encode_cursor, decode_cursor
 from shared.models.review_item import ReviewItem, ReviewItemType, ReviewItemStatus, UserStats
 
 
@@ -76,24 +76,45 @@ class TestQueueManager:
         assert queue_manager.user_stats_collection == "user_stats"
     
     def test_add_to_queue_success(self, queue_manager, mock_firestore, sample_entity_item):
-        """Test successfully adding items to queue."""
-        # Mock batch operations
-        mock_batch = MagicMock()
-        mock_firestore.batch.return_value = mock_batch
-        
-        # Mock document reference
-        mock_doc_ref = MagicMock()
-        mock_doc_ref.id = "item-123"
-        mock_firestore.collection.return_value.document.return_value = mock_doc_ref
+        """Test successfully adding a new item to queue."""
+        # Mock transactional read: no existing canonical item
+        mock_snapshot = MagicMock()
+        mock_snapshot.id = sample_entity_item.get_canonical_id()
+        mock_snapshot.exists = False
+        mock_firestore.get_all.return_value = [mock_snapshot]
+        mock_transaction = mock_firestore.transaction.return_value
         
         # Add items
-        items = [sample_entity_item]
-        result = queue_manager.add_to_queue("test-user", items, "doc-123")
+        with patch('shared.review.queue_manager.firestore.transactional', lambda func: func):
+            result = queue_manager.add_to_queue("test-user", [sample_entity_item], "doc-123")
         
         # Verify
+        assert result == [sample_entity_item.get_canonical_id()]
+        mock_transaction.set.assert_called_once()
+        mock_transaction.update.assert_not_called()
+    
+    def test_add_to_queue_merges_duplicates(self, queue_manager, mock_firestore, sample_entity_item):
+        """Test duplicate extractions merge into the existing canonical item."""
+        existing = sample_entity_item.to_dict()
+        existing['source_document_ids'] = ['doc-old']
+        mock_snapshot = MagicMock()
+        mock_snapshot.id = sample_entity_item.get_canonical_id()
+        mock_snapshot.exists = True
+        mock_snapshot.to_dict.return_value = existing
+        mock_firestore.get_all.return_value = [mock_snapshot]
+        mock_transaction = mock_firestore.transaction.return_value
+        
+        duplicate = ReviewItem.from_dict(sample_entity_item.to_dict())
+        duplicate.entity = {'name': '  john   DOE ', 'type': 'person'}
+        
+        with patch('shared.review.queue_manager.firestore.transactional', lambda func: func):
+            result = queue_manager.add_to_queue("test-user", [sample_entity_item, duplicate], "doc-123")
+        
         assert len(result) == 1
-        assert result[0] == "item-123"
-        mock_batch.commit.assert_called_once()
+        mock_transaction.set.assert_not_called()
+        update = mock_transaction.update.call_args[0][1]
+        assert update['occurrence_count'] == 2
+        assert update['source_document_ids'] == ['doc-old', 'doc-123']
     
     def test_add_to_queue_empty_list(self, queue_manager):
         """Test adding empty list raises error."""
@@ -141,6 +162,85 @@ class TestQueueManager:
         with pytest.raises(ValueError, match="User ID cannot be empty"):
             queue_manager.get_pending_items("")
     
+    def test_get_pending_page_returns_cursor(self, queue_manager, mock_firestore):
+        """Test that a full page returns a cursor for the next page."""
+        mock_query = MagicMock()
+        mock_firestore.collection.return_value = mock_query
+        mock_query.where.return_value = mock_query
+        mock_query.select.return_value = mock_query
+        mock_query.order_by.return_value = mock_query
+        mock_query.limit.return_value = mock_query
+        
+        docs = []
+        for i in range(3):
+            mock_doc = MagicMock()
+            mock_doc.id = f"item-{i}"
+            mock_doc.to_dict.return_value = {
+                'user_id': 'test-user',
+                'type': 'entity',
+                'status': 'pending',
+                'confidence': 0.9 - i * 0.1,
+                'source_document_id': 'doc-123',
+                'entity': {'name': f'Entity {i}', 'type': 'Person'},
+                'created_at': datetime.utcnow().isoformat()
+            }
+            mock_doc.get.return_value = 0.9 - i * 0.1
+            docs.append(mock_doc)
+        mock_query.stream.return_value = docs
+        
+        items, next_cursor = queue_manager.get_pending_page("test-user", limit=2, summary_only=True)
+        
+        assert [item.id for item in items] == ["item-0", "item-1"]
+        mock_query.limit.assert_called_with(3)
+        mock_query.select.assert_called_once()
+        cursor = decode_cursor(next_cursor)
+        assert cursor['doc_id'] == "item-1"
+        assert cursor['order_by'] == "confidence"
+    
+    def test_get_pending_page_last_page(self, queue_manager, mock_firestore):
+        """Test that a short page has no next cursor."""
+        mock_query = MagicMock()
+        mock_firestore.collection.return_value = mock_query
+        mock_query.where.return_value = mock_query
+        mock_query.order_by.return_value = mock_query
+        mock_query.limit.return_value = mock_query
+        mock_query.stream.return_value = []
+        
+        items, next_cursor = queue_manager.get_pending_page("test-user", limit=10)
+        
+        assert items == []
+        assert next_cursor is None
+    
+    def test_get_pending_page_cursor_ordering_mismatch(self, queue_manager):
+        """Test that a cursor from a different ordering is rejected."""
+        cursor = encode_cursor("created_at", True, "2025-01-01T00:00:00", "item-1")
+        with pytest.raises(ValueError, match="Cursor does not match"):
+            queue_manager.get_pending_page("test-user", order_by="confidence", start_after=cursor)
+    
+    def test_get_pending_page_unindexed_order(self, queue_manager):
+        """Test that ordering by an unindexed field is rejected."""
+        with pytest.raises(ValueError, match="Invalid order_by"):
+            queue_manager.get_pending_page("test-user", order_by="extracted_text")
+    
+    def test_cursor_round_trip(self):
+        """Test encoding and decoding cursors."""
+        created_at = datetime(2025, 1, 1, 12, 30)
+        cursor = encode_cursor("created_at", False, created_at, "item-9")
+        
+        decoded = decode_cursor(cursor)
+        
+        assert decoded == {
+            'order_by': 'created_at',
+            'descending': False,
+            'value': created_at,
+            'doc_id': 'item-9'
+        }
+    
+    def test_decode_invalid_cursor(self):
+        """Test decoding a malformed cursor."""
+        with pytest.raises(ValueError, match="Invalid cursor"):
+            decode_cursor("not-a-cursor")
+    
     def test_get_item_by_id_found(self, queue_manager, mock_firestore):
         """Test getting item by ID when it exists."""
         # Mock document
@@ -204,6 +304,99 @@ class TestQueueManager:
             assert result is True
             mock_doc_ref.update.assert_called_once()
     
+    def test_update_item_status_archives_reviewed_item(self, queue_manager, mock_firestore, sample_entity_item):
+        """Test reviewed items move to the archive when archive_on_review is set."""
+        queue_manager.archive_on_review = True
+        sample_entity_item.id = "item-123"
+        mock_transaction = mock_firestore.transaction.return_value
+        
+        # A concurrent merge raised the confidence after the ownership check read
+        current = sample_entity_item.to_dict()
+        current['confidence'] = 0.95
+        snapshot = MagicMock(exists=True, id="item-123")
+        snapshot.to_dict.return_value = current
+        mock_firestore.collection.return_value.document.return_value.get.return_value = snapshot
+        
+        with patch.object(queue_manager, 'get_item_by_id', return_value=sample_entity_item), \
+                patch('shared.review.queue_manager.firestore.transactional', lambda func: func):
+            result = queue_manager.update_item_status(
+                "item-123",
+                ReviewItemStatus.REJECTED,
+                "test-user",
+                rejection_reason="duplicate"
+            )
+        
+        assert result is True
+        archived = mock_transaction.set.call_args[0][1]
+        assert archived['status'] == 'rejected'
+        assert archived['rejection_reason'] == 'duplicate'
+        assert archived['entity'] == sample_entity_item.entity
+        assert archived['confidence'] == 0.95
+        assert 'archived_at' in archived
+        mock_transaction.delete.assert_called_once()
+    
+    def test_archive_reviewed_items(self, queue_manager, mock_firestore):
+        """Test compaction moves reviewed items in batches until none remain."""
+        mock_query = MagicMock()
+        mock_firestore.collection.return_value.where.return_value = mock_query
+        mock_query.where.return_value = mock_query
+        mock_query.limit.return_value = mock_query
+        
+        docs = []
+        for i in range(2):
+            doc = MagicMock(exists=True)
+            doc.id = f"item-{i}"
+            doc.to_dict.return_value = {'user_id': 'test-user', 'status': 'approved'}
+            docs.append(doc)
+        mock_query.stream.side_effect = [iter(docs), iter([])]
+        mock_firestore.get_all.return_value = docs
+        mock_transaction = mock_firestore.transaction.return_value
+        
+        with patch('shared.review.queue_manager.firestore.transactional', lambda func: func):
+            archived = queue_manager.archive_reviewed_items(batch_size=2)
+        
+        assert archived == 2
+        assert mock_transaction.set.call_count == 2
+        assert mock_transaction.delete.call_count == 2
+        assert mock_query.stream.call_count == 2
+    
+    def test_archive_reviewed_items_keeps_concurrent_merge(self, queue_manager, mock_firestore):
+        """Test an occurrence merged after the compaction query is archived with the item."""
+        mock_query = MagicMock()
+        mock_firestore.collection.return_value.where.return_value = mock_query
+        mock_query.where.return_value = mock_query
+        mock_query.limit.return_value = mock_query
+        
+        stale = MagicMock(exists=True, id="item-1")
+        stale.to_dict.return_value = {
+            'user_id': 'test-user', 'status': 'approved',
+            'occurrence_count': 1, 'source_document_ids': ['doc-1']
+        }
+        mock_query.stream.return_value = iter([stale])
+        
+        # add_to_queue merges a new occurrence before the batch commits
+        current = MagicMock(exists=True, id="item-1")
+        current.to_dict.return_value = {
+            'user_id': 'test-user', 'status': 'approved',
+            'occurrence_count': 2, 'source_document_ids': ['doc-1', 'doc-2']
+        }
+        mock_firestore.get_all.return_value = [current]
+        mock_transaction = mock_firestore.transaction.return_value
+        
+        with patch('shared.review.queue_manager.firestore.transactional', lambda func: func):
+            archived = queue_manager.archive_reviewed_items(batch_size=2)
+        
+        assert archived == 1
+        record = mock_transaction.set.call_args[0][1]
+        assert record['occurrence_count'] == 2
+        assert record['source_document_ids'] == ['doc-1', 'doc-2']
+        mock_transaction.delete.assert_called_once_with(current.reference)
+    
+    def test_archive_reviewed_items_invalid_batch_size(self, queue_manager):
+        """Test compaction rejects oversized batches."""
+        with pytest.raises(ValueError, match="batch_size"):
+            queue_manager.archive_reviewed_items(batch_size=1000)
+    
     def test_update_item_status_wrong_user(self, queue_manager):
         """Test updating item status with wrong user raises error."""
         # Mock get_item_by_id
@@ -355,6 +548,49 @@ class TestReviewItem:
                 source_document_id="doc-123"
             )
     
+    def test_canonical_id_normalizes_names(self, sample_entity_item):
+        """Test canonical IDs ignore case and whitespace differences."""
+        variant = ReviewItem.from_dict(sample_entity_item.to_dict())
+        variant.entity = {'name': 'JOHN  doe', 'type': 'person'}
+        other_user = ReviewItem.from_dict(sample_entity_item.to_dict())
+        other_user.user_id = "other-user"
+        
+        assert variant.get_canonical_id() == sample_entity_item.get_canonical_id()
+        assert other_user.get_canonical_id() != sample_entity_item.get_canonical_id()
+    
+    def test_merge_occurrence(self, sample_entity_item):
+        """Test merging a duplicate extraction into an item."""
+        duplicate = ReviewItem.from_dict(sample_entity_item.to_dict())
+        duplicate.source_document_id = "doc-2"
+        duplicate.source_document_ids = ["doc-2"]
+        duplicate.confidence = 0.99
+        
+        sample_entity_item.merge_occurrence(duplicate)
+        
+        assert sample_entity_item.occurrence_count == 2
+        assert sample_entity_item.confidence == 0.99
+        assert sample_entity_item.source_document_ids[-1] == "doc-2"
+    
+    def test_merge_occurrence_is_idempotent(self, sample_entity_item):
+        """Test re-merging an already recorded source document keeps the count."""
+        duplicate = ReviewItem.from_dict(sample_entity_item.to_dict())
+        duplicate.source_document_id = "doc-2"
+        duplicate.source_document_ids = ["doc-2"]
+        
+        sample_entity_item.merge_occurrence(duplicate)
+        sample_entity_item.merge_occurrence(duplicate)
+        sample_entity_item.merge_occurrence(ReviewItem.from_dict(sample_entity_item.to_dict()))
+        
+        assert sample_entity_item.occurrence_count == 2
+        assert sample_entity_item.source_document_ids == ["doc-123", "doc-2"]
+    
+    def test_to_summary_dict(self, sample_entity_item):
+        """Test summary conversion omits heavy fields."""
+        data = sample_entity_item.to_summary_dict()
+        assert data['entity']['name'] == 'John Doe'
+        assert 'extracted_text' not in data
+        assert 'metadata' not in data
+    
     def test_to_dict(self, sample_entity_item):
         """Test converting item to dictionary."""
         data = sample_entity_item.to_dict()
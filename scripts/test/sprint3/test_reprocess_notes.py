@@ -0,0 +1,119 @@
+"""
+Tests for the note reprocessing (backfill) CLI.
+"""
+
+import pytest
+import asyncio
+import os
+import sys
+import time
+from unittest.mock import MagicMock
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", "utils"))
+
+import reprocess_notes
+from reprocess_notes import (
+    BackfillCheckpoint,
+    NoteSelection,
+    RateLimiter,
+    backfill_summaries,
+    estimate,
+    plan_note
+)
+
+
+class TestPlanning:
+    """Test suite for note parsing and estimation."""
+    
+    def test_plan_note(self):
+        """Test a note is split into chunks the way orchestration splits it."""
+        plan = plan_note("note-1", "Ada Lovelace wrote the first program. " * 500)
+        
+        assert plan.note_id == "note-1"
+        assert plan.chunks == 3
+        assert plan.input_tokens > plan.chars // 4
+    
+    def test_estimate_bounded_by_rate_limit(self):
+        """Test duration follows the request rate when it is the bottleneck."""
+        plans = [plan_note(f"note-{i}", "Short note.") for i in range(120)]
+        
+        summary = estimate(plans, "gemini-2.0-flash-exp", concurrency=100, requests_per_minute=60)
+        
+        assert summary['notes'] == 120
+        assert summary['chunks'] == 120
+        assert summary['estimated_minutes'] == 2.0
+        assert summary['estimated_cost_usd'] > 0
+
+
+class TestRateLimiter:
+    """Test suite for the Gemini request pacing."""
+    
+    def test_paces_requests_beyond_burst(self):
+        """Test requests beyond the bucket wait for it to refill."""
+        async def run():
+            limiter = RateLimiter(requests_per_minute=600)
+            started = time.monotonic()
+            await limiter.acquire(600)
+            await limiter.acquire(2)
+            return time.monotonic() - started
+        
+        # 2 requests at 10 per second
+        assert asyncio.run(run()) >= 0.15
+
+
+class TestBackfillCheckpoint:
+    """Test suite for resumable progress."""
+    
+    def test_round_trip(self, tmp_path):
+        """Test progress survives a save and load."""
+        path = str(tmp_path / "checkpoint.json")
+        checkpoint = BackfillCheckpoint(run_id="run-1", selection={'user_id': 'user-1'})
+        checkpoint.done.append("note-1")
+        checkpoint.failed["note-2"] = "AI processing error"
+        
+        checkpoint.save(path)
+        loaded = BackfillCheckpoint.load(path)
+        
+        assert loaded == checkpoint
+
+
+
+class TestSummaryBackfill:
+    """Test suite for --summary-only."""
+    
+    def test_writes_missing_summaries(self, monkeypatch):
+        """Test notes without list fields get them and their owners' versions are bumped."""
+        notes = [
+            ("note-1", {'userId': "user-1", 'content': "Ada Lovelace\nwrote the first program."}),
+            ("note-2", {'userId': "user-1", 'content': "Kept", 'title': "Custom", 'contentPreview': "Kept"}),
+            ("note-3", {'userId': "user-2", 'content': "Charles Babbage", 'title': "Babbage"})
+        ]
+        monkeypatch.setattr(reprocess_notes, 'select_notes', lambda db, selection: iter(notes))
+        db = MagicMock()
+        batch = db.batch.return_value
+        
+        updated = backfill_summaries(db, NoteSelection())
+        
+        assert updated == 2
+        updates = [call[0][1] for call in batch.update.call_args_list]
+        assert updates == [
+            {'title': "Ada Lovelace", 'contentPreview': "Ada Lovelace wrote the first program."},
+            {'contentPreview': "Charles Babbage"}
+        ]
+        bumped = {call[0][0] for call in db.collection.return_value.document.call_args_list} - {"note-1", "note-3"}
+        assert bumped == {"user-1", "user-2"}
+        batch.commit.assert_called_once()
+    
+    def test_dry_run_does_not_write(self, monkeypatch):
+        """Test a dry run only counts the notes to update."""
+        notes = [("note-1", {'userId': "user-1", 'content': "Ada Lovelace"})]
+        monkeypatch.setattr(reprocess_notes, 'select_notes', lambda db, selection: iter(notes))
+        db = MagicMock()
+        
+        assert backfill_summaries(db, NoteSelection(), dry_run=True) == 1
+        db.batch.return_value.update.assert_not_called()
+        db.batch.return_value.commit.assert_not_called()
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -177,7 +177,7 @@ class TestGetPendingItems:
     
     def test_get_pending_items_success(self, mock_queue_manager, sample_review_items, app):
         """Test successfully getting pending items."""
-        mock_queue_manager.get_pending_items.return_value = sample_review_items
+        mock_queue_manager.get_pending_page.return_value = (sample_review_items, None)
         
         with app.test_request_context('/review/pending?limit=10&min_confidence=0.5&type=entity'):
             request = Mock()
@@ -196,6 +196,7 @@ class TestGetPendingItems:
             assert data['success'] is True
             assert len(data['data']['items']) == 2
             assert data['data']['count'] == 2
+            assert data['data']['next_cursor'] is None
     
     def test_get_pending_items_invalid_type(self, mock_queue_manager, app):
         """Test invalid item type parameter."""
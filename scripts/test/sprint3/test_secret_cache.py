@@ -0,0 +1,70 @@
+"""
+Tests for the Neo4j client's secret cache under concurrent requests.
+"""
+
+import pytest
+import threading
+import time
+from unittest.mock import MagicMock
+
+import shared.db.neo4j_client as neo4j_client
+from shared.db.neo4j_client import clear_secret_cache, get_secret
+
+
+@pytest.fixture
+def secret_client(monkeypatch):
+    """Fake Secret Manager client that is slow to answer."""
+    calls = []
+    
+    def access_secret_version(request):
+        calls.append(request['name'])
+        time.sleep(0.05)
+        response = MagicMock()
+        response.payload.data = b"neo4j-password\n"
+        return response
+    
+    client = MagicMock()
+    client.access_secret_version.side_effect = access_secret_version
+    monkeypatch.setattr(neo4j_client, 'get_secret_client', lambda: client)
+    clear_secret_cache()
+    yield calls
+    clear_secret_cache()
+
+
+class TestSecretCache:
+    """Test suite for get_secret caching."""
+    
+    def test_concurrent_misses_fetch_once(self, secret_client):
+        """Test concurrent requests for an uncached secret share one fetch."""
+        results = []
+        
+        def request():
+            results.append(get_secret("project", "NEO4J_PASSWORD"))
+        
+        threads = [threading.Thread(target=request) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        assert results == ["neo4j-password"] * 8
+        assert secret_client == ["projects/project/secrets/NEO4J_PASSWORD/versions/latest"]
+    
+    def test_expired_secret_refetched(self, secret_client, monkeypatch):
+        """Test an expired entry is dropped and fetched again."""
+        monkeypatch.setattr(neo4j_client, 'SECRET_CACHE_TTL', -1)
+        get_secret("project", "NEO4J_USER")
+        get_secret("project", "NEO4J_USER")
+        
+        assert len(secret_client) == 2
+    
+    def test_uncached_lookup(self, secret_client):
+        """Test use_cache=False always fetches and stores nothing."""
+        get_secret("project", "NEO4J_URI", use_cache=False)
+        get_secret("project", "NEO4J_URI")
+        
+        assert len(secret_client) == 2
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,98 @@
+"""
+Tests for the process-wide service container.
+"""
+
+import pytest
+import threading
+from unittest.mock import MagicMock
+
+from shared.utils.service_container import ServiceContainer
+
+
+@pytest.fixture
+def container():
+    """Create a service container with a mocked test service."""
+    container = ServiceContainer(project_id="test-project")
+    factory = MagicMock(side_effect=lambda: object())
+    container.register("test", factory)
+    return container, factory
+
+
+class TestServiceContainer:
+    """Test suite for ServiceContainer."""
+    
+    def test_service_built_once(self, container):
+        """Test a service is built on first use and then reused."""
+        container, factory = container
+        
+        first = container.get("test")
+        second = container.get("test")
+        
+        assert first is second
+        factory.assert_called_once()
+    
+    def test_concurrent_first_use_builds_once(self, container):
+        """Test threads racing on first use share one instance."""
+        container, factory = container
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(container.get("test"))) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        assert len({id(result) for result in results}) == 1
+        factory.assert_called_once()
+    
+    def test_refresh_rebuilds(self, container):
+        """Test refreshed services are rebuilt on next use."""
+        container, factory = container
+        first = container.get("test")
+        
+        container.refresh("test")
+        
+        assert container.get("test") is not first
+        assert factory.call_count == 2
+    
+    def test_max_age_rebuilds(self):
+        """Test services older than their max age are rebuilt."""
+        container = ServiceContainer(project_id="test-project")
+        factory = MagicMock(side_effect=lambda: object())
+        container.register("test", factory, max_age_seconds=0)
+        
+        container.get("test")
+        container.get("test")
+        
+        assert factory.call_count == 2
+    
+    def test_event_loop_per_thread(self, container):
+        """Test each thread reuses its own event loop."""
+        container, _ = container
+        loops = []
+        
+        async def current_loop():
+            import asyncio
+            return asyncio.get_running_loop()
+        
+        def run_twice():
+            loops.append((container.run(current_loop()), container.run(current_loop())))
+        
+        thread = threading.Thread(target=run_twice)
+        thread.start()
+        thread.join()
+        run_twice()
+        
+        (thread_first, thread_second), (main_first, main_second) = loops
+        assert thread_first is thread_second
+        assert main_first is main_second
+        assert thread_first is not main_first
+    
+    def test_unknown_service(self, container):
+        """Test getting an unregistered service raises error."""
+        container, _ = container
+        with pytest.raises(KeyError):
+            container.get("missing")
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,182 @@
+"""
+Tests for stage-level tracing.
+"""
+
+import pytest
+import asyncio
+import json
+import threading
+import time
+
+from shared.utils.tracing import (
+    JsonFileExporter,
+    SpanExporter,
+    SpanStatus,
+    current_span,
+    flush_traces,
+    set_exporter,
+    start_span,
+    to_otlp,
+    traced
+)
+from shared.utils.pipeline import Sink, run_staged_pipeline
+
+
+class CollectingExporter(SpanExporter):
+    """Keeps exported traces in memory."""
+    
+    def __init__(self):
+        self.traces = []
+    
+    def export(self, spans):
+        self.traces.append(list(spans))
+
+
+@pytest.fixture
+def exporter():
+    """Enable tracing with an in-memory exporter."""
+    collecting = CollectingExporter()
+    set_exporter(collecting)
+    yield collecting
+    set_exporter(None)
+
+
+def by_name(spans):
+    return {span.name: span for span in spans}
+
+
+class TestSpans:
+    """Test suite for span nesting and export."""
+    
+    def test_disabled_spans_are_noop(self):
+        """Test nothing is recorded without an exporter."""
+        with start_span("process_note", note_id="note-1") as span:
+            span.set_attribute('rows', 3)
+            
+            assert current_span() is span
+        
+        assert span.attributes == {}
+    
+    def test_nested_spans_exported_with_root(self, exporter):
+        """Test children share the trace and are exported when the root ends."""
+        with start_span("process_note", note_id="note-1"):
+            with start_span("neo4j.query") as query:
+                query.increment('retries')
+                query.increment('retries')
+            
+            flush_traces()
+            assert exporter.traces == []
+        
+        flush_traces()
+        [trace] = exporter.traces
+        spans = by_name(trace)
+        assert spans['neo4j.query'].parent_id == spans['process_note'].span_id
+        assert spans['neo4j.query'].trace_id == spans['process_note'].trace_id
+        assert spans['neo4j.query'].attributes == {'retries': 2}
+        assert spans['process_note'].parent_id is None
+    
+    def test_error_marks_span(self, exporter):
+        """Test an exception marks the span as failed and propagates."""
+        with pytest.raises(ValueError):
+            with start_span("gemini.generate_content"):
+                raise ValueError("quota")
+        
+        flush_traces()
+        [[span]] = exporter.traces
+        assert span.status == SpanStatus.ERROR
+        assert span.error == "ValueError: quota"
+        assert span.end_time >= span.start_time
+    
+    def test_context_follows_pipeline_threads(self, exporter):
+        """Test spans opened in sync sink handlers nest under their stage span."""
+        async def source():
+            for i in range(2):
+                yield i
+        
+        def store(item):
+            with start_span("firestore.merge_review_items", items=item):
+                pass
+        
+        @traced("process_note")
+        def process():
+            asyncio.run(run_staged_pipeline(source(), [Sink("review_queue", store)]))
+        
+        process()
+        flush_traces()
+        
+        [trace] = exporter.traces
+        root = trace[-1]
+        stages = [span for span in trace if span.name == "stage.review_queue"]
+        merges = [span for span in trace if span.name == "firestore.merge_review_items"]
+        assert root.name == "process_note"
+        assert len(stages) == 2 and all(stage.parent_id == root.span_id for stage in stages)
+        assert {merge.parent_id for merge in merges} == {stage.span_id for stage in stages}
+    
+    def test_export_runs_off_the_request_thread(self):
+        """Test a slow exporter does not delay the end of the root span."""
+        release = threading.Event()
+        
+        class SlowExporter(CollectingExporter):
+            def export(self, spans):
+                release.wait(5)
+                super().export(spans)
+        
+        slow = SlowExporter()
+        set_exporter(slow)
+        try:
+            started = time.monotonic()
+            with start_span("process_note"):
+                pass
+            assert time.monotonic() - started < 1
+            assert not flush_traces(timeout=0.05)
+            
+            release.set()
+            assert flush_traces(timeout=5)
+        finally:
+            set_exporter(None)
+        
+        assert [span.name for [span] in slow.traces] == ["process_note"]
+
+
+class TestExporters:
+    """Test suite for the trace formats."""
+    
+    def test_json_file_exporter(self, tmp_path):
+        """Test each trace is appended as one JSON line."""
+        path = tmp_path / "traces.jsonl"
+        set_exporter(JsonFileExporter(str(path)))
+        try:
+            for _ in range(2):
+                with start_span("process_note", note_id="note-1"):
+                    with start_span("extract_chunk", chunk=0):
+                        pass
+            flush_traces()
+        finally:
+            set_exporter(None)
+        
+        lines = [json.loads(line) for line in path.read_text().splitlines()]
+        assert len(lines) == 2
+        assert [span['name'] for span in lines[0]['spans']] == ["extract_chunk", "process_note"]
+        assert lines[0]['spans'][1]['attributes'] == {'note_id': "note-1"}
+    
+    def test_otlp_format(self, exporter):
+        """Test spans convert to an OTLP/JSON export request."""
+        with start_span("process_note", note_id="note-1", cached=True):
+            with start_span("gemini.generate_content", input_tokens=120, next_chunk=None):
+                pass
+        flush_traces()
+        
+        request = to_otlp(exporter.traces[0], service_name="orchestration")
+        
+        resource_spans = request['resourceSpans'][0]
+        assert resource_spans['resource']['attributes'][0]['value'] == {'stringValue': "orchestration"}
+        child, root = resource_spans['scopeSpans'][0]['spans']
+        assert child['parentSpanId'] == root['spanId']
+        assert 'parentSpanId' not in root
+        assert child['attributes'] == [{'key': 'input_tokens', 'value': {'intValue': "120"}}]
+        assert {'key': 'cached', 'value': {'boolValue': True}} in root['attributes']
+        assert int(child['endTimeUnixNano']) >= int(child['startTimeUnixNano'])
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
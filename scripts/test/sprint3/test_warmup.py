@@ -0,0 +1,80 @@
+"""
+Tests for background warm-up at instance start.
+"""
+
+import pytest
+import threading
+
+from shared.utils.warmup import Warmup, enabled_tasks
+
+
+class TestWarmup:
+    """Test suite for Warmup."""
+    
+    def test_wait_for_finished_task(self):
+        """Test waiting on a task returns once it has run."""
+        release = threading.Event()
+        warmup = Warmup({'neo4j': lambda: release.wait(1)})
+        warmup.start()
+        
+        release.set()
+        
+        assert warmup.wait_for('neo4j', timeout=1)
+        assert warmup.status()['neo4j']['done']
+    
+    def test_wait_only_on_requested_tasks(self):
+        """Test a request does not wait for tasks it does not need."""
+        release = threading.Event()
+        warmup = Warmup({'neo4j': lambda: release.wait(5), 'firebase': lambda: None})
+        warmup.start()
+        
+        assert warmup.wait_for('firebase', timeout=1)
+        assert not warmup.done['neo4j'].is_set()
+        release.set()
+    
+    def test_failed_task_reported(self):
+        """Test a failed task is recorded and does not block requests."""
+        def fail():
+            raise RuntimeError("Aura is asleep")
+        
+        warmup = Warmup({'neo4j': fail})
+        warmup.start()
+        
+        assert not warmup.wait_for('neo4j', timeout=1)
+        assert warmup.status()['neo4j']['error'] == "Aura is asleep"
+    
+    def test_wait_times_out(self):
+        """Test requests stop waiting after the timeout."""
+        release = threading.Event()
+        warmup = Warmup({'neo4j': lambda: release.wait(5)})
+        warmup.start()
+        
+        assert not warmup.wait_for('neo4j', timeout=0.01)
+        release.set()
+    
+    def test_task_waiting_on_itself_does_not_block(self):
+        """Test code shared with requests can call wait_for from a warm-up task."""
+        results = []
+        warmup = Warmup({'neo4j': lambda: results.append(warmup.wait_for('neo4j', timeout=5))})
+        warmup.start()
+        
+        assert warmup.wait_for('neo4j', timeout=1)
+        assert results == [False]
+
+
+class TestEnabledTasks:
+    """Test suite for the WARMUP_ON_START setting."""
+    
+    @pytest.mark.parametrize("setting,expected", [
+        ("", []),
+        ("false", []),
+        ("true", ['firebase', 'neo4j']),
+        ("neo4j, ai", ['neo4j'])
+    ])
+    def test_setting(self, setting, expected):
+        """Test the setting enables all, some or none of an entry point's tasks."""
+        assert enabled_tasks(['firebase', 'neo4j'], setting) == expected
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,248 @@
+"""
+Import-time profiler for Cloud Function entry points.
+
+Imports each function's main module in a fresh interpreter with
+`python -X importtime` and reports what the cold import costs, broken down
+by top-level package, so regressions in cold-start time can be traced to
+the module that caused them.
+
+Each function is staged the way the deploy scripts lay it out (its own
+files plus a copy of the root shared/ package) before it is measured.
+
+Budgets for each entry point are recorded in import_budgets.json next to
+this script and enforced by scripts/test/sprint3/test_import_budget.py.
+
+Usage:
+    python scripts/utils/profile_imports.py                 # report all entry points
+    python scripts/utils/profile_imports.py review_api -n 20
+    python scripts/utils/profile_imports.py --record        # re-record budgets
+"""
+
+import argparse
+import json
+import os
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+FUNCTIONS_DIR = os.path.join(REPO_ROOT, "functions")
+SHARED_DIR = os.path.join(REPO_ROOT, "shared")
+BUDGETS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "import_budgets.json")
+
+# Function directories with a main.py entry point
+ENTRY_POINTS = ("graph", "ingestion", "notes_api", "orchestration", "retrieval", "review_api")
+
+# Headroom applied when recording budgets
+BUDGET_HEADROOM = 1.5
+
+# Cold imports measured per entry point (the fastest run is kept)
+DEFAULT_RUNS = 3
+
+_IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)\s*$")
+
+
+class ImportProfileError(Exception):
+    """Raised when an entry point cannot be imported."""
+    
+    def __init__(self, entry_point: str, stderr: str):
+        super().__init__(f"Failed to import {entry_point}: {stderr.strip().splitlines()[-1] if stderr.strip() else 'unknown error'}")
+        self.entry_point = entry_point
+        self.stderr = stderr
+    
+    @property
+    def missing_dependency(self) -> bool:
+        """True if the import failed because a third-party package is not installed."""
+        match = re.search(r"ModuleNotFoundError: No module named '([^']+)'", self.stderr)
+        return match is not None and match.group(1).split('.')[0] not in ("shared", "main")
+
+
+@dataclass
+class ImportProfile:
+    """
+    Cold import cost of one entry point.
+    
+    Attributes:
+        entry_point: Function directory name
+        total_ms: Cumulative import time of main.py
+        modules: Self time per imported module in ms
+        packages: Self time per top-level package in ms
+    """
+    entry_point: str
+    total_ms: float
+    modules: Dict[str, float] = field(default_factory=dict)
+    packages: Dict[str, float] = field(default_factory=dict)
+    
+    def top_packages(self, limit: int = 10) -> List[Tuple[str, float]]:
+        """Get the most expensive top-level packages."""
+        return sorted(self.packages.items(), key=lambda item: item[1], reverse=True)[:limit]
+    
+    def top_modules(self, limit: int = 10) -> List[Tuple[str, float]]:
+        """Get the most expensive individual modules."""
+        return sorted(self.modules.items(), key=lambda item: item[1], reverse=True)[:limit]
+
+
+def parse_importtime(output: str, entry_point: str, root_module: str = "main") -> ImportProfile:
+    """
+    Parse `python -X importtime` output.
+    
+    Args:
+        output: stderr of the profiled interpreter
+        entry_point: Entry point name
+        root_module: Module whose cumulative time is the total
+    
+    Returns:
+        ImportProfile
+    """
+    modules: Dict[str, float] = {}
+    packages: Dict[str, float] = defaultdict(float)
+    total_ms = 0.0
+    
+    for line in output.splitlines():
+        match = _IMPORTTIME_LINE.match(line)
+        if not match:
+            continue
+        self_us, cumulative_us, indent, name = match.groups()
+        self_ms = int(self_us) / 1000.0
+        
+        modules[name] = modules.get(name, 0.0) + self_ms
+        packages[name.split('.')[0]] += self_ms
+        if name == root_module and len(indent) <= 1:
+            total_ms = int(cumulative_us) / 1000.0
+    
+    return ImportProfile(entry_point=entry_point, total_ms=total_ms, modules=modules, packages=dict(packages))
+
+
+def stage_entry_point(entry_point: str, stage_dir: str) -> str:
+    """
+    Lay out a function the way the deploy scripts do.
+    
+    The function directory is copied without its own shared/ (a vendored
+    copy or a symlink to another function's) and the root shared/ package
+    is copied in next to main.py, as deploy-authenticated-functions.sh does.
+    
+    Args:
+        entry_point: Function directory name
+        stage_dir: Empty directory to stage into
+    
+    Returns:
+        Path of the staged function directory
+    """
+    staged_dir = os.path.join(stage_dir, entry_point)
+    shutil.copytree(
+        os.path.join(FUNCTIONS_DIR, entry_point),
+        staged_dir,
+        ignore=shutil.ignore_patterns("shared", "__pycache__", "venv", ".venv")
+    )
+    shutil.copytree(SHARED_DIR, os.path.join(staged_dir, "shared"), ignore=shutil.ignore_patterns("__pycache__"))
+    return staged_dir
+
+
+def profile_entry_point(entry_point: str, runs: int = DEFAULT_RUNS) -> ImportProfile:
+    """
+    Measure the cold import of a function's main module.
+    
+    The function is staged with the root shared/ package (see
+    stage_entry_point) and imported with only the staged directory on the
+    path, so what is measured is what gets deployed.
+    
+    Args:
+        entry_point: Function directory name
+        runs: Number of fresh interpreters to measure (fastest is kept)
+    
+    Returns:
+        ImportProfile of the fastest run
+    
+    Raises:
+        ImportProfileError: If main.py cannot be imported
+    """
+    best: Optional[ImportProfile] = None
+    with tempfile.TemporaryDirectory(prefix=f"import-profile-{entry_point}-") as stage_dir:
+        function_dir = stage_entry_point(entry_point, stage_dir)
+        env = dict(os.environ)
+        env['PYTHONPATH'] = function_dir
+        env['PYTHONDONTWRITEBYTECODE'] = '1'
+        
+        for _ in range(max(1, runs)):
+            result = subprocess.run(
+                [sys.executable, "-X", "importtime", "-c", "import main"],
+                cwd=function_dir,
+                env=env,
+                capture_output=True,
+                text=True
+            )
+            if result.returncode != 0:
+                raise ImportProfileError(entry_point, result.stderr)
+            
+            profile = parse_importtime(result.stderr, entry_point)
+            if best is None or profile.total_ms < best.total_ms:
+                best = profile
+    return best
+
+
+def load_budgets(path: str = BUDGETS_FILE) -> Dict[str, float]:
+    """Load the recorded import budgets (ms per entry point)."""
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)["budgets_ms"]
+
+
+def record_budgets(profiles: List[ImportProfile], path: str = BUDGETS_FILE):
+    """Record budgets from measured profiles, with BUDGET_HEADROOM."""
+    budgets = {}
+    if os.path.exists(path):
+        budgets = load_budgets(path)
+    for profile in profiles:
+        budgets[profile.entry_point] = round(profile.total_ms * BUDGET_HEADROOM)
+    
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({
+            "python": f"{sys.version_info.major}.{sys.version_info.minor}",
+            "headroom": BUDGET_HEADROOM,
+            "budgets_ms": dict(sorted(budgets.items()))
+        }, f, indent=2)
+        f.write("\n")
+
+
+def print_report(profile: ImportProfile, limit: int, budget: Optional[float] = None):
+    """Print an import cost report for one entry point."""
+    budget_text = f" (budget {budget:.0f} ms)" if budget else ""
+    print(f"\n{profile.entry_point}: {profile.total_ms:.1f} ms{budget_text}")
+    print("  by package:")
+    for name, ms in profile.top_packages(limit):
+        print(f"    {ms:8.1f} ms  {name}")
+    print("  slowest modules:")
+    for name, ms in profile.top_modules(limit):
+        print(f"    {ms:8.1f} ms  {name}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Profile cold import time of function entry points")
+    parser.add_argument("entry_points", nargs="*", default=list(ENTRY_POINTS))
+    parser.add_argument("-n", "--limit", type=int, default=10, help="Rows per section")
+    parser.add_argument("--runs", type=int, default=DEFAULT_RUNS, help="Cold imports per entry point")
+    parser.add_argument("--record", action="store_true", help="Record budgets from this run")
+    args = parser.parse_args()
+    
+    budgets = load_budgets() if os.path.exists(BUDGETS_FILE) else {}
+    profiles = []
+    for entry_point in args.entry_points:
+        try:
+            profile = profile_entry_point(entry_point, runs=args.runs)
+        except ImportProfileError as e:
+            print(f"\n{entry_point}: {e}", file=sys.stderr)
+            continue
+        profiles.append(profile)
+        print_report(profile, args.limit, budgets.get(entry_point))
+    
+    if args.record and profiles:
+        record_budgets(profiles)
+        print(f"\nRecorded budgets for {len(profiles)} entry points in {BUDGETS_FILE}")
+
+
+if __name__ == "__main__":
+    main()
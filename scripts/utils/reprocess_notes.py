@@ -0,0 +1,481 @@
+"""
+Reprocess (backfill) existing notes through the orchestration pipeline.
+
+After a change to the model, prompts or normalizers, existing notes can be
+re-extracted with this admin CLI instead of ad-hoc scripts. Notes are
+selected by user, creation date range and status and run through the
+orchestration function's process_note in this process:
+- chunking, hashing and estimation run in a process pool
+- at most --concurrency notes are processed at once
+- note starts are paced so the estimated Gemini request rate stays under
+  --requests-per-minute
+- progress is saved to a checkpoint file, and --resume skips notes that
+  have already been reprocessed in that run
+
+--dry-run only estimates the Gemini cost and duration of the selection.
+
+--summary-only does no AI work: it writes the title and contentPreview
+list fields (shared/models/note.py build_note_summary) to selected notes
+that were created before those fields existed, and bumps their owners'
+notes versions so cached list responses are refreshed.
+
+Requires application default credentials for the project (Firestore,
+Secret Manager) and the orchestration function's dependencies.
+
+Usage:
+    python scripts/utils/reprocess_notes.py --user USER_ID --dry-run
+    python scripts/utils/reprocess_notes.py --status failed --since 2025-01-01 --concurrency 8
+    python scripts/utils/reprocess_notes.py --resume --checkpoint reprocess_checkpoint.json
+    python scripts/utils/reprocess_notes.py --summary-only
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+ORCHESTRATION_DIR = os.path.join(REPO_ROOT, "functions", "orchestration")
+
+# The orchestration function's main module, and its vendored shared
+# package unless the repository root is already on the path
+sys.path.append(ORCHESTRATION_DIR)
+
+from shared.db.processing_ledger import content_hash
+from shared.models.note import build_note_summary, bump_notes_version
+from shared.utils.cost_config import calculate_cost
+from shared.utils.text_chunker import chunk_text
+
+# Must match the chunk size used by orchestration's extract_chunks
+CHUNK_SIZE = 8000
+
+DEFAULT_PROJECT_ID = "aletheia-codex-prod"
+DEFAULT_MODEL = "gemini-2.0-flash-exp"
+DEFAULT_CONCURRENCY = 4
+DEFAULT_REQUESTS_PER_MINUTE = 60
+DEFAULT_CHECKPOINT = "reprocess_checkpoint.json"
+PAGE_SIZE = 200
+
+# Estimation (one Gemini request per chunk)
+CHARS_PER_TOKEN = 4
+PROMPT_TOKENS_PER_CHUNK = 600
+OUTPUT_TOKENS_PER_CHUNK = 500
+SECONDS_PER_CHUNK = 6.0
+
+# Checkpoint is written after this many finished notes
+CHECKPOINT_EVERY = 10
+
+# Notes updated per --summary-only batch (each may add a notes version bump,
+# and a batch allows 500 writes)
+SUMMARY_BATCH_SIZE = 200
+
+
+@dataclass
+class NoteSelection:
+    """
+    Which notes to reprocess.
+    
+    Attributes:
+        user_id: Only this user's notes
+        since: Created at or after (inclusive)
+        until: Created before (exclusive)
+        statuses: Only notes with one of these statuses
+        limit: Maximum number of notes
+    """
+    user_id: Optional[str] = None
+    since: Optional[str] = None
+    until: Optional[str] = None
+    statuses: List[str] = field(default_factory=list)
+    limit: Optional[int] = None
+
+
+@dataclass
+class NotePlan:
+    """
+    Parsed note, ready to be estimated or processed.
+    
+    Attributes:
+        note_id: Note document ID
+        chunks: Number of chunks (Gemini requests)
+        chars: Content length
+        content_sha256: Content hash
+        input_tokens: Estimated Gemini input tokens
+        output_tokens: Estimated Gemini output tokens
+    """
+    note_id: str
+    chunks: int
+    chars: int
+    content_sha256: str
+    input_tokens: int
+    output_tokens: int
+
+
+def plan_note(note_id: str, content: str) -> NotePlan:
+    """Chunk and hash a note (runs in the process pool)."""
+    chunks = len(chunk_text(content, chunk_size=CHUNK_SIZE)) if content else 0
+    return NotePlan(
+        note_id=note_id,
+        chunks=chunks,
+        chars=len(content),
+        content_sha256=content_hash(content),
+        input_tokens=len(content) // CHARS_PER_TOKEN + chunks * PROMPT_TOKENS_PER_CHUNK,
+        output_tokens=chunks * OUTPUT_TOKENS_PER_CHUNK
+    )
+
+
+def estimate(plans: List[NotePlan], model: str, concurrency: int, requests_per_minute: int) -> Dict[str, Any]:
+    """
+    Estimate the Gemini cost and wall-clock duration of reprocessing.
+    
+    Duration is bounded by both the request rate and the concurrency.
+    
+    Args:
+        plans: Parsed notes
+        model: Gemini model (for pricing)
+        concurrency: Notes processed at once
+        requests_per_minute: Gemini request rate limit
+    
+    Returns:
+        Estimate summary
+    """
+    chunks = sum(plan.chunks for plan in plans)
+    input_tokens = sum(plan.input_tokens for plan in plans)
+    output_tokens = sum(plan.output_tokens for plan in plans)
+    seconds = max(
+        chunks * 60.0 / requests_per_minute,
+        chunks * SECONDS_PER_CHUNK / max(1, concurrency)
+    )
+    return {
+        'notes': len(plans),
+        'chunks': chunks,
+        'characters': sum(plan.chars for plan in plans),
+        'input_tokens': input_tokens,
+        'output_tokens': output_tokens,
+        'estimated_cost_usd': round(calculate_cost(input_tokens, output_tokens, model), 4),
+        'estimated_minutes': round(seconds / 60.0, 1)
+    }
+
+
+def parse_date(value: Optional[str]) -> Optional[datetime]:
+    """Parse an ISO date or datetime (UTC unless it has an offset)."""
+    if not value:
+        return None
+    parsed = datetime.fromisoformat(value)
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def select_notes(db, selection: NoteSelection) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """
+    Stream the selected notes, newest first, a page at a time.
+    
+    Args:
+        db: Firestore client
+        selection: Note selection
+    
+    Yields:
+        (note ID, note data)
+    """
+    from google.cloud import firestore
+    from google.cloud.firestore_v1.base_query import FieldFilter
+    
+    query = db.collection('notes')
+    if selection.user_id:
+        query = query.where(filter=FieldFilter('userId', '==', selection.user_id))
+    if selection.statuses:
+        query = query.where(filter=FieldFilter('status', 'in', selection.statuses))
+    if selection.since:
+        query = query.where(filter=FieldFilter('createdAt', '>=', parse_date(selection.since)))
+    if selection.until:
+        query = query.where(filter=FieldFilter('createdAt', '<', parse_date(selection.until)))
+    query = query.order_by('createdAt', direction=firestore.Query.DESCENDING)
+    
+    yielded = 0
+    last = None
+    while True:
+        page = query.start_after(last) if last is not None else query
+        docs = list(page.limit(PAGE_SIZE).stream())
+        for doc in docs:
+            if selection.limit is not None and yielded >= selection.limit:
+                return
+            yielded += 1
+            yield doc.id, doc.to_dict()
+        if len(docs) < PAGE_SIZE:
+            return
+        last = docs[-1]
+
+
+def missing_summary(data: Dict[str, Any]) -> Dict[str, str]:
+    """Get the summary fields a note lacks, built from its content."""
+    summary = build_note_summary(data.get('content', ''))
+    return {key: value for key, value in summary.items() if key not in data}
+
+
+def backfill_summaries(db, selection: NoteSelection, dry_run: bool = False) -> int:
+    """
+    Write the list summary fields to selected notes that lack them.
+    
+    Existing fields are never overwritten, so the run can be repeated.
+    
+    Args:
+        db: Firestore client
+        selection: Note selection
+        dry_run: Only count the notes that would be updated
+    
+    Returns:
+        Number of notes updated (or to update, for a dry run)
+    """
+    updated = 0
+    batch, pending, owners = db.batch(), 0, set()
+    
+    def commit():
+        for user_id in owners:
+            bump_notes_version(db, user_id, batch=batch)
+        batch.commit()
+    
+    for note_id, data in select_notes(db, selection):
+        updates = missing_summary(data)
+        if not updates:
+            continue
+        updated += 1
+        if dry_run:
+            continue
+        
+        batch.update(db.collection('notes').document(note_id), updates)
+        if data.get('userId'):
+            owners.add(data['userId'])
+        pending += 1
+        if pending >= SUMMARY_BATCH_SIZE:
+            commit()
+            print(f"Updated {updated} note summaries")
+            batch, pending, owners = db.batch(), 0, set()
+    
+    if pending:
+        commit()
+    return updated
+
+
+class RateLimiter:
+    """Token bucket pacing Gemini requests across concurrent notes."""
+    
+    def __init__(self, requests_per_minute: int):
+        self.rate = requests_per_minute / 60.0
+        self.capacity = float(requests_per_minute)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = asyncio.Lock()
+    
+    async def acquire(self, requests: int):
+        """Wait until a note's requests fit under the rate (large notes wait for a full bucket)."""
+        requests = min(float(requests), self.capacity)
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= requests:
+                    self.tokens -= requests
+                    return
+                await asyncio.sleep((requests - self.tokens) / self.rate)
+
+
+@dataclass
+class BackfillCheckpoint:
+    """
+    Progress of a reprocessing run, saved as JSON.
+    
+    Attributes:
+        run_id: Run identifier
+        selection: Selection the run was started with
+        done: IDs of notes reprocessed successfully
+        failed: Note ID to error of notes that failed
+    """
+    run_id: str
+    selection: Dict[str, Any]
+    done: List[str] = field(default_factory=list)
+    failed: Dict[str, str] = field(default_factory=dict)
+    
+    @classmethod
+    def load(cls, path: str) -> 'BackfillCheckpoint':
+        """Load a checkpoint file."""
+        with open(path, "r", encoding="utf-8") as f:
+            return cls(**json.load(f))
+    
+    def save(self, path: str):
+        """Write the checkpoint atomically."""
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(asdict(self), f, indent=2)
+        os.replace(tmp_path, path)
+
+
+def load_orchestration():
+    """Import the orchestration function's main module for in-process runs."""
+    # Process every note to completion here instead of handing long notes
+    # to continuation tasks on the processing queue
+    os.environ.pop('NOTE_PROCESSING_WORKER_URL', None)
+    os.environ.pop('WARMUP_ON_START', None)
+    import main as orchestration
+    return orchestration
+
+
+def reprocess_note(orchestration, db, note_id: str, user_id: str) -> Optional[str]:
+    """
+    Reprocess one note (runs in a worker thread).
+    
+    Args:
+        orchestration: Orchestration main module
+        db: Firestore client
+        note_id: Note document ID
+        user_id: Note owner
+    
+    Returns:
+        Error message, or None on success
+    """
+    orchestration.update_note_status(
+        note_id,
+        'processing',
+        user_id=user_id,
+        processingStartedAt=orchestration.firestore.SERVER_TIMESTAMP
+    )
+    # A fresh event ID per attempt, as for reprocessing through the API
+    orchestration.process_note(note_id, f"backfill-{uuid.uuid4().hex}")
+    
+    note = db.collection('notes').document(note_id).get().to_dict() or {}
+    if note.get('status') != 'completed':
+        return note.get('error') or f"Note ended with status {note.get('status')}"
+    return None
+
+
+async def run_backfill(args, selection: NoteSelection, checkpoint: BackfillCheckpoint) -> int:
+    """
+    Parse, estimate and (unless dry-run) reprocess the selected notes.
+    
+    Returns:
+        Process exit code
+    """
+    from shared.db.firestore_client import get_firestore_client
+    
+    db = get_firestore_client(args.project)
+    loop = asyncio.get_running_loop()
+    done = set(checkpoint.done)
+    
+    # Parse in the process pool
+    owners: Dict[str, str] = {}
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        futures = []
+        for note_id, data in await asyncio.to_thread(lambda: list(select_notes(db, selection))):
+            if note_id in done:
+                continue
+            if data.get('status') == 'processing':
+                print(f"Skipping {note_id}: already processing", file=sys.stderr)
+                continue
+            owners[note_id] = data.get('userId', '')
+            futures.append(loop.run_in_executor(pool, plan_note, note_id, data.get('content', '')))
+        plans = [plan for plan in await asyncio.gather(*futures) if plan.chunks]
+    
+    summary = estimate(plans, args.model, args.concurrency, args.requests_per_minute)
+    print(json.dumps({'run_id': checkpoint.run_id, 'skipped_done': len(done), **summary}, indent=2))
+    if args.dry_run or not plans:
+        return 0
+    
+    orchestration = load_orchestration()
+    limiter = RateLimiter(args.requests_per_minute)
+    semaphore = asyncio.Semaphore(args.concurrency)
+    finished = 0
+    
+    async def process(plan: NotePlan):
+        nonlocal finished
+        async with semaphore:
+            await limiter.acquire(plan.chunks)
+            started = time.monotonic()
+            try:
+                error = await asyncio.to_thread(
+                    reprocess_note, orchestration, db, plan.note_id, owners[plan.note_id]
+                )
+            except Exception as e:
+                error = f"{type(e).__name__}: {str(e)}"
+            
+            if error:
+                checkpoint.failed[plan.note_id] = error
+                print(f"FAILED {plan.note_id}: {error}", file=sys.stderr)
+            else:
+                checkpoint.failed.pop(plan.note_id, None)
+                checkpoint.done.append(plan.note_id)
+                print(f"done {plan.note_id} ({plan.chunks} chunks, {time.monotonic() - started:.1f}s)")
+            
+            finished += 1
+            if finished % CHECKPOINT_EVERY == 0:
+                checkpoint.save(args.checkpoint)
+    
+    try:
+        await asyncio.gather(*(process(plan) for plan in plans))
+    finally:
+        checkpoint.save(args.checkpoint)
+    
+    print(f"Reprocessed {len(plans) - len(checkpoint.failed)}/{len(plans)} notes "
+          f"({len(checkpoint.failed)} failed); checkpoint: {args.checkpoint}")
+    return 1 if checkpoint.failed else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Reprocess existing notes through the orchestration pipeline")
+    parser.add_argument("--user", help="Only notes of this user ID")
+    parser.add_argument("--since", help="Created at or after (ISO date/datetime, UTC)")
+    parser.add_argument("--until", help="Created before (ISO date/datetime, UTC)")
+    parser.add_argument("--status", action="append", default=[], help="Only notes with this status (repeatable)")
+    parser.add_argument("--limit", type=int, help="Maximum number of notes")
+    parser.add_argument("--project", default=DEFAULT_PROJECT_ID, help="GCP project ID")
+    parser.add_argument("--model", default=DEFAULT_MODEL, help="Gemini model (for cost estimates)")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY, help="Notes processed at once")
+    parser.add_argument("--workers", type=int, default=None, help="Parsing processes (default: CPU count)")
+    parser.add_argument("--requests-per-minute", type=int, default=DEFAULT_REQUESTS_PER_MINUTE,
+                        help="Gemini request rate limit")
+    parser.add_argument("--checkpoint", default=DEFAULT_CHECKPOINT, help="Checkpoint file")
+    parser.add_argument("--resume", action="store_true", help="Resume the run in the checkpoint file")
+    parser.add_argument("--dry-run", action="store_true", help="Only estimate cost and duration")
+    parser.add_argument("--summary-only", action="store_true",
+                        help="Only write missing title/contentPreview list fields (no AI processing)")
+    args = parser.parse_args()
+    
+    if args.summary_only:
+        from shared.db.firestore_client import get_firestore_client
+        
+        selection = NoteSelection(
+            user_id=args.user,
+            since=args.since,
+            until=args.until,
+            statuses=args.status,
+            limit=args.limit
+        )
+        updated = backfill_summaries(get_firestore_client(args.project), selection, dry_run=args.dry_run)
+        print(f"{'Would update' if args.dry_run else 'Updated'} {updated} note summaries")
+        return
+    
+    if args.resume:
+        checkpoint = BackfillCheckpoint.load(args.checkpoint)
+        selection = NoteSelection(**checkpoint.selection)
+        print(f"Resuming run {checkpoint.run_id}: {len(checkpoint.done)} notes done")
+    else:
+        selection = NoteSelection(
+            user_id=args.user,
+            since=args.since,
+            until=args.until,
+            statuses=args.status,
+            limit=args.limit
+        )
+        checkpoint = BackfillCheckpoint(run_id=uuid.uuid4().hex[:12], selection=asdict(selection))
+        if os.path.exists(args.checkpoint) and not args.dry_run:
+            parser.error(f"{args.checkpoint} exists; pass --resume or choose another --checkpoint")
+    
+    sys.exit(asyncio.run(run_backfill(args, selection, checkpoint)))
+
+
+if __name__ == "__main__":
+    main()
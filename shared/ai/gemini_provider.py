@@ -6,9 +6,8 @@ Implements the BaseAIProvider interface using Google's Gemini API.
 
 import json
 import logging
+import time
 from typing import List, Dict, Any, Optional
-import google.generativeai as genai
-from google.generativeai.types import HarmCategory, HarmBlockThreshold
 
 from .base_provider import (
     BaseAIProvider,
@@ -21,9 +20,21 @@ from ..models.entity import Entity, normalize_entity_type
 from ..models.relationship import Relationship, normalize_relationship_type
 from .prompts.entity_extraction import build_entity_extraction_prompt
 from .prompts.relationship_detection import build_relationship_detection_prompt
+from ..utils.lazy_import import lazy_import
+from ..utils.metrics import counter, histogram
+from ..utils.tracing import start_span
+
+# Imported on first use (the SDK is slow to import)
+genai = lazy_import("google.generativeai")
+genai_types = lazy_import("google.generativeai.types")
 
 logger = logging.getLogger(__name__)
 
+# Metrics
+GEMINI_REQUESTS = counter("gemini_requests_total", "Gemini generate_content calls by model and outcome")
+GEMINI_REQUEST_SECONDS = histogram("gemini_request_seconds", "Gemini generate_content latency by model")
+GEMINI_TOKENS = counter("gemini_tokens_total", "Gemini tokens by model and direction")
+
 
 class GeminiProvider(BaseAIProvider):
     """
@@ -75,10 +86,10 @@ class GeminiProvider(BaseAIProvider):
                 "max_output_tokens": 8192,
             },
             safety_settings={
-                HarmCategory.HARM_CATEGORY_HATE_SPEECH: HarmBlockThreshold.BLOCK_NONE,
-                HarmCategory.HARM_CATEGORY_HARASSMENT: HarmBlockThreshold.BLOCK_NONE,
-                HarmCategory.HARM_CATEGORY_SEXUALLY_EXPLICIT: HarmBlockThreshold.BLOCK_NONE,
-                HarmCategory.HARM_CATEGORY_DANGEROUS_CONTENT: HarmBlockThreshold.BLOCK_NONE,
+                genai_types.HarmCategory.HARM_CATEGORY_HATE_SPEECH: genai_types.HarmBlockThreshold.BLOCK_NONE,
+                genai_types.HarmCategory.HARM_CATEGORY_HARASSMENT: genai_types.HarmBlockThreshold.BLOCK_NONE,
+                genai_types.HarmCategory.HARM_CATEGORY_SEXUALLY_EXPLICIT: genai_types.HarmBlockThreshold.BLOCK_NONE,
+                genai_types.HarmCategory.HARM_CATEGORY_DANGEROUS_CONTENT: genai_types.HarmBlockThreshold.BLOCK_NONE,
             }
         )
         
@@ -138,6 +149,9 @@ class GeminiProvider(BaseAIProvider):
             logger.info(f"Extracted {len(entities)} entities")
             return entities
             
+        except AIProviderError:
+            # Keep the specific error (auth, rate limit) for the caller
+            raise
         except Exception as e:
             logger.error(f"Entity extraction failed: {e}")
             raise AIProviderError(f"Entity extraction failed: {e}")
@@ -204,6 +218,9 @@ class GeminiProvider(BaseAIProvider):
             logger.info(f"Detected {len(relationships)} relationships")
             return relationships
             
+        except AIProviderError:
+            # Keep the specific error (auth, rate limit) for the caller
+            raise
         except Exception as e:
             logger.error(f"Relationship detection failed: {e}")
             raise AIProviderError(f"Relationship detection failed: {e}")
@@ -265,8 +282,25 @@ class GeminiProvider(BaseAIProvider):
         Returns:
             Generated text response
         """
+        started = time.monotonic()
         try:
-            response = await self.model.generate_content_async(prompt)
+            with start_span("gemini.generate_content", model=self.model_name, prompt_chars=len(prompt)) as span:
+                try:
+                    response = await self.model.generate_content_async(prompt)
+                except Exception:
+                    GEMINI_REQUESTS.inc(model=self.model_name, status="error")
+                    raise
+                finally:
+                    GEMINI_REQUEST_SECONDS.observe(time.monotonic() - started, model=self.model_name)
+                GEMINI_REQUESTS.inc(model=self.model_name, status="ok")
+                
+                usage = getattr(response, 'usage_metadata', None)
+                if usage is not None:
+                    input_tokens = getattr(usage, 'prompt_token_count', 0)
+                    output_tokens = getattr(usage, 'candidates_token_count', 0)
+                    span.set_attributes(input_tokens=input_tokens, output_tokens=output_tokens)
+                    GEMINI_TOKENS.inc(input_tokens, model=self.model_name, direction="input")
+                    GEMINI_TOKENS.inc(output_tokens, model=self.model_name, direction="output")
             
             # Check for blocked content
             if not response.text:
@@ -277,6 +311,8 @@ class GeminiProvider(BaseAIProvider):
             
             return response.text
             
+        except AIProviderError:
+            raise
         except Exception as e:
             if "quota" in str(e).lower() or "rate" in str(e).lower():
                 raise AIProviderRateLimitError(f"Rate limit exceeded: {e}")
@@ -3,26 +3,70 @@ Firebase Authentication middleware for Cloud Functions.
 
 Provides decorator and utilities for verifying Firebase ID tokens
 and extracting authenticated user information.
+
+Verified tokens are cached in memory, keyed by a hash of the token, until
+their own expiry (exp claim), so repeat calls with the same token skip
+JWT parsing and signature checks. The signing public keys are prefetched
+and kept fresh by a background thread, so a verification never waits on
+Google's certificate endpoint.
+
+Environment configuration:
+- ID_TOKEN_CACHE_SIZE: verified tokens kept (default 1024, 0 disables)
+- ID_TOKEN_KEY_REFRESH_SECONDS: public key refresh interval (default 300)
 """
 
 import functools
+import hashlib
 import logging
-from typing import Callable, Any, Tuple
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Any, Dict, Optional, Tuple
 from flask import Request, jsonify
-import firebase_admin
-from firebase_admin import auth, credentials
 import os
 
+from ..utils.lazy_import import lazy_import
+from ..utils.metrics import counter
+from ..utils.warmup import WARMUP_FIREBASE, wait_for_warmup
+
+# Imported on first token verification
+firebase_admin = lazy_import("firebase_admin")
+auth = lazy_import("firebase_admin.auth")
+credentials = lazy_import("firebase_admin.credentials")
+
 logger = logging.getLogger(__name__)
 
-# Initialize Firebase Admin SDK (only once)
+# Public keys that sign Firebase ID tokens
+ID_TOKEN_CERT_URL = "https://www.googleapis.com/robot/v1/metadata/x509/securetoken@system.gserviceaccount.com"
+
+# Verified token cache
+ID_TOKEN_CACHE_SIZE = int(os.environ.get("ID_TOKEN_CACHE_SIZE", "1024"))
+ID_TOKEN_KEY_REFRESH_SECONDS = float(os.environ.get("ID_TOKEN_KEY_REFRESH_SECONDS", "300"))
+
+ID_TOKEN_CACHE_LOOKUPS = counter("id_token_cache_lookups_total", "Verified ID token cache lookups by result")
+
+# {sha256 of token: (decoded token, exp)}, least recently used first
+_token_cache: "OrderedDict[str, Tuple[Dict[str, Any], float]]" = OrderedDict()
+_token_cache_lock = threading.Lock()
+
+_key_refresh_thread: Optional[threading.Thread] = None
+_key_refresh_lock = threading.Lock()
+
+# Initialize Firebase Admin SDK (only once, also under concurrent requests)
 _firebase_initialized = False
+_firebase_lock = threading.Lock()
 
 def _initialize_firebase():
     """Initialize Firebase Admin SDK if not already initialized."""
     global _firebase_initialized
     
-    if not _firebase_initialized:
+    if _firebase_initialized:
+        return
+    
+    with _firebase_lock:
+        if _firebase_initialized:
+            return
+        
         try:
             # Try to initialize with default credentials
             firebase_admin.initialize_app()
@@ -40,10 +84,117 @@ def _initialize_firebase():
             raise
 
 
+def warm_up():
+    """
+    Initialize the Admin SDK, prefetch the ID token public keys and start
+    refreshing them in the background.
+    """
+    _initialize_firebase()
+    _prefetch_public_keys()
+    start_key_refresh()
+
+
+def _prefetch_public_keys() -> bool:
+    """
+    Fetch the ID token public keys into the SDK's certificate cache.
+    
+    The keys are fetched through the SDK's own HTTP-cached certificate
+    request, so verify_id_token() finds them cached; once the cached copy
+    is past its max-age this fetches a fresh one. That request is
+    SDK-internal; if it is not available nothing is prefetched.
+    
+    Returns:
+        Whether the keys were fetched (or already cached)
+    """
+    try:
+        client = auth._get_client(firebase_admin.get_app())
+        client._token_verifier.request(ID_TOKEN_CERT_URL)
+        return True
+    except AttributeError as e:
+        logger.debug(f"Firebase public key prefetch unavailable: {str(e)}")
+    except Exception as e:
+        logger.warning(f"Firebase public key prefetch failed: {type(e).__name__}: {str(e)}")
+    return False
+
+
+def _refresh_keys_periodically(interval: float):
+    while True:
+        time.sleep(interval)
+        _prefetch_public_keys()
+
+
+def start_key_refresh(interval: float = ID_TOKEN_KEY_REFRESH_SECONDS) -> bool:
+    """
+    Start the background public key refresh thread (once per process).
+    
+    Args:
+        interval: Seconds between refreshes (0 disables refreshing)
+    
+    Returns:
+        Whether the refresh thread is running
+    """
+    global _key_refresh_thread
+    if interval <= 0:
+        return False
+    if _key_refresh_thread is not None:
+        return True
+    
+    with _key_refresh_lock:
+        if _key_refresh_thread is None:
+            _key_refresh_thread = threading.Thread(
+                target=_refresh_keys_periodically,
+                args=(interval,),
+                name="firebase-key-refresh",
+                daemon=True
+            )
+            _key_refresh_thread.start()
+    return True
+
+
+def _token_key(id_token: str) -> str:
+    """Cache key for a token (the token itself is never stored)."""
+    return hashlib.sha256(id_token.encode("utf-8")).hexdigest()
+
+
+def _get_cached_token(key: str) -> Optional[Dict[str, Any]]:
+    """Get a verified token that has not expired yet."""
+    with _token_cache_lock:
+        entry = _token_cache.get(key)
+        if entry is None:
+            return None
+        decoded_token, expires_at = entry
+        if time.time() >= expires_at:
+            del _token_cache[key]
+            return None
+        _token_cache.move_to_end(key)
+        return decoded_token
+
+
+def _cache_token(key: str, decoded_token: Dict[str, Any]):
+    """Cache a verified token until its exp claim."""
+    expires_at = decoded_token.get('exp')
+    if not expires_at or ID_TOKEN_CACHE_SIZE <= 0:
+        return
+    
+    with _token_cache_lock:
+        _token_cache[key] = (decoded_token, float(expires_at))
+        _token_cache.move_to_end(key)
+        while len(_token_cache) > ID_TOKEN_CACHE_SIZE:
+            _token_cache.popitem(last=False)
+
+
+def clear_token_cache():
+    """Clear the verified token cache. Useful for testing."""
+    with _token_cache_lock:
+        _token_cache.clear()
+
+
 def verify_firebase_token(id_token: str) -> dict:
     """
     Verify Firebase ID token and return decoded token.
     
+    A token verified before is served from the cache until its expiry.
+    
     Args:
         id_token: Firebase ID token from Authorization header
         
@@ -53,12 +204,22 @@ def verify_firebase_token(id_token: str) -> dict:
     Raises:
         Exception: If token is invalid or verification fails
     """
+    key = _token_key(id_token)
+    decoded_token = _get_cached_token(key)
+    if decoded_token is not None:
+        ID_TOKEN_CACHE_LOOKUPS.inc(result="hit")
+        return decoded_token
+    ID_TOKEN_CACHE_LOOKUPS.inc(result="miss")
+    
+    wait_for_warmup(WARMUP_FIREBASE)
     _initialize_firebase()
+    start_key_refresh()
     
     try:
         # Verify the token
         decoded_token = auth.verify_id_token(id_token)
         logger.info(f"Token verified for user: {decoded_token.get('uid')}")
+        _cache_token(key, decoded_token)
         return decoded_token
     except auth.InvalidIdTokenError as e:
         logger.warning(f"Invalid ID token: {str(e)}")
@@ -0,0 +1,248 @@
+"""
+Content-addressed document storage in Cloud Storage.
+
+Document content is streamed to Cloud Storage with resumable uploads,
+gzip-compressed on the fly, and stored under its SHA-256 so identical
+uploads share one blob. Memory use is bounded by the read and upload chunk
+sizes regardless of document size.
+
+Since the hash is only known once the stream ends, content is first written
+to a staging blob and then copied server-side to its content address (or
+discarded if that address already exists).
+"""
+
+import hashlib
+import io
+import threading
+import uuid
+import zlib
+from dataclasses import dataclass
+from typing import BinaryIO, Dict, Any, Optional
+
+from google.api_core import exceptions as gcs_exceptions
+from google.cloud import storage
+
+from ..utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+_storage_client: Optional[storage.Client] = None
+_storage_client_lock = threading.Lock()
+
+# Bytes read from the source stream at a time
+READ_CHUNK_SIZE = 256 * 1024
+
+# Resumable upload chunk size (must be a multiple of 256 KiB)
+UPLOAD_CHUNK_SIZE = 4 * 256 * 1024
+
+# Blob name prefixes
+CONTENT_PREFIX = "content/sha256"
+STAGING_PREFIX = "staging"
+
+
+def get_storage_client(project_id: str = "aletheia-codex-prod") -> storage.Client:
+    """
+    Get or create a Cloud Storage client (singleton pattern).
+    
+    Args:
+        project_id: GCP project ID
+    
+    Returns:
+        Initialized Storage client
+    """
+    global _storage_client
+    if _storage_client is None:
+        with _storage_client_lock:
+            if _storage_client is None:
+                _storage_client = storage.Client(project=project_id)
+    return _storage_client
+
+
+def content_blob_name(sha256: str) -> str:
+    """Get the blob name for content with the given SHA-256."""
+    return f"{CONTENT_PREFIX}/{sha256[:2]}/{sha256}.gz"
+
+
+@dataclass
+class StoredContent:
+    """
+    Result of storing document content.
+    
+    Attributes:
+        sha256: SHA-256 of the uncompressed content
+        blob_name: Content-addressed blob name
+        size: Uncompressed size in bytes
+        compressed_size: Stored (gzip) size in bytes
+        deduplicated: True if identical content was already stored
+    """
+    sha256: str
+    blob_name: str
+    size: int
+    compressed_size: int
+    deduplicated: bool
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to dictionary representation."""
+        return {
+            'sha256': self.sha256,
+            'blob_name': self.blob_name,
+            'size': self.size,
+            'compressed_size': self.compressed_size,
+            'deduplicated': self.deduplicated
+        }
+
+
+class DocumentStore:
+    """
+    Streams document content into a content-addressed bucket.
+    
+    Content is gzip-compressed and served with Content-Encoding: gzip, so
+    plain downloads are transparently decompressed by Cloud Storage.
+    """
+    
+    def __init__(
+        self,
+        bucket_name: str,
+        project_id: str = "aletheia-codex-prod",
+        max_size: Optional[int] = None
+    ):
+        """
+        Initialize document store.
+        
+        Args:
+            bucket_name: Cloud Storage bucket name
+            project_id: GCP project ID
+            max_size: Maximum uncompressed content size in bytes (no limit if None)
+        """
+        self.project_id = project_id
+        self.bucket = get_storage_client(project_id).bucket(bucket_name)
+        self.max_size = max_size
+    
+    def store_stream(self, stream: BinaryIO, content_type: str = "text/plain; charset=utf-8") -> StoredContent:
+        """
+        Store content read from a stream.
+        
+        Args:
+            stream: Binary stream with the document content
+            content_type: Content type of the uncompressed content
+        
+        Returns:
+            StoredContent describing the stored blob
+        
+        Raises:
+            ValueError: If the content is empty or larger than max_size
+            Exception: If the upload fails
+        """
+        staging = self.bucket.blob(f"{STAGING_PREFIX}/{uuid.uuid4().hex}.gz")
+        staging.content_type = content_type
+        staging.content_encoding = "gzip"
+        
+        hasher = hashlib.sha256()
+        compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits=31: gzip container
+        size = 0
+        compressed_size = 0
+        
+        try:
+            with staging.open("wb", chunk_size=UPLOAD_CHUNK_SIZE, ignore_flush=True) as writer:
+                while True:
+                    chunk = stream.read(READ_CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    size += len(chunk)
+                    if self.max_size is not None and size > self.max_size:
+                        raise ValueError(f"Content exceeds maximum size of {self.max_size} bytes")
+                    hasher.update(chunk)
+                    compressed = compressor.compress(chunk)
+                    if compressed:
+                        writer.write(compressed)
+                        compressed_size += len(compressed)
+                
+                if size == 0:
+                    raise ValueError("Content cannot be empty")
+                
+                tail = compressor.flush()
+                writer.write(tail)
+                compressed_size += len(tail)
+            
+            sha256 = hasher.hexdigest()
+            deduplicated = self._promote(staging, sha256)
+        
+        except Exception:
+            self._delete_quietly(staging)
+            raise
+        
+        stored = StoredContent(
+            sha256=sha256,
+            blob_name=content_blob_name(sha256),
+            size=size,
+            compressed_size=compressed_size,
+            deduplicated=deduplicated
+        )
+        logger.info(
+            f"Stored content {sha256[:12]} ({size} bytes, {compressed_size} compressed"
+            f"{', deduplicated' if deduplicated else ''})"
+        )
+        return stored
+    
+    def store_bytes(self, content: bytes, content_type: str = "text/plain; charset=utf-8") -> StoredContent:
+        """
+        Store in-memory content.
+        
+        Args:
+            content: Document content
+            content_type: Content type of the uncompressed content
+        
+        Returns:
+            StoredContent describing the stored blob
+        """
+        return self.store_stream(io.BytesIO(content), content_type=content_type)
+    
+    def _promote(self, staging: storage.Blob, sha256: str) -> bool:
+        """
+        Move a staging blob to its content address.
+        
+        Returns:
+            True if the content already existed (the staging blob is discarded)
+        """
+        target_name = content_blob_name(sha256)
+        if self.bucket.blob(target_name).exists():
+            self._delete_quietly(staging)
+            return True
+        
+        try:
+            # Precondition: only create the target if no identical upload won the race
+            self.bucket.copy_blob(staging, self.bucket, target_name, if_generation_match=0)
+        except gcs_exceptions.PreconditionFailed:
+            self._delete_quietly(staging)
+            return True
+        
+        self._delete_quietly(staging)
+        return False
+    
+    def _delete_quietly(self, blob: storage.Blob):
+        """Delete a staging blob; failures only leave an orphan under the staging prefix."""
+        try:
+            blob.delete()
+        except gcs_exceptions.NotFound:
+            pass
+        except Exception as e:
+            logger.warning(f"Failed to delete staging blob {blob.name}: {str(e)}")
+
+
+def create_document_store(
+    bucket_name: str,
+    project_id: str = "aletheia-codex-prod",
+    max_size: Optional[int] = None
+) -> DocumentStore:
+    """
+    Factory function to create a DocumentStore instance.
+    
+    Args:
+        bucket_name: Cloud Storage bucket name
+        project_id: GCP project ID
+        max_size: Maximum uncompressed content size in bytes
+    
+    Returns:
+        DocumentStore instance
+    """
+    return DocumentStore(bucket_name=bucket_name, project_id=project_id, max_size=max_size)
@@ -0,0 +1,281 @@
+"""
+Idempotency ledger for note processing.
+
+Firestore triggers and Cloud Tasks deliver at least once, so the same
+processing request can arrive several times, possibly concurrently. Before
+doing any AI or graph work a worker claims the request in the ledger,
+keyed by the delivery's event ID and the hash of the note content it is
+about to process:
+- the first delivery claims the entry with a time-limited lease
+- duplicates of a completed entry, or of one whose lease is still held,
+  exit after the single read done by the claim transaction
+- duplicates of a held entry are told when the lease expires, so queue
+  workers can ask for redelivery after it
+- if a worker dies mid-processing its lease expires and a redelivery takes
+  the entry over
+
+The key includes the content hash, so an edited note redelivered under the
+same event is processed again. Callers therefore read the note before
+claiming: a duplicate costs the note read plus the claim read, and one that
+arrives after the note has left 'processing' stops at the note read.
+- a worker that runs short of time hands the rest of the note to a
+  continuation, which claims its own entry
+
+Entries carry an expires_at field for a Firestore TTL policy so the ledger
+does not grow without bound.
+"""
+
+import hashlib
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from enum import Enum
+from typing import Optional
+
+from google.cloud import firestore
+
+from .firestore_client import get_firestore_client
+from ..utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+# Ledger collection
+LEDGER_COLLECTION = "processing_ledger"
+
+# How long a claim is held before another delivery may take it over
+# (longer than the orchestration function timeout)
+DEFAULT_LEASE_SECONDS = 600
+
+# How long entries are kept (Firestore TTL on expires_at)
+LEDGER_RETENTION_DAYS = 30
+
+
+class LedgerStatus(str, Enum):
+    """Status of a ledger entry."""
+    IN_PROGRESS = "in_progress"
+    COMPLETED = "completed"
+    CONTINUED = "continued"
+    FAILED = "failed"
+
+
+class ClaimOutcome(str, Enum):
+    """Result of trying to claim a ledger entry."""
+    CLAIMED = "claimed"
+    DUPLICATE = "duplicate"
+    IN_PROGRESS = "in_progress"
+
+
+@dataclass
+class LedgerClaim:
+    """
+    Result of a claim attempt.
+    
+    Attributes:
+        key: Ledger entry ID
+        outcome: Whether the caller owns the entry
+        owner: Owner token of the claim (set when claimed)
+        attempts: Number of times the entry has been claimed
+        retry_after: Seconds until the holder's lease expires (IN_PROGRESS only)
+    """
+    key: str
+    outcome: ClaimOutcome
+    owner: Optional[str] = None
+    attempts: int = 0
+    retry_after: Optional[float] = None
+    
+    @property
+    def claimed(self) -> bool:
+        """True if the caller should do the work."""
+        return self.outcome == ClaimOutcome.CLAIMED
+
+
+def content_hash(content: str) -> str:
+    """Get the SHA-256 of note content."""
+    return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+
+def ledger_key(note_id: str, event_id: str, content_sha256: str) -> str:
+    """Get the ledger entry ID for a processing request."""
+    return hashlib.sha256(f"{note_id}:{event_id}:{content_sha256}".encode('utf-8')).hexdigest()
+
+
+class ProcessingLedger:
+    """Transactional claim/complete ledger for at-least-once deliveries."""
+    
+    def __init__(self, project_id: str = "aletheia-codex-prod", lease_seconds: int = DEFAULT_LEASE_SECONDS):
+        """
+        Initialize processing ledger.
+        
+        Args:
+            project_id: GCP project ID
+            lease_seconds: How long a claim is held
+        """
+        self.project_id = project_id
+        self.db = get_firestore_client(project_id)
+        self.lease_seconds = lease_seconds
+        
+        logger.info(f"Initialized ProcessingLedger for project: {project_id}")
+    
+    def claim(self, note_id: str, event_id: str, content_sha256: str) -> LedgerClaim:
+        """
+        Claim a processing request.
+        
+        Args:
+            note_id: Note document ID
+            event_id: Delivery event ID (Firestore event or processing request)
+            content_sha256: Hash of the note content being processed
+        
+        Returns:
+            LedgerClaim; only process the note if claim.claimed
+        """
+        key = ledger_key(note_id, event_id, content_sha256)
+        ref = self.db.collection(LEDGER_COLLECTION).document(key)
+        owner = uuid.uuid4().hex
+        transaction = self.db.transaction()
+        
+        @firestore.transactional
+        def claim_entry(transaction) -> LedgerClaim:
+            snapshot = ref.get(transaction=transaction)
+            now = datetime.utcnow()
+            attempts = 0
+            
+            if snapshot.exists:
+                entry = snapshot.to_dict()
+                attempts = entry.get('attempts', 0)
+                status = entry.get('status')
+                
+                if status in (LedgerStatus.COMPLETED.value, LedgerStatus.CONTINUED.value):
+                    return LedgerClaim(key=key, outcome=ClaimOutcome.DUPLICATE, attempts=attempts)
+                
+                lease_expires_at = entry.get('lease_expires_at')
+                if status == LedgerStatus.IN_PROGRESS.value and lease_expires_at is not None:
+                    lease_expires_at = lease_expires_at.replace(tzinfo=None)
+                    if lease_expires_at > now:
+                        return LedgerClaim(
+                            key=key,
+                            outcome=ClaimOutcome.IN_PROGRESS,
+                            attempts=attempts,
+                            retry_after=(lease_expires_at - now).total_seconds()
+                        )
+            
+            transaction.set(ref, {
+                'note_id': note_id,
+                'event_id': event_id,
+                'content_sha256': content_sha256,
+                'status': LedgerStatus.IN_PROGRESS.value,
+                'owner': owner,
+                'attempts': attempts + 1,
+                'lease_expires_at': now + timedelta(seconds=self.lease_seconds),
+                'claimed_at': now,
+                'expires_at': now + timedelta(days=LEDGER_RETENTION_DAYS)
+            }, merge=True)
+            return LedgerClaim(key=key, outcome=ClaimOutcome.CLAIMED, owner=owner, attempts=attempts + 1)
+        
+        try:
+            result = claim_entry(transaction)
+        except Exception as e:
+            logger.error(f"Failed to claim ledger entry for note {note_id}: {str(e)}")
+            raise
+        
+        if not result.claimed:
+            logger.info(f"Skipping note {note_id} for event {event_id}: {result.outcome.value}")
+        elif result.attempts > 1:
+            logger.warning(f"Took over expired claim for note {note_id} (attempt {result.attempts})")
+        return result
+    
+    def complete(self, claim: LedgerClaim, **fields) -> bool:
+        """
+        Mark a claimed request as completed.
+        
+        Args:
+            claim: Claim returned by claim()
+            **fields: Additional fields to record (e.g. result counts)
+        
+        Returns:
+            True if recorded; False if the claim was taken over
+        """
+        return self._finish(claim, LedgerStatus.COMPLETED, fields)
+    
+    def hand_off(self, claim: LedgerClaim, **fields) -> bool:
+        """
+        Mark a claimed request as handed to a continuation.
+        
+        The continuation is claimed under its own event ID; duplicates of
+        this delivery are then dropped as if it had completed.
+        
+        Args:
+            claim: Claim returned by claim()
+            **fields: Additional fields to record (e.g. the continuation cursor)
+        
+        Returns:
+            True if recorded; False if the claim was taken over
+        """
+        return self._finish(claim, LedgerStatus.CONTINUED, fields)
+    
+    def release(self, claim: LedgerClaim, error: Optional[str] = None) -> bool:
+        """
+        Mark a claimed request as failed, so a redelivery may claim it again.
+        
+        Args:
+            claim: Claim returned by claim()
+            error: Error message
+        
+        Returns:
+            True if recorded; False if the claim was taken over
+        """
+        return self._finish(claim, LedgerStatus.FAILED, {'error': error} if error else {})
+    
+    def _finish(self, claim: LedgerClaim, status: LedgerStatus, fields: dict) -> bool:
+        """
+        Record the final status of a claim and drop its lease.
+        
+        The entry is only written while the caller still owns it: if the
+        lease expired and another delivery took the entry over, the new
+        owner's claim is left alone.
+        
+        Returns:
+            True if the status was recorded
+        """
+        ref = self.db.collection(LEDGER_COLLECTION).document(claim.key)
+        update = dict(fields)
+        update.update({
+            'status': status.value,
+            'lease_expires_at': None,
+            'finished_at': firestore.SERVER_TIMESTAMP
+        })
+        transaction = self.db.transaction()
+        
+        @firestore.transactional
+        def finish_entry(transaction) -> bool:
+            snapshot = ref.get(transaction=transaction)
+            if not snapshot.exists or snapshot.to_dict().get('owner') != claim.owner:
+                return False
+            transaction.update(ref, update)
+            return True
+        
+        try:
+            finished = finish_entry(transaction)
+        except Exception as e:
+            # The lease expires on its own; a duplicate may then redo the work
+            logger.error(f"Failed to mark ledger entry {claim.key} {status.value}: {str(e)}")
+            return False
+        
+        if not finished:
+            logger.warning(f"Ledger entry {claim.key} was taken over; not marking it {status.value}")
+        return finished
+
+def create_processing_ledger(
+    project_id: str = "aletheia-codex-prod",
+    lease_seconds: int = DEFAULT_LEASE_SECONDS
+) -> ProcessingLedger:
+    """
+    Factory function to create a ProcessingLedger instance.
+    
+    Args:
+        project_id: GCP project ID
+        lease_seconds: How long a claim is held
+    
+    Returns:
+        ProcessingLedger instance
+    """
+    return ProcessingLedger(project_id=project_id, lease_seconds=lease_seconds)
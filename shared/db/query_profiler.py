@@ -0,0 +1,285 @@
+"""
+Per-template profiling for Neo4j statements.
+
+Every statement sent through execute_neo4j_query_http() carries a template
+name (e.g. "graph.get_nodes"). Latency, rows returned and payload bytes
+are recorded per template in the metrics registry (labelled by template),
+so a slow endpoint can be traced to the statement responsible.
+
+Statements slower than NEO4J_SLOW_QUERY_SECONDS are logged with their
+template and a parameter fingerprint: the parameter names and types plus a
+hash of the values, which identifies repeated calls without logging user
+data. With NEO4J_PROFILE_SAMPLE_RATE > 0, that fraction of slow read-only
+statements is re-run under PROFILE in a background thread, and the total
+db hits and the operator tree are logged for regression comparison.
+
+Neo4j caches execution plans by statement text, so each statement is also
+counted as a plan cache hit or miss against an LRU of recently sent texts
+the size of the server's query cache. A template whose hit ratio stays low
+is building a new statement per call.
+
+Configuration (environment):
+    NEO4J_SLOW_QUERY_SECONDS: Slow statement threshold (default 1.0)
+    NEO4J_PROFILE_SAMPLE_RATE: Fraction of slow statements to PROFILE
+        (default 0, disabled)
+    NEO4J_QUERY_CACHE_SIZE: Server query cache size to mirror (default 1000)
+"""
+
+import hashlib
+import json
+import os
+import random
+import re
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from ..utils.logging import get_logger
+from ..utils.metrics import DEFAULT_SIZE_BUCKETS, counter, histogram
+
+logger = get_logger(__name__)
+
+NEO4J_SLOW_QUERY_SECONDS = float(os.environ.get("NEO4J_SLOW_QUERY_SECONDS", "1.0"))
+NEO4J_PROFILE_SAMPLE_RATE = float(os.environ.get("NEO4J_PROFILE_SAMPLE_RATE", "0"))
+NEO4J_QUERY_CACHE_SIZE = int(os.environ.get("NEO4J_QUERY_CACHE_SIZE", "1000"))
+
+# Template name prefix for statements sent without one
+ADHOC_TEMPLATE_PREFIX = "adhoc:"
+
+# Payload size buckets in bytes
+PAYLOAD_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+# Statements that must not be re-executed under PROFILE
+_WRITE_CLAUSE = re.compile(r"\b(CREATE|MERGE|SET|DELETE|REMOVE|DROP|FOREACH|LOAD\s+CSV|CALL)\b", re.IGNORECASE)
+
+TEMPLATE_QUERY_SECONDS = histogram("neo4j_template_query_seconds", "Neo4j statement latency by template")
+TEMPLATE_ROWS = histogram("neo4j_template_rows", "Rows returned by template", DEFAULT_SIZE_BUCKETS)
+TEMPLATE_PAYLOAD_BYTES = histogram("neo4j_template_payload_bytes", "Request and response bytes by template", PAYLOAD_BUCKETS)
+SLOW_QUERIES = counter("neo4j_slow_queries_total", "Neo4j statements over the slow threshold by template")
+PLAN_CACHE = counter("neo4j_plan_cache_total", "Estimated plan cache hits and misses by template")
+
+_profile_lock = threading.Lock()
+
+# Digests of recently sent statement texts, least recently used first
+_recent_texts: "OrderedDict[bytes, None]" = OrderedDict()
+_recent_texts_lock = threading.Lock()
+
+
+def adhoc_template_name(query: str) -> str:
+    """
+    Name an untagged statement by a hash of its whitespace-normalized text.
+    
+    Args:
+        query: Cypher statement
+    
+    Returns:
+        "adhoc:<12 hex characters>"
+    """
+    normalized = " ".join(query.split())
+    return ADHOC_TEMPLATE_PREFIX + hashlib.sha256(normalized.encode("utf-8")).hexdigest()[:12]
+
+
+def parameter_fingerprint(parameters: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Fingerprint statement parameters without exposing their values.
+    
+    Args:
+        parameters: Statement parameters
+    
+    Returns:
+        Dictionary with the parameter names and types ('shape') and a hash
+        of the values ('hash')
+    """
+    parameters = parameters or {}
+    shape = {name: type(value).__name__ for name, value in sorted(parameters.items())}
+    encoded = json.dumps(parameters, sort_keys=True, default=str).encode("utf-8")
+    return {
+        'shape': shape,
+        'hash': hashlib.sha256(encoded).hexdigest()[:16]
+    }
+
+
+def note_query_text(template: str, query: str) -> bool:
+    """
+    Count a statement as an estimated plan cache hit or miss.
+    
+    Args:
+        template: Template name
+        query: Cypher statement as sent
+    
+    Returns:
+        True if the same text was sent recently enough to still be cached
+    """
+    digest = hashlib.sha256(query.encode("utf-8")).digest()
+    with _recent_texts_lock:
+        hit = digest in _recent_texts
+        if hit:
+            _recent_texts.move_to_end(digest)
+        else:
+            _recent_texts[digest] = None
+            if len(_recent_texts) > NEO4J_QUERY_CACHE_SIZE:
+                _recent_texts.popitem(last=False)
+    
+    PLAN_CACHE.inc(template=template, result="hit" if hit else "miss")
+    return hit
+
+
+def plan_cache_hit_ratio(template: str) -> Optional[float]:
+    """
+    Estimated plan cache hit ratio for a template.
+    
+    Args:
+        template: Template name
+    
+    Returns:
+        Hits / statements, or None if the template has not run
+    """
+    hits = PLAN_CACHE.value(template=template, result="hit")
+    total = hits + PLAN_CACHE.value(template=template, result="miss")
+    return hits / total if total else None
+
+
+def is_read_only(query: str) -> bool:
+    """Whether a statement can safely be re-run under PROFILE."""
+    return not _WRITE_CLAUSE.search(query)
+
+
+def summarize_plan(plan: Dict[str, Any]) -> Tuple[int, Dict[str, Any]]:
+    """
+    Reduce a Query API profiled plan to its operator tree.
+    
+    Args:
+        plan: profiledQueryPlan from a PROFILE response
+    
+    Returns:
+        Tuple of (total db hits, operator tree with rows and db hits)
+    """
+    children = [summarize_plan(child) for child in plan.get('children', [])]
+    db_hits = plan.get('dbHits', 0) + sum(child_hits for child_hits, _ in children)
+    tree = {
+        'operator': plan.get('operatorType'),
+        'rows': plan.get('records', plan.get('rows')),
+        'db_hits': plan.get('dbHits', 0)
+    }
+    if children:
+        tree['children'] = [child for _, child in children]
+    return db_hits, tree
+
+
+def record_query(
+    template: str,
+    query: str,
+    parameters: Optional[Dict[str, Any]],
+    seconds: float,
+    rows: int,
+    request_bytes: int,
+    response_bytes: int,
+    run_profile: Optional[Callable[[str], Dict[str, Any]]] = None
+):
+    """
+    Record one executed statement.
+    
+    Args:
+        template: Template name
+        query: Cypher statement
+        parameters: Statement parameters
+        seconds: Latency, including retries
+        rows: Rows returned
+        request_bytes: Request body size
+        response_bytes: Response body size
+        run_profile: Executes a statement and returns the raw Query API
+            response (used for PROFILE sampling)
+    """
+    plan_cache_hit = note_query_text(template, query)
+    TEMPLATE_QUERY_SECONDS.observe(seconds, template=template)
+    TEMPLATE_ROWS.observe(rows, template=template)
+    TEMPLATE_PAYLOAD_BYTES.observe(request_bytes, template=template, direction="request")
+    TEMPLATE_PAYLOAD_BYTES.observe(response_bytes, template=template, direction="response")
+    
+    if seconds < NEO4J_SLOW_QUERY_SECONDS:
+        return
+    
+    SLOW_QUERIES.inc(template=template)
+    fingerprint = parameter_fingerprint(parameters)
+    logger.warning(
+        f"Slow Neo4j query {template}: {seconds:.3f}s, {rows} rows",
+        extra={'extra_fields': {
+            'template': template,
+            'duration_seconds': seconds,
+            'rows': rows,
+            'request_bytes': request_bytes,
+            'response_bytes': response_bytes,
+            'plan_cache_hit': plan_cache_hit,
+            'parameters': fingerprint
+        }}
+    )
+    
+    if (
+        run_profile is not None
+        and NEO4J_PROFILE_SAMPLE_RATE > 0
+        and random.random() < NEO4J_PROFILE_SAMPLE_RATE
+        and is_read_only(query)
+    ):
+        _start_profile(template, query, fingerprint, run_profile)
+
+
+def _start_profile(
+    template: str,
+    query: str,
+    fingerprint: Dict[str, Any],
+    run_profile: Callable[[str], Dict[str, Any]]
+):
+    """Profile a statement in the background (one profile at a time)."""
+    if not _profile_lock.acquire(blocking=False):
+        return
+    
+    def work():
+        try:
+            profile_query(template, query, fingerprint, run_profile)
+        finally:
+            _profile_lock.release()
+    
+    threading.Thread(target=work, name="neo4j-profile", daemon=True).start()
+
+
+def profile_query(
+    template: str,
+    query: str,
+    fingerprint: Dict[str, Any],
+    run_profile: Callable[[str], Dict[str, Any]]
+) -> Optional[Dict[str, Any]]:
+    """
+    Re-run a statement under PROFILE and log its plan.
+    
+    Failures are logged, never raised.
+    
+    Args:
+        template: Template name
+        query: Read-only Cypher statement
+        fingerprint: Parameter fingerprint of the slow call
+        run_profile: Executes a statement and returns the raw Query API response
+    
+    Returns:
+        Profile record (template, parameters, db_hits, plan), or None if
+        the response has no plan or profiling failed
+    """
+    try:
+        response = run_profile(f"PROFILE {query}")
+        plan = response.get('profiledQueryPlan')
+        if not plan:
+            logger.warning(f"No profiled plan returned for Neo4j query {template}")
+            return None
+        
+        db_hits, tree = summarize_plan(plan)
+        record = {
+            'template': template,
+            'parameters': fingerprint,
+            'db_hits': db_hits,
+            'plan': tree
+        }
+        logger.info(f"Neo4j query profile {template}: {db_hits} db hits", extra={'extra_fields': record})
+        return record
+    
+    except Exception as e:
+        logger.warning(f"Failed to profile Neo4j query {template}: {type(e).__name__}: {str(e)}")
+        return None
@@ -0,0 +1,96 @@
+"""
+Note data helpers for AletheiaCodex.
+
+Notes are written by the web client and the orchestration function as plain
+Firestore documents in the 'notes' collection. These helpers define the
+lightweight summary stored alongside the content, so list views can project
+a few small fields instead of reading whole notes, and the per-user notes
+version used for conditional list requests.
+"""
+
+import re
+from typing import Any, Dict, Optional
+
+from google.cloud import firestore
+
+# Length limits for the stored summary fields
+NOTE_TITLE_LENGTH = 80
+NOTE_PREVIEW_LENGTH = 200
+
+# Fields returned by the notes list summary projection
+NOTE_SUMMARY_FIELDS = [
+    'userId',
+    'title',
+    'contentPreview',
+    'status',
+    'createdAt',
+    'updatedAt',
+    'processingCompletedAt',
+    'extractionSummary'
+]
+
+# Per-user notes version documents: note_versions/{userId}.version
+NOTE_VERSIONS_COLLECTION = "note_versions"
+
+
+def build_note_summary(content: str) -> Dict[str, str]:
+    """
+    Build the stored summary fields for a note's content.
+    
+    Args:
+        content: Full note content
+    
+    Returns:
+        Dictionary with title (first non-empty line) and contentPreview
+    """
+    content = content or ''
+    first_line = next((line.strip() for line in content.splitlines() if line.strip()), '')
+    preview = re.sub(r'\s+', ' ', content).strip()
+    return {
+        'title': _truncate(first_line, NOTE_TITLE_LENGTH),
+        'contentPreview': _truncate(preview, NOTE_PREVIEW_LENGTH)
+    }
+
+
+def bump_notes_version(db: firestore.Client, user_id: str, batch: Optional[Any] = None):
+    """
+    Increment a user's notes version.
+    
+    Every write that changes what the user's notes list returns must bump the
+    version, since list ETags are derived from it.
+    
+    Args:
+        db: Firestore client
+        user_id: User ID
+        batch: Write batch or transaction to add the update to (written immediately if None)
+    """
+    ref = db.collection(NOTE_VERSIONS_COLLECTION).document(user_id)
+    data = {'version': firestore.Increment(1), 'updatedAt': firestore.SERVER_TIMESTAMP}
+    if batch is not None:
+        batch.set(ref, data, merge=True)
+    else:
+        ref.set(data, merge=True)
+
+
+def get_notes_version(db: firestore.Client, user_id: str) -> int:
+    """
+    Get a user's notes version.
+    
+    Args:
+        db: Firestore client
+        user_id: User ID
+    
+    Returns:
+        Current version (0 if the user has never written a note)
+    """
+    doc = db.collection(NOTE_VERSIONS_COLLECTION).document(user_id).get()
+    if not doc.exists:
+        return 0
+    return int(doc.to_dict().get('version', 0))
+
+
+def _truncate(text: str, length: int) -> str:
+    """Truncate text to a maximum length, marking the cut with an ellipsis."""
+    if len(text) <= length:
+        return text
+    return text[:length - 1].rstrip() + '…'
@@ -0,0 +1,362 @@
+"""
+Real-time change feed for pending review items.
+
+Streams incremental added/modified/removed events for a user's pending items,
+backed by a Firestore snapshot listener instead of clients re-running the
+pending query on a timer. Each process keeps one listener per user, shared by
+all of that user's subscribers (open tabs, reconnecting streams), so reads
+scale with changes rather than with polls.
+
+Every event carries a resume token. A subscriber that reconnects with the
+token of the last event it saw gets the events it missed replayed from a
+bounded in-memory buffer; if the token is from another instance or has aged
+out of the buffer, it gets a reset event with the full pending set instead.
+"""
+
+import json
+import queue
+import threading
+import uuid
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+from google.cloud.firestore_v1 import FieldFilter
+
+from ..db.firestore_client import get_firestore_client
+from ..models.review_item import ReviewItem, ReviewItemStatus
+from ..utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+# Change event types
+EVENT_ADDED = "added"
+EVENT_MODIFIED = "modified"
+EVENT_REMOVED = "removed"
+EVENT_RESET = "reset"
+
+# Events kept per user for resuming subscribers
+MAX_BUFFERED_EVENTS = 500
+
+# Events queued per subscriber before it is considered too slow and dropped
+SUBSCRIBER_QUEUE_SIZE = 1000
+
+# How long a listener with no subscribers is kept open for reconnects
+LISTENER_IDLE_SECONDS = 60
+
+
+@dataclass
+class ChangeEvent:
+    """
+    A change to a user's pending items.
+    
+    Attributes:
+        token: Resume token ("<feed id>:<sequence>")
+        type: added, modified, removed or reset
+        item_id: Changed item ID (None for reset)
+        item: Item summary (None for removed and reset)
+        items: Full pending set (reset only)
+        pending_count: Number of pending items after the change
+    """
+    token: str
+    type: str
+    item_id: Optional[str] = None
+    item: Optional[Dict[str, Any]] = None
+    items: Optional[List[Dict[str, Any]]] = None
+    pending_count: int = 0
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert event to dictionary representation."""
+        data = {
+            'type': self.type,
+            'pending_count': self.pending_count
+        }
+        if self.type == EVENT_RESET:
+            data['items'] = self.items or []
+        else:
+            data['item_id'] = self.item_id
+            if self.item is not None:
+                data['item'] = self.item
+        return data
+    
+    def to_sse(self) -> str:
+        """Format event as a server-sent event message."""
+        return f"id: {self.token}\nevent: {self.type}\ndata: {json.dumps(self.to_dict(), default=str)}\n\n"
+
+
+class ChangeFeedSubscription:
+    """
+    A subscriber's view of a user's change feed.
+    
+    Events are delivered through a bounded queue. A subscriber that falls too
+    far behind is closed; it should reconnect with its last token.
+    """
+    
+    def __init__(self, feed: 'UserPendingFeed'):
+        """
+        Initialize subscription.
+        
+        Args:
+            feed: Feed the subscription reads from
+        """
+        self.feed = feed
+        self.closed = False
+        self._events: "queue.Queue[ChangeEvent]" = queue.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+    
+    def get(self, timeout: Optional[float] = None) -> Optional[ChangeEvent]:
+        """
+        Wait for the next event.
+        
+        Args:
+            timeout: Seconds to wait
+        
+        Returns:
+            ChangeEvent, or None if no event arrived in time or the subscription is closed
+        """
+        if self.closed and self._events.empty():
+            return None
+        try:
+            return self._events.get(timeout=timeout)
+        except queue.Empty:
+            return None
+    
+    def close(self):
+        """Stop receiving events."""
+        if not self.closed:
+            self.closed = True
+            self.feed.unsubscribe(self)
+    
+    def _deliver(self, event: ChangeEvent) -> bool:
+        """Queue an event; returns False if the subscriber has fallen behind."""
+        try:
+            self._events.put_nowait(event)
+            return True
+        except queue.Full:
+            return False
+
+
+class UserPendingFeed:
+    """Shared Firestore listener over one user's pending items."""
+    
+    def __init__(self, manager: 'PendingChangeFeed', user_id: str):
+        """
+        Initialize feed and start the listener.
+        
+        Args:
+            manager: Owning change feed manager
+            user_id: User ID
+        """
+        self.manager = manager
+        self.user_id = user_id
+        self.feed_id = uuid.uuid4().hex[:12]
+        self.items: Dict[str, Dict[str, Any]] = {}
+        self.sequence = 0
+        self.subscribers = set()
+        self._buffer: "deque[ChangeEvent]" = deque(maxlen=MAX_BUFFERED_EVENTS)
+        self._lock = threading.Lock()
+        self._idle_timer: Optional[threading.Timer] = None
+        
+        query = (
+            manager.db.collection(manager.review_queue_collection)
+            .where(filter=FieldFilter('user_id', '==', user_id))
+            .where(filter=FieldFilter('status', '==', ReviewItemStatus.PENDING.value))
+        )
+        self._watch = query.on_snapshot(self._on_snapshot)
+        
+        logger.info(f"Started pending change listener for user {user_id} (feed {self.feed_id})")
+    
+    def subscribe(self, resume_token: Optional[str] = None) -> ChangeFeedSubscription:
+        """
+        Add a subscriber.
+        
+        Args:
+            resume_token: Token of the last event the subscriber saw
+        
+        Returns:
+            ChangeFeedSubscription, primed with missed events or a reset
+        """
+        subscription = ChangeFeedSubscription(self)
+        with self._lock:
+            if self._idle_timer is not None:
+                self._idle_timer.cancel()
+                self._idle_timer = None
+            
+            missed = self._events_since(resume_token)
+            if missed is None:
+                subscription._deliver(self._reset_event())
+            else:
+                for event in missed:
+                    subscription._deliver(event)
+            self.subscribers.add(subscription)
+        return subscription
+    
+    def unsubscribe(self, subscription: ChangeFeedSubscription):
+        """
+        Remove a subscriber; the listener closes after LISTENER_IDLE_SECONDS without any.
+        
+        Args:
+            subscription: Subscription to remove
+        """
+        with self._lock:
+            self.subscribers.discard(subscription)
+            if not self.subscribers and self._idle_timer is None:
+                self._idle_timer = threading.Timer(LISTENER_IDLE_SECONDS, self._close_if_idle)
+                self._idle_timer.daemon = True
+                self._idle_timer.start()
+    
+    def close(self):
+        """Stop the listener and close all subscriptions."""
+        self._watch.unsubscribe()
+        with self._lock:
+            subscribers = list(self.subscribers)
+            self.subscribers.clear()
+        for subscription in subscribers:
+            subscription.closed = True
+        logger.info(f"Stopped pending change listener for user {self.user_id}")
+    
+    def _close_if_idle(self):
+        """Close the listener if no subscriber came back."""
+        with self._lock:
+            if self.subscribers:
+                return
+            self._idle_timer = None
+        self.manager._remove_feed(self)
+        self.close()
+    
+    def _events_since(self, resume_token: Optional[str]) -> Optional[List[ChangeEvent]]:
+        """
+        Get buffered events after a resume token.
+        
+        Returns:
+            Missed events, or None if the token cannot be resumed from this buffer
+        """
+        if not resume_token or not self._buffer:
+            return None
+        
+        feed_id, _, sequence = resume_token.partition(':')
+        if feed_id != self.feed_id or not sequence.isdigit():
+            return None
+        
+        sequence = int(sequence)
+        oldest = self._sequence_of(self._buffer[0])
+        if sequence < oldest - 1 or sequence > self.sequence:
+            return None
+        return [event for event in self._buffer if self._sequence_of(event) > sequence]
+    
+    def _sequence_of(self, event: ChangeEvent) -> int:
+        """Get the sequence number from an event token."""
+        return int(event.token.rsplit(':', 1)[1])
+    
+    def _reset_event(self) -> ChangeEvent:
+        """Build a reset event with the current pending set."""
+        return ChangeEvent(
+            token=f"{self.feed_id}:{self.sequence}",
+            type=EVENT_RESET,
+            items=list(self.items.values()),
+            pending_count=len(self.items)
+        )
+    
+    def _on_snapshot(self, docs, changes, read_time):
+        """Firestore listener callback; turns document changes into events."""
+        try:
+            with self._lock:
+                events = []
+                for change in changes:
+                    doc = change.document
+                    change_type = change.type.name
+                    
+                    if change_type == 'REMOVED':
+                        self.items.pop(doc.id, None)
+                        item = None
+                        event_type = EVENT_REMOVED
+                    else:
+                        data = doc.to_dict()
+                        data['id'] = doc.id
+                        item = ReviewItem.from_dict(data).to_summary_dict()
+                        self.items[doc.id] = item
+                        event_type = EVENT_ADDED if change_type == 'ADDED' else EVENT_MODIFIED
+                    
+                    self.sequence += 1
+                    events.append(ChangeEvent(
+                        token=f"{self.feed_id}:{self.sequence}",
+                        type=event_type,
+                        item_id=doc.id,
+                        item=item,
+                        pending_count=len(self.items)
+                    ))
+                
+                self._buffer.extend(events)
+                
+                for subscription in list(self.subscribers):
+                    if not all(subscription._deliver(event) for event in events):
+                        logger.warning(f"Dropping slow change feed subscriber for user {self.user_id}")
+                        self.subscribers.discard(subscription)
+                        subscription.closed = True
+        except Exception as e:
+            logger.error(f"Failed to process pending changes for user {self.user_id}: {str(e)}")
+
+
+class PendingChangeFeed:
+    """
+    Per-process registry of pending-item listeners.
+    
+    Create one instance per process and share it across requests.
+    """
+    
+    def __init__(self, project_id: str = "aletheia-codex-prod"):
+        """
+        Initialize change feed.
+        
+        Args:
+            project_id: GCP project ID
+        """
+        self.project_id = project_id
+        self.db = get_firestore_client(project_id)
+        self.review_queue_collection = "review_queue"
+        self._feeds: Dict[str, UserPendingFeed] = {}
+        self._lock = threading.Lock()
+        
+        logger.info(f"Initialized PendingChangeFeed for project: {project_id}")
+    
+    def subscribe(self, user_id: str, resume_token: Optional[str] = None) -> ChangeFeedSubscription:
+        """
+        Subscribe to a user's pending-item changes.
+        
+        Args:
+            user_id: User ID
+            resume_token: Token of the last event the subscriber saw
+        
+        Returns:
+            ChangeFeedSubscription
+        
+        Raises:
+            ValueError: If user_id is empty
+        """
+        if not user_id or not user_id.strip():
+            raise ValueError("User ID cannot be empty")
+        
+        with self._lock:
+            feed = self._feeds.get(user_id)
+            if feed is None:
+                feed = UserPendingFeed(self, user_id)
+                self._feeds[user_id] = feed
+        return feed.subscribe(resume_token)
+    
+    def _remove_feed(self, feed: UserPendingFeed):
+        """Forget an idle feed."""
+        with self._lock:
+            if self._feeds.get(feed.user_id) is feed:
+                del self._feeds[feed.user_id]
+
+
+def create_change_feed(project_id: str = "aletheia-codex-prod") -> PendingChangeFeed:
+    """
+    Factory function to create a PendingChangeFeed instance.
+    
+    Args:
+        project_id: GCP project ID
+    
+    Returns:
+        PendingChangeFeed instance
+    """
+    return PendingChangeFeed(project_id=project_id)
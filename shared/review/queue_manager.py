@@ -6,16 +6,49 @@ updating status, and managing user statistics.
 """
 
 import logging
-from typing import List, Optional, Dict, Any
+import os
+from typing import List, Optional, Dict, Any, Tuple
 from datetime import datetime
 from google.cloud import firestore
 from google.cloud.firestore_v1 import FieldFilter
+from google.cloud.firestore_v1.field_path import FieldPath
 
-from ..models.review_item import ReviewItem, ReviewItemType, ReviewItemStatus, UserStats
+from ..models.review_item import (
+    ReviewItem,
+    ReviewItemType,
+    ReviewItemStatus,
+    UserStats,
+    REVIEW_ITEM_SUMMARY_FIELDS
+)
 from ..db.firestore_client import get_firestore_client
+from ..utils.metrics import DEFAULT_SIZE_BUCKETS, counter, histogram
+from ..utils.pagination import encode_cursor, decode_cursor
+from ..utils.tracing import start_span
 
 logger = logging.getLogger(__name__)
 
+# Fields covered by the review_queue composite indexes (see firestore.indexes.json).
+# Only these can be used as the sort key for cursor pagination.
+PAGINATION_ORDER_FIELDS = ('confidence', 'created_at')
+
+# Metrics
+REVIEW_ITEMS_ADDED = counter("review_items_added_total", "Extracted items added to the review queue, created or merged")
+REVIEW_ADD_BATCH_SIZE = histogram("review_add_batch_size", "Items per review queue add", DEFAULT_SIZE_BUCKETS)
+
+# Canonical items merged per Firestore transaction (each needs a read and a write)
+MAX_MERGE_TRANSACTION_ITEMS = 200
+
+# Reviewed items are moved out of review_queue into per-user partitions:
+# review_archive/{user_id}/reviewed_items/{item_id}
+REVIEW_ARCHIVE_COLLECTION = "review_archive"
+REVIEW_ARCHIVE_ITEMS_SUBCOLLECTION = "reviewed_items"
+
+# Items moved per archive batch (each needs a write and a delete)
+ARCHIVE_BATCH_SIZE = 200
+
+# Statuses that mark an item as reviewed (and eligible for archiving)
+REVIEWED_STATUSES = [ReviewItemStatus.APPROVED.value, ReviewItemStatus.REJECTED.value]
+
 
 class QueueManager:
     """
@@ -28,17 +61,20 @@ class QueueManager:
     - Managing user statistics
     """
     
-    def __init__(self, project_id: str = "aletheia-codex-prod"):
+    def __init__(self, project_id: str = "aletheia-codex-prod", archive_on_review: bool = False):
         """
         Initialize queue manager.
         
         Args:
             project_id: GCP project ID
+            archive_on_review: Move items to the archive as soon as they are reviewed
         """
         self.project_id = project_id
         self.db = get_firestore_client(project_id)
         self.review_queue_collection = "review_queue"
         self.user_stats_collection = "user_stats"
+        self.archive_collection = REVIEW_ARCHIVE_COLLECTION
+        self.archive_on_review = archive_on_review
         
         logger.info(f"Initialized QueueManager for project: {project_id}")
     
@@ -49,7 +85,13 @@ class QueueManager:
         source_doc_id: str
     ) -> List[str]:
         """
-        Add items to the review queue.
+        Add items to the review queue, merging duplicates into canonical items.
+        
+        Each entity (user, normalized name, type) or relationship triple has a
+        single canonical review item with a deterministic ID. Extractions that
+        match an existing item record the source document (counting each
+        document once) instead of creating a new item, so one approval covers
+        every occurrence. Merges run in Firestore transactions.
         
         Args:
             user_id: User ID
@@ -57,7 +99,7 @@ class QueueManager:
             source_doc_id: Source document ID
             
         Returns:
-            List of created item IDs
+            List of canonical item IDs (one per distinct entity/relationship)
             
         Raises:
             ValueError: If items list is empty or invalid
@@ -70,9 +112,8 @@ class QueueManager:
             raise ValueError("User ID cannot be empty")
         
         try:
-            created_ids = []
-            batch = self.db.batch()
-            
+            # Collapse duplicates within this extraction first
+            canonical_items: Dict[str, ReviewItem] = {}
             for item in items:
                 # Validate item
                 if item.user_id != user_id:
@@ -82,28 +123,103 @@ class QueueManager:
                 if item.source_document_id != source_doc_id:
                     logger.warning(f"Item source_document_id doesn't match provided source_doc_id")
                     item.source_document_id = source_doc_id
+                item.source_document_ids = [source_doc_id]
                 
-                # Create document reference
-                doc_ref = self.db.collection(self.review_queue_collection).document()
-                item.id = doc_ref.id
-                
-                # Add to batch
-                batch.set(doc_ref, item.to_dict())
-                created_ids.append(doc_ref.id)
+                canonical_id = item.get_canonical_id()
+                if canonical_id in canonical_items:
+                    canonical_items[canonical_id].merge_occurrence(item)
+                else:
+                    item.id = canonical_id
+                    canonical_items[canonical_id] = item
             
-            # Commit batch
-            batch.commit()
+            # Merge into Firestore in transactional chunks
+            merged = list(canonical_items.values())
+            created_count = 0
+            for start in range(0, len(merged), MAX_MERGE_TRANSACTION_ITEMS):
+                created_count += self._merge_items(merged[start:start + MAX_MERGE_TRANSACTION_ITEMS])
             
-            # Update user stats
-            self._update_user_stats_pending(user_id, len(items))
+            # Update user stats (only new canonical items add to the backlog)
+            if created_count:
+                self._update_user_stats_pending(user_id, created_count)
+            
+            REVIEW_ADD_BATCH_SIZE.observe(len(items))
+            REVIEW_ITEMS_ADDED.inc(created_count, result="created")
+            REVIEW_ITEMS_ADDED.inc(len(items) - created_count, result="merged")
             
-            logger.info(f"Added {len(items)} items to review queue for user {user_id}")
-            return created_ids
+            logger.info(f"Added {len(items)} items to review queue for user {user_id}: "
+                        f"{created_count} new, {len(merged) - created_count} merged")
+            return list(canonical_items.keys())
             
         except Exception as e:
             logger.error(f"Failed to add items to queue: {str(e)}")
             raise
     
+    def _merge_items(self, items: List[ReviewItem]) -> int:
+        """
+        Create or merge canonical review items in a single transaction.
+        
+        Items that were already reviewed and archived are merged into their
+        archived copy, so a new occurrence does not re-open the review.
+        
+        Args:
+            items: Review items whose id is their canonical ID
+            
+        Returns:
+            Number of items that were created (not merged)
+        """
+        collection = self.db.collection(self.review_queue_collection)
+        refs = [collection.document(item.id) for item in items]
+        transaction = self.db.transaction()
+        
+        @firestore.transactional
+        def merge(transaction) -> int:
+            snapshots = {
+                snapshot.id: snapshot
+                for snapshot in self.db.get_all(refs, transaction=transaction)
+            }
+            
+            # Fall back to the archive for items not in the hot collection
+            missing = [
+                item for item in items
+                if snapshots.get(item.id) is None or not snapshots[item.id].exists
+            ]
+            archived = {}
+            if missing:
+                archive_refs = [self._archive_ref(item.user_id, item.id) for item in missing]
+                archived = {
+                    snapshot.id: snapshot
+                    for snapshot in self.db.get_all(archive_refs, transaction=transaction)
+                    if snapshot.exists
+                }
+            
+            created = 0
+            for item, ref in zip(items, refs):
+                snapshot = snapshots.get(item.id)
+                if snapshot is None or not snapshot.exists:
+                    snapshot = archived.get(item.id)
+                    if snapshot is None:
+                        transaction.set(ref, item.to_dict())
+                        created += 1
+                        continue
+                    ref = snapshot.reference
+                
+                data = snapshot.to_dict()
+                data['id'] = snapshot.id
+                existing = ReviewItem.from_dict(data)
+                existing.merge_occurrence(item)
+                transaction.update(ref, {
+                    'occurrence_count': existing.occurrence_count,
+                    'confidence': existing.confidence,
+                    'source_document_ids': existing.source_document_ids,
+                    'extracted_text': existing.extracted_text
+                })
+            return created
+        
+        with start_span("firestore.merge_review_items", items=len(items)) as span:
+            created = merge(transaction)
+            span.set_attributes(created=created, merged=len(items) - created)
+        return created
+    
     def get_pending_items(
         self,
         user_id: str,
@@ -111,7 +227,9 @@ class QueueManager:
         min_confidence: float = 0.0,
         item_type: Optional[ReviewItemType] = None,
         order_by: str = "confidence",
-        descending: bool = True
+        descending: bool = True,
+        start_after: Optional[str] = None,
+        summary_only: bool = False
     ) -> List[ReviewItem]:
         """
         Get pending review items for a user.
@@ -123,20 +241,81 @@ class QueueManager:
             item_type: Filter by item type (optional)
             order_by: Field to order by (default: "confidence")
             descending: Order descending (default: True)
+            start_after: Cursor returned by a previous page (optional)
+            summary_only: Only read the fields needed by list views (default: False)
             
         Returns:
             List of pending review items
             
         Raises:
-            ValueError: If user_id is empty
+            ValueError: If user_id is empty or the cursor is invalid
+            Exception: If Firestore query fails
+        """
+        items, _ = self.get_pending_page(
+            user_id=user_id,
+            limit=limit,
+            min_confidence=min_confidence,
+            item_type=item_type,
+            order_by=order_by,
+            descending=descending,
+            start_after=start_after,
+            summary_only=summary_only
+        )
+        return items
+    
+    def get_pending_page(
+        self,
+        user_id: str,
+        limit: int = 50,
+        min_confidence: float = 0.0,
+        item_type: Optional[ReviewItemType] = None,
+        order_by: str = "confidence",
+        descending: bool = True,
+        start_after: Optional[str] = None,
+        summary_only: bool = False
+    ) -> Tuple[List[ReviewItem], Optional[str]]:
+        """
+        Get one page of pending review items for a user.
+        
+        Pages are ordered by the requested field with the document ID as a
+        tie-breaker, so cursors stay stable when many items share a value.
+        
+        Args:
+            user_id: User ID
+            limit: Maximum number of items to return (default: 50)
+            min_confidence: Minimum confidence threshold (default: 0.0)
+            item_type: Filter by item type (optional)
+            order_by: Field to order by, one of PAGINATION_ORDER_FIELDS (default: "confidence")
+            descending: Order descending (default: True)
+            start_after: Cursor returned by a previous page (optional)
+            summary_only: Only read the fields needed by list views (default: False)
+            
+        Returns:
+            Tuple of (items, next_cursor). next_cursor is None on the last page.
+            
+        Raises:
+            ValueError: If user_id is empty, order_by is not indexed or the cursor is invalid
             Exception: If Firestore query fails
         """
         if not user_id or not user_id.strip():
             raise ValueError("User ID cannot be empty")
         
+        if order_by not in PAGINATION_ORDER_FIELDS:
+            raise ValueError(
+                f"Invalid order_by '{order_by}'. Must be one of: {', '.join(PAGINATION_ORDER_FIELDS)}"
+            )
+        
+        cursor = None
+        if start_after:
+            cursor = decode_cursor(start_after)
+            if cursor['order_by'] != order_by or cursor['descending'] != descending:
+                raise ValueError("Cursor does not match the requested ordering")
+        
         try:
+            collection = self.db.collection(self.review_queue_collection)
+            
             # Build query
-            query = self.db.collection(self.review_queue_collection)
+            query = collection
             query = query.where(filter=FieldFilter("user_id", "==", user_id))
             query = query.where(filter=FieldFilter("status", "==", ReviewItemStatus.PENDING.value))
             
@@ -147,13 +326,26 @@ class QueueManager:
                 type_value = item_type.value if isinstance(item_type, ReviewItemType) else item_type
                 query = query.where(filter=FieldFilter("type", "==", type_value))
             
-            # Order and limit
+            if summary_only:
+                query = query.select(REVIEW_ITEM_SUMMARY_FIELDS)
+            
+            # Order by the indexed field, then document ID to break ties
             direction = firestore.Query.DESCENDING if descending else firestore.Query.ASCENDING
             query = query.order_by(order_by, direction=direction)
-            query = query.limit(limit)
+            query = query.order_by(FieldPath.document_id(), direction=direction)
             
-            # Execute query
-            docs = query.stream()
+            if cursor:
+                query = query.start_after({
+                    order_by: cursor['value'],
+                    FieldPath.document_id(): collection.document(cursor['doc_id'])
+                })
+            
+            # Fetch one extra document to know whether another page exists
+            query = query.limit(limit + 1)
+            docs = list(query.stream())
+            
+            has_more = len(docs) > limit
+            docs = docs[:limit]
             
             # Convert to ReviewItem objects
             items = []
@@ -167,19 +359,25 @@ class QueueManager:
                     logger.error(f"Failed to parse review item {doc.id}: {str(e)}")
                     continue
             
+            next_cursor = None
+            if has_more and docs:
+                last = docs[-1]
+                next_cursor = encode_cursor(order_by, descending, last.get(order_by), last.id)
+            
             logger.info(f"Retrieved {len(items)} pending items for user {user_id}")
-            return items
+            return items, next_cursor
             
         except Exception as e:
             logger.error(f"Failed to get pending items: {str(e)}")
             raise
     
-    def get_item_by_id(self, item_id: str) -> Optional[ReviewItem]:
+    def get_item_by_id(self, item_id: str, user_id: Optional[str] = None) -> Optional[ReviewItem]:
         """
         Get a review item by ID.
         
         Args:
             item_id: Review item ID
+            user_id: Owner ID; when given, archived items are also searched
             
         Returns:
             ReviewItem if found, None otherwise
@@ -191,6 +389,9 @@ class QueueManager:
             doc_ref = self.db.collection(self.review_queue_collection).document(item_id)
             doc = doc_ref.get()
             
+            if not doc.exists and user_id:
+                doc = self._archive_ref(user_id, item_id).get()
+            
             if not doc.exists:
                 logger.warning(f"Review item not found: {item_id}")
                 return None
@@ -248,9 +449,14 @@ class QueueManager:
             if rejection_reason:
                 update_data['rejection_reason'] = rejection_reason
             
-            # Update item
+            # Update item (or move it to the archive in the same commit)
             doc_ref = self.db.collection(self.review_queue_collection).document(item_id)
-            doc_ref.update(update_data)
+            if self.archive_on_review and update_data['status'] in REVIEWED_STATUSES:
+                if not self._move_to_archive(doc_ref, user_id, update_data):
+                    logger.error(f"Item not found: {item_id}")
+                    return False
+            else:
+                doc_ref.update(update_data)
             
             # Update user stats
             self._update_user_stats_on_review(user_id, status, item.confidence)
@@ -302,6 +508,149 @@ class QueueManager:
             logger.error(f"Failed to delete item: {str(e)}")
             raise
     
+    def archive_reviewed_items(
+        self,
+        user_id: Optional[str] = None,
+        reviewed_before: Optional[datetime] = None,
+        batch_size: int = ARCHIVE_BATCH_SIZE,
+        max_batches: Optional[int] = None
+    ) -> int:
+        """
+        Move reviewed items from the review queue into the archive.
+        
+        Compaction job for items reviewed while archive_on_review was off.
+        Each batch atomically copies items to their archive partition and
+        deletes them from review_queue, so the job can be stopped and re-run
+        at any point. All item fields are kept for auditing.
+        
+        Items are re-read inside each batch's transaction, so occurrences
+        merged by a concurrent add_to_queue after the query are archived
+        with the item.
+        
+        Args:
+            user_id: Only archive this user's items (all users if None)
+            reviewed_before: Only archive items reviewed before this time
+            batch_size: Items moved per batch commit
+            max_batches: Stop after this many batches (no limit if None)
+            
+        Returns:
+            Number of items archived
+            
+        Raises:
+            ValueError: If batch_size is out of range
+            Exception: If Firestore operation fails
+        """
+        if not 0 < batch_size <= ARCHIVE_BATCH_SIZE:
+            raise ValueError(f"batch_size must be between 1 and {ARCHIVE_BATCH_SIZE}")
+        
+        try:
+            collection = self.db.collection(self.review_queue_collection)
+            query = collection.where(filter=FieldFilter('status', 'in', REVIEWED_STATUSES))
+            if user_id:
+                query = query.where(filter=FieldFilter('user_id', '==', user_id))
+            if reviewed_before:
+                query = query.where(filter=FieldFilter('reviewed_at', '<', reviewed_before.isoformat()))
+            query = query.limit(batch_size)
+            
+            archived_count = 0
+            batches = 0
+            while max_batches is None or batches < max_batches:
+                # Archived items leave the query results, so each batch re-runs it
+                docs = list(query.stream())
+                if not docs:
+                    break
+                
+                moved = self._archive_batch([doc.reference for doc in docs])
+                
+                archived_count += moved
+                batches += 1
+                logger.info(f"Archived batch of {moved} reviewed items ({archived_count} total)")
+                
+                if len(docs) < batch_size:
+                    break
+            
+            logger.info(f"Archived {archived_count} reviewed items")
+            return archived_count
+            
+        except Exception as e:
+            logger.error(f"Failed to archive reviewed items: {str(e)}")
+            raise
+    
+    def _move_to_archive(self, doc_ref, user_id: str, update_data: Dict[str, Any]) -> bool:
+        """
+        Move a review item to the archive with an update applied.
+        
+        The item is re-read inside the transaction, so occurrences merged
+        into it by a concurrent add_to_queue are carried into the archived
+        copy instead of being lost with the deleted document.
+        
+        Args:
+            doc_ref: Review queue document reference
+            user_id: Owner ID (archive partition)
+            update_data: Fields to set on the archived copy
+        
+        Returns:
+            True if the item was moved, False if it no longer exists
+        """
+        transaction = self.db.transaction()
+        
+        @firestore.transactional
+        def move(transaction) -> bool:
+            snapshot = doc_ref.get(transaction=transaction)
+            if not snapshot.exists:
+                return False
+            
+            archived = snapshot.to_dict()
+            archived['id'] = snapshot.id
+            archived.update(update_data)
+            transaction.set(self._archive_ref(user_id, snapshot.id), self._archive_record(archived))
+            transaction.delete(doc_ref)
+            return True
+        
+        return move(transaction)
+    
+    def _archive_batch(self, refs: List[Any]) -> int:
+        """
+        Move a batch of review items to the archive in one transaction.
+        
+        Args:
+            refs: Review queue document references
+        
+        Returns:
+            Number of items moved (items deleted since the query are skipped)
+        """
+        transaction = self.db.transaction()
+        
+        @firestore.transactional
+        def move(transaction) -> int:
+            snapshots = [
+                snapshot for snapshot in self.db.get_all(refs, transaction=transaction)
+                if snapshot.exists
+            ]
+            for snapshot in snapshots:
+                data = snapshot.to_dict()
+                data['id'] = snapshot.id
+                transaction.set(self._archive_ref(data['user_id'], snapshot.id), self._archive_record(data))
+                transaction.delete(snapshot.reference)
+            return len(snapshots)
+        
+        return move(transaction)
+    
+    def _archive_ref(self, user_id: str, item_id: str):
+        """Get the archive document reference for an item."""
+        return (
+            self.db.collection(self.archive_collection)
+            .document(user_id)
+            .collection(REVIEW_ARCHIVE_ITEMS_SUBCOLLECTION)
+            .document(item_id)
+        )
+    
+    def _archive_record(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """Build the archived copy of a review item document."""
+        record = dict(data)
+        record['archived_at'] = datetime.utcnow().isoformat()
+        return record
+    
     def get_user_stats(self, user_id: str) -> UserStats:
         """
         Get user review statistics.
@@ -425,14 +774,22 @@ class QueueManager:
             # Don't raise - stats update failure shouldn't break main flow
 
 
-def create_queue_manager(project_id: str = "aletheia-codex-prod") -> QueueManager:
+def create_queue_manager(
+    project_id: str = "aletheia-codex-prod",
+    archive_on_review: Optional[bool] = None
+) -> QueueManager:
     """
     Factory function to create a QueueManager instance.
     
     Args:
         project_id: GCP project ID
+        archive_on_review: Move items to the archive as soon as they are reviewed.
+            Defaults to the REVIEW_ARCHIVE_ON_REVIEW environment variable (on
+            unless set to "false").
         
     Returns:
         QueueManager instance
     """
-    return QueueManager(project_id=project_id)
\ No newline at end of file
+    if archive_on_review is None:
+        archive_on_review = os.environ.get('REVIEW_ARCHIVE_ON_REVIEW', 'true').lower() == 'true'
+    return QueueManager(project_id=project_id, archive_on_review=archive_on_review)
\ No newline at end of file
@@ -0,0 +1,90 @@
+"""
+Invocation deadlines for long-running work.
+
+A Cloud Function that runs past its timeout is killed with nothing
+persisted. Work split into units (e.g. note chunks) can instead track the
+invocation's deadline, stop starting new units when the remaining time no
+longer covers another unit plus a reserve for finishing in-flight work, and
+hand the rest to a continuation from the recorded cursor.
+
+Usage:
+    deadline = Deadline(FUNCTION_TIMEOUT_SECONDS)
+    for i, unit in enumerate(units):
+        if not deadline.has_time_for(deadline.average_unit_seconds):
+            deadline.stop_at(i)
+            break
+        started = time.monotonic()
+        process(unit)
+        deadline.record_unit(time.monotonic() - started)
+    if deadline.stopped_at is not None:
+        enqueue_continuation(cursor=deadline.stopped_at)
+"""
+
+import time
+from typing import Callable, Optional
+
+from .logging import get_logger
+
+logger = get_logger(__name__)
+
+# Invocation timeout (the maximum for event-driven Cloud Functions)
+DEFAULT_BUDGET_SECONDS = 540
+
+# Time kept back for finishing in-flight work and persisting results
+DEFAULT_RESERVE_SECONDS = 60
+
+
+class Deadline:
+    """Tracks the time left in an invocation and where work was stopped."""
+    
+    def __init__(
+        self,
+        budget_seconds: float = DEFAULT_BUDGET_SECONDS,
+        reserve_seconds: float = DEFAULT_RESERVE_SECONDS,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        """
+        Initialize deadline (the invocation is assumed to start now).
+        
+        Args:
+            budget_seconds: Total time the invocation may run
+            reserve_seconds: Time kept back for finishing up
+            clock: Monotonic clock (seconds)
+        """
+        self.clock = clock
+        self.expires_at = clock() + budget_seconds
+        self.reserve_seconds = reserve_seconds
+        self.stopped_at: Optional[int] = None
+        self._units = 0
+        self._unit_seconds = 0.0
+    
+    def remaining(self) -> float:
+        """Get the seconds left before the invocation times out."""
+        return self.expires_at - self.clock()
+    
+    def has_time_for(self, seconds: float) -> bool:
+        """Check whether work of the given duration fits before the reserve."""
+        return self.remaining() - self.reserve_seconds >= seconds
+    
+    def record_unit(self, seconds: float):
+        """Record how long one unit of work took."""
+        self._units += 1
+        self._unit_seconds += seconds
+    
+    @property
+    def average_unit_seconds(self) -> float:
+        """Average duration of the recorded units (0 before the first)."""
+        return self._unit_seconds / self._units if self._units else 0.0
+    
+    def stop_at(self, cursor: int):
+        """
+        Record that no more units are started, from the given cursor on.
+        
+        Args:
+            cursor: Index of the first unit left for a continuation
+        """
+        self.stopped_at = cursor
+        logger.warning(
+            f"Stopping at unit {cursor} with {self.remaining():.0f}s left "
+            f"(average unit {self.average_unit_seconds:.1f}s, reserve {self.reserve_seconds:.0f}s)"
+        )
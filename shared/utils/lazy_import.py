@@ -0,0 +1,87 @@
+"""
+Lazy imports for heavy SDKs.
+
+Importing SDKs such as google.generativeai, google.cloud.secretmanager,
+firebase_admin or requests costs tens to hundreds of milliseconds each.
+Module-level imports in shared/ put that on every cold start, even on
+routes that never use them. lazy_import() returns a stand-in module that
+performs the real import on first attribute access, so the cost moves to
+the first request that needs the SDK (or to a background warm-up).
+
+Usage:
+    secretmanager = lazy_import("google.cloud.secretmanager")
+    ...
+    client = secretmanager.SecretManagerServiceClient()  # imported here
+
+Only use it for modules accessed through attributes at call time; names
+needed at import time (base classes, decorators, type annotations) must be
+imported normally.
+"""
+
+import importlib
+import sys
+import threading
+import types
+from typing import Dict
+
+_lazy_modules: Dict[str, "LazyModule"] = {}
+_lock = threading.Lock()
+
+
+class LazyModule(types.ModuleType):
+    """Module stand-in that imports the real module on first attribute access."""
+    
+    def __init__(self, name: str):
+        super().__init__(name)
+        self.__dict__['_lazy_module'] = None
+        self.__dict__['_lazy_lock'] = threading.Lock()
+    
+    def _load(self) -> types.ModuleType:
+        """Import the real module (once)."""
+        module = self.__dict__['_lazy_module']
+        if module is None:
+            with self.__dict__['_lazy_lock']:
+                module = self.__dict__['_lazy_module']
+                if module is None:
+                    module = importlib.import_module(self.__name__)
+                    self.__dict__['_lazy_module'] = module
+        return module
+    
+    def __getattr__(self, attribute: str):
+        return getattr(self._load(), attribute)
+    
+    def __dir__(self):
+        return dir(self._load())
+    
+    def __repr__(self) -> str:
+        state = "loaded" if self.__dict__['_lazy_module'] is not None else "not loaded"
+        return f"<lazy module '{self.__name__}' ({state})>"
+
+
+def lazy_import(name: str) -> types.ModuleType:
+    """
+    Get a module that is imported on first use.
+    
+    Returns the real module if it has already been imported.
+    
+    Args:
+        name: Fully qualified module name
+    
+    Returns:
+        The module, or a LazyModule stand-in for it
+    """
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+    
+    with _lock:
+        if name not in _lazy_modules:
+            _lazy_modules[name] = LazyModule(name)
+        return _lazy_modules[name]
+
+
+def is_loaded(module: types.ModuleType) -> bool:
+    """Check whether a (possibly lazy) module has actually been imported."""
+    if isinstance(module, LazyModule):
+        return module.__dict__['_lazy_module'] is not None
+    return True
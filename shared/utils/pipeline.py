@@ -0,0 +1,160 @@
+"""
+Staged asyncio pipeline with bounded queues.
+
+A source stage (an async iterator, e.g. per-chunk AI extraction) feeds
+every sink through its own bounded queue. Sinks consume concurrently with
+the source and with each other, so downstream writes for early items
+overlap the production of later ones, and total latency approaches that of
+the slowest stage instead of the sum of all stages. A full queue blocks the
+source, which bounds memory when a sink falls behind.
+
+Each sink handles its items one at a time and in order. Async handlers run
+on the event loop; sync handlers (blocking Firestore or Neo4j calls) run in
+worker threads so they do not stall the other stages. Each handler call is
+traced as a "stage.<name>" span.
+
+Usage:
+    results = await run_staged_pipeline(extract_chunks(...), [
+        Sink("review_queue", store_chunk),
+        Sink("graph", populate_chunk, required=False)
+    ])
+"""
+
+import asyncio
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Callable, Dict, List
+
+from .logging import get_logger
+from .tracing import start_span
+
+logger = get_logger(__name__)
+
+# Items buffered between the source and each sink
+DEFAULT_QUEUE_SIZE = 2
+
+SOURCE_STAGE = "source"
+
+_END = object()
+
+
+class PipelineStageError(Exception):
+    """Raised when the source or a required sink fails."""
+    
+    def __init__(self, stage: str, error: BaseException):
+        super().__init__(f"Pipeline stage {stage} failed: {type(error).__name__}: {str(error)}")
+        self.stage = stage
+        self.error = error
+
+
+@dataclass
+class Sink:
+    """
+    A pipeline sink.
+    
+    Attributes:
+        name: Stage name (used in results and errors)
+        handler: Called with each item; async or sync
+        required: Whether a failure aborts the pipeline; failures of
+            optional sinks are recorded and the sink moves on to the next item
+    """
+    name: str
+    handler: Callable[[Any], Any]
+    required: bool = True
+
+
+@dataclass
+class SinkResult:
+    """
+    Outcome of one sink.
+    
+    Attributes:
+        name: Stage name
+        results: Handler return values, in item order (failed items omitted)
+        errors: Error messages of failed items (optional sinks only)
+    """
+    name: str
+    results: List[Any] = field(default_factory=list)
+    errors: List[str] = field(default_factory=list)
+
+
+async def _produce(source: AsyncIterator, queues: List[asyncio.Queue]):
+    """Feed every source item to every sink queue."""
+    try:
+        async for item in source:
+            for queue in queues:
+                await queue.put(item)
+    except asyncio.CancelledError:
+        raise
+    except Exception as e:
+        raise PipelineStageError(SOURCE_STAGE, e) from e
+    
+    for queue in queues:
+        await queue.put(_END)
+
+
+async def _consume(sink: Sink, queue: asyncio.Queue, result: SinkResult):
+    """Run a sink over its queue until the source is exhausted."""
+    is_async = asyncio.iscoroutinefunction(sink.handler)
+    while True:
+        item = await queue.get()
+        if item is _END:
+            return
+        
+        try:
+            # Worker threads inherit the context, so handler spans nest here
+            with start_span(f"stage.{sink.name}"):
+                if is_async:
+                    value = await sink.handler(item)
+                else:
+                    value = await asyncio.to_thread(sink.handler, item)
+            result.results.append(value)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            if sink.required:
+                raise PipelineStageError(sink.name, e) from e
+            logger.warning(f"Optional pipeline stage {sink.name} failed: {type(e).__name__}: {str(e)}")
+            result.errors.append(str(e))
+
+
+async def run_staged_pipeline(
+    source: AsyncIterator,
+    sinks: List[Sink],
+    queue_size: int = DEFAULT_QUEUE_SIZE
+) -> Dict[str, SinkResult]:
+    """
+    Run a source and its sinks concurrently.
+    
+    When the source or a required sink fails, the remaining stages are
+    cancelled (a sync handler already running in a worker thread finishes
+    in the background) and the failure is raised.
+    
+    Args:
+        source: Async iterator of items
+        sinks: Sinks, each receiving every item
+        queue_size: Items buffered per sink before the source waits
+    
+    Returns:
+        Sink name to SinkResult
+    
+    Raises:
+        PipelineStageError: If the source or a required sink fails
+    """
+    queues = [asyncio.Queue(maxsize=queue_size) for _ in sinks]
+    results = {sink.name: SinkResult(name=sink.name) for sink in sinks}
+    
+    tasks = [asyncio.ensure_future(_produce(source, queues))]
+    tasks.extend(
+        asyncio.ensure_future(_consume(sink, queue, results[sink.name]))
+        for sink, queue in zip(sinks, queues)
+    )
+    
+    try:
+        await asyncio.gather(*tasks)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
+    
+    return results
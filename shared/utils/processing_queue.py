@@ -0,0 +1,195 @@
+"""
+Note processing queue for AletheiaCodex.
+
+Sits between the APIs that request processing (notes API, ingestion,
+backfills) and the orchestration worker. Work is split into priority lanes,
+each backed by its own task queue with its own concurrency and dispatch rate,
+so a bulk backfill cannot starve interactive single-note processing:
+- interactive: notes submitted by a user, small and latency sensitive
+- bulk: backfills and imports, throttled
+
+Each lane has a maximum backlog. Enqueueing into a full lane raises
+QueueBacklogError so the API can reject the request with 429 instead of
+growing the queue without bound.
+"""
+
+import os
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional
+
+from .logging import get_logger
+from .task_queue import TaskQueue, TaskQueueError, create_task_queue
+
+logger = get_logger(__name__)
+
+# Priority lanes
+LANE_INTERACTIVE = "interactive"
+LANE_BULK = "bulk"
+
+
+@dataclass
+class LaneConfig:
+    """
+    Limits for one processing lane.
+    
+    Attributes:
+        max_concurrency: Maximum notes processed at once
+        max_dispatches_per_second: Maximum rate at which processing starts
+        max_depth: Backlog above which new work is rejected
+        retry_after_seconds: Suggested client back-off when the lane is full
+    """
+    max_concurrency: int
+    max_dispatches_per_second: float
+    max_depth: int
+    retry_after_seconds: int = 30
+
+
+DEFAULT_LANES: Dict[str, LaneConfig] = {
+    LANE_INTERACTIVE: LaneConfig(max_concurrency=10, max_dispatches_per_second=5.0, max_depth=500),
+    LANE_BULK: LaneConfig(max_concurrency=2, max_dispatches_per_second=1.0, max_depth=20000, retry_after_seconds=300)
+}
+
+
+class QueueBacklogError(TaskQueueError):
+    """Raised when a lane's backlog is above its maximum depth."""
+    
+    def __init__(self, lane: str, depth: int, retry_after_seconds: int):
+        super().__init__(f"Processing queue lane '{lane}' is full ({depth} tasks)")
+        self.lane = lane
+        self.depth = depth
+        self.retry_after_seconds = retry_after_seconds
+
+
+class ProcessingQueue:
+    """Priority lanes of task queues with backlog limits."""
+    
+    def __init__(self, name: str, lanes: Dict[str, TaskQueue], configs: Dict[str, LaneConfig]):
+        """
+        Initialize processing queue.
+        
+        Args:
+            name: Queue name
+            lanes: Task queue for each lane
+            configs: Limits for each lane
+        """
+        self.name = name
+        self.lanes = lanes
+        self.configs = configs
+    
+    def enqueue(
+        self,
+        payload: Dict[str, Any],
+        lane: str = LANE_INTERACTIVE,
+        delay_seconds: int = 0,
+        enforce_backlog: bool = True
+    ) -> str:
+        """
+        Enqueue work into a lane.
+        
+        Args:
+            payload: JSON-serializable task payload
+            lane: Priority lane
+            delay_seconds: Delay before the task becomes eligible to run
+            enforce_backlog: Reject the task if the lane is full (callers
+                that cannot push back, such as triggers, pass False)
+        
+        Returns:
+            Task identifier
+        
+        Raises:
+            ValueError: If the lane is unknown
+            QueueBacklogError: If the lane is full
+            TaskQueueError: If the task cannot be enqueued
+        """
+        if enforce_backlog:
+            self.check_capacity(lane)
+        elif lane not in self.lanes:
+            raise ValueError(f"Unknown processing lane: {lane}")
+        return self.lanes[lane].enqueue(dict(payload, lane=lane), delay_seconds=delay_seconds)
+    
+    def check_capacity(self, lane: str = LANE_INTERACTIVE):
+        """
+        Check that a lane can accept more work.
+        
+        Args:
+            lane: Priority lane
+        
+        Raises:
+            ValueError: If the lane is unknown
+            QueueBacklogError: If the lane is full
+        """
+        if lane not in self.lanes:
+            raise ValueError(f"Unknown processing lane: {lane}")
+        
+        config = self.configs[lane]
+        depth = self.lanes[lane].depth()
+        if depth >= config.max_depth:
+            logger.warning(f"Processing lane {lane} is full: {depth}/{config.max_depth}")
+            raise QueueBacklogError(lane, depth, config.retry_after_seconds)
+    
+    def depth(self) -> Dict[str, Dict[str, int]]:
+        """
+        Get the backlog of every lane.
+        
+        Returns:
+            Mapping of lane to {'depth', 'max_depth'}
+        """
+        return {
+            lane: {'depth': queue.depth(), 'max_depth': self.configs[lane].max_depth}
+            for lane, queue in self.lanes.items()
+        }
+
+
+def create_processing_queue(
+    name: str = "note-processing",
+    handler: Optional[Callable[[Dict[str, Any]], None]] = None,
+    worker_url: Optional[str] = None,
+    project_id: str = "aletheia-codex-prod",
+    backend: Optional[str] = None,
+    configs: Optional[Dict[str, LaneConfig]] = None
+) -> ProcessingQueue:
+    """
+    Create a processing queue with one task queue per lane.
+    
+    Lane queues are named "<name>-<lane>". With Cloud Tasks their
+    concurrency and rate limits live on the Cloud Tasks queues (applied with
+    CloudTasksQueue.configure at deploy time by
+    scripts/deploy/configure_task_queues.py); the local backend enforces
+    them in-process. Each lane's max_depth can be overridden with the
+    PROCESSING_QUEUE_<LANE>_MAX_DEPTH environment variable.
+    
+    Args:
+        name: Queue name prefix
+        handler: Payload handler for the local backend
+        worker_url: Worker URL for the Cloud Tasks backend
+        project_id: GCP project ID
+        backend: Explicit backend override
+        configs: Lane limits (DEFAULT_LANES if None)
+    
+    Returns:
+        ProcessingQueue instance
+    """
+    configs = dict(configs or DEFAULT_LANES)
+    lanes = {}
+    for lane, config in configs.items():
+        max_depth = os.environ.get(f"PROCESSING_QUEUE_{lane.upper()}_MAX_DEPTH")
+        if max_depth:
+            config = LaneConfig(
+                max_concurrency=config.max_concurrency,
+                max_dispatches_per_second=config.max_dispatches_per_second,
+                max_depth=int(max_depth),
+                retry_after_seconds=config.retry_after_seconds
+            )
+            configs[lane] = config
+        
+        lanes[lane] = create_task_queue(
+            f"{name}-{lane}",
+            handler=handler,
+            worker_url=worker_url,
+            project_id=project_id,
+            backend=backend,
+            max_concurrency=config.max_concurrency,
+            max_dispatches_per_second=config.max_dispatches_per_second
+        )
+    
+    return ProcessingQueue(name=name, lanes=lanes, configs=configs)
@@ -0,0 +1,355 @@
+"""
+Task queue abstraction for AletheiaCodex background work.
+
+Provides a small interface for enqueuing JSON payloads to a worker with two
+interchangeable backends:
+- Cloud Tasks (production): each payload becomes an HTTP task that POSTs to
+  a worker Cloud Function, authenticated with an OIDC token
+- Local (development/tests): payloads are handled in-process by background
+  worker threads, standing in for Cloud Tasks
+
+Both backends support a maximum number of concurrently running tasks and a
+maximum dispatch rate, and report their depth (tasks not yet finished).
+"""
+
+import json
+import os
+import queue
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from .logging import get_logger
+
+logger = get_logger(__name__)
+
+# Backend selection
+BACKEND_CLOUD_TASKS = "cloud_tasks"
+BACKEND_LOCAL = "local"
+
+# Cloud Tasks depth is counted by listing tasks, up to this many
+DEPTH_COUNT_LIMIT = 5000
+
+# How long a Cloud Tasks depth count is reused
+DEPTH_CACHE_SECONDS = 10.0
+
+
+class TaskQueueError(Exception):
+    """Raised when a task cannot be enqueued."""
+    pass
+
+
+class TaskQueue(ABC):
+    """Abstract base class for task queue backends."""
+    
+    def __init__(self, name: str):
+        """
+        Initialize task queue.
+        
+        Args:
+            name: Queue name
+        """
+        self.name = name
+    
+    @abstractmethod
+    def enqueue(self, payload: Dict[str, Any], delay_seconds: int = 0) -> str:
+        """
+        Enqueue a payload for the worker.
+        
+        Args:
+            payload: JSON-serializable task payload
+            delay_seconds: Delay before the task becomes eligible to run
+        
+        Returns:
+            Task identifier
+        """
+        pass
+    
+    @abstractmethod
+    def depth(self) -> int:
+        """
+        Get the number of tasks that have not finished yet.
+        
+        Returns:
+            Queued plus running tasks
+        """
+        pass
+
+
+class CloudTasksQueue(TaskQueue):
+    """Task queue backed by Google Cloud Tasks HTTP targets."""
+    
+    def __init__(
+        self,
+        name: str,
+        worker_url: str,
+        project_id: str = "aletheia-codex-prod",
+        location: str = "us-central1",
+        service_account_email: Optional[str] = None
+    ):
+        """
+        Initialize Cloud Tasks queue.
+        
+        Args:
+            name: Cloud Tasks queue name
+            worker_url: URL of the worker function that receives tasks
+            project_id: GCP project ID
+            location: Cloud Tasks location
+            service_account_email: Service account used to mint the OIDC token
+        """
+        super().__init__(name)
+        from google.cloud import tasks_v2
+        
+        self._tasks_v2 = tasks_v2
+        self.client = tasks_v2.CloudTasksClient()
+        self.parent = self.client.queue_path(project_id, location, name)
+        self.worker_url = worker_url
+        self.service_account_email = service_account_email
+        self._depth_cache: Optional[Tuple[float, int]] = None
+        
+        logger.info(f"Initialized Cloud Tasks queue: {self.parent}")
+    
+    def enqueue(self, payload: Dict[str, Any], delay_seconds: int = 0) -> str:
+        """Create an HTTP task that POSTs the payload to the worker URL."""
+        http_request = {
+            'http_method': self._tasks_v2.HttpMethod.POST,
+            'url': self.worker_url,
+            'headers': {'Content-Type': 'application/json'},
+            'body': json.dumps(payload).encode('utf-8')
+        }
+        if self.service_account_email:
+            http_request['oidc_token'] = {
+                'service_account_email': self.service_account_email
+            }
+        
+        task: Dict[str, Any] = {'http_request': http_request}
+        if delay_seconds > 0:
+            from google.protobuf import timestamp_pb2
+            schedule_time = timestamp_pb2.Timestamp()
+            schedule_time.FromSeconds(int(time.time()) + delay_seconds)
+            task['schedule_time'] = schedule_time
+        
+        try:
+            response = self.client.create_task(request={'parent': self.parent, 'task': task})
+            logger.info(f"Enqueued Cloud Task on {self.name}: {response.name}")
+            return response.name
+        except Exception as e:
+            logger.error(f"Failed to enqueue Cloud Task on {self.name}: {str(e)}")
+            raise TaskQueueError(f"Failed to enqueue task: {e}")
+    
+    def depth(self) -> int:
+        """
+        Count tasks in the queue (capped at DEPTH_COUNT_LIMIT).
+        
+        Counting lists tasks, so the result is cached for DEPTH_CACHE_SECONDS.
+        """
+        now = time.monotonic()
+        if self._depth_cache is not None and now - self._depth_cache[0] < DEPTH_CACHE_SECONDS:
+            return self._depth_cache[1]
+        
+        try:
+            count = 0
+            for _ in self.client.list_tasks(request={'parent': self.parent, 'page_size': 1000}):
+                count += 1
+                if count >= DEPTH_COUNT_LIMIT:
+                    break
+        except Exception as e:
+            logger.error(f"Failed to count tasks on {self.name}: {str(e)}")
+            raise TaskQueueError(f"Failed to get queue depth: {e}")
+        
+        self._depth_cache = (now, count)
+        return count
+    
+    def configure(self, max_concurrency: int, max_dispatches_per_second: float):
+        """
+        Apply concurrency and rate limits to the Cloud Tasks queue.
+        
+        The queue is created if it does not exist yet (UpdateQueue upserts).
+        Requires the cloudtasks.queues.update permission, so this is meant for
+        deployment scripts (scripts/deploy/configure_task_queues.py) rather
+        than request handling.
+        
+        Args:
+            max_concurrency: Maximum concurrently running tasks
+            max_dispatches_per_second: Maximum task dispatch rate
+        """
+        from google.protobuf import field_mask_pb2
+        
+        queue_update = {
+            'name': self.parent,
+            'rate_limits': {
+                'max_concurrent_dispatches': max_concurrency,
+                'max_dispatches_per_second': max_dispatches_per_second
+            }
+        }
+        mask = field_mask_pb2.FieldMask(paths=[
+            'rate_limits.max_concurrent_dispatches',
+            'rate_limits.max_dispatches_per_second'
+        ])
+        self.client.update_queue(request={'queue': queue_update, 'update_mask': mask})
+        logger.info(
+            f"Configured Cloud Tasks queue {self.name}: "
+            f"{max_concurrency} concurrent, {max_dispatches_per_second}/s"
+        )
+
+
+class LocalTaskQueue(TaskQueue):
+    """
+    In-process task queue.
+    
+    Payloads are handled in FIFO order by max_concurrency daemon worker
+    threads, started no faster than max_dispatches_per_second. Handler
+    exceptions are logged and do not stop the workers.
+    """
+    
+    def __init__(
+        self,
+        name: str,
+        handler: Callable[[Dict[str, Any]], None],
+        max_concurrency: int = 1,
+        max_dispatches_per_second: Optional[float] = None
+    ):
+        """
+        Initialize local task queue.
+        
+        Args:
+            name: Queue name (for logging)
+            handler: Callable invoked with each payload
+            max_concurrency: Number of worker threads
+            max_dispatches_per_second: Maximum task start rate (unlimited if None)
+        """
+        super().__init__(name)
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+        
+        self.handler = handler
+        self.max_concurrency = max_concurrency
+        self.max_dispatches_per_second = max_dispatches_per_second
+        self._queue: "queue.Queue[Dict[str, Any]]" = queue.Queue()
+        self._counter = 0
+        self._running = 0
+        self._next_dispatch = 0.0
+        self._lock = threading.Lock()
+        self._workers = [
+            threading.Thread(target=self._run, name=f"task-queue-{name}-{i}", daemon=True)
+            for i in range(max_concurrency)
+        ]
+        for worker in self._workers:
+            worker.start()
+        
+        logger.info(f"Initialized local task queue: {name} ({max_concurrency} workers)")
+    
+    def enqueue(self, payload: Dict[str, Any], delay_seconds: int = 0) -> str:
+        """Queue the payload for the in-process workers."""
+        with self._lock:
+            self._counter += 1
+            task_id = f"{self.name}-{self._counter}"
+        
+        # Round-trip through JSON so handlers see the same data as with Cloud Tasks
+        task = {
+            'id': task_id,
+            'payload': json.loads(json.dumps(payload)),
+            'not_before': time.monotonic() + max(0, delay_seconds)
+        }
+        self._queue.put(task)
+        logger.debug(f"Enqueued local task {task_id}")
+        return task_id
+    
+    def depth(self) -> int:
+        """Get the number of queued plus running tasks."""
+        with self._lock:
+            return self._queue.qsize() + self._running
+    
+    def join(self):
+        """Block until every queued task has been handled."""
+        self._queue.join()
+    
+    def _wait_for_dispatch_slot(self):
+        """Sleep until the dispatch rate allows another task to start."""
+        if not self.max_dispatches_per_second:
+            return
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_dispatch)
+            self._next_dispatch = slot + 1.0 / self.max_dispatches_per_second
+        if slot > now:
+            time.sleep(slot - now)
+    
+    def _run(self):
+        """Worker loop."""
+        while True:
+            task = self._queue.get()
+            with self._lock:
+                self._running += 1
+            try:
+                wait = task['not_before'] - time.monotonic()
+                if wait > 0:
+                    time.sleep(wait)
+                self._wait_for_dispatch_slot()
+                self.handler(task['payload'])
+            except Exception as e:
+                logger.error(f"Local task {task['id']} failed: {type(e).__name__}: {str(e)}")
+            finally:
+                with self._lock:
+                    self._running -= 1
+                self._queue.task_done()
+
+
+def create_task_queue(
+    name: str,
+    handler: Optional[Callable[[Dict[str, Any]], None]] = None,
+    worker_url: Optional[str] = None,
+    project_id: str = "aletheia-codex-prod",
+    backend: Optional[str] = None,
+    max_concurrency: int = 1,
+    max_dispatches_per_second: Optional[float] = None
+) -> TaskQueue:
+    """
+    Create a task queue for the configured backend.
+    
+    The backend defaults to the TASK_QUEUE_BACKEND environment variable
+    ("cloud_tasks" or "local"). Cloud Tasks is used when a worker URL is
+    available, otherwise the local backend is used.
+    
+    Concurrency and rate limits are enforced in-process by the local backend.
+    Cloud Tasks queues enforce them server-side (see CloudTasksQueue.configure).
+    
+    Args:
+        name: Queue name
+        handler: Payload handler for the local backend
+        worker_url: Worker URL for the Cloud Tasks backend
+        project_id: GCP project ID
+        backend: Explicit backend override
+        max_concurrency: Worker threads for the local backend
+        max_dispatches_per_second: Dispatch rate for the local backend
+    
+    Returns:
+        TaskQueue instance
+    """
+    backend = backend or os.environ.get('TASK_QUEUE_BACKEND')
+    if backend is None:
+        backend = BACKEND_CLOUD_TASKS if worker_url else BACKEND_LOCAL
+    
+    if backend == BACKEND_CLOUD_TASKS:
+        if not worker_url:
+            raise TaskQueueError(f"Cloud Tasks queue {name} requires a worker URL")
+        return CloudTasksQueue(
+            name=name,
+            worker_url=worker_url,
+            project_id=project_id,
+            location=os.environ.get('TASK_QUEUE_LOCATION', 'us-central1'),
+            service_account_email=os.environ.get('TASK_QUEUE_SERVICE_ACCOUNT')
+        )
+    
+    if backend == BACKEND_LOCAL:
+        if handler is None:
+            raise TaskQueueError(f"Local queue {name} requires a handler")
+        return LocalTaskQueue(
+            name=name,
+            handler=handler,
+            max_concurrency=max_concurrency,
+            max_dispatches_per_second=max_dispatches_per_second
+        )
+    
+    raise ValueError(f"Unknown task queue backend: {backend}")
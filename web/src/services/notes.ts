@@ -1,10 +1,12 @@
-import { collection, doc, addDoc, updateDoc, deleteDoc, getDocs, getDoc, query, where, orderBy, limit, onSnapshot, Timestamp } from 'firebase/firestore';
-import { db } from '../firebase/config';
+import { collection, doc, getDocs, getDoc, query, where, orderBy, limit, onSnapshot, Timestamp, writeBatch, increment, serverTimestamp, WriteBatch } from 'firebase/firestore';
+import { db, auth } from '../firebase/config';
 
 export interface Note {
   id: string;
   userId: string;
   content: string;
+  title?: string;
+  contentPreview?: string;
   createdAt: Timestamp;
   updatedAt: Timestamp;
   status: 'processing' | 'completed' | 'failed';
@@ -44,6 +46,37 @@ export interface UpdateNoteRequest {
 }
 
 const COLLECTION_NAME = 'notes';
+const VERSIONS_COLLECTION_NAME = 'note_versions';
+const TITLE_LENGTH = 80;
+const PREVIEW_LENGTH = 200;
+
+const truncate = (text: string, length: number): string =>
+  text.length <= length ? text : `${text.slice(0, length - 1).trimEnd()}…`;
+
+/**
+ * Build the list summary fields stored with a note (mirrors shared/models/note.py)
+ */
+const buildNoteSummary = (content: string): { title: string; contentPreview: string } => {
+  const firstLine = content.split('\n').map(line => line.trim()).find(line => line) || '';
+  return {
+    title: truncate(firstLine, TITLE_LENGTH),
+    contentPreview: truncate(content.replace(/\s+/g, ' ').trim(), PREVIEW_LENGTH),
+  };
+};
+
+/**
+ * Bump the user's notes version (used by the Notes API list ETag) in the same batch as a note write
+ */
+const bumpNotesVersion = (batch: WriteBatch, userId: string | undefined): void => {
+  if (!userId) {
+    return;
+  }
+  batch.set(
+    doc(db, VERSIONS_COLLECTION_NAME, userId),
+    { version: increment(1), updatedAt: serverTimestamp() },
+    { merge: true }
+  );
+};
 
 class NotesService {
   /**
@@ -54,6 +87,7 @@ class NotesService {
     const noteData = {
       userId: request.userId,
       content: request.content,
+      ...buildNoteSummary(request.content),
       createdAt: now,
       updatedAt: now,
       status: 'processing' as const,
@@ -63,7 +97,11 @@ class NotesService {
       },
     };
 
-    const docRef = await addDoc(collection(db, COLLECTION_NAME), noteData);
+    const docRef = doc(collection(db, COLLECTION_NAME));
+    const batch = writeBatch(db);
+    batch.set(docRef, noteData);
+    bumpNotesVersion(batch, request.userId);
+    await batch.commit();
     
     return {
       id: docRef.id,
@@ -131,7 +169,10 @@ class NotesService {
       updatedAt: Timestamp.now(),
     };
     
-    await updateDoc(docRef, updateData);
+    const batch = writeBatch(db);
+    batch.update(docRef, updateData);
+    bumpNotesVersion(batch, auth.currentUser?.uid);
+    await batch.commit();
   }
 
   /**
@@ -139,7 +180,10 @@ class NotesService {
    */
   async deleteNote(noteId: string): Promise<void> {
     const docRef = doc(db, COLLECTION_NAME, noteId);
-    await deleteDoc(docRef);
+    const batch = writeBatch(db);
+    batch.delete(docRef);
+    bumpNotesVersion(batch, auth.currentUser?.uid);
+    await batch.commit();
   }
 
   /**